@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+""" Benchmark of torch.compile'd quantization kernels against the eager implementation """
+
+import time
+
+import pytest
+import torch
+from torch import nn
+from torchvision import models
+
+from aimet_torch.v2.quantsim import QuantizationSimModel
+from aimet_torch.v2.quantization import _compiled_kernels
+from aimet_torch._base.nn.modules import custom
+
+
+class BertLayer(nn.Module):
+    """ BERT-base sized transformer encoder layer """
+    def __init__(self, hidden_size=768, num_heads=12, intermediate_size=3072):
+        super().__init__()
+        self.num_heads = num_heads
+        self.query = nn.Linear(hidden_size, hidden_size)
+        self.key = nn.Linear(hidden_size, hidden_size)
+        self.value = nn.Linear(hidden_size, hidden_size)
+        self.matmul_1 = custom.MatMul()
+        self.softmax = nn.Softmax(dim=-1)
+        self.matmul_2 = custom.MatMul()
+        self.dense = nn.Linear(hidden_size, hidden_size)
+        self.add_1 = custom.Add()
+        self.layernorm_1 = nn.LayerNorm(hidden_size)
+        self.intermediate = nn.Linear(hidden_size, intermediate_size)
+        self.gelu = nn.GELU()
+        self.output = nn.Linear(intermediate_size, hidden_size)
+        self.add_2 = custom.Add()
+        self.layernorm_2 = nn.LayerNorm(hidden_size)
+
+    def _split_heads(self, x):
+        batch_size, seq_len, hidden_size = x.shape
+        return x.view(batch_size, seq_len, self.num_heads, hidden_size // self.num_heads).transpose(1, 2)
+
+    def forward(self, x):
+        batch_size, seq_len, hidden_size = x.shape
+        q = self._split_heads(self.query(x))
+        k = self._split_heads(self.key(x))
+        v = self._split_heads(self.value(x))
+        attn = self.softmax(self.matmul_1(q, k.transpose(-1, -2)) / (hidden_size // self.num_heads) ** 0.5)
+        ctx = self.matmul_2(attn, v).transpose(1, 2).reshape(batch_size, seq_len, hidden_size)
+        x = self.layernorm_1(self.add_1(x, self.dense(ctx)))
+        return self.layernorm_2(self.add_2(x, self.output(self.gelu(self.intermediate(x)))))
+
+
+class Bert(nn.Module):
+    def __init__(self, num_layers=4):
+        super().__init__()
+        self.layers = nn.Sequential(*(BertLayer() for _ in range(num_layers)))
+
+    def forward(self, x):
+        return self.layers(x)
+
+
+def _measure(fn, num_iterations):
+    fn() # warm-up. Compilation happens here when compiled implementation is enabled
+    start = time.perf_counter()
+    for _ in range(num_iterations):
+        fn()
+    return (time.perf_counter() - start) / num_iterations
+
+
+@pytest.mark.parametrize('model_factory, input_shape', [
+    (models.resnet18, (8, 3, 224, 224)),
+    (Bert, (8, 128, 768)),
+])
+def test_compiled_fake_quant_benchmark(model_factory, input_shape):
+    """
+    Compare the latency of calibration and QAT steps with/without torch.compile'd quantization kernels
+    """
+    torch.manual_seed(0)
+    model = model_factory().eval()
+    dummy_input = torch.randn(input_shape)
+    eager_sim = QuantizationSimModel(model, dummy_input, quant_scheme='tf')
+    compiled_sim = QuantizationSimModel(model, dummy_input, quant_scheme='tf', use_compiled_kernels=True)
+
+    def calibrate(sim):
+        sim.compute_encodings(lambda model: model(dummy_input))
+
+    def qat_step(sim, optimizer):
+        optimizer.zero_grad()
+        sim.model(dummy_input).mean().backward()
+        optimizer.step()
+
+    latencies = {}
+    for name, sim in (('eager', eager_sim), ('compiled', compiled_sim)):
+        optimizer = torch.optim.SGD(sim.model.parameters(), lr=1e-6)
+        latencies[name, 'calibration'] = _measure(lambda: calibrate(sim), 3)
+        sim.model.train()
+        latencies[name, 'qat_step'] = _measure(lambda: qat_step(sim, optimizer), 5)
+        sim.model.eval()
+
+    assert not _compiled_kernels._FAILED_KERNELS
+
+    print(f"\n{model_factory.__name__} {list(input_shape)}")
+    for step in ('calibration', 'qat_step'):
+        eager, compiled = latencies['eager', step], latencies['compiled', step]
+        print(f"  {step:<12}: eager {eager:.3f}s, compiled {compiled:.3f}s (x{eager / compiled:.2f})")
+
+    for step in ('calibration', 'qat_step'):
+        assert latencies['compiled', step] <= latencies['eager', step]
+
+    # Compiled kernels should be numerically equivalent to the eager implementation
+    calibrate(eager_sim)
+    calibrate(compiled_sim)
+    with torch.no_grad():
+        eager_out = eager_sim.model(dummy_input)
+        compiled_out = compiled_sim.model(dummy_input)
+    assert torch.allclose(eager_out, compiled_out, atol=1e-5)
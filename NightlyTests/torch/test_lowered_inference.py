@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+""" Micro-benchmark of per-op dispatch overhead of quantized modules before and after lowering for inference """
+
+import time
+
+import pytest
+import torch
+from torch import nn
+
+from aimet_torch.v2.quantsim import QuantizationSimModel, lower_for_inference
+from aimet_torch._base.nn.modules import custom
+from test_compiled_fake_quant import BertLayer
+
+
+class SmallBert(nn.Module):
+    """ Transformer with small hidden size, where the runtime is dominated by per-op overhead """
+    def __init__(self, num_layers=4):
+        super().__init__()
+        self.layers = nn.Sequential(*(BertLayer(hidden_size=64, num_heads=4, intermediate_size=128)
+                                      for _ in range(num_layers)))
+
+    def forward(self, x):
+        return self.layers(x)
+
+
+class SingleOp(nn.Module):
+    def __init__(self, module, num_inputs=1):
+        super().__init__()
+        self.module = module
+        self.num_inputs = num_inputs
+
+    def forward(self, x):
+        return self.module(*(x,) * self.num_inputs)
+
+
+def _measure(fn, num_iterations):
+    fn() # warm-up
+    start = time.perf_counter()
+    for _ in range(num_iterations):
+        fn()
+    return (time.perf_counter() - start) / num_iterations
+
+
+def _benchmark(model, dummy_input, num_iterations):
+    model = model.eval()
+    sim = QuantizationSimModel(model, dummy_input, quant_scheme='tf')
+    sim.compute_encodings(lambda model: model(dummy_input))
+
+    with torch.no_grad():
+        lowered = lower_for_inference(sim.model)
+        traced = lower_for_inference(sim.model, dummy_input)
+
+        latency = {
+            'fp32': _measure(lambda: model(dummy_input), num_iterations),
+            'sim': _measure(lambda: sim.model(dummy_input), num_iterations),
+            'lowered': _measure(lambda: lowered(dummy_input), num_iterations),
+            'traced': _measure(lambda: traced(dummy_input), num_iterations),
+        }
+
+        # Lowered model should be numerically equivalent to the sim model
+        expected = sim.model(dummy_input)
+        assert torch.equal(lowered(dummy_input), expected)
+        assert torch.equal(traced(dummy_input), expected)
+
+    return latency
+
+
+@pytest.mark.parametrize('name, module, num_inputs', [
+    ('linear', nn.Linear(16, 16), 1),
+    ('add', custom.Add(), 2),
+    ('matmul', custom.MatMul(), 2),
+    ('softmax', nn.Softmax(dim=-1), 1),
+    ('layernorm', nn.LayerNorm(16), 1),
+    ('gelu', nn.GELU(), 1),
+])
+def test_per_op_dispatch_overhead(name, module, num_inputs):
+    """
+    Measure the per-op overhead on top of the floating point op before and after lowering
+    """
+    torch.manual_seed(0)
+    latency = _benchmark(SingleOp(module, num_inputs), torch.randn(16, 16), num_iterations=1000)
+    overhead = {key: (value - latency['fp32']) * 1e6 for key, value in latency.items() if key != 'fp32'}
+
+    print(f"\n{name}: fp32 {latency['fp32'] * 1e6:.1f}us, overhead per op: " +
+          ", ".join(f"{key} {value:.1f}us" for key, value in overhead.items()))
+
+    assert latency['lowered'] < latency['sim']
+
+
+def test_lowered_inference_benchmark():
+    """
+    Compare the latency of small-op-heavy transformer before and after lowering
+    """
+    torch.manual_seed(0)
+    latency = _benchmark(SmallBert(), torch.randn(1, 8, 64), num_iterations=50)
+
+    print("\nSmallBert [1, 8, 64]: " +
+          ", ".join(f"{key} {value * 1e3:.2f}ms" for key, value in latency.items()) +
+          f" (lowered x{latency['sim'] / latency['lowered']:.2f}, traced x{latency['sim'] / latency['traced']:.2f})")
+
+    assert latency['lowered'] < latency['sim']
+    assert latency['traced'] < latency['sim']
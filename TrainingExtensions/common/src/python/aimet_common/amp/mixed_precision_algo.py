@@ -41,9 +41,11 @@ import copy
 import io
 import abc
 import json
+import itertools
+import multiprocessing
 import time
 from collections import defaultdict, OrderedDict
-from typing import Callable, Tuple, List, Dict, Union
+from typing import Callable, Tuple, List, Dict, Set, Union, Iterable, Iterator
 import pickle
 import functools
 import  math
@@ -73,6 +75,29 @@ from aimet_common.amp.utils import (
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.MixedPrecision)
 
+# (algo, disabled quantizers, baseline candidate, reuse encodings) inherited by the forked phase 1 worker processes
+_phase1_worker_state = None
+
+
+def _evaluate_in_phase1_worker(task: Tuple[CANDIDATE_WITH_DTYPE, List[int]]) \
+        -> List[Tuple[int, CANDIDATE_WITH_DTYPE, float]]:
+    """
+    Evaluates the quantizer groups of one phase 1 task with the replica of the sim owned by the worker process
+
+    :param task: Candidate and the indices of the quantizer groups to evaluate with the candidate
+    :return: List of the index of the quantizer group, the candidate and the eval score
+    """
+    algo, disabled_quantizers, baseline_candidate, reuse_encodings = _phase1_worker_state # pylint: disable=unpacking-non-sequence
+    candidate, quantizer_group_indices = task
+    quantizer_groups = [algo.quantizer_groups[index] for index in quantizer_group_indices]
+    # pylint: disable=protected-access
+    eval_results = algo._evaluate_phase1_task(candidate, quantizer_groups, disabled_quantizers,
+                                              baseline_candidate, reuse_encodings)
+    index_of_quantizer_group = dict(zip(quantizer_groups, quantizer_group_indices))
+    return [(index_of_quantizer_group[quantizer_group], candidate, eval_score)
+            for quantizer_group, candidate, eval_score in eval_results]
+
+
 class GreedyMixedPrecisionAlgoParams:
     """ Bundle parameters needed for GreedyMixedPrecisionAlgo together for reducing amount of function parameters """
 
@@ -100,6 +125,14 @@ class GreedyMixedPrecisionAlgoParams:
 class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-attributes
     """ Base class for Naive Greedy MixedPrecisionAlgo """
 
+    # Number of worker processes evaluating the (quantizer group, candidate) pairs in phase 1.
+    # Each worker is forked from the current process and evaluates the pairs with its own replica of the sim,
+    # so the model and the callbacks must be able to run in a forked process (e.g. on CPU).
+    # If less than 2 or fork isn't supported by the platform, the pairs are evaluated in the current process.
+    # When the encodings of each candidate are reused across quantizer groups (phase1_optimize), every worker
+    # computes the encodings of a candidate once for its share of the quantizer groups.
+    PHASE1_NUM_WORKERS = 0
+
     def __init__( # pylint: disable=too-many-arguments
             self,
             sim,
@@ -613,6 +646,27 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
         :param baseline_candidate: Candidate [bitwidth, dtype] which yields max accuracy
         :return: Sorted accuracy list containing tuples of (quantizer, candidate, accuracy score, bit ops reduction)
         """
+        return self._compute_accuracy_list(baseline_candidate, reuse_encodings=False)
+
+    def _create_and_save_accuracy_list_optimized(self, baseline_candidate: CANDIDATE_WITH_DTYPE) -> ACCURACY_LIST:
+        """
+        Create a list of tuples of (quantizer_group, bitwidth, accuracy score).
+        Instead of computing encodings for every (quantizer group, candidate) pair, the encodings of each candidate
+        are computed once with all the quantizer groups supporting the candidate, and reused to evaluate each of them.
+
+        :param baseline_candidate: Candidate [bitwidth, dtype] which yields max accuracy
+        :return: Sorted accuracy list containing tuples of (quantizer, candidate, accuracy score, bit ops reduction)
+        """
+        return self._compute_accuracy_list(baseline_candidate, reuse_encodings=True)
+
+    def _compute_accuracy_list(self, baseline_candidate: CANDIDATE_WITH_DTYPE, reuse_encodings: bool) -> ACCURACY_LIST:
+        """
+        Create a list of tuples of (quantizer_group, bitwidth, accuracy score)
+
+        :param baseline_candidate: Candidate [bitwidth, dtype] which yields max accuracy
+        :param reuse_encodings: If True, encodings are computed once per candidate and reused across quantizer groups
+        :return: Sorted accuracy list containing tuples of (quantizer, candidate, accuracy score, bit ops reduction)
+        """
 
         # pylint: disable=too-many-locals, too-many-branches, too-many-statements
         index_of_quantizer_group = {}
@@ -648,54 +702,36 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
             # Loop through all possible bitwidths and all quantizers.  Set each quantizer in turn to the lower bitwidth,
             # calculate resulting model accuracy, and reset the quantizer back to default bitwidth.
             # Accuracy list will contain tuples of the quantizer, bitwidth, and accuracy score
-            for quantizer_group, candidates in self._supported_candidates_per_quantizer_group.items():
-                quantizers = disabled_quantizers[quantizer_group]
-                try:
-                    enable_quantizers(quantizers) # Temporarily enable quantizers in the current quantizer group
-
-                    for candidate in candidates:
-                        if candidate == baseline_candidate:
-                            continue
-
-                        # If starting the computation from an already existing state, then check if that combination
-                        # has already been executed
-                        if (quantizer_group, candidate) in combinations_already_computed:
-                            continue
-
-                        # Set quantizer bitwidth to lower candidate (bitwidth)
-                        quantizer_group.set_quantizers_to_candidate(self._module_name_dict, candidate)
-
-                        # Recompute encodings for new candidate (bitwidth)
-                        self._sim.compute_encodings(self.algo_params.forward_pass_callback,
-                                                    self.algo_params.forward_pass_callback_args)
-                        # Compute accuracy of model with new candidate (bitwidth)
-                        eval_score = self.evaluate_model(self.algo_params.eval_callback_for_phase1)
-
-                        bit_ops_reduction = self._find_bit_ops_reduction_for_acc_list(quantizer_group,
-                                                                                      baseline_candidate,
-                                                                                      candidate)
-                        accuracy_list.append((quantizer_group, candidate, eval_score, bit_ops_reduction))
-                        # Sort accuracy list, first by descending accuracy score, then by descending order of addition of bitwidths if accuracy
-                        # scores are identical, if that is also identical we sort by relative bit ops change in descending order
-                        # If bit ops reduction is also the same, then we sort in ascending order based on occurence of
-                        # quantizer group in the model
-                        accuracy_list = sort_accuracy_list(accuracy_list, index_of_quantizer_group)
-                        self._export_accuracy_list(accuracy_list, self._results_dir)
-                        logger.info('\n Quantizer: %s candidate: %s eval_score: %f \n', quantizer_group,
-                                    candidate, eval_score)
-                finally:
-                    # Getting candidate which is valid for the quantizer group for a given baseline_candidate
-                    valid_baseline_candidate = baseline_candidate
-                    if baseline_candidate in self._candidate_mapping_dict and quantizer_group in self._candidate_mapping_dict[baseline_candidate]:
-                        valid_baseline_candidate = self._candidate_mapping_dict[baseline_candidate][quantizer_group]
-                    else:
-                        logger.warning("Either %s or %s not found in candidate mapping dict. Setting %s as valid "
-                                       "baseline candidate", str(baseline_candidate), str(quantizer_group),
-                                       str(baseline_candidate))
-
-                    # Reset bitwidth back to default
-                    quantizer_group.set_quantizers_to_candidate(self._module_name_dict, valid_baseline_candidate)
-                    disable_quantizers(quantizers)
+            # If starting the computation from an already existing state, then skip the combinations that have already
+            # been executed
+            use_workers = self.PHASE1_NUM_WORKERS > 1 and 'fork' in multiprocessing.get_all_start_methods()
+            tasks = self._get_phase1_tasks(baseline_candidate, combinations_already_computed, reuse_encodings,
+                                           self.PHASE1_NUM_WORKERS if use_workers else 1)
+
+            if use_workers:
+                eval_results = self._evaluate_accuracy_list_in_parallel(tasks, disabled_quantizers,
+                                                                        baseline_candidate, reuse_encodings)
+            else:
+                eval_results = itertools.chain.from_iterable(
+                    self._evaluate_phase1_task(candidate, quantizer_groups, disabled_quantizers,
+                                               baseline_candidate, reuse_encodings)
+                    for candidate, quantizer_groups in tasks
+                )
+
+            for quantizer_group, candidate, eval_score in eval_results:
+                bit_ops_reduction = self._find_bit_ops_reduction_for_acc_list(quantizer_group,
+                                                                              baseline_candidate,
+                                                                              candidate)
+                accuracy_list.append((quantizer_group, candidate, eval_score, bit_ops_reduction))
+                # Sort accuracy list, first by descending accuracy score, then by descending order of addition of bitwidths if accuracy
+                # scores are identical, if that is also identical we sort by relative bit ops change in descending order
+                # If bit ops reduction is also the same, then we sort in ascending order based on occurence of
+                # quantizer group in the model
+                accuracy_list = sort_accuracy_list(accuracy_list, index_of_quantizer_group)
+                # Save every finished result so that an interrupted run can be resumed
+                self._export_accuracy_list(accuracy_list, self._results_dir)
+                logger.info('\n Quantizer: %s candidate: %s eval_score: %f \n', quantizer_group,
+                            candidate, eval_score)
         finally:
             # Enable the disabled quantizers
             for quantizers in disabled_quantizers.values():
@@ -708,6 +744,201 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
 
         return accuracy_list
 
+    def _get_phase1_tasks(self, baseline_candidate: CANDIDATE_WITH_DTYPE, combinations_already_computed: Set,
+                          reuse_encodings: bool, num_tasks_per_candidate: int) \
+            -> List[Tuple[CANDIDATE_WITH_DTYPE, List[QuantizerGroupBase]]]:
+        """
+        Splits the (quantizer group, candidate) pairs left to evaluate in phase 1 into tasks.
+        Without reusing encodings, each pair is a task of its own.
+        Otherwise, the quantizer groups of each candidate are split into num_tasks_per_candidate tasks,
+        each of which computes the encodings of the candidate once.
+
+        :param baseline_candidate: Candidate [bitwidth, dtype] which yields max accuracy
+        :param combinations_already_computed: (quantizer group, candidate) pairs evaluated by a previous run
+        :param reuse_encodings: If True, encodings are computed once per candidate and reused across quantizer groups
+        :param num_tasks_per_candidate: Number of tasks to split the quantizer groups of each candidate into
+        :return: List of candidates and the quantizer groups to evaluate with them
+        """
+        pairs = [(quantizer_group, candidate)
+                 for quantizer_group, candidates in self._supported_candidates_per_quantizer_group.items()
+                 for candidate in candidates
+                 if candidate != baseline_candidate and
+                 (quantizer_group, candidate) not in combinations_already_computed]
+
+        if not reuse_encodings:
+            return [(candidate, [quantizer_group]) for quantizer_group, candidate in pairs]
+
+        quantizer_groups_per_candidate = defaultdict(list)
+        for quantizer_group, candidate in pairs:
+            quantizer_groups_per_candidate[candidate].append(quantizer_group)
+
+        tasks = []
+        for candidate, quantizer_groups in quantizer_groups_per_candidate.items():
+            chunk_size = -(-len(quantizer_groups) // num_tasks_per_candidate)
+            tasks += [(candidate, quantizer_groups[i:i + chunk_size])
+                      for i in range(0, len(quantizer_groups), chunk_size)]
+        return tasks
+
+    def _evaluate_phase1_task(self, candidate: CANDIDATE_WITH_DTYPE, quantizer_groups: List[QuantizerGroupBase],
+                              disabled_quantizers: Dict, baseline_candidate: CANDIDATE_WITH_DTYPE,
+                              reuse_encodings: bool) -> Iterator[Tuple[QuantizerGroupBase, CANDIDATE_WITH_DTYPE, float]]:
+        """
+        Evaluates the model with each of the quantizer groups set to the candidate
+
+        :param candidate: Candidate [bitwidth, dtype] to set the quantizer groups to
+        :param quantizer_groups: Quantizer groups to evaluate
+        :param disabled_quantizers: Dictionary mapping quantizer groups to their quantizers, which are all disabled
+        :param baseline_candidate: Candidate [bitwidth, dtype] which yields max accuracy
+        :param reuse_encodings: If True, encodings are computed once per candidate and reused across quantizer groups
+        :return: Iterator of (quantizer group, candidate, eval score)
+        """
+        if reuse_encodings:
+            yield from self._evaluate_candidate_reusing_encodings(candidate, quantizer_groups,
+                                                                  disabled_quantizers, baseline_candidate)
+            return
+
+        for quantizer_group in quantizer_groups:
+            eval_score = self._evaluate_quantizer_group_candidate(quantizer_group, candidate,
+                                                                  disabled_quantizers[quantizer_group],
+                                                                  baseline_candidate)
+            yield quantizer_group, candidate, eval_score
+
+    def _evaluate_quantizer_group_candidate(self, quantizer_group: QuantizerGroupBase,
+                                            candidate: CANDIDATE_WITH_DTYPE, quantizers: List,
+                                            baseline_candidate: CANDIDATE_WITH_DTYPE) -> float:
+        """
+        Evaluates the model with only the given quantizer group enabled and set to the candidate.
+        The quantizer group is set back to the baseline candidate and disabled afterwards.
+
+        :param quantizer_group: Quantizer group
+        :param candidate: Candidate [bitwidth, dtype] to set the quantizer group to
+        :param quantizers: Quantizers of the quantizer group
+        :param baseline_candidate: Candidate [bitwidth, dtype] which yields max accuracy
+        :return: Eval score
+        """
+        try:
+            enable_quantizers(quantizers) # Temporarily enable quantizers in the current quantizer group
+
+            # Set quantizer bitwidth to lower candidate (bitwidth)
+            quantizer_group.set_quantizers_to_candidate(self._module_name_dict, candidate)
+
+            # Recompute encodings for new candidate (bitwidth)
+            self._sim.compute_encodings(self.algo_params.forward_pass_callback,
+                                        self.algo_params.forward_pass_callback_args)
+            # Compute accuracy of model with new candidate (bitwidth)
+            return self.evaluate_model(self.algo_params.eval_callback_for_phase1)
+        finally:
+            # Reset bitwidth back to default
+            self._set_quantizer_group_to_baseline_candidate(quantizer_group, baseline_candidate)
+            disable_quantizers(quantizers)
+
+    def _evaluate_candidate_reusing_encodings(self, candidate: CANDIDATE_WITH_DTYPE,
+                                              quantizer_groups: List[QuantizerGroupBase], disabled_quantizers: Dict,
+                                              baseline_candidate: CANDIDATE_WITH_DTYPE) \
+            -> Iterator[Tuple[QuantizerGroupBase, CANDIDATE_WITH_DTYPE, float]]:
+        """
+        Computes the encodings once with all the quantizer groups supporting the candidate set to the candidate,
+        and evaluates the model with only one of the given quantizer groups enabled at a time.
+        The quantizer groups are set back to the baseline candidate and disabled afterwards.
+
+        :param candidate: Candidate [bitwidth, dtype] to set the quantizer groups to
+        :param quantizer_groups: Quantizer groups to evaluate
+        :param disabled_quantizers: Dictionary mapping quantizer groups to their quantizers, which are all disabled
+        :param baseline_candidate: Candidate [bitwidth, dtype] which yields max accuracy
+        :return: Iterator of (quantizer group, candidate, eval score)
+        """
+        # The encodings are always computed with all the quantizer groups supporting the candidate,
+        # so that they don't depend on how the quantizer groups are split into tasks
+        candidate_quantizer_groups = [quantizer_group for quantizer_group, candidates
+                                      in self._supported_candidates_per_quantizer_group.items()
+                                      if candidate in candidates]
+        try:
+            for quantizer_group in candidate_quantizer_groups:
+                enable_quantizers(disabled_quantizers[quantizer_group])
+                try:
+                    quantizer_group.set_quantizers_to_candidate(self._module_name_dict, candidate)
+                except RuntimeError as e:
+                    logger.info("Exception occured while setting Quantizers to Candidate: %s", e)
+
+            self._compute_encodings_for_candidate(candidate_quantizer_groups)
+
+            for quantizer_group in candidate_quantizer_groups:
+                disable_quantizers(disabled_quantizers[quantizer_group])
+
+            # Enable one quantizer group at a time and compute accuracy of model with the candidate (bitwidth)
+            for quantizer_group in quantizer_groups:
+                quantizers = disabled_quantizers[quantizer_group]
+                try:
+                    enable_quantizers(quantizers)
+                    eval_score = self.evaluate_model(self.algo_params.eval_callback_for_phase1)
+                finally:
+                    disable_quantizers(quantizers)
+                yield quantizer_group, candidate, eval_score
+        finally:
+            for quantizer_group in candidate_quantizer_groups:
+                quantizers = disabled_quantizers[quantizer_group]
+                enable_quantizers(quantizers)
+                self._set_quantizer_group_to_baseline_candidate(quantizer_group, baseline_candidate)
+                disable_quantizers(quantizers)
+
+    def _compute_encodings_for_candidate(self, quantizer_groups: List[QuantizerGroupBase]):
+        """
+        Computes encodings of the sim, in which the given quantizer groups are enabled and set to the same candidate
+
+        :param quantizer_groups: Enabled quantizer groups
+        """
+        # pylint: disable=unused-argument
+        self._sim.compute_encodings(self.algo_params.forward_pass_callback,
+                                    self.algo_params.forward_pass_callback_args)
+
+    def _set_quantizer_group_to_baseline_candidate(self, quantizer_group: QuantizerGroupBase,
+                                                   baseline_candidate: CANDIDATE_WITH_DTYPE):
+        """
+        Sets the quantizer group to the candidate which is valid for the quantizer group for a given baseline_candidate
+
+        :param quantizer_group: Quantizer group
+        :param baseline_candidate: Candidate [bitwidth, dtype] which yields max accuracy
+        """
+        valid_baseline_candidate = baseline_candidate
+        if baseline_candidate in self._candidate_mapping_dict and quantizer_group in self._candidate_mapping_dict[baseline_candidate]:
+            valid_baseline_candidate = self._candidate_mapping_dict[baseline_candidate][quantizer_group]
+        else:
+            logger.warning("Either %s or %s not found in candidate mapping dict. Setting %s as valid "
+                           "baseline candidate", str(baseline_candidate), str(quantizer_group),
+                           str(baseline_candidate))
+
+        quantizer_group.set_quantizers_to_candidate(self._module_name_dict, valid_baseline_candidate)
+
+    def _evaluate_accuracy_list_in_parallel(self, tasks: Iterable[Tuple[CANDIDATE_WITH_DTYPE, List[QuantizerGroupBase]]],
+                                            disabled_quantizers: Dict, baseline_candidate: CANDIDATE_WITH_DTYPE,
+                                            reuse_encodings: bool) \
+            -> Iterator[Tuple[QuantizerGroupBase, CANDIDATE_WITH_DTYPE, float]]:
+        """
+        Evaluates phase 1 tasks across PHASE1_NUM_WORKERS forked processes.
+        Results are yielded in the order of the tasks, same as in the serial evaluation.
+
+        :param tasks: Candidates and the quantizer groups to evaluate with them
+        :param disabled_quantizers: Dictionary mapping quantizer groups to their quantizers, which are all disabled
+        :param baseline_candidate: Candidate [bitwidth, dtype] which yields max accuracy
+        :param reuse_encodings: If True, encodings are computed once per task and reused across quantizer groups
+        :return: Iterator of (quantizer group, candidate, eval score)
+        """
+        global _phase1_worker_state # pylint: disable=global-statement
+        index_of_quantizer_group = {quantizer_group: index for index, quantizer_group in enumerate(self.quantizer_groups)}
+        tasks = [(candidate, [index_of_quantizer_group[quantizer_group] for quantizer_group in quantizer_groups])
+                 for candidate, quantizer_groups in tasks]
+
+        logger.info("Evaluating %d phase 1 tasks with %d worker processes", len(tasks), self.PHASE1_NUM_WORKERS)
+
+        _phase1_worker_state = (self, disabled_quantizers, baseline_candidate, reuse_encodings)
+        try:
+            with multiprocessing.get_context('fork').Pool(self.PHASE1_NUM_WORKERS) as pool:
+                for eval_results in pool.imap(_evaluate_in_phase1_worker, tasks):
+                    for quantizer_group_index, candidate, eval_score in eval_results:
+                        yield self.quantizer_groups[quantizer_group_index], candidate, eval_score
+        finally:
+            _phase1_worker_state = None
+
     @staticmethod
     def _export_pareto_list(results_dir: str, pareto_front: List, file_name: str = 'pareto_list'):
         """
@@ -201,6 +201,24 @@ class Cache:
 
         return lambda fn: _wrap(fn, cache_key)
 
+    def is_enabled(self) -> bool:
+        """
+        Returns True if caching is enabled
+        """
+        return self._cache_dir is not None
+
+    def get_cache_file(self, cache_key: str) -> str:
+        """
+        Returns the path of the file caching the results marked with the given cache key
+        using the default (pickle) serialization protocol.
+
+        :param cache_key: Cache key passed to :meth:`mark`
+        :return: Path of the cache file
+        """
+        if self._cache_dir is None:
+            raise RuntimeError("Caching is not enabled")
+        return _PickleSerializationProtocol._get_filename(self._cache_dir, cache_key) # pylint: disable=protected-access
+
     @contextlib.contextmanager
     def enable(self, cache_dir: Optional[str]):
         """
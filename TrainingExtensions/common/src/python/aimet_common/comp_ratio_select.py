@@ -41,9 +41,11 @@ import abc
 from decimal import Decimal
 from typing import Dict, List, Tuple, Any, Optional
 import math
+import multiprocessing
 import pickle
 import statistics
 import os
+import tempfile
 
 from aimet_common.bokeh_plots import DataTable
 from aimet_common.bokeh_plots import LinePlot
@@ -59,6 +61,23 @@ from aimet_common.comp_ratio_rounder import CompRatioRounder
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.CompRatioSelect)
 
+# Greedy comp-ratio select algo inherited by the forked candidate evaluation worker processes
+_greedy_worker_algo = None
+
+
+def _evaluate_in_greedy_worker(task: Tuple[str, Decimal]) -> Tuple[str, Decimal, float]:
+    """
+    Evaluates one (layer, comp-ratio) candidate with the replica of the model owned by the worker process
+
+    :param task: Name of the layer and the compression-ratio
+    :return: Name of the layer, the compression-ratio and the eval score
+    """
+    # pylint: disable=protected-access
+    layer_name, comp_ratio = task
+    layer = _greedy_worker_algo._layer_db.find_layer_by_name(layer_name)
+    eval_score = _greedy_worker_algo._evaluate_comp_ratio_candidate(layer, comp_ratio)
+    return layer_name, comp_ratio, eval_score
+
 
 class CompRatioSelectAlgo(metaclass=abc.ABCMeta):
     """
@@ -94,11 +113,19 @@ class GreedyCompRatioSelectAlgo(CompRatioSelectAlgo):
 
     PICKLE_FILE_EVAL_DICT = './data/greedy_selection_eval_scores_dict.pkl'
 
+    # Default number of worker processes to evaluate (layer, comp-ratio) candidates with,
+    # if not given by GreedySelectionParameters.num_workers.
+    # Each worker is forked from the current process and evaluates the candidates with its own replica of the model,
+    # so the model and the eval callback must be able to run in a forked process (e.g. on CPU).
+    # If less than 2 or fork isn't supported by the platform, the candidates are evaluated in the current process.
+    NUM_WORKERS = 0
+
     # pylint: disable=too-many-locals
     def __init__(self, layer_db: LayerDatabase, pruner: Pruner, cost_calculator: cc.CostCalculator,
                  eval_func: EvalFunction, eval_iterations, cost_metric: CostMetric, target_comp_ratio: float,
                  num_candidates: int, use_monotonic_fit: bool, saved_eval_scores_dict: Optional[str],
-                 comp_ratio_rounding_algo: CompRatioRounder, use_cuda: bool, bokeh_session):
+                 comp_ratio_rounding_algo: CompRatioRounder, use_cuda: bool, bokeh_session,
+                 patch_layers_in_place: bool = False, num_workers: Optional[int] = None):
 
         # pylint: disable=too-many-arguments
         CompRatioSelectAlgo.__init__(self, layer_db, cost_calculator, cost_metric, comp_ratio_rounding_algo)
@@ -111,33 +138,54 @@ class GreedyCompRatioSelectAlgo(CompRatioSelectAlgo):
         self._saved_eval_scores_dict = saved_eval_scores_dict
         self._target_comp_ratio = target_comp_ratio
         self._use_monotonic_fit = use_monotonic_fit
+        self._patch_layers_in_place = patch_layers_in_place
+        self._num_workers = self.NUM_WORKERS if num_workers is None else num_workers
 
-        if saved_eval_scores_dict:
-            self._comp_ratio_candidates = 0
-
-        else:
-            self._comp_ratio_candidates = []
-            for index in range(1, num_candidates):
-                self._comp_ratio_candidates.append((Decimal(1) / Decimal(num_candidates)) * index)
+        self._comp_ratio_candidates = []
+        for index in range(1, num_candidates):
+            self._comp_ratio_candidates.append((Decimal(1) / Decimal(num_candidates)) * index)
 
     def _pickle_eval_scores_dict(self, eval_scores_dict):
 
-        if not os.path.exists('./data'):
-            os.makedirs('./data')
-
-        with open(self.PICKLE_FILE_EVAL_DICT, 'wb') as file:
-            pickle.dump(eval_scores_dict, file)
+        dir_name = os.path.dirname(self.PICKLE_FILE_EVAL_DICT) or '.'
+        os.makedirs(dir_name, exist_ok=True)
+
+        # Eval scores are saved after every computed eval score. The saved file is replaced by a complete
+        # temporary file, so that interrupting the run while saving doesn't corrupt the saved file
+        with tempfile.NamedTemporaryFile('wb', dir=dir_name, delete=False) as file:
+            try:
+                pickle.dump({'eval_scores': eval_scores_dict,
+                             'comp_ratio_candidates': self._comp_ratio_candidates}, file)
+            except BaseException:
+                file.close()
+                os.remove(file.name)
+                raise
+        os.replace(file.name, self.PICKLE_FILE_EVAL_DICT)
 
         logger.info("Greedy selection: Saved eval dict to %s", self.PICKLE_FILE_EVAL_DICT)
 
     @staticmethod
-    def _unpickle_eval_scores_dict(saved_eval_scores_dict_path: str):
-
+    def _unpickle_eval_scores_dict(saved_eval_scores_dict_path: str) -> Tuple[Dict, Optional[List[Decimal]]]:
+        """
+        :param saved_eval_scores_dict_path: Path to the saved eval scores dictionary
+        :return: Eval scores dictionary and the comp-ratio candidates it was computed with.
+                 Candidates are None if the file doesn't contain them (e.g. saved by an older version)
+        """
         with open(saved_eval_scores_dict_path, 'rb') as f:
-            eval_dict = pickle.load(f)
+            saved = pickle.load(f)
+            if isinstance(saved, dict) and set(saved) == {'eval_scores', 'comp_ratio_candidates'}:
+                eval_dict, comp_ratio_candidates = saved['eval_scores'], saved['comp_ratio_candidates']
+            else:
+                # Saved by an older version, with only the eval scores dictionary
+                # or followed by the comp-ratio candidates
+                eval_dict = saved
+                try:
+                    comp_ratio_candidates = pickle.load(f)
+                except EOFError:
+                    comp_ratio_candidates = None
 
         logger.info("Greedy selection: Read eval dict from %s", saved_eval_scores_dict_path)
-        return eval_dict
+        return eval_dict, comp_ratio_candidates
 
     @staticmethod
     def _calculate_function_value_by_interpolation(comp_ratio: Decimal, layer_eval_score_dict: dict,
@@ -203,7 +251,23 @@ class GreedyCompRatioSelectAlgo(CompRatioSelectAlgo):
     def _construct_eval_dict(self):
         #  If the user already passed in a previously saved eval scores dict, we just use that
         if self._saved_eval_scores_dict:
-            eval_scores_dict = self._unpickle_eval_scores_dict(self._saved_eval_scores_dict)
+            eval_scores_dict, saved_comp_ratio_candidates = self._unpickle_eval_scores_dict(self._saved_eval_scores_dict)
+
+            # Use the comp-ratio candidates of the saved dictionary
+            if saved_comp_ratio_candidates is None:
+                # Candidates weren't saved. Infer them from the eval scores
+                saved_comp_ratio_candidates = sorted({comp_ratio for layer_eval_scores_dict in eval_scores_dict.values()
+                                                      for comp_ratio in layer_eval_scores_dict})
+            if saved_comp_ratio_candidates:
+                self._comp_ratio_candidates = list(saved_comp_ratio_candidates)
+
+            # Eval scores are saved as they are computed, so a dictionary saved by an interrupted run can be
+            # missing some candidates. Resume by computing only the missing candidates
+            if self._get_candidates_to_evaluate(eval_scores_dict):
+                logger.info("Greedy selection: Resuming computation of eval dict read from %s",
+                            self._saved_eval_scores_dict)
+                eval_scores_dict = self._compute_eval_scores_for_all_comp_ratio_candidates(eval_scores_dict)
+                self._pickle_eval_scores_dict(eval_scores_dict)
 
         else:
             # Create the eval scores dictionary
@@ -363,10 +427,14 @@ class GreedyCompRatioSelectAlgo(CompRatioSelectAlgo):
 
         return min_score, max_score
 
-    def _compute_eval_scores_for_all_comp_ratio_candidates(self) -> Dict[str, Dict[Decimal, float]]:
+    def _compute_eval_scores_for_all_comp_ratio_candidates(self, eval_scores_dict: Optional[Dict] = None) \
+            -> Dict[str, Dict[Decimal, float]]:
         """
-        Creates and returns the eval scores dictionary
+        Creates and returns the eval scores dictionary. Every computed eval score is saved to
+        PICKLE_FILE_EVAL_DICT right away, so that an interrupted run can be resumed.
 
+        :param eval_scores_dict: Partially computed eval scores dictionary to resume from. Candidates already in this
+                                 dictionary are not evaluated again
         :return: Dictionary of {layer_name: {compression_ratio: eval_score}}  for all selected layers
                  and all compression-ratio candidates
         """
@@ -389,24 +457,90 @@ class GreedyCompRatioSelectAlgo(CompRatioSelectAlgo):
             data_table = None
             progress_bar = None
 
-        eval_scores_dict = {}
-        for layer in selected_layers:
+        # Let the pruner precompute state that is shared by all candidates of a layer
+        self._pruner.prepare_to_prune(self._layer_db, selected_layers)
 
-            layer_wise_eval_scores = self._compute_layerwise_eval_score_per_comp_ratio_candidate(data_table,
-                                                                                                 progress_bar, layer)
-            eval_scores_dict[layer.name] = layer_wise_eval_scores
+        if eval_scores_dict is None:
+            eval_scores_dict = {}
 
-        return eval_scores_dict
+        if self._num_workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            self._compute_eval_scores_in_parallel(eval_scores_dict, data_table, progress_bar)
+
+        else:
+            for layer in selected_layers:
+
+                layer_wise_eval_scores = self._compute_layerwise_eval_score_per_comp_ratio_candidate(
+                    data_table, progress_bar, layer, eval_scores_dict)
+                eval_scores_dict[layer.name] = layer_wise_eval_scores
+
+        # Order the eval scores by layer and compression-ratio, independent of the order they were computed in
+        ordered_layer_names = [layer.name for layer in selected_layers if layer.name in eval_scores_dict]
+        ordered_layer_names += [layer_name for layer_name in eval_scores_dict if layer_name not in ordered_layer_names]
+
+        return {layer_name: dict(sorted(eval_scores_dict[layer_name].items())) for layer_name in ordered_layer_names}
+
+    def _get_candidates_to_evaluate(self, eval_scores_dict: Dict[str, Dict[Decimal, float]]) \
+            -> List[Tuple[Layer, Decimal]]:
+        """
+        :param eval_scores_dict: Partially computed eval scores dictionary
+        :return: (layer, compression-ratio) candidates of the selected layers missing from the eval scores dictionary
+        """
+        return [(layer, comp_ratio)
+                for layer in self._layer_db.get_selected_layers()
+                for comp_ratio in self._comp_ratio_candidates
+                if comp_ratio not in eval_scores_dict.get(layer.name, {})]
+
+    def _evaluate_comp_ratio_candidate(self, layer: Layer, comp_ratio: Decimal) -> float:
+        """
+        Evaluates the model with the given layer pruned to the given compression-ratio
+
+        :param layer: Layer to prune
+        :param comp_ratio: Compression-ratio to prune the layer to
+        :return: Eval score
+        """
+        logger.info("Analyzing compression ratio: %s =====================>", comp_ratio)
+
+        if self._patch_layers_in_place:
+            # Prune layer given this comp ratio directly in the shared model, restoring it after evaluation
+            with self._pruner.prune_layer_in_place(self._layer_db, LayerCompRatioPair(layer, comp_ratio),
+                                                   self._cost_metric) as pruned_layer_db:
+                eval_score = self._eval_func(pruned_layer_db.model, self._eval_iter, use_cuda=self._is_cuda)
+
+        else:
+            # Prune layer given this comp ratio
+            pruned_layer_db = self._pruner.prune_model(self._layer_db,
+                                                       [LayerCompRatioPair(layer, comp_ratio)],
+                                                       self._cost_metric,
+                                                       trainer=None)
+
+            eval_score = self._eval_func(pruned_layer_db.model, self._eval_iter, use_cuda=self._is_cuda)
+
+            # destroy the layer database
+            pruned_layer_db.destroy()
+            pruned_layer_db = None
+
+        logger.info("Layer %s, comp_ratio %f ==> eval_score=%f", layer.name, comp_ratio,
+                    eval_score)
+
+        return eval_score
 
     def _compute_layerwise_eval_score_per_comp_ratio_candidate(self, tabular_progress_object, progress_bar,
-                                                               layer: Layer) -> Dict[Decimal, float]:
+                                                               layer: Layer,
+                                                               eval_scores_dict: Optional[Dict] = None) \
+            -> Dict[Decimal, float]:
         """
         Computes eval scores for each compression-ratio candidate for a given layer
         :param layer: Layer for which to calculate eval scores
+        :param eval_scores_dict: If given, eval scores dictionary of all layers to add the computed eval scores to.
+                                 Candidates already in this dictionary are skipped, and the dictionary is saved
+                                 after every computed eval score
         :return: Dictionary of {compression_ratio: eval_score} for each compression-ratio candidate
         """
 
-        layer_wise_eval_scores_dict = {}
+        if eval_scores_dict is not None:
+            layer_wise_eval_scores_dict = eval_scores_dict.setdefault(layer.name, {})
+        else:
+            layer_wise_eval_scores_dict = {}
 
         # Only publish plots to a document if a bokeh server session exists
         if self.bokeh_session:
@@ -416,23 +550,14 @@ class GreedyCompRatioSelectAlgo(CompRatioSelectAlgo):
                                                    title=layer.name, bokeh_document=self.bokeh_session)
         # Loop over each candidate
         for comp_ratio in self._comp_ratio_candidates:
-            logger.info("Analyzing compression ratio: %s =====================>", comp_ratio)
+            if comp_ratio in layer_wise_eval_scores_dict:
+                continue
 
-            # Prune layer given this comp ratio
-            pruned_layer_db = self._pruner.prune_model(self._layer_db,
-                                                       [LayerCompRatioPair(layer, comp_ratio)],
-                                                       self._cost_metric,
-                                                       trainer=None)
-
-            eval_score = self._eval_func(pruned_layer_db.model, self._eval_iter, use_cuda=self._is_cuda)
+            eval_score = self._evaluate_comp_ratio_candidate(layer, comp_ratio)
             layer_wise_eval_scores_dict[comp_ratio] = eval_score
 
-            # destroy the layer database
-            pruned_layer_db.destroy()
-            pruned_layer_db = None
-
-            logger.info("Layer %s, comp_ratio %f ==> eval_score=%f", layer.name, comp_ratio,
-                        eval_score)
+            if eval_scores_dict is not None:
+                self._pickle_eval_scores_dict(eval_scores_dict)
 
             if self.bokeh_session:
                 layer_wise_eval_scores_plot.update(new_x_coordinate=comp_ratio, new_y_coordinate=eval_score)
@@ -447,6 +572,38 @@ class GreedyCompRatioSelectAlgo(CompRatioSelectAlgo):
 
         return layer_wise_eval_scores_dict
 
+    def _compute_eval_scores_in_parallel(self, eval_scores_dict: Dict[str, Dict[Decimal, float]],
+                                         tabular_progress_object, progress_bar):
+        """
+        Evaluates the candidates missing from the eval scores dictionary across the worker processes.
+        Eval scores are added to the dictionary, which is saved after every computed eval score, in order of
+        completion.
+
+        :param eval_scores_dict: Eval scores dictionary of all layers to add the computed eval scores to
+        :param tabular_progress_object: Data table to add the computed eval scores to, if a bokeh session exists
+        :param progress_bar: Progress bar to update, if a bokeh session exists
+        """
+        global _greedy_worker_algo # pylint: disable=global-statement
+        tasks = [(layer.name, comp_ratio) for layer, comp_ratio in self._get_candidates_to_evaluate(eval_scores_dict)]
+
+        logger.info("Evaluating %d compression-ratio candidates with %d worker processes",
+                    len(tasks), self._num_workers)
+
+        _greedy_worker_algo = self
+        try:
+            with multiprocessing.get_context('fork').Pool(self._num_workers) as pool:
+                for layer_name, comp_ratio, eval_score in pool.imap_unordered(_evaluate_in_greedy_worker, tasks):
+                    eval_scores_dict.setdefault(layer_name, {})[comp_ratio] = eval_score
+                    self._pickle_eval_scores_dict(eval_scores_dict)
+
+                    if self.bokeh_session:
+                        # Update the data table by adding the computed eval score
+                        tabular_progress_object.update_table(str(comp_ratio), layer_name, eval_score)
+                        # Update the progress bar
+                        progress_bar.update()
+        finally:
+            _greedy_worker_algo = None
+
 
 class ManualCompRatioSelectAlgo(CompRatioSelectAlgo):
     """
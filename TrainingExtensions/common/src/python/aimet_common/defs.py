@@ -187,13 +187,26 @@ class GreedySelectionParameters:
             different target compression-ratios for example. aimet will save eval_scores
             dictionary pickle file automatically in a ./data directory relative to the
             current path. num_comp_ratio_candidates parameter will be ignored when this option is used.
+            The pickle file is updated as every eval score is computed. If the saved dictionary is missing candidates
+            of the selected layers, e.g. because the run that saved it was interrupted, only the missing candidates
+            are evaluated.
+    :ivar patch_layers_in_place: If True, each compression-ratio candidate is evaluated by swapping the pruned
+            layer into the original model and restoring it afterwards, instead of pruning a full copy of the model.
+            Pruners that can not patch a layer in place fall back to copying the model. The eval callback must not
+            modify the model it is given. By default, this option is set to False.
+    :ivar num_workers: Number of worker processes to evaluate the compression-ratio candidates with. Each worker is
+            forked from the current process, so the model and the eval callback must be able to run in a forked
+            process (e.g. on CPU). If less than 2, the candidates are evaluated in the current process.
+            By default, GreedyCompRatioSelectAlgo.NUM_WORKERS is used.
     """
 
     def __init__(self,
                  target_comp_ratio: float,
                  num_comp_ratio_candidates: int = 10,
                  use_monotonic_fit: bool = False,
-                 saved_eval_scores_dict: Optional[str] = None):
+                 saved_eval_scores_dict: Optional[str] = None,
+                 patch_layers_in_place: bool = False,
+                 num_workers: Optional[int] = None):
 
         self.target_comp_ratio = target_comp_ratio
 
@@ -205,6 +218,8 @@ class GreedySelectionParameters:
         self.num_comp_ratio_candidates = num_comp_ratio_candidates
         self.use_monotonic_fit = use_monotonic_fit
         self.saved_eval_scores_dict = saved_eval_scores_dict
+        self.patch_layers_in_place = patch_layers_in_place
+        self.num_workers = num_workers
 
 
 class GreedyCompressionRatioSelectionStats:
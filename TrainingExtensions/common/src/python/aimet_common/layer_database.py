@@ -44,6 +44,7 @@ training framework.
 from typing import Tuple
 from collections import OrderedDict
 import abc
+import contextlib
 
 
 class Conv2dTypeSpecificParams:
@@ -158,6 +159,19 @@ class LayerDatabase:
                            if layer.picked_for_compression is True]
         return selected_layers
 
+    @contextlib.contextmanager
+    def restore_layers_on_exit(self):
+        """
+        Context manager that restores the database to its current layers on exit, undoing any layer replacements
+        made within the context. Frameworks that replace layers of the model in place also restore the model.
+        """
+        saved_layers = self._compressible_layers.copy()
+        try:
+            yield self
+        finally:
+            self._compressible_layers.clear()
+            self._compressible_layers.update(saved_layers)
+
     @abc.abstractmethod
     def destroy(self):
         """
@@ -38,7 +38,10 @@
 """ This module contains a common utility class for saving outputs of intermediate layers to disk """
 
 import os
-from typing import Union, List, Tuple
+import math
+import queue
+import threading
+from typing import Union, List, Tuple, Dict
 import json
 import numpy as np
 
@@ -46,15 +49,48 @@ import numpy as np
 class SaveInputOutput:
     """ This class saves the input instance and corresponding layer-outputs to the disk. """
 
-    def __init__(self, dir_path: str, axis_layout: str):
+    # Name of the index file of the packed format
+    PACKED_INDEX_FILE_NAME = 'packed_index.json'
+
+    # Byte alignment of every tensor in a packed file, so that tensors can be memory-mapped as aligned arrays
+    PACKED_ALIGNMENT = 64
+
+    def __init__(self, dir_path: str, axis_layout: str, num_writers: int = 0, max_pending_saves: int = 8,
+                 packed: bool = False):
         """
         Constructor
         :param dir_path: Directory to save input and output.
         :param axis_layout: Axis-layout of the tensor in source framework. Eg: NCHW or NHWC
+        :param num_writers: Number of background threads writing tensors to disk. If 0, tensors are written in the
+            thread calling save(). Otherwise, close() must be called once all inputs are saved.
+        :param max_pending_saves: Maximum number of saved input instances waiting to be written by the background
+            threads. save() blocks while this many input instances are pending.
+        :param packed: If True, all tensors of a layer-output (or input) are appended to a single file in dir_path,
+            together with an index of their offsets (see PackedLayerOutputReader), instead of saving every tensor
+            as an individual raw file. The index is written by flush() and close(), so close() must be called once
+            all inputs are saved.
         """
         self.dir_path = dir_path
         self.input_cntr = 0
         self.axis_layout = axis_layout
+        self.packed = packed
+
+        self._packed_index = {'inputs': {}, 'outputs': {}}
+        self._packed_file_sizes = {}
+        # Guards the packed index and the per-file locks. Each packed file is appended to under its own lock,
+        # so that background writers can append to different files concurrently
+        self._packed_lock = threading.Lock()
+        self._packed_file_locks = {}
+
+        self._queue = None
+        self._writers = []
+        self._writer_error = None
+        if num_writers > 0:
+            self._queue = queue.Queue(maxsize=max_pending_saves)
+            for _ in range(num_writers):
+                writer = threading.Thread(target=self._write_pending_saves, daemon=True)
+                writer.start()
+                self._writers.append(writer)
 
     @staticmethod
     def transform_axis(tensor: np.ndarray, old_layout: str, new_layout: str) -> np.ndarray:
@@ -81,41 +117,244 @@ class SaveInputOutput:
         file_path = os.path.join(dir_path, file_name + '.raw')
 
         # Convert axis-layout of the tensor to NHWC if not already
-        if numpy_tensor.ndim == 4 and axis_layout == 'NCHW':
-            numpy_tensor = SaveInputOutput.transform_axis(tensor=numpy_tensor, old_layout='NCHW', new_layout='NHWC')
+        numpy_tensor = SaveInputOutput._to_nhwc(numpy_tensor, axis_layout)
 
         with open(file_path, 'wb') as fptr:
             numpy_tensor.tofile(fptr)
 
+    @staticmethod
+    def _to_nhwc(numpy_tensor: np.ndarray, axis_layout: str) -> np.ndarray:
+        """
+        Converts the axis-layout of a 4D tensor to NHWC if not already
+        :param numpy_tensor: Tensor to convert
+        :param axis_layout: Axis-layout of the tensor
+        :return: Tensor in NHWC axis-layout
+        """
+        if numpy_tensor.ndim == 4 and axis_layout == 'NCHW':
+            numpy_tensor = SaveInputOutput.transform_axis(tensor=numpy_tensor, old_layout='NCHW', new_layout='NHWC')
+        return numpy_tensor
+
     def save(self, input_instance: Union[np.ndarray, List[np.ndarray], Tuple[np.ndarray]], layer_output: dict):
         """
         This function saves the input and layer-outputs in the form of raw files. Separate directories are used to store inputs
         and outputs. The correspondence between input and output is obtained using an identical number which is used for naming.
 
+        If background writers are used, the input and layer-outputs are written asynchronously, so the layer-output
+        arrays must not be modified afterwards. The input arrays are copied since they usually belong to the caller.
+
         :param input_instance: Input instance for which we want to obtain layer-outputs.
         :param layer_output: Dictionary where key is output-name and value is output(s).
         :return:
         """
+        self._raise_writer_error()
+
+        if self._queue is not None:
+            if isinstance(input_instance, (List, Tuple)):
+                input_instance = [np.array(ith_input) for ith_input in input_instance]
+            else:
+                input_instance = np.array(input_instance)
+            self._queue.put((self.input_cntr, input_instance, layer_output))
+        else:
+            self._write(self.input_cntr, input_instance, layer_output)
+
+        self.input_cntr += 1
+
+    def flush(self):
+        """
+        Waits until all saved inputs and layer-outputs are written to disk, and writes the index of the packed format.
+        Errors raised while writing in the background are re-raised here.
+        """
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_writer_error()
+
+        if self.packed:
+            with self._packed_lock:
+                with open(os.path.join(self.dir_path, self.PACKED_INDEX_FILE_NAME), 'w') as fptr:
+                    json.dump(self._packed_index, fptr)
+
+    def close(self):
+        """
+        Flushes all saved inputs and layer-outputs to disk and stops the background writers.
+        """
+        try:
+            self.flush()
+        finally:
+            if self._queue is not None:
+                for _ in self._writers:
+                    self._queue.put(None)
+                for writer in self._writers:
+                    writer.join()
+                self._queue = None
+                self._writers = []
+
+    def _write_pending_saves(self):
+        """
+        Background writer loop writing queued input instances and layer-outputs until None is queued
+        """
+        while True:
+            pending_save = self._queue.get()
+            try:
+                if pending_save is None:
+                    return
+                # Stop writing once an error occurred. The error is raised to the caller by save() or flush()
+                if self._writer_error is None:
+                    self._write(*pending_save)
+            except Exception as e: # pylint: disable=broad-except
+                self._writer_error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_writer_error(self):
+        """
+        Raises the error that occurred in a background writer, if any
+        """
+        if self._writer_error is not None:
+            error, self._writer_error = self._writer_error, None
+            raise RuntimeError('Failed to write layer-outputs to disk') from error
+
+    def _write(self, input_index: int, input_instance: Union[np.ndarray, List[np.ndarray], Tuple[np.ndarray]],
+               layer_output: dict):
+        """
+        Writes an input instance and its layer-outputs to disk
+        :param input_index: Index of the input instance
+        :param input_instance: Input instance
+        :param layer_output: Dictionary where key is output-name and value is output(s).
+        """
+        if self.packed:
+            self._write_packed(input_index, input_instance, layer_output)
+        else:
+            self._write_raw(input_index, input_instance, layer_output)
+
+    def _write_raw(self, input_index: int, input_instance: Union[np.ndarray, List[np.ndarray], Tuple[np.ndarray]],
+                   layer_output: dict):
+        """
+        Writes every tensor of an input instance and its layer-outputs as an individual raw file
+        :param input_index: Index of the input instance
+        :param input_instance: Input instance
+        :param layer_output: Dictionary where key is output-name and value is output(s).
+        """
         input_dir = os.path.join(self.dir_path, 'inputs')
         output_dir = os.path.join(self.dir_path, 'outputs')
         os.makedirs(input_dir, exist_ok=True)
         os.makedirs(output_dir, exist_ok=True)
 
         if isinstance(input_instance, (List, Tuple)):
-            multi_input_dir = os.path.join(input_dir, 'input_' + str(self.input_cntr))
+            multi_input_dir = os.path.join(input_dir, 'input_' + str(input_index))
             os.makedirs(multi_input_dir, exist_ok=True)
             for i, ith_input in enumerate(input_instance):
                 SaveInputOutput.save_raw_tensor(ith_input, self.axis_layout, str(i), multi_input_dir)
         else:
-            input_file_name = 'input_' + str(self.input_cntr)
+            input_file_name = 'input_' + str(input_index)
             SaveInputOutput.save_raw_tensor(input_instance, self.axis_layout, input_file_name, input_dir)
 
-        layer_output_dir = os.path.join(output_dir, 'layer_outputs_' + str(self.input_cntr))
+        layer_output_dir = os.path.join(output_dir, 'layer_outputs_' + str(input_index))
         os.makedirs(layer_output_dir, exist_ok=True)
         for layer_output_name in layer_output:
             SaveInputOutput.save_raw_tensor(layer_output[layer_output_name], self.axis_layout, layer_output_name, layer_output_dir)
 
-        self.input_cntr += 1
+    def _write_packed(self, input_index: int, input_instance: Union[np.ndarray, List[np.ndarray], Tuple[np.ndarray]],
+                      layer_output: dict):
+        """
+        Appends every tensor of an input instance and its layer-outputs to the packed file of its input or layer-output
+        :param input_index: Index of the input instance
+        :param input_instance: Input instance
+        :param layer_output: Dictionary where key is output-name and value is output(s).
+        """
+        if isinstance(input_instance, (List, Tuple)):
+            for i, ith_input in enumerate(input_instance):
+                self._append_packed_tensor('inputs', str(i), input_index, ith_input)
+        else:
+            self._append_packed_tensor('inputs', 'input', input_index, input_instance)
+
+        for layer_output_name, output in layer_output.items():
+            self._append_packed_tensor('outputs', layer_output_name, input_index, output)
+
+    def _append_packed_tensor(self, kind: str, name: str, input_index: int, numpy_tensor: np.ndarray):
+        """
+        Appends a tensor in NHWC axis-layout to a packed file and records its offset in the packed index
+        :param kind: Either 'inputs' or 'outputs'
+        :param name: Name of the input or layer-output
+        :param input_index: Index of the input instance
+        :param numpy_tensor: Tensor to append
+        """
+        numpy_tensor = np.ascontiguousarray(self._to_nhwc(np.asarray(numpy_tensor), self.axis_layout))
+        file_name = os.path.join(kind, name + '.bin')
+        file_path = os.path.join(self.dir_path, file_name)
+
+        with self._packed_lock:
+            file_lock = self._packed_file_locks.setdefault(file_path, threading.Lock())
+
+        # Tensors are appended while holding the lock of the file, so that file offsets match the index
+        with file_lock:
+            # A file left by a previous run isn't referenced by the index, so it is truncated on first use
+            mode = 'ab' if file_path in self._packed_file_sizes else 'wb'
+            offset = self._packed_file_sizes.get(file_path, 0)
+            padding = -offset % self.PACKED_ALIGNMENT
+            offset += padding
+
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, mode) as fptr:
+                fptr.write(bytes(padding))
+                numpy_tensor.tofile(fptr)
+            self._packed_file_sizes[file_path] = offset + numpy_tensor.nbytes
+
+        with self._packed_lock:
+            if name not in self._packed_index[kind]:
+                self._packed_index[kind][name] = {'file': file_name, 'entries': {}}
+            self._packed_index[kind][name]['entries'][str(input_index)] = \
+                [offset, list(numpy_tensor.shape), numpy_tensor.dtype.str]
+
+
+class PackedLayerOutputReader:
+    """ Reads inputs and layer-outputs saved by SaveInputOutput in the packed format, using memory-mapped files. """
+
+    def __init__(self, dir_path: str):
+        """
+        Constructor
+        :param dir_path: Directory wherein the inputs and layer-outputs were saved.
+        """
+        self.dir_path = dir_path
+        with open(os.path.join(dir_path, SaveInputOutput.PACKED_INDEX_FILE_NAME)) as fptr:
+            self._index = json.load(fptr)
+        self._memmaps: Dict[str, np.memmap] = {}
+
+    def get_names(self, kind: str = 'outputs') -> List[str]:
+        """
+        :param kind: Either 'inputs' or 'outputs'
+        :return: Names of the saved inputs or layer-outputs
+        """
+        return list(self._index[kind])
+
+    def get_input_indices(self, name: str, kind: str = 'outputs') -> List[int]:
+        """
+        :param name: Name of the input or layer-output
+        :param kind: Either 'inputs' or 'outputs'
+        :return: Sorted indices of the input instances saved for the given input or layer-output
+        """
+        return sorted(int(input_index) for input_index in self._index[kind][name]['entries'])
+
+    def read(self, name: str, input_index: int, kind: str = 'outputs') -> np.ndarray:
+        """
+        Returns a saved tensor as a read-only view into the memory-mapped packed file
+        :param name: Name of the input or layer-output
+        :param input_index: Index of the input instance
+        :param kind: Either 'inputs' or 'outputs'
+        :return: Saved tensor in NHWC axis-layout
+        """
+        packed = self._index[kind][name]
+        offset, shape, dtype = packed['entries'][str(input_index)]
+        memmap = self._get_memmap(packed['file'])
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=memmap, offset=offset)
+
+    def _get_memmap(self, file_name: str) -> np.memmap:
+        """
+        :param file_name: Packed file name relative to dir_path
+        :return: Read-only memory-map of the packed file
+        """
+        if file_name not in self._memmaps:
+            self._memmaps[file_name] = np.memmap(os.path.join(self.dir_path, file_name), dtype=np.uint8, mode='r')
+        return self._memmaps[file_name]
 
 
 def save_layer_output_names(layer_output_names: list, dir_path: str):
@@ -129,3 +368,96 @@ def save_layer_output_names(layer_output_names: list, dir_path: str):
     json_file_path = os.path.join(dir_path, 'layer_output_name_order.json')
     with open(json_file_path, 'w') as fptr:
         json.dump({'layer_output_names': layer_output_names}, fptr, indent=4)
+
+
+class LayerOutputErrorStats:
+    """
+    Running accumulators of the error between a quantized layer-output and the corresponding reference (FP32)
+    layer-output, over any number of input instances.
+    """
+
+    def __init__(self):
+        self.num_elements = 0
+        self.sum_squared_error = 0.0
+        self.sum_squared_reference = 0.0
+        self.sum_squared_quantized = 0.0
+        self.sum_product = 0.0
+        self.max_abs_error = 0.0
+
+    # pylint: disable=too-many-arguments
+    def update(self, num_elements: int, sum_squared_error: float, sum_squared_reference: float,
+               sum_squared_quantized: float, sum_product: float, max_abs_error: float):
+        """
+        Accumulates the reductions of one pair of reference and quantized layer-outputs
+        :param num_elements: Number of elements of the layer-output
+        :param sum_squared_error: Sum of squared differences between quantized and reference layer-output
+        :param sum_squared_reference: Sum of squares of the reference layer-output
+        :param sum_squared_quantized: Sum of squares of the quantized layer-output
+        :param sum_product: Sum of element-wise products of the reference and quantized layer-output
+        :param max_abs_error: Maximum absolute difference between quantized and reference layer-output
+        """
+        self.num_elements += num_elements
+        self.sum_squared_error += sum_squared_error
+        self.sum_squared_reference += sum_squared_reference
+        self.sum_squared_quantized += sum_squared_quantized
+        self.sum_product += sum_product
+        self.max_abs_error = max(self.max_abs_error, max_abs_error)
+
+    def update_from_numpy(self, reference: np.ndarray, quantized: np.ndarray):
+        """
+        Accumulates the error between a pair of reference and quantized layer-outputs
+        :param reference: Reference layer-output
+        :param quantized: Quantized layer-output
+        """
+        reference = np.asarray(reference, dtype=np.float64)
+        quantized = np.asarray(quantized, dtype=np.float64)
+        error = quantized - reference
+        self.update(reference.size, float(np.sum(error * error)), float(np.sum(reference * reference)),
+                    float(np.sum(quantized * quantized)), float(np.sum(reference * quantized)),
+                    float(np.max(np.abs(error))) if error.size else 0.0)
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        :return: Dictionary of accumulated metrics. SQNR is in dB, and cosine similarity is computed over all elements
+            of all accumulated layer-outputs.
+        """
+        if self.sum_squared_error > 0:
+            sqnr = 10 * math.log10(self.sum_squared_reference / self.sum_squared_error) \
+                if self.sum_squared_reference > 0 else -math.inf
+        else:
+            sqnr = math.inf
+
+        norm_product = math.sqrt(self.sum_squared_reference * self.sum_squared_quantized)
+        if norm_product > 0:
+            cosine_similarity = self.sum_product / norm_product
+        else:
+            cosine_similarity = 1.0 if self.sum_squared_reference == self.sum_squared_quantized else 0.0
+
+        return {
+            'sqnr': sqnr,
+            'mse': self.sum_squared_error / self.num_elements if self.num_elements else 0.0,
+            'max_abs_error': self.max_abs_error,
+            'cosine_similarity': cosine_similarity,
+        }
+
+
+def save_layer_output_comparison_report(layer_output_error_stats: Dict[str, LayerOutputErrorStats],
+                                        dir_path: str) -> Dict[str, Dict[str, float]]:
+    """
+    This function saves the accumulated metrics of every layer-output into a json file. Non-finite metrics (e.g. the
+    SQNR of a layer-output without any error) are written as the strings 'inf', '-inf' or 'nan' so that the file stays
+    valid JSON; they can be read back with float().
+    :param layer_output_error_stats: Dictionary of layer-output name to accumulated error stats, in topological order
+    :param dir_path: Directory to save json file
+    :return: Dictionary of layer-output name to metrics
+    """
+    report = {name: stats.get_metrics() for name, stats in layer_output_error_stats.items()}
+    json_report = {name: {metric: value if math.isfinite(value) else str(value) for metric, value in metrics.items()}
+                   for name, metrics in report.items()}
+
+    os.makedirs(dir_path, exist_ok=True)
+    json_file_path = os.path.join(dir_path, 'layer_output_comparison.json')
+    with open(json_file_path, 'w') as fptr:
+        json.dump({'layer_outputs': json_report}, fptr, indent=4, allow_nan=False)
+
+    return report
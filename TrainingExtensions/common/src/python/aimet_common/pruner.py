@@ -38,6 +38,7 @@
 """ Creates a compressed model by calling modules to split layers """
 from decimal import Decimal
 import abc
+import contextlib
 from typing import List
 import copy
 
@@ -51,6 +52,10 @@ class Pruner(abc.ABC):
     Models a ML Model Pruner
     """
 
+    # Pruners whose _prune_layer() only swaps the pruned layer's module within its parent, leaving every other
+    # module of the model untouched, can prune a single layer directly in the given LayerDatabase
+    supports_in_place_pruning = False
+
     def prune_model(self, layer_db: LayerDatabase, layer_comp_ratio_list: List[LayerCompRatioPair],
                     cost_metric: CostMetric, trainer) -> LayerDatabase:
         """
@@ -79,6 +84,46 @@ class Pruner(abc.ABC):
 
         return comp_layer_db
 
+    def prepare_to_prune(self, layer_db: LayerDatabase, layers: List[Layer]):
+        """
+        Precomputes any per-layer state that is reused across calls to prune the given layers, e.g. weight
+        factorizations. Does nothing by default.
+
+        :param layer_db: Layer database of the model to prune
+        :param layers: Layers that will be pruned
+        """
+
+    @contextlib.contextmanager
+    def prune_layer_in_place(self, layer_db: LayerDatabase, layer_comp_ratio: LayerCompRatioPair,
+                             cost_metric: CostMetric):
+        """
+        Context manager that prunes a single layer of the given LayerDatabase in place and restores the original
+        layer on exit. This avoids copying the whole model when a pruned model is only needed transiently, e.g. to
+        evaluate a compression-ratio candidate. Pruners that do not support in place pruning yield a compressed copy
+        of the LayerDatabase instead, which is destroyed on exit.
+
+        :param layer_db: Layer database of the model to prune
+        :param layer_comp_ratio: Layer-comp_ratio pair to prune
+        :param cost_metric: Cost metric
+        :return: LayerDatabase holding the pruned layer
+        """
+        if not self.supports_in_place_pruning:
+            comp_layer_db = self.prune_model(layer_db, [layer_comp_ratio], cost_metric, trainer=None)
+            try:
+                yield comp_layer_db
+            finally:
+                comp_layer_db.destroy()
+            return
+
+        with layer_db.restore_layers_on_exit():
+            layer = layer_db.find_layer_by_name(layer_comp_ratio.layer.name)
+            comp_ratio = layer_comp_ratio.comp_ratio
+
+            if comp_ratio is not None and comp_ratio < 1.0:
+                self._prune_layer(layer_db, layer_db, layer, comp_ratio, cost_metric)
+
+            yield layer_db
+
     @abc.abstractmethod
     def _prune_layer(self, orig_layer_db: LayerDatabase, comp_layer_db: LayerDatabase, layer: Layer,
                      comp_ratio: Decimal, cost_metric: CostMetric):
@@ -37,7 +37,7 @@
 
 """ Sample output from original module for Adaround feature """
 
-from typing import Tuple, List, Dict, Union
+from typing import Tuple, List, Dict, Optional, Union
 
 import numpy as np
 import onnxruntime as ort
@@ -45,7 +45,7 @@ import onnx
 from packaging import version
 
 from aimet_common.utils import AimetLogger
-from aimet_onnx.quantsim import QuantizationSimModel
+from aimet_onnx.quantsim import QuantizationSimModel, SessionCache
 from aimet_onnx.utils import add_hook_to_get_activation, remove_activation_hooks, create_input_dict
 
 # pylint: disable=no-name-in-module, ungrouped-imports
@@ -85,8 +85,11 @@ class ActivationSampler:
         else:
             self.providers = ['CPUExecutionProvider']
 
-        self._orig_module_collector = ModuleData(orig_model, orig_op, self.providers, user_onnx_libs)
-        self._quant_module_collector = ModuleData(quant_model, quant_op, self.providers, user_onnx_libs)
+        # Sessions are reused across the batches sampled by this sampler
+        session_cache = SessionCache()
+        self._orig_module_collector = ModuleData(orig_model, orig_op, self.providers, user_onnx_libs, session_cache)
+        self._quant_module_collector = ModuleData(quant_model, quant_op, self.providers, user_onnx_libs,
+                                                  session_cache)
 
     def sample_and_place_all_acts_on_cpu(self, dataset) -> Tuple:
         """
@@ -140,17 +143,20 @@ class ModuleData:
     Collect input and output data to and from module
     """
 
-    def __init__(self, model: ModelProto, node_name: str, providers: List, user_onnx_libs: List[str] = None):
+    def __init__(self, model: ModelProto, node_name: str, providers: List, user_onnx_libs: List[str] = None,
+                 session_cache: Optional[SessionCache] = None):
         """
         :param session: ONNX session
         :param node: Module reference
         :param providers: CPU/GPU execution providers
         :param user_onnx_libs: List of paths to all compiled ONNX custom ops libraries
+        :param session_cache: Cache of the sessions to reuse across calls. If None, a new session is built every call
         """
         self._model = model
         self._module_name = node_name
         self._providers = providers
         self._user_onnx_libs = user_onnx_libs
+        self._session_cache = session_cache
 
     def collect_inp_out_data(self, model_input: Dict[str, List[np.ndarray]],
                              collect_input: bool, collect_output: bool) -> Union[Tuple[None, List], Tuple[List, None]]:
@@ -164,7 +170,8 @@ class ModuleData:
         """
 
         handle = add_hook_to_get_activation(self._model.model, self._module_name)
-        sess = QuantizationSimModel.build_session(self._model.model, self._providers, self._user_onnx_libs)
+        sess = QuantizationSimModel.build_session(self._model.model, self._providers, self._user_onnx_libs,
+                                                  session_cache=self._session_cache)
         outputs = sess.run([self._module_name], model_input)
         remove_activation_hooks(self._model.model, handle)
 
@@ -38,9 +38,8 @@
 
 import contextlib
 import os
-from collections import defaultdict, OrderedDict
-import pickle
 import functools
+import tempfile
 from typing import Any, Callable, Tuple, List, Dict
 import json
 import numpy as np
@@ -51,9 +50,7 @@ from aimet_common.defs import CallbackFunc
 from aimet_common.amp.mixed_precision_algo import GreedyMixedPrecisionAlgo as MixedPrecisionAlgo
 from aimet_common.amp.quantizer_groups import reformat_supported_kernels
 from aimet_common.amp.utils import (
-    sort_accuracy_list,
     CANDIDATE_WITH_DTYPE,
-    ACCURACY_LIST,
     disable_quantizers,
     enable_quantizers,
 )
@@ -253,146 +250,41 @@ class GreedyMixedPrecisionAlgo(MixedPrecisionAlgo):
             mixed_precision_utils.get_quantizer_to_op_type_dict(sim),
             use_all_amp_candidates)
 
-    def _create_and_save_accuracy_list_optimized(self, baseline_candidate) -> ACCURACY_LIST:
+    def _compute_encodings_for_candidate(self, quantizer_groups: List[QuantizerGroup]):
         """
-        Create a list of tuples of (quantizer_group, bitwidth, accuracy score)
+        Computes encodings of the sim, in which the given quantizer groups are enabled and set to the same candidate.
+        The activation encodings are computed without parameter quantization.
 
-        :param baseline_candidate: Candidate [bitwidth, dtype] which yields max accuracy
-        :return: Sorted accuracy list containing tuples of (quantizer, candidate, accuracy score, bit ops reduction)
+        :param quantizer_groups: Enabled quantizer groups
         """
-        # pylint: disable=too-many-locals, too-many-branches, too-many-statements
-        index_of_quantizer_group = {}
-        for index, quantizer_group in enumerate(self.quantizer_groups):
-            index_of_quantizer_group[quantizer_group] = index
-
-        accuracy_list: ACCURACY_LIST = []
-
-        file = os.path.join(self._results_dir, '.cache', 'accuracy_list.pkl')
-        combinations_already_computed = set()
-
-        if os.path.isfile(file):
-            if self._clean_start:
-                os.remove(file)
-                logger.info("Removed old cached files and restarting computation")
-            else:
-                with open(file, 'rb') as f:
-                    accuracy_list = pickle.load(f)
-
-                combinations_already_computed.update(
-                    (quantizer_group, candidate)
-                    for quantizer_group, candidate, _, _ in accuracy_list
-                )
-
-        disabled_quantizers = OrderedDict()
-
-        try:
-            # Disable all quantizers
-            for quantizer_group in self.quantizer_groups:
-                quantizers = quantizer_group.get_active_quantizers(self._module_name_dict)
-                disable_quantizers(quantizers)
-                disabled_quantizers[quantizer_group] = quantizers
-
-            # quantizer_groups_per_candidate = {"candidate1":[quantizer_group1,quantizer_group2,...]}
-            # quantizer_groups_per_candidate is the dictionary with keys as candidates and values as quantizer groups that supports the corresponding candidate
-            # quantizer_groups_per_candidate is like reverse mapping to self._supported_candidates_per_quantizer_group
-            quantizer_groups_per_candidate = defaultdict(list)
-            for quantizer_group, candidates in self._supported_candidates_per_quantizer_group.items():
-                for candidate in candidates:
-                    quantizer_groups_per_candidate[candidate].append(quantizer_group)
-
-            # Loop through all possible bitwidths(candidates). Set all the quantizer groups to the corresponding bitwidth(candidate)
-            # Compute encodings by disabling the parameters and  reuse the encodings
-            for candidate, quantizer_groups in quantizer_groups_per_candidate.items():
-                if candidate == baseline_candidate:
-                    continue
-
-                 # configure the sim model with the candidate by enabling the quantizers and set quantizers to corresponding candidate
-                for quantizer_group in quantizer_groups:
-                    quantizers = disabled_quantizers[quantizer_group]
-                    try:
-                        enable_quantizers(quantizers)
-                        # Set quantizer bitwidth to candidate (bitwidth)
-                        quantizer_group.set_quantizers_to_candidate(self._module_name_dict, candidate)
-                    except RuntimeError as e:
-                        logger.info("Exception occured while setting Quantizers to Candidate: %s", e)
-
-                # list to store all the param quantizers
-                param_quantizers_qgp = []
-
-                for quantizer_group in quantizer_groups:
-                    for quantizer in quantizer_group.get_param_quantizers(self._module_name_dict):
-                        if quantizer.enabled:
-                            param_quantizers_qgp.append(quantizer)
-
-                # compute encodings
-                self._sim.compute_encodings(self.algo_params.forward_pass_callback,
-                                            self.algo_params.forward_pass_callback_args)
-                # export encodings
-                self._export_encodings(self._results_dir)
-
-                # disable the parameter quantization
-                disable_quantizers(param_quantizers_qgp)
-
-                # compute encodings with out parameter quantization
-                self._sim.compute_encodings(self.algo_params.forward_pass_callback,
-                                            self.algo_params.forward_pass_callback_args)
-
-                # export activation encodings
-                self._export_activation_encodings(self._results_dir)
-                # enable the parameter quantization
-                enable_quantizers(param_quantizers_qgp)
-                self._load_param_encodings(self._results_dir)
-
-                # Disable all the quantizers
-                for quantizer_group in quantizer_groups:
-                    quantizers = quantizer_group.get_active_quantizers(self._module_name_dict)
-                    disable_quantizers(quantizers)
-                    disabled_quantizers[quantizer_group] = quantizers
-
-                # Loop over all the quantizer groups and enable one at a time and calculate resulting model accuracy and disable the enabled quantizer
-                # Accuracy list will contain tuples of the quantizer, bitwidth, and accuracy score
-                for quantizer_group in quantizer_groups:
-                    quantizers = disabled_quantizers[quantizer_group]
-                    try:
-                        enable_quantizers(quantizers)
-
-                        # If starting the computation from an already existing state, then check if that combination
-                        # has already been executed
-                        if (quantizer_group, candidate) in combinations_already_computed:
-                            continue
-                        # Compute accuracy of model with new candidate (bitwidth)
-                        eval_score = self.evaluate_model(self.algo_params.eval_callback_for_phase1)
-
-                        bit_ops_reduction = self._find_bit_ops_reduction_for_acc_list(quantizer_group,
-                                                                                      baseline_candidate,
-                                                                                      candidate)
-                        accuracy_list.append((quantizer_group, candidate, eval_score, bit_ops_reduction))
-                        # Sort accuracy list, first by descending accuracy score, then by descending order of addition of bitwidths if accuracy
-                        # scores are identical, if that is also identical we sort by relative bit ops change in descending order
-                        # If bit ops reduction is also the same, then we sort in ascending order based on occurence of
-                        # quantizer group in the model
-                        accuracy_list = sort_accuracy_list(accuracy_list, index_of_quantizer_group)
-                        self._export_accuracy_list(accuracy_list, self._results_dir)
-                        logger.info('\n Quantizer: %s candidate: %s eval_score: %f \n', quantizer_group,
-                                    candidate, eval_score)
-                    finally:
-                        # Disable the quantizer
-                        disable_quantizers(quantizers)
-        finally:
-            # set all quantizers to baseline candidate
-            for quantizer_group in self.quantizer_groups:
-                quantizers = disabled_quantizers[quantizer_group]
-                try:
-                    # Enable the disabled quantizers
-                    enable_quantizers(quantizers)
-                    quantizer_group.set_quantizers_to_candidate(self._module_name_dict, baseline_candidate)
-                except RuntimeError as e:
-                    logger.info("Exception occured while setting Quantizers to Candidate: %s", e)
-
-        logger.info('Completed Accuracy list computation')
-        # Recompute encodings after quantizer's bitwidth is set back to self._max_bitwidth
-        self._sim.compute_encodings(self.algo_params.forward_pass_callback, self.algo_params.forward_pass_callback_args)
-        return accuracy_list
+        # list to store all the param quantizers
+        param_quantizers_qgp = []
+
+        for quantizer_group in quantizer_groups:
+            for quantizer in quantizer_group.get_param_quantizers(self._module_name_dict):
+                if quantizer.enabled:
+                    param_quantizers_qgp.append(quantizer)
+
+        # Encodings are exported to a directory of their own since phase 1 can run in several worker processes
+        with tempfile.TemporaryDirectory() as encodings_dir:
+            # compute encodings
+            self._sim.compute_encodings(self.algo_params.forward_pass_callback,
+                                        self.algo_params.forward_pass_callback_args)
+            # export encodings
+            self._export_encodings(encodings_dir)
+
+            # disable the parameter quantization
+            disable_quantizers(param_quantizers_qgp)
+
+            # compute encodings with out parameter quantization
+            self._sim.compute_encodings(self.algo_params.forward_pass_callback,
+                                        self.algo_params.forward_pass_callback_args)
+
+            # export activation encodings
+            self._export_activation_encodings(encodings_dir)
+            # enable the parameter quantization
+            enable_quantizers(param_quantizers_qgp)
+            self._load_param_encodings(encodings_dir)
 
     def _export_encodings(self, path: str):
         """
@@ -0,0 +1,254 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+""" Persistent cache of the encodings computed by QuantizationSimModel.compute_encodings """
+
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from onnx import numpy_helper
+
+from aimet_common import _libpymo as libpymo
+from aimet_common.cache import Cache
+from aimet_common.defs import QuantScheme, QuantizationDataType
+from aimet_onnx.qc_quantize_op import QcQuantizeOp
+
+
+__all__ = ['enable_encoding_cache']
+
+
+_encoding_cache = Cache()
+_data_key: Optional[str] = None
+
+
+@contextlib.contextmanager
+def enable_encoding_cache(cache_dir: str, data_key: str):
+    """
+    Enables caching of the encodings computed by :meth:`QuantizationSimModel.compute_encodings`.
+
+    Within this context, the encodings of all quantizers are saved to ``cache_dir``, keyed by a
+    fingerprint of the model graph, the model weights, the parameter quantizer configurations and
+    ``data_key``. The encodings of each activation quantizer are saved per quantizer configuration
+    (bitwidth, symmetry, enabled, ...). Since activation quantizers only observe the statistics
+    without quantizing the activations during calibration, their encodings don't depend on the
+    configuration of the other activation quantizers.
+    Subsequent calls to ``compute_encodings`` will skip the calibration forward passes if the
+    current configuration of every quantizer has been calibrated before with the same key.
+
+    .. note::
+        The calibration data can't be inspected without running ``forward_pass_callback``.
+        ``data_key`` should therefore uniquely identify the calibration data produced by
+        ``forward_pass_callback``, and be changed whenever the calibration data changes.
+
+    Example:
+
+        >>> with enable_encoding_cache("./encoding_cache", data_key="calib_set_v1"):
+        ...     sim.compute_encodings(run_forward_pass, None)
+        ...     sim.qc_quantize_op_dict['output'].set_bitwidth(4)
+        ...     sim.compute_encodings(run_forward_pass, None) # Forward pass runs once for 4-bit 'output'
+        ...     sim.qc_quantize_op_dict['output'].set_bitwidth(8)
+        ...     sim.compute_encodings(run_forward_pass, None) # No forward pass
+
+    :param cache_dir: Directory to save the cached encodings
+    :param data_key: Key that identifies the calibration data used by the forward pass callback
+    """
+    if not isinstance(data_key, str) or not data_key:
+        raise ValueError(f"data_key should be a non-empty string identifying the calibration data; got {data_key}")
+
+    global _data_key # pylint: disable=global-statement
+    prev_data_key = _data_key
+    _data_key = data_key
+    try:
+        with _encoding_cache.enable(cache_dir):
+            yield
+    finally:
+        _data_key = prev_data_key
+
+
+def _is_enabled() -> bool:
+    """ Returns True if encoding cache is enabled """
+    return _encoding_cache.is_enabled()
+
+
+def _get_quantizer_config(qc_op: QcQuantizeOp) -> Tuple:
+    """
+    Returns the attributes of the quantizer that determine its encodings given the same statistics
+    """
+    percentile = None
+    if qc_op.quant_scheme == QuantScheme.post_training_percentile:
+        percentile = qc_op._tensor_quantizer[0].getPercentileValue() # pylint: disable=protected-access
+
+    return (qc_op.enabled,
+            qc_op.bitwidth,
+            qc_op.data_type.name,
+            qc_op.use_symmetric_encodings,
+            qc_op.use_strict_symmetric,
+            qc_op.use_unsigned_symmetric,
+            qc_op.quant_scheme.name,
+            percentile,
+            qc_op.rounding_mode,
+            qc_op.quant_info.usePerChannelMode,
+            qc_op.quant_info.channelAxis,
+            qc_op.quant_info.blockAxis,
+            qc_op.quant_info.blockSize,
+            getattr(qc_op, 'decompressed_bw', None),
+            qc_op._encoding_min_max_fixed_vals) # pylint: disable=protected-access
+
+
+def _to_tuples(encodings: Optional[List[libpymo.TfEncoding]]) -> Optional[List[Tuple]]:
+    """ Convert libpymo encodings to picklable tuples """
+    if encodings is None:
+        return None
+    return [(enc.bw, enc.min, enc.max, enc.delta, enc.offset) for enc in encodings]
+
+
+def _to_libpymo_encodings(encodings: List[Tuple]) -> List[libpymo.TfEncoding]:
+    """ Convert tuples back to libpymo encodings """
+    libpymo_encodings = []
+    for bw, min_val, max_val, delta, offset in encodings:
+        enc = libpymo.TfEncoding()
+        enc.bw, enc.min, enc.max, enc.delta, enc.offset = bw, min_val, max_val, delta, offset
+        libpymo_encodings.append(enc)
+    return libpymo_encodings
+
+
+def _get_cache_file(sim) -> str:
+    """
+    Returns the path of the cache file of the model, parameter quantizers and calibration data of the sim.
+
+    Activation quantizers are excluded from the fingerprint since they only observe the statistics
+    during calibration. Their encodings are saved per quantizer configuration in the cache file instead.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(f'data_key:{_data_key}'.encode())
+
+    graph = sim.model.model.graph
+    for node in graph.node:
+        hasher.update(f'{node.op_type}:{node.domain}:{list(node.input)}:{list(node.output)}'.encode())
+        for attribute in node.attribute:
+            if attribute.name == 'quant_info':
+                # Address of the quantizer. Differs across sim instances
+                continue
+            hasher.update(attribute.SerializeToString())
+
+    for initializer in graph.initializer:
+        hasher.update(initializer.name.encode())
+        hasher.update(numpy_helper.to_array(initializer).tobytes())
+
+    for name, qc_op in sim.qc_quantize_op_dict.items():
+        if name in sim.activation_names:
+            continue
+        # Parameter quantizers quantize the parameters during calibration and
+        # affect the statistics observed by the downstream activation quantizers
+        hasher.update(f'{name}:{_get_quantizer_config(qc_op)}:{qc_op.is_encoding_frozen()}'.encode())
+        if qc_op.is_encoding_frozen():
+            hasher.update(repr(_to_tuples(qc_op.get_encodings())).encode())
+
+    return _encoding_cache.get_cache_file(f'encodings_{hasher.hexdigest()}')
+
+
+def _load_cache_file(cache_file: str) -> Dict:
+    """ Load the cache file, or return an empty entry if it doesn't exist """
+    if not os.path.exists(cache_file):
+        return {'params': None, 'activations': {}}
+    with open(cache_file, 'rb') as f:
+        return pickle.load(f)
+
+
+def _is_calibrated(qc_op: QcQuantizeOp) -> bool:
+    """ Returns True if compute_encodings computes the encodings of the quantizer """
+    return qc_op.data_type == QuantizationDataType.int and not qc_op.is_encoding_frozen()
+
+
+def _load_cached_encodings(sim) -> bool:
+    """
+    Load the cached encodings to all quantizers of the sim if the current configuration
+    of every quantizer has been calibrated before.
+
+    :param sim: QuantizationSimModel to load the encodings to
+    :return: True if the encodings were loaded from cache, False otherwise
+    """
+    entry = _load_cache_file(_get_cache_file(sim))
+    if entry['params'] is None:
+        return False
+
+    encodings = {}
+    for name, qc_op in sim.qc_quantize_op_dict.items():
+        if not _is_calibrated(qc_op):
+            continue
+        if name not in sim.activation_names:
+            encodings[name] = entry['params'][name]
+            continue
+        config = _get_quantizer_config(qc_op)
+        if config not in entry['activations'].get(name, {}):
+            return False
+        encodings[name] = entry['activations'][name][config]
+
+    for name, qc_op in sim.qc_quantize_op_dict.items():
+        qc_op.reset_encoding_stats()
+        if encodings.get(name) is not None:
+            qc_op.load_encodings(_to_libpymo_encodings(encodings[name]))
+        qc_op.op_mode = libpymo.TensorQuantizerOpMode.quantizeDequantize
+
+    return True
+
+
+def _save_encodings(sim):
+    """
+    Save the encodings computed by the last calibration of the sim to cache
+
+    :param sim: QuantizationSimModel whose encodings were just computed
+    """
+    cache_file = _get_cache_file(sim)
+    entry = _load_cache_file(cache_file)
+    entry['params'] = {}
+
+    for name, qc_op in sim.qc_quantize_op_dict.items():
+        if not _is_calibrated(qc_op):
+            continue
+        encodings = _to_tuples(qc_op.get_encodings())
+        if name in sim.activation_names:
+            entry['activations'].setdefault(name, {})[_get_quantizer_config(qc_op)] = encodings
+        else:
+            entry['params'][name] = encodings
+
+    # Write to a temporary file first so that concurrent readers never see a partially written file
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(cache_file), delete=False) as f:
+        pickle.dump(entry, f)
+    os.replace(f.name, cache_file)
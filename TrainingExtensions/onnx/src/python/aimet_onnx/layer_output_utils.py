@@ -38,7 +38,7 @@
 """ This module contains utilities to capture and save intermediate layer-outputs of a model """
 
 import copy
-from typing import List, Dict, Tuple, Union
+from typing import List, Dict, Tuple, Union, Iterable, Optional
 import re
 import numpy as np
 import onnxruntime as ort
@@ -46,10 +46,11 @@ import onnx
 from packaging import version
 
 from aimet_common.utils import AimetLogger
-from aimet_common.layer_output_utils import SaveInputOutput, save_layer_output_names
+from aimet_common.layer_output_utils import SaveInputOutput, save_layer_output_names, LayerOutputErrorStats, \
+    save_layer_output_comparison_report
 
 from aimet_onnx.quantsim import QuantizationSimModel
-from aimet_onnx.utils import create_input_dict, add_hook_to_get_activation
+from aimet_onnx.utils import create_input_dict, add_hook_to_get_activation, IOBindingSession
 
 # pylint: disable=no-name-in-module, ungrouped-imports
 if version.parse(onnx.__version__) >= version.parse("1.14.0"):
@@ -63,13 +64,18 @@ logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.LayerOutputs)
 class LayerOutputUtil:
     """ Implementation to capture and save outputs of intermediate layers of a model (fp32/quantsim) """
 
-    def __init__(self, model: ModelProto, dir_path: str, device: int = 0):
+    def __init__(self, model: ModelProto, dir_path: str, device: int = 0, num_writers: int = 0, packed: bool = False):
         """
         Constructor - It initializes the utility classes that captures and saves layer-outputs
 
         :param model: ONNX model
         :param dir_path: Directory wherein layer-outputs will be saved
         :param device: CUDA device-id to be used
+        :param num_writers: Number of background threads writing layer-outputs to disk. If 0, layer-outputs are written
+            synchronously. Otherwise, close() must be called once all layer-outputs are generated.
+        :param packed: If True, layer-outputs are saved in the packed format, with a single memory-mappable file per
+            layer-output (see aimet_common.layer_output_utils.PackedLayerOutputReader). close() must be called once all
+            layer-outputs are generated.
         """
         self.model = model
 
@@ -82,7 +88,7 @@ class LayerOutputUtil:
         self.layer_output = LayerOutput(model=model, providers=providers, dir_path=dir_path)
 
         # Utility to save model inputs and their corresponding layer-outputs
-        self.save_input_output = SaveInputOutput(dir_path, 'NCHW')
+        self.save_input_output = SaveInputOutput(dir_path, 'NCHW', num_writers=num_writers, packed=packed)
 
     def generate_layer_outputs(self, input_instance: Union[np.ndarray, List[np.ndarray], Tuple[np.ndarray]]):
         """
@@ -100,6 +106,88 @@ class LayerOutputUtil:
 
         logger.info('Layer-outputs generated for input instance %d', self.save_input_output.input_cntr)
 
+    def close(self):
+        """
+        Waits until all generated layer-outputs are written to disk and stops the background writers, if any.
+        """
+        self.save_input_output.close()
+
+
+class LayerOutputComparator:
+    """
+    Compares outputs of intermediate layers of a FP32 model and its quantized (quantsim) model, by running both models
+    side by side and accumulating per-layer error metrics (SQNR, MSE, max absolute error and cosine similarity).
+    Layer-outputs are not saved, so memory usage does not grow with the number of input instances.
+    """
+
+    def __init__(self, fp32_model: ModelProto, quantized_model: ModelProto, dir_path: str, device: int = 0):
+        """
+        Constructor - It initializes the utility classes that capture layer-outputs of both models
+
+        :param fp32_model: FP32 ONNX model
+        :param quantized_model: Quantized ONNX model, e.g. QuantizationSimModel.model.model
+        :param dir_path: Directory wherein the comparison report will be saved
+        :param device: CUDA device-id to be used
+        """
+        self.fp32_model = fp32_model
+        self.dir_path = dir_path
+
+        # Fetch appropriate execution providers depending on availability
+        providers = ['CPUExecutionProvider']
+        if 'CUDAExecutionProvider' in ort.get_available_providers():
+            providers = [('CUDAExecutionProvider', {'device_id': device}), 'CPUExecutionProvider']
+
+        self.fp32_layer_output = LayerOutput(model=fp32_model, providers=providers, dir_path=dir_path)
+        self.quantized_layer_output = LayerOutput(model=quantized_model, providers=providers, dir_path=dir_path)
+        self.layer_output_error_stats: Dict[str, LayerOutputErrorStats] = {}
+
+    def compare_layer_outputs(self, input_instance: Union[np.ndarray, List[np.ndarray], Tuple[np.ndarray]]):
+        """
+        This method captures the output of every layer of both models for the given input and accumulates the errors
+        of the quantized layer-outputs. Layer-outputs that only one of the models produces are skipped.
+
+        :param input_instance: Input (batch) passed to both models.
+        :return: None
+        """
+        input_dict = create_input_dict(self.fp32_model, input_instance)
+        fp32_layer_output_dict = self.fp32_layer_output.get_outputs(input_dict)
+        quantized_layer_output_dict = self.quantized_layer_output.get_outputs(input_dict)
+
+        for name, reference in fp32_layer_output_dict.items():
+            quantized = quantized_layer_output_dict.get(name)
+            if quantized is None or np.shape(quantized) != np.shape(reference):
+                continue
+
+            if name not in self.layer_output_error_stats:
+                self.layer_output_error_stats[name] = LayerOutputErrorStats()
+            self.layer_output_error_stats[name].update_from_numpy(reference, quantized)
+
+    def compare_over_data_loader(self, data_loader: Iterable, num_batches: Optional[int] = None) \
+            -> Dict[str, Dict[str, float]]:
+        """
+        Compares the layer-outputs of both models over a data loader and saves the comparison report
+        (layer_output_comparison.json) to dir_path.
+
+        :param data_loader: Data loader. Every batch is passed as is to compare_layer_outputs()
+        :param num_batches: Number of batches to compare. If None, all batches are compared
+        :return: Dictionary of layer-output name to metrics
+        """
+        for batch_index, batch in enumerate(data_loader):
+            if num_batches is not None and batch_index >= num_batches:
+                break
+            logger.info("Comparing layer-outputs for batch %d", batch_index + 1)
+            self.compare_layer_outputs(batch)
+
+        return self.save_report()
+
+    def save_report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Saves the metrics accumulated so far to layer_output_comparison.json in dir_path.
+
+        :return: Dictionary of layer-output name to metrics
+        """
+        return save_layer_output_comparison_report(self.layer_output_error_stats, self.dir_path)
+
 
 class LayerOutput:
     """
@@ -123,6 +211,7 @@ class LayerOutput:
         LayerOutput.register_activations(self.model, self.activation_names)
 
         self.session = QuantizationSimModel.build_session(self.model, providers)
+        self._io_binding_session = IOBindingSession(self.session)
 
         # Replace special characters with underscore. This gives valid file names to store activation tensors.
         self.sanitized_activation_names = [re.sub(r'\W+', "_", name.replace('_updated', '')) for name in self.activation_names]
@@ -137,7 +226,7 @@ class LayerOutput:
         :param input_dict: input name to input tensor map
         :return: layer-output name to layer-output dictionary
         """
-        activation_values = self.session.run(self.activation_names, input_dict)
+        activation_values = self._io_binding_session.run(self.activation_names, input_dict)
         return dict(zip(self.sanitized_activation_names, activation_values))
 
     @staticmethod
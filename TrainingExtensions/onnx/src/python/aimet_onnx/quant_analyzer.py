@@ -39,6 +39,8 @@
 
 import os
 import re
+import hashlib
+import tempfile
 from typing import Union, Tuple, Dict, List, Iterable
 import copy
 from collections import defaultdict
@@ -55,15 +57,110 @@ from aimet_common.quant_analyzer import save_json, export_per_layer_sensitivity_
     create_and_export_min_max_ranges_plot, export_per_layer_mse_plot, export_stats_histogram_plot
 
 from aimet_onnx.qc_quantize_op import QcQuantizeOp
-from aimet_onnx.quantsim import QuantizationSimModel
+from aimet_onnx.quantsim import QuantizationSimModel, SessionCache
 from aimet_onnx.batch_norm_fold import fold_all_batch_norms_to_weight
-from aimet_onnx.adaround.activation_sampler import ModuleData
 from aimet_onnx import utils
 from aimet_onnx.meta.operations import Op
 
 _logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.QuantAnalyzer)
 
 
+class _ActivationCache:
+    """
+    Stores the activations of each batch. Once the total size exceeds the in-memory limit,
+    the remaining activations are saved to a temporary directory and loaded back as memory-mapped arrays.
+    """
+    def __init__(self, max_in_memory_bytes: int):
+        """
+        :param max_in_memory_bytes: Maximum number of bytes to keep in memory
+        """
+        self._max_in_memory_bytes = max_in_memory_bytes
+        self._in_memory_bytes = 0
+        self._activations = defaultdict(list)
+        self._tmp_dir = None
+
+    def append(self, name: str, activation: np.ndarray):
+        """
+        Append activation of the next batch
+
+        :param name: Activation name
+        :param activation: Activation value
+        """
+        if self._in_memory_bytes + activation.nbytes > self._max_in_memory_bytes:
+            if self._tmp_dir is None:
+                self._tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=consider-using-with
+            batch_index = len(self._activations[name])
+            file_name = hashlib.sha1(name.encode()).hexdigest()
+            path = os.path.join(self._tmp_dir.name, f"{file_name}_{batch_index}.npy")
+            np.save(path, activation)
+            activation = np.load(path, mmap_mode='r')
+        else:
+            self._in_memory_bytes += activation.nbytes
+
+        self._activations[name].append(activation)
+
+    def get(self, name: str, batch_index: int) -> np.ndarray:
+        """
+        Get activation of the given batch
+
+        :param name: Activation name
+        :param batch_index: Index of the batch
+        :return: Activation value
+        """
+        return self._activations[name][batch_index]
+
+
+class _SessionPool:
+    """
+    Pool of inference sessions keyed by the model object and its outputs so that
+    sessions can be reused across analyses instead of being rebuilt every time.
+    """
+    def __init__(self, max_size: int):
+        """
+        :param max_size: Maximum number of sessions to keep alive
+        """
+        self._session_cache = SessionCache(max_size)
+
+    @staticmethod
+    def _get_providers() -> List:
+        if 'CUDAExecutionProvider' in ort.get_available_providers():
+            return [('CUDAExecutionProvider', {'cudnn_conv_algo_search': 'DEFAULT'}), 'CPUExecutionProvider']
+        return ['CPUExecutionProvider']
+
+    def get_model_version(self, model: ModelProto) -> int:
+        """
+        Returns the version of the model, which is bumped whenever the model is invalidated
+
+        :param model: ONNX model
+        """
+        return self._session_cache.get_version(model)
+
+    def invalidate(self, model: ModelProto):
+        """
+        Releases the sessions of the model modified in place and bumps its version
+
+        :param model: ONNX model
+        """
+        self._session_cache.invalidate(model)
+
+    def get_session(self, model: ModelProto, output_names: List[str] = None) -> ort.InferenceSession:
+        """
+        Get inference session of the model, building a new one only if not found in the pool.
+
+        :param model: ONNX model
+        :param output_names: Names of the intermediate activations to be exposed as additional model outputs
+        :return: Inference session
+        """
+        existing_outputs = {output.name for output in model.graph.output}
+        hooks = [utils.add_hook_to_get_activation(model, name)
+                 for name in output_names or [] if name not in existing_outputs]
+        try:
+            # NOTE: SessionCache registers AIMET custom op library required for running quantsim models
+            return self._session_cache.get_session(model, self._get_providers())
+        finally:
+            utils.remove_activation_hooks(model, hooks)
+
+
 class QuantAnalyzer:
     """
     QuantAnalyzer provides following utilities:
@@ -74,6 +171,12 @@ class QuantAnalyzer:
      4) per layer quantizer historgram analysis and
      5) per layer MSE analysis
     """
+    # Maximum number of inference sessions to keep alive for reuse
+    SESSION_POOL_SIZE = 4
+    # Maximum number of bytes of the cached fp32 activations to keep in memory.
+    # Activations beyond this limit are saved to disk and memory-mapped.
+    ACTIVATION_CACHE_IN_MEMORY_LIMIT = 2 * 1024 ** 3
+
     def __init__(self,
                  model: Union[ModelProto, ONNXModel],
                  dummy_input: Dict[str, np.ndarray],
@@ -104,6 +207,9 @@ class QuantAnalyzer:
         self._eval_callback = eval_callback
         self._unlabeled_dataset_iterable = None
         self._num_batches = None
+        self._session_pool = _SessionPool(self.SESSION_POOL_SIZE)
+        self._fp32_activation_cache = None
+        self._fp32_activation_cache_key = None
 
     def analyze(self,
                 quant_scheme: QuantScheme = QuantScheme.post_training_tf_enhanced,
@@ -208,14 +314,7 @@ class QuantAnalyzer:
         :param model: ONNX model to be evaluated.
         :return: Scaler value representing model performance.
         """
-        if 'CUDAExecutionProvider' in ort.get_available_providers():
-            providers = [('CUDAExecutionProvider', {'cudnn_conv_algo_search': 'DEFAULT'}), 'CPUExecutionProvider']
-        else:
-            providers = ['CPUExecutionProvider']
-        session = ort.InferenceSession(
-            path_or_bytes=model.SerializeToString(),
-            providers=providers,
-        )
+        session = self._session_pool.get_session(model)
         return self._eval_callback.func(session, self._eval_callback.args)
 
     def _eval_weight_quantized_model(self, sim: QuantizationSimModel)-> float:
@@ -566,6 +665,8 @@ class QuantAnalyzer:
 
         self._unlabeled_dataset_iterable = unlabeled_dataset_iterable
         self._num_batches = num_batches
+        self._fp32_activation_cache = None
+        self._fp32_activation_cache_key = None
 
     def export_per_layer_mse_loss(self, sim: QuantizationSimModel, results_dir: str) -> Dict:
         """
@@ -578,15 +679,15 @@ class QuantAnalyzer:
         results_dir = os.path.abspath(results_dir)
         os.makedirs(results_dir, exist_ok=True)
 
-        mse_loss_dict = {}
+        op_to_act_name = {}
         for op_node in self._onnx_model.nodes():
             if op_node.op_type == 'Constant':
                 continue
             op_output = op_node.output[0]
             if op_output in sim.qc_quantize_op_dict:
-                quantized_op_output = op_output + '_updated'
-                loss = self._compute_mse_loss(op_output, quantized_op_output, self._onnx_model, sim.model)
-                mse_loss_dict[op_node.name] = loss
+                op_to_act_name[op_node.name] = op_output
+
+        mse_loss_dict = self._compute_mse_loss(op_to_act_name, sim.model)
 
         export_per_layer_mse_plot(mse_loss_dict,
                                   results_dir,
@@ -595,45 +696,62 @@ class QuantAnalyzer:
         _logger.info("Exported per layer MSE loss plot.")
         return mse_loss_dict
 
-    # pylint: disable=too-many-locals
-    def _compute_mse_loss(self, fp32_act_name: str, quantized_act_name: str,
-                          fp32_model: ONNXModel, quantized_model: ONNXModel) -> float:
+    def _get_fp32_activations(self, act_names: List[str]) -> _ActivationCache:
         """
-        Compute MSE loss between fp32 and quantized output activations for each batch, add for
-        all the batches and return averaged mse loss.
+        Run fp32 model once for all the batches and cache the given activations.
+        Cached activations are reused as long as the fp32 model and the requested activations stay the same.
+        The fp32 model is identified by its identity and its version in the session pool, so in-place
+        modifications of the model should be followed by invalidating it in the session pool.
 
-        :param fp32_act_name: module from the fp32_model.
-        :param quantized_act_name: Corresponding quant wrapper from the QuantSim model.
-        :param fp32_model: PyTorch model.
-        :param sim: Quantsim model.
-        :return: MSE loss between fp32 and quantized output activations.
+        :param act_names: Names of the fp32 activations to collect.
+        :return: Cache of fp32 activations.
         """
+        model = self._onnx_model.model
+        key = (id(model), self._session_pool.get_model_version(model), tuple(act_names))
+        if self._fp32_activation_cache is not None and self._fp32_activation_cache_key == key:
+            return self._fp32_activation_cache
 
-        providers = ['CPUExecutionProvider']
-        if 'CUDAExecutionProvider' in ort.get_available_providers():
-            providers = [('CUDAExecutionProvider', {'cudnn_conv_algo_search': 'DEFAULT'}), 'CPUExecutionProvider']
-
-        # output activations collector.
-        orig_module_collector = ModuleData(fp32_model, fp32_act_name, providers)
-        quant_module_collector = ModuleData(quantized_model, quantized_act_name, providers)
-
-        total = 0
-        loss = 0.0
-        batch_index = 0
-        for model_inputs in self._unlabeled_dataset_iterable:
-            model_inputs = utils.create_input_dict(fp32_model.model, model_inputs)
-            _, quantized_out_acts = quant_module_collector.collect_inp_out_data(model_inputs,
-                                                                                collect_input=False,
-                                                                                collect_output=True)
-            _, fp32_out_acts = orig_module_collector.collect_inp_out_data(model_inputs,
-                                                                          collect_input=False,
-                                                                          collect_output=True)
-            loss += mean_squared_error(fp32_out_acts[0].reshape(fp32_out_acts[0].shape[0], -1),
-                                       quantized_out_acts[0].reshape(fp32_out_acts[0].shape[0], -1))
-            total += fp32_out_acts[0].shape[0]
-            batch_index += 1
+        cache = _ActivationCache(self.ACTIVATION_CACHE_IN_MEMORY_LIMIT)
+        session = utils.IOBindingSession(self._session_pool.get_session(self._onnx_model.model, act_names))
+        for batch_index, model_inputs in enumerate(self._unlabeled_dataset_iterable):
             if batch_index == self._num_batches:
                 break
+            model_inputs = utils.create_input_dict(self._onnx_model.model, model_inputs)
+            for act_name, act in zip(act_names, session.run(act_names, model_inputs)):
+                cache.append(act_name, act)
 
-        average_loss = loss/total
-        return float(average_loss)
+        self._fp32_activation_cache = cache
+        self._fp32_activation_cache_key = key
+        return cache
+
+    def _compute_mse_loss(self, op_to_act_name: Dict[str, str], quantized_model: ONNXModel) -> Dict[str, float]:
+        """
+        Compute MSE loss between fp32 and quantized output activations for each batch, add for
+        all the batches and return averaged mse loss for each op.
+
+        The fp32 activations are collected once and cached, so only the quantized model needs to run
+        for every call. All the activations are collected with a single forward pass per batch.
+
+        :param op_to_act_name: Mapping from op name to its output activation name in the fp32 model.
+        :param quantized_model: Quantsim model.
+        :return: MSE loss between fp32 and quantized output activations. dict[op_name] = MSE loss.
+        """
+        fp32_act_names = list(op_to_act_name.values())
+        quantized_act_names = [act_name + '_updated' for act_name in fp32_act_names]
+        fp32_acts = self._get_fp32_activations(fp32_act_names)
+        session = utils.IOBindingSession(self._session_pool.get_session(quantized_model.model, quantized_act_names))
+
+        loss = defaultdict(float)
+        total = defaultdict(int)
+        for batch_index, model_inputs in enumerate(self._unlabeled_dataset_iterable):
+            if batch_index == self._num_batches:
+                break
+            model_inputs = utils.create_input_dict(self._onnx_model.model, model_inputs)
+            quantized_out_acts = session.run(quantized_act_names, model_inputs)
+            for (op_name, act_name), quantized_out_act in zip(op_to_act_name.items(), quantized_out_acts):
+                fp32_out_act = fp32_acts.get(act_name, batch_index)
+                loss[op_name] += mean_squared_error(fp32_out_act.reshape(fp32_out_act.shape[0], -1),
+                                                    quantized_out_act.reshape(fp32_out_act.shape[0], -1))
+                total[op_name] += fp32_out_act.shape[0]
+
+        return {op_name: float(loss[op_name] / total[op_name]) for op_name in op_to_act_name}
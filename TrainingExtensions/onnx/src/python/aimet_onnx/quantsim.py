@@ -38,10 +38,11 @@
 
 import contextlib
 import tempfile
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 import os
-from typing import Dict, List, Union, Tuple, Optional
+from typing import Dict, List, Union, Tuple, Optional, Set, Iterable
 import itertools
 import json
 import warnings
@@ -64,6 +65,7 @@ from aimet_onnx import utils
 from aimet_onnx.meta.operations import Op
 from aimet_onnx.meta.utils import get_op_given_param_name, get_param_shape_using_connected_graph
 from aimet_onnx.meta.connectedgraph import ConnectedGraph
+from aimet_onnx.encoding_cache import _is_enabled as _is_encoding_cache_enabled, _load_cached_encodings, _save_encodings
 from aimet_onnx.qc_quantize_op import QcQuantizeOp, OpMode, TensorQuantizerParams, GroupedBlockQuantizeDequantize
 from aimet_onnx.quantsim_config.quantsim_config import QuantSimConfigurator
 from aimet_onnx.utils import make_dummy_input, save_model_with_external_weights, add_hook_to_get_activation, \
@@ -73,9 +75,9 @@ logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
 
 # pylint: disable=no-name-in-module, ungrouped-imports, too-many-lines
 if version.parse(onnx.__version__) >= version.parse("1.14.0"):
-    from onnx import ModelProto
+    from onnx import ModelProto, NodeProto
 else:
-    from onnx.onnx_pb import ModelProto
+    from onnx.onnx_pb import ModelProto, NodeProto
 
 # List of ops whose outputs are not to be quantized
 op_outputs_to_ignore = ["branch", "Flatten", "Gather", "Reshape", "Shape", "Unsqueeze", "Squeeze", "Split",
@@ -93,6 +95,140 @@ _tie_qtzrs = False
 data_types_to_quantize = [np.float32]
 
 
+class SessionCache:
+    """
+    LRU cache of inference sessions keyed by the identity of the model, the version of the model, the model outputs,
+    the execution providers and the user custom op libraries, so that components running the same graph share
+    one session instead of rebuilding it.
+
+    The cache doesn't inspect the contents of the model, except for the names of the model outputs which are often
+    changed temporarily to expose intermediate activations. Any other in-place modification of a model (e.g. removing
+    nodes or updating weights) should be followed by :meth:`invalidate`, which bumps the version of the model.
+
+    NOTE: Sessions of quantsim models stay valid after quantizer settings/encodings change, since QcQuantizeOp nodes
+    only refer to the quantizer info objects which are read on every run.
+    """
+    def __init__(self, max_size: int = 8):
+        """
+        :param max_size: Maximum number of sessions to keep alive
+        """
+        self._max_size = max_size
+        self._sessions = OrderedDict()
+        self._model_versions = {}
+
+    def _get_key(self, model: ModelProto, providers: List, user_onnx_libs: List[str] = None) -> Tuple:
+        return (id(model), self.get_version(model), tuple(output.name for output in model.graph.output),
+                repr(providers), tuple(user_onnx_libs or []))
+
+    def get_version(self, model: ModelProto) -> int:
+        """
+        Returns the version of the model, which is bumped by every :meth:`invalidate`
+
+        :param model: onnx model
+        """
+        return self._model_versions.get(id(model), 0)
+
+    def get_session(self, model: ModelProto, providers: List, user_onnx_libs: List[str] = None,
+                    path: str = None) -> InferenceSession:
+        """
+        Get inference session of the model, building a new one only if not found in the cache.
+
+        :param model: onnx model
+        :param providers: providers to execute onnxruntime
+        :param user_onnx_libs: list of paths to user custom ONNX op libraries
+        :param path: path where to store model external data
+        :return: Inference session
+        """
+        key = self._get_key(model, providers, user_onnx_libs)
+        # Cached entries hold a reference to the model so that its id can't be reused by another model
+        cached_model, session = self._sessions.get(key, (None, None))
+        if cached_model is model:
+            self._sessions.move_to_end(key)
+            return session
+
+        session = QuantizationSimModel.build_session(model, providers, user_onnx_libs, path)
+        self._sessions[key] = (model, session)
+        if len(self._sessions) > self._max_size:
+            self._sessions.popitem(last=False)
+        return session
+
+    def invalidate(self, model: ModelProto):
+        """
+        Bump the version of the model modified in place, releasing all the sessions of the previous versions
+
+        :param model: onnx model
+        """
+        self._model_versions[id(model)] = self._model_versions.get(id(model), 0) + 1
+        for key in [key for key, (cached_model, _) in self._sessions.items() if cached_model is model]:
+            del self._sessions[key]
+
+    def clear(self):
+        """
+        Release all the cached sessions
+        """
+        self._sessions.clear()
+
+
+class _RecordingSession:
+    """
+    Wrapper of inference session that records the values of the given activations in every run.
+    Activations that are model inputs are recorded from the input feed.
+    """
+    def __init__(self, session: InferenceSession, output_names: List[str], activation_names: List[str]):
+        """
+        :param session: Inference session whose outputs include the activations to record
+        :param output_names: Names of the outputs of the original model
+        :param activation_names: Names of the activations to record
+        """
+        self._session = session
+        self._output_names = output_names
+        self._recorded_activations = {name: [] for name in activation_names}
+
+    def run(self, output_names: Optional[List[str]], input_feed: Dict[str, np.ndarray], run_options=None):
+        """
+        Run the session and record the activations
+
+        :param output_names: Names of the outputs to return. If None, all the outputs of the original model
+        :param input_feed: Dictionary mapping input names to input values
+        :param run_options: Run options passed to the session as-is
+        :return: List of output values
+        """
+        output_names = list(output_names) if output_names else list(self._output_names)
+        session_outputs = {output.name for output in self._session.get_outputs()}
+        names_to_fetch = [name for name in self._recorded_activations
+                          if name not in input_feed and name in session_outputs]
+        outputs = self._session.run(output_names + names_to_fetch, input_feed, run_options)
+        activations = dict(zip(names_to_fetch, outputs[len(output_names):]))
+
+        for name, recorded in self._recorded_activations.items():
+            if name in input_feed:
+                # Copy the input since the caller may reuse the input buffer
+                recorded.append(np.array(input_feed[name]))
+            elif name in activations:
+                recorded.append(activations[name])
+
+        return outputs[:len(output_names)]
+
+    def get_outputs(self):
+        """
+        Returns the outputs of the original model
+        """
+        return [output for output in self._session.get_outputs() if output.name in self._output_names]
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def get_recorded_activations(self) -> Dict[str, List[np.ndarray]]:
+        """
+        Returns the recorded activations, or an empty dictionary if any of the activations were not recorded
+        in every run. (e.g. the session was run through an API other than run())
+        """
+        num_runs = {len(recorded) for recorded in self._recorded_activations.values()}
+        if len(num_runs) != 1 or 0 in num_runs:
+            return {}
+        return self._recorded_activations
+
+
 @contextlib.contextmanager
 def _apply_constraints(flag: bool):
     """
@@ -218,6 +354,12 @@ class QuantizationSimModel:
         self._apply_exception_rules()
         self._tie_quantizers()
 
+        # Activation quantizers observed during the last calibration, mapped to the tensor quantizers
+        # holding the statistics. Used by recompute_encodings to reuse the statistics.
+        self._observed_quantizers = {}
+        # Inputs to the region of the graph re-run by the last recompute_encodings, recorded per session run
+        self._cached_activations = {}
+
         # Build onnxruntime inference session
         self.session = QuantizationSimModel.build_session(self.model.model, self.providers,
                                                           user_onnx_libs=self._user_onnx_libs, path=self._path)
@@ -515,7 +657,8 @@ class QuantizationSimModel:
                                                           use_symmetric_encodings=self._use_symmetric_encodings)
 
     @staticmethod
-    def build_session(model: onnx.ModelProto, providers: List, user_onnx_libs: List[str] = None, path: str = None):
+    def build_session(model: onnx.ModelProto, providers: List, user_onnx_libs: List[str] = None, path: str = None,
+                      session_cache: Optional[SessionCache] = None):
         """
         Build and return onnxruntime inference session
 
@@ -523,14 +666,13 @@ class QuantizationSimModel:
         :param providers: providers to execute onnxruntime
         :param user_onnx_libs: list of paths to user custom ONNX op libraries
         :param path: path where to store model external data
+        :param session_cache: If given, reuse the session previously built in session_cache for the same model,
+            providers and user_onnx_libs. Returned session is shared and must not be modified by the caller.
         """
-        sess_options = SessionOptions()
-        shared_library = os.path.dirname(libquant_info.__file__)
-        shared_library = os.path.join(shared_library, "libaimet_onnxrt_ops.so")
-        sess_options.register_custom_ops_library(shared_library)
-        if user_onnx_libs is not None:
-            for lib in user_onnx_libs:
-                sess_options.register_custom_ops_library(lib)
+        if session_cache is not None:
+            return session_cache.get_session(model, providers, user_onnx_libs, path)
+
+        sess_options = QuantizationSimModel._build_session_options(user_onnx_libs)
 
         # Convert and save ONNX model to external data if larger than 2GB.
         # External data will be saved under same directory.
@@ -552,6 +694,22 @@ class QuantizationSimModel:
         )
         return session
 
+    @staticmethod
+    def _build_session_options(user_onnx_libs: List[str] = None) -> SessionOptions:
+        """
+        Build session options with AIMET and user custom op libraries registered
+
+        :param user_onnx_libs: list of paths to user custom ONNX op libraries
+        """
+        sess_options = SessionOptions()
+        shared_library = os.path.dirname(libquant_info.__file__)
+        shared_library = os.path.join(shared_library, "libaimet_onnxrt_ops.so")
+        sess_options.register_custom_ops_library(shared_library)
+        if user_onnx_libs is not None:
+            for lib in user_onnx_libs:
+                sess_options.register_custom_ops_library(lib)
+        return sess_options
+
     def get_qc_quantize_op(self):
         """
         Return dict of qc quantize ops
@@ -677,6 +835,12 @@ class QuantizationSimModel:
             of data samples to use. Or could be a tuple of parameters or an object representing something more complex.
             If set to None, forward_pass_callback will be invoked with no parameters.
         """
+        self._observed_quantizers = {}
+        self._cached_activations = {}
+
+        if _is_encoding_cache_enabled() and _load_cached_encodings(self):
+            return
+
         for op_name, qc_op in self.qc_quantize_op_dict.items():
             qc_op.reset_encoding_stats()
             if op_name in self.activation_names:
@@ -687,11 +851,228 @@ class QuantizationSimModel:
                     qc_op.op_mode = OpMode.quantizeDequantize
 
         forward_pass_callback(self.session, forward_pass_callback_args)
+        self._mark_observed(self.activation_names)
         for op_name, qc_op in self.qc_quantize_op_dict.items():
             if qc_op.data_type == QuantizationDataType.int and not qc_op.is_encoding_frozen():
                 qc_op.compute_encodings()
             qc_op.op_mode = OpMode.quantizeDequantize
 
+        if _is_encoding_cache_enabled():
+            _save_encodings(self)
+
+    def recompute_encodings(self, forward_pass_callback, forward_pass_callback_args, quantizer_names: List[str]):
+        """
+        Recompute the encodings of the quantizers whose configuration (bitwidth, symmetry, enabled, etc.) has changed
+        since the last call to compute_encodings, along with all the activation quantizers affected by the change.
+
+        Since activation quantizers only observe the statistics without quantizing the activations during
+        calibration, the statistics of the other quantizers don't depend on the activation quantizer configurations.
+        Therefore, changing the configuration of activation quantizers only requires recomputing their encodings
+        from the statistics collected previously, without running forward pass.
+        Changing the configuration of parameter quantizers, on the other hand, requires re-collecting the statistics
+        of the downstream activation quantizers. The first time a region of the graph needs to be re-run,
+        forward_pass_callback is invoked while recording the inputs to the region. Subsequent calls affecting
+        the same region only run the region on the recorded inputs.
+
+        :param forward_pass_callback: A callback function that simply runs forward passes on the model.
+            This should be the same callback previously used for compute_encodings.
+        :param forward_pass_callback_args: These argument(s) are passed to the forward_pass_callback as-is.
+        :param quantizer_names: Names of the quantizers whose configuration has changed
+        """
+        changed_param_quantizers = set()
+        quantizers_to_observe = set()
+        quantizers_to_recompute = set()
+
+        for name in quantizer_names:
+            qc_op = self.qc_quantize_op_dict[name]
+            if name not in self.activation_names:
+                changed_param_quantizers.add(name)
+            elif qc_op.enabled and not self._is_observed(name):
+                # Statistics of the quantizer are not available. (e.g. quantizer was disabled during calibration)
+                quantizers_to_observe.add(name)
+            else:
+                quantizers_to_recompute.add(name)
+
+        quantizers_to_observe |= self._get_downstream_activation_quantizers(changed_param_quantizers)
+        quantizers_to_recompute |= quantizers_to_observe | changed_param_quantizers
+
+        if quantizers_to_observe or changed_param_quantizers:
+            for op_name, qc_op in self.qc_quantize_op_dict.items():
+                if op_name in self.activation_names:
+                    # Reproduce the previous calibration where activation quantizers run in pass-through mode
+                    qc_op.op_mode = OpMode.passThrough
+                else:
+                    qc_op.op_mode = OpMode.quantizeDequantize
+
+            # NOTE: Quantizers in dirty region should be updated after the others
+            #       since the same quantizer object can be shared by multiple tensors
+            for op_name in itertools.chain(changed_param_quantizers, quantizers_to_observe):
+                qc_op = self.qc_quantize_op_dict[op_name]
+                qc_op.reset_encoding_stats()
+                if op_name in self.activation_names:
+                    qc_op.op_mode = OpMode.updateStats
+                elif qc_op.is_encoding_frozen():
+                    qc_op.op_mode = OpMode.quantizeDequantize
+                else:
+                    qc_op.op_mode = OpMode.oneShotQuantizeDequantize
+
+            self._run_dirty_region(forward_pass_callback, forward_pass_callback_args,
+                                   changed_param_quantizers, quantizers_to_observe)
+            self._mark_observed(quantizers_to_observe)
+
+        for op_name in quantizers_to_recompute:
+            qc_op = self.qc_quantize_op_dict[op_name]
+            if qc_op.data_type == QuantizationDataType.int and not qc_op.is_encoding_frozen():
+                qc_op.compute_encodings()
+
+        for qc_op in self.qc_quantize_op_dict.values():
+            qc_op.op_mode = OpMode.quantizeDequantize
+
+    def _mark_observed(self, activation_names: Iterable[str]):
+        """
+        Record that the given activation quantizers have collected statistics in the last forward pass
+
+        :param activation_names: Names of the activation quantizers
+        """
+        for name in activation_names:
+            qc_op = self.qc_quantize_op_dict[name]
+            if qc_op.enabled:
+                self._observed_quantizers[name] = tuple(qc_op._tensor_quantizer) # pylint: disable=protected-access
+
+    def _is_observed(self, activation_name: str) -> bool:
+        """
+        Returns True if the statistics collected by the activation quantizer during the last calibration
+        are still available. Statistics are lost if the tensor quantizers were rebuilt since then
+        (e.g. by set_quant_scheme or enable_per_channel_quantization)
+
+        :param activation_name: Name of the activation quantizer
+        """
+        if activation_name not in self._observed_quantizers:
+            return False
+        tensor_quantizers = self.qc_quantize_op_dict[activation_name]._tensor_quantizer # pylint: disable=protected-access
+        observed_tensor_quantizers = self._observed_quantizers[activation_name]
+        return len(tensor_quantizers) == len(observed_tensor_quantizers) and \
+            all(a is b for a, b in zip(tensor_quantizers, observed_tensor_quantizers))
+
+    def _run_dirty_region(self, forward_pass_callback, forward_pass_callback_args,
+                          changed_param_quantizers: Set[str], quantizers_to_observe: Set[str]):
+        """
+        Run the region of the graph affected by the changed quantizers, which consists of
+        all the nodes downstream of the changed parameter quantizers and the quantization nodes
+        of the activation quantizers to observe.
+
+        If the inputs to the region were recorded by a previous call, only the region is run on the recorded inputs.
+        Otherwise, forward_pass_callback is run on the full graph while recording the inputs to the region.
+
+        :param forward_pass_callback: A callback function that simply runs forward passes on the model
+        :param forward_pass_callback_args: These argument(s) are passed to the forward_pass_callback as-is
+        :param changed_param_quantizers: Names of the changed parameter quantizers
+        :param quantizers_to_observe: Names of the activation quantizers to observe
+        """
+        input_name_to_nodes = self.model.input_name_to_nodes()
+        dirty_nodes = self._get_downstream_nodes(changed_param_quantizers)
+        for name in quantizers_to_observe:
+            dirty_nodes |= {node.name for node in input_name_to_nodes.get(name, []) if node.op_type == 'QcQuantizeOp'}
+
+        nodes = [node for node in self.model.nodes() if node.name in dirty_nodes]
+        dirty_tensors = {output for node in nodes for output in node.output}
+        initializers = {initializer.name for initializer in self.model.initializer()}
+        region_inputs = list(OrderedDict.fromkeys(
+            inp for node in nodes for inp in node.input
+            if inp and inp not in dirty_tensors and inp not in initializers
+        ))
+
+        # Activations recorded before the parameter quantizers changed are no longer valid
+        for name in dirty_tensors:
+            self._cached_activations.pop(name, None)
+
+        if region_inputs and all(name in self._cached_activations for name in region_inputs):
+            self._run_subgraph(nodes, region_inputs)
+            return
+
+        session = self.session
+        model_inputs_and_outputs = {tensor.name for tensor in itertools.chain(self.model.graph().input,
+                                                                              self.model.graph().output)}
+        activations_to_record = [name for name in region_inputs if name not in model_inputs_and_outputs]
+        save_as_external_data = self.model.model.ByteSize() >= onnx.checker.MAXIMUM_PROTOBUF
+        if not save_as_external_data:
+            # NOTE: Building a session of models larger than 2GB saves the model as external data,
+            #       which removes the initializer data from the model.
+            hooks = [add_hook_to_get_activation(self.model.model, name) for name in activations_to_record]
+            try:
+                session = QuantizationSimModel.build_session(self.model.model, self.providers,
+                                                             user_onnx_libs=self._user_onnx_libs, path=self._path)
+            finally:
+                remove_activation_hooks(self.model.model, hooks)
+
+        model_outputs = [output.name for output in self.model.graph().output]
+        recorder = _RecordingSession(session, model_outputs, region_inputs)
+        forward_pass_callback(recorder, forward_pass_callback_args)
+        self._cached_activations = recorder.get_recorded_activations()
+
+    def _run_subgraph(self, nodes: List[NodeProto], input_names: List[str]):
+        """
+        Run the subgraph consisting of the given nodes on the recorded activations
+
+        :param nodes: Nodes of the subgraph
+        :param input_names: Names of the inputs to the subgraph
+        """
+        consumed = {inp for node in nodes for inp in node.input}
+        model_outputs = {output.name for output in self.model.graph().output}
+        output_names = [output for node in nodes for output in node.output
+                        if output and (output not in consumed or output in model_outputs)]
+        inputs = [
+            helper.make_tensor_value_info(
+                name, onnx.mapping.NP_TYPE_TO_TENSOR_TYPE[self._cached_activations[name][0].dtype], None
+            )
+            for name in input_names
+        ]
+        outputs = [onnx.ValueInfoProto(name=name) for name in output_names]
+        initializers = [initializer for initializer in self.model.initializer() if initializer.name in consumed]
+        graph = helper.make_graph(nodes, 'dirty_region', inputs, outputs, initializer=initializers)
+        model = helper.make_model(graph, opset_imports=self.model.model.opset_import,
+                                  ir_version=self.model.model.ir_version)
+
+        session = QuantizationSimModel.build_session(model, self.providers,
+                                                     user_onnx_libs=self._user_onnx_libs, path=self._path)
+        num_runs = len(self._cached_activations[input_names[0]]) if input_names else 0
+        for i in range(num_runs):
+            session.run(None, {name: self._cached_activations[name][i] for name in input_names})
+
+    def _get_downstream_nodes(self, tensor_names: Set[str]) -> Set[str]:
+        """
+        Get the names of all nodes that consume the given tensors directly or indirectly
+
+        :param tensor_names: Names of the tensors to start the search from
+        :return: Names of the downstream nodes
+        """
+        input_name_to_nodes = self.model.input_name_to_nodes()
+        visited = set()
+        stack = list(tensor_names)
+
+        while stack:
+            tensor_name = stack.pop()
+            for node in input_name_to_nodes.get(tensor_name, []):
+                if node.name in visited:
+                    continue
+                visited.add(node.name)
+                stack.extend(node.output)
+
+        return visited
+
+    def _get_downstream_activation_quantizers(self, tensor_names: Set[str]) -> Set[str]:
+        """
+        Get the names of all activation quantizers that consume the given tensors directly or indirectly
+
+        :param tensor_names: Names of the tensors to start the search from
+        :return: Names of the downstream activation quantizers
+        """
+        downstream_nodes = self._get_downstream_nodes(tensor_names)
+        return {
+            node.input[0] for node in self.model.nodes()
+            if node.name in downstream_nodes and node.op_type == 'QcQuantizeOp' and node.input[0] in self.activation_names
+        }
+
     def _get_encodings(self, quantizer_names, enc_version):
         encoding_dict = {}
         for name in quantizer_names:
@@ -41,20 +41,21 @@
 # pylint: disable=no-name-in-module, ungrouped-imports, too-many-lines
 
 import copy
-from typing import List
+from typing import List, Callable, Optional
 import numpy as np
 import torch
 from onnxruntime.quantization.onnx_quantizer import ONNXModel
-from onnx import numpy_helper
+from onnx import numpy_helper, helper
 from onnx.utils import Extractor
 
-from aimet_onnx.quantsim import QuantizationSimModel
+from aimet_onnx.quantsim import QuantizationSimModel, SessionCache
 from aimet_onnx.qc_quantize_op import QcQuantizeOp
+from aimet_onnx.utils import IOBindingSession
 from aimet_onnx.sequential_mse.dependency_graph_utils import DependencyGraphUtils
 from aimet_onnx.sequential_mse.dependency_graph import DependencyGraph
 from aimet_onnx.sequential_mse.dependency_graph import DependencyNode
 from aimet_common.libpymo import TensorQuantizerOpMode
-from aimet_common.defs import QuantScheme
+from aimet_common.defs import QuantScheme, QuantizationDataType
 from aimet_onnx.meta.connectedgraph import ConnectedGraph
 from aimet_common.utils import AimetLogger
 from dataclasses import dataclass
@@ -75,11 +76,15 @@ class SeqMseParams:
     :param num_candidates: Number of candidates to perform grid search. Default 20.
     :param inp_symmetry: Input symmetry. Available options are 'asym', 'symfp' and 'symqt'. Default 'symqt'.
     :param loss_fn: Loss function. Available options are 'mse', 'l1' and 'sqnr'. Default 'mse'.
+    :param batch_candidates: If True, evaluate all the candidates of a Conv/Gemm/MatMul op at once in torch
+        instead of running the quantized op in ONNX Runtime once per candidate. Ops that can't be evaluated
+        this way fall back to ONNX Runtime. Default False.
     """
     num_batches: int = 4
     num_candidates: int = 20
     inp_symmetry: str = 'symqt'
     loss_fn: str = 'mse'
+    batch_candidates: bool = False
 
 # pylint: disable=too-many-instance-attributes
 class SequentialMse:
@@ -110,7 +115,10 @@ class SequentialMse:
         self.model = model
         self.params = params
         self.node_name_to_input_names = {}
+        self.node_name_to_node = {}
         self.static_tensor_name_to_proto = {}
+        # Sessions of the split models are reused across the candidates of a node
+        self._session_cache = SessionCache()
 
         if not isinstance(self.model, ONNXModel):
             self.model = ONNXModel(self.model)
@@ -242,6 +250,7 @@ class SequentialMse:
         """
         for node in self.model.nodes():
             self.node_name_to_input_names[node.name] = node.input
+            self.node_name_to_node[node.name] = node
 
     @staticmethod
     def apply_seq_mse(model, sim: QuantizationSimModel, params: SeqMseParams, data_loader):
@@ -327,14 +336,7 @@ class SequentialMse:
 
         weight_name = self.node_name_to_input_names[dependency_node.op_name][1]
         weight_data = self._extract_float_data_from_proto(weight_name)
-
-        connected_op = self.connected_graph.get_op_from_module_name(dependency_node.op_name)
-        # pylint: disable=protected-access
-        channel_axis = QuantizationSimModel._get_quantization_axes(connected_op)[0]
-
-        # Handle negative indexing
-        if channel_axis  < 0:
-            channel_axis +=  len(weight_data.shape)
+        channel_axis = self._get_weight_channel_axis(dependency_node)
 
         axis = tuple(i for i in range(len(weight_data.shape)) if i != channel_axis)
 
@@ -460,6 +462,214 @@ class SequentialMse:
         assert loss.size() == torch.Size([channel_dim])
         return np.array(loss)
 
+    def _get_batched_op_fn(self, dependency_node: DependencyNode) -> Optional[Callable]:
+        """
+        Returns a torch function equivalent to the op of the dependency node, which takes the op input and
+        the weights of all candidates stacked along a new leading dimension, and returns the op outputs
+        stacked along the same dimension. Returns None if the op can't be evaluated in torch this way.
+
+        :param dependency_node: Corresponding Dependency node
+        :return: Function of (input, stacked weights) or None
+        """
+        # pylint: disable=too-many-return-statements
+        node = self.node_name_to_node[dependency_node.op_name]
+        weight_name = node.input[1]
+        quantize_op = self.sim.qc_quantize_op_dict.get(weight_name)
+
+        if quantize_op is None or not quantize_op.enabled or quantize_op.data_type != QuantizationDataType.int:
+            return None
+
+        if list(dependency_node.op_input_names) != [node.input[0]]:
+            return None
+
+        # All the inputs other than the op input should be static
+        static_inputs = [self._extract_float_data_from_proto(name) if name else None for name in node.input[1:]]
+        weight = static_inputs[0]
+        # pylint: disable=protected-access
+        if len(quantize_op._tensor_quantizer) not in (1, weight.shape[self._get_weight_channel_axis(dependency_node)]):
+            return None
+
+        attrs = {attr.name: helper.get_attribute_value(attr) for attr in node.attribute}
+
+        if node.op_type == "Conv":
+            return self._get_batched_conv_fn(attrs, weight, static_inputs[1] if len(static_inputs) > 1 else None)
+
+        if node.op_type == "Gemm":
+            return self._get_batched_gemm_fn(attrs, static_inputs[1] if len(static_inputs) > 1 else None)
+
+        if node.op_type == "MatMul" and weight.ndim >= 2:
+            def matmul_fn(inp: torch.Tensor, weights: torch.Tensor) -> torch.Tensor:
+                if inp.dim() >= weight.ndim:
+                    weights = weights.reshape(weights.shape[0], *[1] * (inp.dim() - weight.ndim), *weight.shape)
+                return torch.matmul(inp, weights)
+            return matmul_fn
+
+        return None
+
+    @staticmethod
+    def _get_batched_conv_fn(attrs: dict, weight: np.ndarray, bias: Optional[np.ndarray]) -> Optional[Callable]:
+        """
+        Returns batched torch function equivalent to onnx Conv. Candidates are stacked along output channels
+        within each group so that all the candidates are evaluated with a single convolution.
+
+        :param attrs: Attributes of the Conv node
+        :param weight: Weight of the Conv node
+        :param bias: Bias of the Conv node
+        :return: Function of (input, stacked weights) or None
+        """
+        auto_pad = attrs.get('auto_pad', b'NOTSET')
+        if isinstance(auto_pad, bytes):
+            auto_pad = auto_pad.decode()
+
+        num_spatial_dims = weight.ndim - 2
+        conv_fns = {1: torch.nn.functional.conv1d, 2: torch.nn.functional.conv2d, 3: torch.nn.functional.conv3d}
+        pads = list(attrs.get('pads', [0] * 2 * num_spatial_dims))
+
+        if auto_pad != 'NOTSET' or num_spatial_dims not in conv_fns or \
+                pads[:num_spatial_dims] != pads[num_spatial_dims:]:
+            return None
+
+        conv_fn = conv_fns[num_spatial_dims]
+        strides = list(attrs.get('strides', [1] * num_spatial_dims))
+        dilations = list(attrs.get('dilations', [1] * num_spatial_dims))
+        groups = attrs.get('group', 1)
+        out_channels = weight.shape[0]
+        bias = torch.from_numpy(bias).float().reshape(groups, 1, out_channels // groups) if bias is not None else None
+
+        def batched_conv_fn(inp: torch.Tensor, weights: torch.Tensor) -> torch.Tensor:
+            num_candidates = weights.shape[0]
+            # [candidates, groups, out_channels / groups, ...] -> [groups * candidates * out_channels / groups, ...]
+            weights = weights.reshape(num_candidates, groups, out_channels // groups, *weights.shape[2:])
+            weights = weights.transpose(0, 1).reshape(-1, *weights.shape[3:])
+            batched_bias = bias.expand(-1, num_candidates, -1).reshape(-1) if bias is not None else None
+
+            out = conv_fn(inp, weights, batched_bias, strides, pads[:num_spatial_dims], dilations, groups)
+            spatial_shape = out.shape[2:]
+            out = out.reshape(out.shape[0], groups, num_candidates, out_channels // groups, *spatial_shape)
+            return out.transpose(1, 2).reshape(out.shape[0], num_candidates, out_channels, *spatial_shape)\
+                .transpose(0, 1)
+
+        return batched_conv_fn
+
+    @staticmethod
+    def _get_batched_gemm_fn(attrs: dict, bias: Optional[np.ndarray]) -> Callable:
+        """
+        Returns batched torch function equivalent to onnx Gemm
+
+        :param attrs: Attributes of the Gemm node
+        :param bias: Bias (input C) of the Gemm node
+        :return: Function of (input, stacked weights)
+        """
+        alpha = attrs.get('alpha', 1.0)
+        beta = attrs.get('beta', 1.0)
+        trans_a = attrs.get('transA', 0)
+        trans_b = attrs.get('transB', 0)
+        bias = torch.from_numpy(bias).float() if bias is not None else None
+
+        def batched_gemm_fn(inp: torch.Tensor, weights: torch.Tensor) -> torch.Tensor:
+            inp = inp.t() if trans_a else inp
+            weights = weights.transpose(1, 2) if trans_b else weights
+            out = alpha * torch.matmul(inp, weights)
+            if bias is not None:
+                out = out + beta * bias
+            return out
+
+        return batched_gemm_fn
+
+    def _get_weight_channel_axis(self, dependency_node: DependencyNode) -> int:
+        """
+        Returns the non-negative channel axis of the weight of given dependency node
+
+        :param dependency_node: Corresponding Dependency node
+        :return: Channel axis
+        """
+        weight_name = self.node_name_to_input_names[dependency_node.op_name][1]
+        weight_data = self._extract_float_data_from_proto(weight_name)
+        connected_op = self.connected_graph.get_op_from_module_name(dependency_node.op_name)
+        # pylint: disable=protected-access
+        channel_axis = QuantizationSimModel._get_quantization_axes(connected_op)[0]
+        return channel_axis + len(weight_data.shape) if channel_axis < 0 else channel_axis
+
+    def _get_candidate_weights(self, candidates, dependency_node: DependencyNode) -> torch.Tensor:
+        """
+        Returns quantized-dequantized weights of all candidates stacked along a new leading dimension
+
+        :param candidates: List of (candidate max, candidate min)
+        :param dependency_node: Corresponding Dependency node
+        :return: Stacked quantized-dequantized weights
+        """
+        weight_name = self.node_name_to_input_names[dependency_node.op_name][1]
+        weight = torch.from_numpy(self._extract_float_data_from_proto(weight_name)).float()
+        quantize_op = self.sim.qc_quantize_op_dict[weight_name]
+
+        encodings = []
+        for candidate in candidates:
+            self._compute_encoding_from_candidate(candidate, dependency_node)
+            encodings.append([(enc.min, enc.max, enc.delta, enc.offset) for enc in quantize_op.get_encodings()])
+
+        # [candidates, num encodings, 4] -> 4 x [candidates, (1, ..., channels, ..., 1)]
+        encodings = torch.tensor(encodings, dtype=torch.float32)
+        shape = [len(candidates)] + [1] * weight.dim()
+        if encodings.shape[1] > 1:
+            shape[self._get_weight_channel_axis(dependency_node) + 1] = encodings.shape[1]
+        enc_min, enc_max, delta, offset = (encodings[..., i].reshape(shape) for i in range(4))
+
+        weights = torch.maximum(torch.minimum(weight, enc_max), enc_min)
+        weights = torch.clamp(torch.round(weights / delta) - offset, 0, 2 ** quantize_op.bitwidth - 1)
+        return (weights + offset) * delta
+
+    def _compute_batched_recon_loss(self, op_fn: Callable, candidates, float_inputs, sim_inputs,
+                                    dependency_node: DependencyNode) -> np.ndarray:
+        """
+        Compute reconstruction loss of all candidates at once.
+        Losses are accumulated batch by batch to avoid holding the outputs of all candidates over the whole data.
+
+        :param op_fn: Batched torch function equivalent to the op
+        :param candidates: List of (candidate max, candidate min)
+        :param float_inputs: Inputs to the float op
+        :param sim_inputs: Inputs to the quantized op
+        :param dependency_node: Corresponding Dependency node
+        :return: Loss of shape [candidates, channels]
+        """
+        # pylint: disable=too-many-locals
+        if self.params.loss_fn not in ("mse", "l1", "sqnr"):
+            raise ValueError(f"Invalid loss function: {self.params.loss_fn}")
+
+        weight_name = self.node_name_to_input_names[dependency_node.op_name][1]
+        weight = torch.from_numpy(self._extract_float_data_from_proto(weight_name)).float()
+        candidate_weights = self._get_candidate_weights(candidates, dependency_node)
+
+        input_name = dependency_node.op_input_names[0]
+        num_batches = min(self.params.num_batches, len(self.data_loader.dataset) // self.data_loader.batch_size)
+        channel_dim = 1 if dependency_node.op_type == "Conv" else -1
+
+        loss, signal, num_elements = 0, 0, 0
+        with torch.no_grad():
+            for i in range(num_batches):
+                xw = op_fn(torch.from_numpy(float_inputs[input_name][i]).float(), weight.unsqueeze(0))[0]
+                xqwq = op_fn(torch.from_numpy(sim_inputs[input_name][i]).float(), candidate_weights)
+
+                # Move channels last and flatten: [candidates, -1, channels]
+                xw = xw.movedim(channel_dim, -1).reshape(-1, xw.shape[channel_dim])
+                xqwq = xqwq.movedim(channel_dim + 1 if channel_dim >= 0 else channel_dim, -1)
+                xqwq = xqwq.reshape(len(candidates), -1, xqwq.shape[-1])
+
+                error = xqwq - xw
+                if self.params.loss_fn == "l1":
+                    loss = loss + error.abs().sum(1)
+                else:
+                    loss = loss + (error ** 2).sum(1)
+                signal = signal + (xw ** 2).sum(0)
+                num_elements += xw.shape[0]
+
+        if self.params.loss_fn == "sqnr":
+            # Same as SequentialMse.neg_sqnr over the concatenated data
+            exp_noise = loss / num_elements + 1e-10
+            exp_signal = signal / num_elements
+            loss = -10 * torch.log10(exp_signal / exp_noise)
+
+        return loss.numpy()
+
     # pylint: disable-msg=too-many-locals
     def _do_seq_mse(self, dependency_node: DependencyNode):
         """
@@ -472,9 +682,6 @@ class SequentialMse:
 
         total_loss = []
 
-        float_split_model, sim_split_model = self._split_onnx_graph(dependency_node.op_input_names,
-                                                                    dependency_node.op_output_names)
-
         _logger.info("Finding and freezing optimal param encodings candidate of op: %s", dependency_node.op_name)
         # for different modes only inputs will change
         if self.params.inp_symmetry == "asym":
@@ -489,21 +696,31 @@ class SequentialMse:
         else:
             raise ValueError(f"Invalid inp_symmetry: {self.params.inp_symmetry}")
 
-        float_outputs = self._run_onnx_graph(float_split_model, float_inputs)
-        float_outputs = np.concatenate(float_outputs[0], axis=0)
+        op_fn = self._get_batched_op_fn(dependency_node) if self.params.batch_candidates else None
 
-        for candidate in candidates:
+        if op_fn is not None:
+            stacked_loss = self._compute_batched_recon_loss(op_fn, candidates, float_inputs, sim_inputs,
+                                                            dependency_node)
+        else:
+            float_split_model, sim_split_model = self._split_onnx_graph(dependency_node.op_input_names,
+                                                                        dependency_node.op_output_names)
 
-            self._compute_encoding_from_candidate(candidate, dependency_node)
+            float_outputs = self._run_onnx_graph(float_split_model, float_inputs)
+            float_outputs = np.concatenate(float_outputs[0], axis=0)
+
+            for candidate in candidates:
+
+                self._compute_encoding_from_candidate(candidate, dependency_node)
+
+                sim_outputs = self._run_onnx_graph(sim_split_model, sim_inputs)
+                sim_outputs = np.concatenate(sim_outputs[0], axis=0)
 
-            sim_outputs = self._run_onnx_graph(sim_split_model, sim_inputs)
-            sim_outputs = np.concatenate(sim_outputs[0], axis=0)
+                loss = self._compute_recon_loss(sim_outputs, float_outputs, dependency_node)
 
-            loss = self._compute_recon_loss(sim_outputs, float_outputs, dependency_node)
+                total_loss.append(loss)
 
-            total_loss.append(loss)
+            stacked_loss = np.stack(total_loss, axis=0)
 
-        stacked_loss = np.stack(total_loss, axis=0)
         arg_min_ = np.argmin(stacked_loss, axis=0, keepdims=True)
 
         best_max = torch.stack([torch.tensor(cand_max) for cand_max, _ in candidates]).gather(0, torch.tensor(arg_min_))[0]
@@ -568,7 +785,9 @@ class SequentialMse:
         """
         # pylint: disable=protected-access
         session = QuantizationSimModel.build_session(model, self.sim.providers,
-                                                     user_onnx_libs=self.sim._user_onnx_libs, path=self.sim._path)
+                                                     user_onnx_libs=self.sim._user_onnx_libs, path=self.sim._path,
+                                                     session_cache=self._session_cache)
+        session = IOBindingSession(session)
 
         outputs = []
 
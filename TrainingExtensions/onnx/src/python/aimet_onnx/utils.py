@@ -37,12 +37,13 @@
 """ Utility functions for ONNX """
 import copy
 import itertools
-from typing import Dict, List, Union, Tuple
+from typing import Dict, List, Union, Tuple, Optional
 import os
 import pickle
 import numpy as np
 import onnx
 from onnx import helper, numpy_helper, mapping
+import onnxruntime as ort
 
 from aimet_common.utils import AimetLogger
 from packaging import version
@@ -507,3 +508,91 @@ def create_input_dict(model: ModelProto, input_batch: Union[Dict, np.ndarray, Li
         raise ValueError('There is mismatch between number of input names and input tensors')
 
     return dict(zip(input_names, input_batch_list))
+
+
+class IOBindingSession:
+    """
+    Runs an inference session with IO-binding. Inputs are copied into OrtValues preallocated on the device of the
+    session, and outputs are written to the OrtValues allocated by the first run. Both are reused across batches
+    as long as the shapes and dtypes of the inputs do not change, which avoids re-allocating device memory per batch.
+    Outputs are only reused if all of them have a static shape; otherwise they are allocated by onnxruntime per run.
+    Has the same run() interface as onnxruntime.InferenceSession.
+    """
+    def __init__(self, session: ort.InferenceSession):
+        """
+        :param session: Inference session to run
+        """
+        self.session = session
+        self._io_binding = session.io_binding()
+        self._device, self._device_id = self._get_device(session)
+        self._input_values = {}
+        self._bound_output_names = None
+        self._static_output_names = {output.name for output in session.get_outputs()
+                                     if all(isinstance(dim, int) for dim in output.shape)}
+
+    @staticmethod
+    def _get_device(session: ort.InferenceSession) -> Tuple[str, int]:
+        """
+        Returns device type and id on which the session runs
+        """
+        if 'CUDAExecutionProvider' in session.get_providers():
+            provider_options = session.get_provider_options().get('CUDAExecutionProvider', {})
+            return 'cuda', int(provider_options.get('device_id', 0))
+        return 'cpu', 0
+
+    def _bind_inputs(self, input_dict: Dict[str, np.ndarray]) -> bool:
+        """
+        Copies inputs into the preallocated OrtValues, allocating new ones only if shape or dtype changed
+
+        :param input_dict: input name to input tensor map
+        :return: True if any input had to be reallocated
+        """
+        reallocated = False
+        for name, value in input_dict.items():
+            value = np.ascontiguousarray(value)
+            ort_value, shape, dtype = self._input_values.get(name, (None, None, None))
+            if ort_value is not None and shape == value.shape and dtype == value.dtype:
+                ort_value.update_inplace(value)
+                continue
+
+            ort_value = ort.OrtValue.ortvalue_from_numpy(value, self._device, self._device_id)
+            self._io_binding.bind_ortvalue_input(name, ort_value)
+            self._input_values[name] = (ort_value, value.shape, value.dtype)
+            reallocated = True
+        return reallocated
+
+    def run(self, output_names: Optional[List[str]], input_dict: Dict[str, np.ndarray]) -> List[np.ndarray]:
+        """
+        Run the session
+
+        :param output_names: names of the outputs to fetch. If None, all model outputs are fetched
+        :param input_dict: input name to input tensor map
+        :return: list of outputs copied to host
+        """
+        output_names = output_names or [output.name for output in self.session.get_outputs()]
+        reallocated = self._bind_inputs(input_dict)
+
+        # Let onnxruntime allocate the outputs whenever the input shapes or requested outputs change
+        preallocated = not reallocated and self._bound_output_names == output_names
+        if not preallocated:
+            self._io_binding.clear_binding_outputs()
+            for name in output_names:
+                self._io_binding.bind_output(name, self._device, self._device_id)
+
+        self._io_binding.synchronize_inputs()
+        self.session.run_with_iobinding(self._io_binding)
+        outputs = self._io_binding.copy_outputs_to_cpu()
+
+        if not preallocated:
+            # Output shapes that are not static may change even if the input shapes do not (e.g. NonZero),
+            # so such outputs are allocated by onnxruntime on every run
+            self._bound_output_names = None
+            if all(name in self._static_output_names for name in output_names):
+                # Keep the allocated outputs bound so that the next runs write to the same buffers
+                ort_values = self._io_binding.get_outputs()
+                self._io_binding.clear_binding_outputs()
+                for name, ort_value in zip(output_names, ort_values):
+                    self._io_binding.bind_ortvalue_output(name, ort_value)
+                self._bound_output_names = list(output_names)
+
+        return outputs
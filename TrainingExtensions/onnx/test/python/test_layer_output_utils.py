@@ -35,17 +35,19 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 import copy
+import json
 import os
 import shutil
+import tempfile
 
 import torch
 import numpy as np
 import onnxruntime as ort
 from torch.utils.data import Dataset, DataLoader
 
-from aimet_onnx.utils import make_dummy_input
+from aimet_onnx.utils import make_dummy_input, create_input_dict
 from aimet_onnx.quantsim import QuantizationSimModel
-from aimet_onnx.layer_output_utils import LayerOutput, LayerOutputUtil
+from aimet_onnx.layer_output_utils import LayerOutput, LayerOutputUtil, LayerOutputComparator
 from .models.models_for_tests import build_dummy_model_with_dynamic_input
 
 
@@ -210,3 +212,44 @@ class TestLayerOutputUtil:
 
         # Delete temp_dir
         shutil.rmtree(temp_dir_path, ignore_errors=False, onerror=None)
+
+
+class TestLayerOutputComparator:
+    def test_compare_over_data_loader(self):
+        """
+        Given: A FP32 model and its quantsim model
+        When: Layer-outputs of both models are compared over a data loader
+        Then: 1) Accumulated metrics match the ones computed over all layer-outputs at once
+              2) The comparison report is saved
+        """
+        quantsim, output_names, _ = get_quantsim_artifacts()
+        model, _, _ = get_original_model_artifacts()
+        _, dummy_data_loader, _ = get_dataset_artifacts()
+        data_loader = [input_batch.numpy() for input_batch in dummy_data_loader]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            comparator = LayerOutputComparator(model, quantsim.model.model, dir_path=tmpdir)
+            report = comparator.compare_over_data_loader(data_loader)
+
+            with open(os.path.join(tmpdir, 'layer_output_comparison.json')) as f:
+                saved_report = json.load(f)['layer_outputs']
+
+            fp32_outputs = [LayerOutput(model, providers, tmpdir).get_outputs(create_input_dict(model, batch))
+                            for batch in data_loader]
+            quantized_outputs = [LayerOutput(quantsim.model.model, providers, tmpdir).get_outputs(create_input_dict(model, batch))
+                                 for batch in data_loader]
+
+        for name in output_names:
+            assert name in report
+        assert list(saved_report) == list(report)
+
+        for name, metrics in report.items():
+            reference = np.concatenate([outputs[name].flatten() for outputs in fp32_outputs]).astype(np.float64)
+            quantized = np.concatenate([outputs[name].flatten() for outputs in quantized_outputs]).astype(np.float64)
+            error = quantized - reference
+
+            assert np.isclose(metrics['mse'], np.mean(error ** 2))
+            assert np.isclose(metrics['max_abs_error'], np.max(np.abs(error)))
+            assert np.isclose(metrics['cosine_similarity'],
+                              np.dot(reference, quantized) / np.sqrt(np.dot(reference, reference) * np.dot(quantized, quantized)))
+            assert np.isclose(saved_report[name]['mse'], metrics['mse'])
@@ -373,6 +373,53 @@ class TestQuantAnalyzer:
             # Check if it is exported to correct html file.
             assert os.path.isfile(Path(tmp_dir, "per_layer_mse_loss.html"))
 
+    def test_export_per_layer_mse_loss_with_cached_activations(self):
+        """ test export_per_layer_mse_loss() reuses cached fp32 activations and sessions """
+        input_shape = (1, 3, 32, 32)
+        unlabeled_dataset_iterable = [np.random.randn(*input_shape).astype(np.float32) for _ in range(10)]
+        model = models_for_tests._convert_to_onnx(models_for_tests.TinyModel(), torch.randn(*input_shape))
+        dummy_input_dict = {'input': np.random.randn(1, 3, 32, 32).astype(np.float32)}
+        fold_all_batch_norms_to_weight(model)
+        sim = QuantizationSimModel(copy.deepcopy(model), dummy_input_dict)
+        sim.compute_encodings(evaluate, dummy_input_dict)
+        forward_pass_callback = CallbackFunc(calibrate, dummy_input_dict)
+        eval_callback = CallbackFunc(evaluate, dummy_input_dict)
+        quant_analyzer = QuantAnalyzer(model, dummy_input_dict, forward_pass_callback, eval_callback)
+        quant_analyzer.enable_per_layer_mse_loss(unlabeled_dataset_iterable, num_batches=4)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mse_loss_dict = quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tmp_dir)
+            fp32_activation_cache = quant_analyzer._fp32_activation_cache
+            assert fp32_activation_cache is not None
+
+            # Compare against MSE loss computed by running fp32 and quantized model separately
+            fp32_session = ort.InferenceSession(model.model.SerializeToString(), providers=['CPUExecutionProvider'])
+            fp32_output_name = fp32_session.get_outputs()[0].name
+            expected_loss, total = 0.0, 0
+            for batch in unlabeled_dataset_iterable[:4]:
+                fp32_out = fp32_session.run(None, {'input': batch})[0]
+                quantized_out = sim.session.run(None, {'input': batch})[0]
+                expected_loss += ((fp32_out - quantized_out) ** 2).mean()
+                total += fp32_out.shape[0]
+            output_op_name = next(node.name for node in model.nodes() if fp32_output_name in node.output)
+            assert np.isclose(mse_loss_dict[output_op_name], expected_loss / total)
+
+            # Cached fp32 activations should be reused across calls
+            assert quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tmp_dir) == mse_loss_dict
+            assert quant_analyzer._fp32_activation_cache is fp32_activation_cache
+
+            # fp32 activations should be collected again once the fp32 model is invalidated
+            quant_analyzer._session_pool.invalidate(quant_analyzer._onnx_model.model)
+            assert quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tmp_dir) == mse_loss_dict
+            assert quant_analyzer._fp32_activation_cache is not fp32_activation_cache
+            fp32_activation_cache = quant_analyzer._fp32_activation_cache
+
+            # Activations spilled to disk should give identical results
+            quant_analyzer.ACTIVATION_CACHE_IN_MEMORY_LIMIT = 0
+            quant_analyzer.enable_per_layer_mse_loss(unlabeled_dataset_iterable, num_batches=4)
+            assert quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tmp_dir) == mse_loss_dict
+            assert quant_analyzer._fp32_activation_cache is not fp32_activation_cache
+
     def test_analyze(self):
         """ test end to end for analyze() method """
         input_shape = (1, 3, 32, 32)
@@ -36,6 +36,7 @@
 # =============================================================================
 
 import contextlib
+import copy
 import itertools
 import json
 import os
@@ -56,9 +57,10 @@ from aimet_common import libquant_info
 from aimet_common.defs import QuantScheme, QuantizationDataType, EncodingType
 from aimet_common.quantsim_config.utils import get_path_for_per_channel_config
 from aimet_onnx.quantsim import QuantizationSimModel, load_encodings_to_sim, set_blockwise_quantization_for_weights, _apply_constraints, clamp_activation_encodings, \
-    set_grouped_blockwise_quantization_for_weights
+    set_grouped_blockwise_quantization_for_weights, SessionCache
 from aimet_onnx.qc_quantize_op import OpMode, GroupedBlockQuantizeDequantize
-from aimet_onnx.utils import make_dummy_input
+from aimet_onnx.encoding_cache import enable_encoding_cache
+from aimet_onnx.utils import make_dummy_input, add_hook_to_get_activation, remove_activation_hooks
 from .models.models_for_tests import SingleResidual
 from .models import models_for_tests, test_models
 from .models.models_for_tests import build_dummy_model, single_residual_model, BNAfterConv, multi_input_with_constant_model , multi_output_model, custom_add_model, build_lstm_gru_dummy_model, \
@@ -191,6 +193,213 @@ class TestQuantSim:
                 assert qc_op.quant_info.tensorQuantizerRef[0].isEncodingValid is True
                 assert qc_op.op_mode == OpMode.quantizeDequantize
 
+    def test_build_session_with_cache(self):
+        """
+        Given: A quantsim model with computed encodings
+        When: Sessions are built with a session cache
+        Then: 1) The same session is returned for the same model and providers
+              2) A new session is built once the model changes
+              3) Cached session reflects the changes of quantizer settings
+        """
+        model = build_dummy_model()
+        dummy_input = make_dummy_input(model)
+        with tempfile.TemporaryDirectory() as tempdir:
+            sim = QuantizationSimModel(model, dummy_input, path=tempdir)
+            sim.compute_encodings(lambda session, _: session.run(None, dummy_input), None)
+
+            session_cache = SessionCache()
+
+            def build_cached_session(model):
+                return QuantizationSimModel.build_session(model, sim.providers, session_cache=session_cache)
+
+            session = build_cached_session(sim.model.model)
+            assert build_cached_session(sim.model.model) is session
+            assert QuantizationSimModel.build_session(sim.model.model, sim.providers) is not session
+            assert QuantizationSimModel.build_session(sim.model.model, sim.providers,
+                                                      session_cache=SessionCache()) is not session
+
+            quantized_output = session.run(None, dummy_input)[0]
+            for qc_op in sim.qc_quantize_op_dict.values():
+                qc_op.enabled = False
+            fp32_output = session.run(None, dummy_input)[0]
+            assert np.allclose(fp32_output, sim.session.run(None, dummy_input)[0])
+            assert not np.allclose(fp32_output, quantized_output)
+
+            hook = add_hook_to_get_activation(sim.model.model, '3')
+            assert build_cached_session(sim.model.model) is not session
+            remove_activation_hooks(sim.model.model, [hook])
+            assert build_cached_session(sim.model.model) is session
+
+            # Sessions are keyed by the identity of the model, not by its contents
+            model_copy = copy.deepcopy(sim.model.model)
+            assert build_cached_session(model_copy) is not session
+
+            # In-place modifications other than changing the model outputs need to be notified to the cache
+            session_cache.invalidate(sim.model.model)
+            assert build_cached_session(sim.model.model) is not session
+
+    def test_recompute_encodings(self):
+        """Test to recompute encodings of the changed quantizers only"""
+        dummy_input = make_dummy_input(single_residual_model().model)
+        num_forward_passes = 0
+
+        def callback(session, args):
+            nonlocal num_forward_passes
+            num_forward_passes += 1
+            session.run(None, dummy_input)
+
+        def get_encodings(sim):
+            return {
+                name: [(enc.min, enc.max, enc.bw) for enc in qc_op.get_encodings()]
+                for name, qc_op in sim.qc_quantize_op_dict.items() if qc_op.enabled
+            }
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            sim = QuantizationSimModel(single_residual_model().model, dummy_input, path=tempdir)
+            ref_sim = QuantizationSimModel(single_residual_model().model, dummy_input, path=tempdir)
+            sim.compute_encodings(callback, None)
+
+            """
+            When: Change the bitwidth of an activation quantizer and recompute encodings
+            Then: 1) Encodings should be recomputed without forward pass
+                  2) Encodings should be equal to the ones computed from scratch
+            """
+            act_name = sim.activation_names[1]
+            for qsim in (sim, ref_sim):
+                qsim.qc_quantize_op_dict[act_name].set_bitwidth(4)
+
+            num_forward_passes = 0
+            sim.recompute_encodings(callback, None, [act_name])
+            assert num_forward_passes == 0
+            assert sim.qc_quantize_op_dict[act_name].get_encodings()[0].bw == 4
+
+            ref_sim.compute_encodings(callback, None)
+            assert get_encodings(sim) == get_encodings(ref_sim)
+
+            """
+            When: Change the bitwidth of a param quantizer and recompute encodings
+            Then: 1) Only the downstream activation quantizers should be updated
+                  2) Encodings should be equal to the ones computed from scratch
+            """
+            param_name = next(name for name in sim.param_names if sim.qc_quantize_op_dict[name].enabled)
+            for qsim in (sim, ref_sim):
+                qsim.qc_quantize_op_dict[param_name].set_bitwidth(4)
+
+            downstream_quantizers = sim._get_downstream_activation_quantizers({param_name})
+            assert downstream_quantizers
+            assert len(downstream_quantizers) < len(sim.activation_names)
+
+            num_forward_passes = 0
+            sim.recompute_encodings(callback, None, [param_name])
+            assert num_forward_passes == 1
+            ref_sim.compute_encodings(callback, None)
+            assert get_encodings(sim) == get_encodings(ref_sim)
+
+            """
+            When: Change the bitwidth of the same param quantizer again and recompute encodings
+            Then: 1) Only the downstream region should be re-run on the recorded activations without forward pass
+                  2) Encodings should be equal to the ones computed from scratch
+            """
+            for qsim in (sim, ref_sim):
+                qsim.qc_quantize_op_dict[param_name].set_bitwidth(6)
+
+            num_forward_passes = 0
+            sim.recompute_encodings(callback, None, [param_name])
+            assert num_forward_passes == 0
+            ref_sim.compute_encodings(callback, None)
+            assert get_encodings(sim) == get_encodings(ref_sim)
+
+            """
+            When: Change the quant scheme of an activation quantizer, which discards its statistics
+            Then: The quantizer should be re-observed and the encodings should be equal to the ones computed from scratch
+            """
+            for qsim in (sim, ref_sim):
+                qsim.qc_quantize_op_dict[act_name].set_quant_scheme(QuantScheme.post_training_tf)
+
+            sim.recompute_encodings(callback, None, [act_name])
+            ref_sim.compute_encodings(callback, None)
+            assert get_encodings(sim) == get_encodings(ref_sim)
+
+            for qc_op in sim.qc_quantize_op_dict.values():
+                assert qc_op.op_mode == OpMode.quantizeDequantize
+
+    def test_compute_encodings_with_encoding_cache(self):
+        """Test to reuse the cached encodings across compute_encodings calls"""
+        dummy_input = make_dummy_input(single_residual_model().model)
+        num_forward_passes = 0
+
+        def callback(session, args):
+            nonlocal num_forward_passes
+            num_forward_passes += 1
+            session.run(None, dummy_input)
+
+        def get_encodings(sim):
+            return {
+                name: [(enc.min, enc.max, enc.bw) for enc in qc_op.get_encodings()]
+                for name, qc_op in sim.qc_quantize_op_dict.items() if qc_op.enabled
+            }
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            sim = QuantizationSimModel(single_residual_model().model, dummy_input, path=tempdir)
+            ref_sim = QuantizationSimModel(single_residual_model().model, dummy_input, path=tempdir)
+            act_name = sim.activation_names[1]
+            cache_dir = os.path.join(tempdir, 'cache')
+
+            with pytest.raises(ValueError):
+                with enable_encoding_cache(cache_dir, None):
+                    pass
+
+            with enable_encoding_cache(cache_dir, data_key='dummy_input'):
+                """
+                When: Compute encodings for the first time
+                Then: Calibration forward pass should run
+                """
+                sim.compute_encodings(callback, None)
+                assert num_forward_passes == 1
+                encodings_8bit = get_encodings(sim)
+
+                """
+                When: Change the bitwidth of an activation quantizer for the first time
+                Then: Calibration forward pass should run
+                """
+                sim.qc_quantize_op_dict[act_name].set_bitwidth(4)
+                sim.compute_encodings(callback, None)
+                assert num_forward_passes == 2
+                encodings_4bit = get_encodings(sim)
+
+                """
+                When: Compute encodings of the configurations calibrated before, with a separate sim
+                Then: 1) Calibration forward pass should not run
+                      2) Encodings should be loaded from cache
+                """
+                ref_sim.compute_encodings(callback, None)
+                assert num_forward_passes == 2
+                assert get_encodings(ref_sim) == encodings_8bit
+
+                ref_sim.qc_quantize_op_dict[act_name].set_bitwidth(4)
+                ref_sim.compute_encodings(callback, None)
+                assert num_forward_passes == 2
+                assert get_encodings(ref_sim) == encodings_4bit
+                for qc_op in ref_sim.qc_quantize_op_dict.values():
+                    assert qc_op.op_mode == OpMode.quantizeDequantize
+
+                """
+                When: Change the bitwidth of a param quantizer
+                Then: Calibration forward pass should run
+                """
+                param_name = next(name for name in sim.param_names if sim.qc_quantize_op_dict[name].enabled)
+                sim.qc_quantize_op_dict[param_name].set_bitwidth(4)
+                sim.compute_encodings(callback, None)
+                assert num_forward_passes == 3
+
+            with enable_encoding_cache(cache_dir, data_key='other_input'):
+                """
+                When: Compute encodings with a different data key
+                Then: Calibration forward pass should run
+                """
+                ref_sim.compute_encodings(callback, None)
+                assert num_forward_passes == 4
+
     def test_export_model_with_quant_args(self):
         """Test to export encodings and model"""
         model = build_dummy_model()
@@ -268,6 +268,40 @@ def test_do_seq_mse_for_linear(inp_symmetry, param_bw, loss_fn, enable_pcq):
         assert not np.all(np.isclose(encodings_max, per_channel_max))
 
 
+@pytest.mark.parametrize("model_fn, dummy_input_fn, op_name", [
+    (single_conv_layer_model, dummy_input_for_conv_layer, '/conv/Conv'),
+    (get_single_linear_layer_model, dummy_input_for_linear_layer, '/fc/MatMul'),
+])
+@pytest.mark.parametrize("loss_fn", ['mse', 'l1', 'sqnr'])
+@pytest.mark.parametrize("enable_pcq", [True, False])
+def test_do_seq_mse_with_batched_candidates(model_fn, dummy_input_fn, op_name, loss_fn, enable_pcq):
+    """ Evaluating all candidates at once in torch should pick the same encodings as running them in ORT """
+    model = model_fn()
+    dataloader = unlabeled_data_loader(dummy_input_fn())
+    encodings = []
+
+    for batch_candidates in (False, True):
+        sim = QuantizationSimModel(model=copy.deepcopy(model),
+                                   quant_scheme=QuantScheme.post_training_tf,
+                                   default_activation_bw=8,
+                                   default_param_bw=4,
+                                   use_cuda=False,
+                                   config_file=_get_config_file(is_symmetric=True, strict_symmetric=False,
+                                                                unsigned_symmetric=False, pcq=enable_pcq))
+        seq_params = SeqMseParams(loss_fn=loss_fn, batch_candidates=batch_candidates)
+        seq_mse = SequentialMse(model, sim, seq_params, dataloader)
+        seq_mse.dependency_graph = seq_mse.dependency_graph_utils.create_dependency_graph(dataloader,
+                                                                                          seq_params.num_batches)
+        node = seq_mse.dependency_graph.node_by_name[op_name]
+        assert seq_mse._get_batched_op_fn(node) is not None
+        seq_mse._do_seq_mse(node)
+
+        weight_name = seq_mse.node_name_to_input_names[node.op_name][1]
+        encodings.append([(enc.min, enc.max) for enc in sim.qc_quantize_op_dict[weight_name].get_encodings()])
+
+    assert np.allclose(encodings[0], encodings[1])
+
+
 @pytest.mark.parametrize("inp_symmetry", ['asym', 'symfp', 'symqt'])
 @pytest.mark.parametrize("param_bw", [2, 31])
 @pytest.mark.parametrize("loss_fn", ['mse', 'l1', 'sqnr'])
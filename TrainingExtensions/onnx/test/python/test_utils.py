@@ -34,7 +34,9 @@
 #
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
+import numpy as np
 import onnx
+import onnxruntime as ort
 import torch
 from packaging import version
 
@@ -199,3 +201,55 @@ class TestUtils:
         model = models_for_tests.transposed_conv_model_without_bn()
         model_data = ModelData(model.model)
         assert len(model_data.module_to_info) == 3
+
+    def test_io_binding_session(self):
+        """
+        Given: A model with dynamic batch size
+        When: The model is run with IOBindingSession over batches of different sizes and output names
+        Then: Outputs should match the ones of InferenceSession.run
+        """
+        model = models_for_tests.build_dummy_model_with_dynamic_input()
+        session = ort.InferenceSession(model.SerializeToString(), providers=['CPUExecutionProvider'])
+        io_binding_session = utils.IOBindingSession(session)
+
+        outputs = []
+        for batch_size in (1, 1, 2, 2, 1):
+            input_dict = utils.make_dummy_input(model, dynamic_size=batch_size)
+            input_dict = {name: np.random.randn(*value.shape).astype(value.dtype) for name, value in input_dict.items()}
+            expected = session.run(None, input_dict)
+            actual = io_binding_session.run(None, input_dict)
+            assert len(actual) == len(expected)
+            for exp, act in zip(expected, actual):
+                assert np.allclose(exp, act)
+            outputs.append((expected, actual))
+
+        # Outputs returned by the previous runs should not be overwritten by the later runs
+        for expected, actual in outputs:
+            for exp, act in zip(expected, actual):
+                assert np.allclose(exp, act)
+
+        output_name = session.get_outputs()[0].name
+        input_dict = utils.make_dummy_input(model)
+        assert np.allclose(io_binding_session.run([output_name], input_dict)[0],
+                           session.run([output_name], input_dict)[0])
+
+    def test_io_binding_session_with_data_dependent_output_shape(self):
+        """
+        Given: A model with static input shape whose output shape depends on the input values
+        When: The model is run with IOBindingSession over batches of the same shape
+        Then: Outputs should match the ones of InferenceSession.run
+        """
+        graph = onnx.helper.make_graph(
+            [onnx.helper.make_node('NonZero', ['input'], ['output'])], 'nonzero',
+            [onnx.helper.make_tensor_value_info('input', onnx.TensorProto.FLOAT, [8])],
+            [onnx.helper.make_tensor_value_info('output', onnx.TensorProto.INT64, [1, None])])
+        model = onnx.helper.make_model(graph, opset_imports=[onnx.helper.make_opsetid('', 13)])
+        session = ort.InferenceSession(model.SerializeToString(), providers=['CPUExecutionProvider'])
+        io_binding_session = utils.IOBindingSession(session)
+
+        for num_nonzero in (2, 5, 5, 1):
+            input_dict = {'input': np.zeros(8, dtype=np.float32)}
+            input_dict['input'][:num_nonzero] = 1
+            actual = io_binding_session.run(None, input_dict)[0]
+            assert np.array_equal(actual, session.run(None, input_dict)[0])
+            assert actual.shape == (1, num_nonzero)
@@ -43,7 +43,7 @@ from torch.utils.data import Dataset
 # Import AIMET specific modules
 from aimet_common.utils import AimetLogger
 from aimet_torch.utils import CachedDataset, ModuleData, get_named_module, cache_intermediate_datasets,\
-    change_tensor_device_placement, in_eval_mode, save_to_cache, get_ordered_list_of_modules
+    change_tensor_device_placement, in_eval_mode, save_to_cache, get_ordered_list_of_modules, is_leaf_module
 from aimet_torch._base.quantsim import _QuantizationSimModelInterface, _QuantizedModuleProtocol
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
@@ -169,6 +169,136 @@ def get_block_outputs(fp_block: torch.nn.ModuleList, quant_block: torch.nn.Modul
     quant_block.cpu()
 
 
+def get_sequential_stages(model: torch.nn.Module, model_inputs: Union[torch.Tensor, List, Tuple],
+                          forward_fn: Callable) -> List[str]:
+    """
+    Split the model into stages that are executed back-to-back, i.e. every stage takes the output of
+    the preceding stage as its only input. Submodules that are simple chains of their children are split recursively.
+
+    A submodule is regarded as a chain of its children only if
+      1. it is called once and its first child is called with exactly the same positional inputs,
+      2. every following child is called once with the unmodified output of the preceding child as its only input,
+      3. it returns the unmodified output of its last child.
+    Condition 1 doesn't apply to the modules that are executed first, since the inputs to the first stage
+    are sampled from the model directly.
+
+    :param model: FP32 model
+    :param model_inputs: Single batch of model inputs
+    :param forward_fn: Adapter function that performs forward pass given a model and inputs
+     yielded from the data loader.
+    :return: Names of the stages in order of execution. [''] if the model can't be split
+    """
+    # pylint: disable=too-many-locals
+    module_to_name = {}
+    for name, module in model.named_modules():
+        module_to_name.setdefault(module, name)
+
+    calls = {module: [] for module in module_to_name}
+    call_order = []
+
+    def _versions(tensors):
+        return tuple(t._version if isinstance(t, torch.Tensor) else None for t in tensors) # pylint: disable=protected-access
+
+    def pre_hook(module, args, kwargs):
+        call_order.append(module)
+        calls[module].append({'args': args, 'kwargs': kwargs, 'args_version': _versions(args)})
+
+    def hook(module, _, __, output):
+        calls[module][-1].update(output=output, output_version=_versions((output,)))
+
+    handles = []
+    for module in module_to_name:
+        handles.append(module.register_forward_pre_hook(pre_hook, with_kwargs=True))
+        handles.append(module.register_forward_hook(hook, with_kwargs=True))
+
+    try:
+        with in_eval_mode(model), torch.no_grad():
+            forward_fn(model, model_inputs)
+    finally:
+        for handle in handles:
+            handle.remove()
+
+    def _is_same_input(call, inputs, inputs_version):
+        return not call['kwargs'] and \
+            len(call['args']) == len(inputs) and \
+            all(arg is inp for arg, inp in zip(call['args'], inputs)) and \
+            call['args_version'] == inputs_version
+
+    def _get_chain(module, is_first) -> Optional[List[torch.nn.Module]]:
+        if is_leaf_module(module) or len(calls[module]) != 1:
+            return None
+
+        call = calls[module][0]
+        if 'output' not in call or call['kwargs']:
+            return None
+
+        children = set(module.children())
+        chain = [child for child in call_order if child in children]
+        if not chain or any(len(calls[child]) != 1 for child in chain):
+            return None
+
+        inputs, inputs_version = call['args'], call['args_version']
+        for i, child in enumerate(chain):
+            child_call = calls[child][0]
+            if 'output' not in child_call:
+                return None
+            if not (is_first and i == 0) and not _is_same_input(child_call, inputs, inputs_version):
+                return None
+            inputs, inputs_version = (child_call['output'],), child_call['output_version']
+
+        if inputs[0] is not call['output'] or inputs_version != call['output_version']:
+            return None
+
+        return chain
+
+    def _split(module, is_first) -> List[str]:
+        chain = _get_chain(module, is_first)
+        if chain is None:
+            return [module_to_name[module]]
+        return [name for i, child in enumerate(chain) for name in _split(child, is_first and i == 0)]
+
+    return _split(model, True)
+
+
+def propagate_stage_inputs(fp_stage: torch.nn.Module, quant_stage: torch.nn.Module,
+                           cached_fp_dataset: CachedDataset, cached_quant_dataset: CachedDataset,
+                           forward_fn: Callable, fp_cache_path: str, quant_cache_path: str):
+    """
+    Replace the cached inputs to FP32 and quant stages with the outputs of the stages,
+    which are the inputs to the next stages.
+
+    :param fp_stage: FP32 stage
+    :param quant_stage: Quant stage
+    :param cached_fp_dataset: Cached inputs to FP32 stage
+    :param cached_quant_dataset: Cached inputs to quant stage
+    :param forward_fn: Adapter function that performs forward pass given a stage and its cached inputs
+    :param fp_cache_path: Path where cached_fp_dataset is stored
+    :param quant_cache_path: Path where cached_quant_dataset is stored
+    """
+    # pylint: disable=too-many-arguments
+    propagate_cached_inputs(fp_stage, cached_fp_dataset, forward_fn, fp_cache_path)
+    propagate_cached_inputs(quant_stage, cached_quant_dataset, forward_fn, quant_cache_path)
+
+
+def propagate_cached_inputs(stage: torch.nn.Module, cached_dataset: CachedDataset, forward_fn: Callable,
+                            cache_path: str):
+    """
+    Replace the cached inputs to a stage with the outputs of the stage, which are the inputs to the next stage.
+
+    :param stage: FP32 or quant stage
+    :param cached_dataset: Cached inputs to the stage
+    :param forward_fn: Adapter function that performs forward pass given a stage and its cached inputs
+    :param cache_path: Path where cached_dataset is stored
+    """
+    cpu = torch.device('cpu')
+    for idx, inputs in enumerate(cached_dataset):
+        with in_eval_mode(stage), torch.no_grad():
+            outputs = forward_fn(stage, inputs)
+
+        # Overwriting the inputs of idx-th batch is safe since they are never read again
+        save_to_cache([change_tensor_device_placement(outputs, cpu)], cache_path, idx)
+
+
 class ActivationSampler:
     """
     For a module in the original model and the corresponding module in the weight quantized QuantSim model,
@@ -56,7 +56,7 @@ from aimet_torch._base.quantsim import _QuantizationSimModelInterface, _Quantize
 from aimet_torch._base.adaround.adaround_optimizer import AdaroundOptimizer
 from aimet_torch._base.adaround.adaround_loss import AdaroundHyperParameters
 from aimet_torch._base.adaround.activation_sampler import create_modulelist_for_group_modules, get_block_inputs, \
-    get_block_outputs, create_cached_block_schedule_list
+    get_block_outputs, create_cached_block_schedule_list, get_sequential_stages, propagate_stage_inputs
 from aimet_torch.utils import get_named_module
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
@@ -72,7 +72,7 @@ class AdaroundParameters:
     def __init__(self, data_loader: DataLoader, num_batches: int,
                  default_num_iterations: int = None, default_reg_param: float = 0.01,
                  default_beta_range: Tuple = (20, 2), default_warm_start: float = 0.2,
-                 forward_fn: Callable[[torch.nn.Module, Any], Any] = None):
+                 forward_fn: Callable[[torch.nn.Module, Any], Any] = None, sequential_sampling: bool = False):
         """
         :param data_loader: Data loader
         :param num_batches: Number of batches to be used for Adaround.
@@ -87,6 +87,10 @@ class AdaroundParameters:
         :param forward_fn: Optional adapter function that performs forward pass given a model and inputs
          yielded from the data loader. The function expects model as first argument and inputs to model
          as second argument.
+        :param sequential_sampling: If True, split the model into stages that are executed back-to-back and
+         compute the inputs to each stage once per batch from the outputs of the preceding stage, instead of running
+         the model up to every single module. Parts of the model that can't be split are sampled as a whole.
+         Default False
         """
         if len(data_loader) < num_batches:
             raise ValueError(f'Can not fetch {num_batches} batches from '
@@ -99,6 +103,7 @@ class AdaroundParameters:
         self.beta_range = default_beta_range
         self.warm_start = default_warm_start
         self.forward_fn = forward_fn
+        self.sequential_sampling = sequential_sampling
 
 
 class AdaroundBase(ABC):
@@ -314,9 +319,22 @@ class AdaroundBase(ABC):
                             del cached_fp_dataset
                             del cached_quant_dataset
             else:
-                modules = utils.get_ordered_list_of_modules(model, dummy_input)
-                cls._run_adaround_model(modules, model, quant_sim.model, module_act_func_pair, opt_params,
-                                        params.forward_fn, cached_dataset)
+                stages = ['']
+                if params.sequential_sampling:
+                    forward_fn = params.forward_fn or utils.ModuleData.default_forward_fn
+                    device = utils.get_device(model)
+                    stages = get_sequential_stages(model,
+                                                   utils.change_tensor_device_placement(cached_dataset[0], device),
+                                                   forward_fn)
+                    logger.info("Split model into %d sequential stage(s)", len(stages))
+
+                if len(stages) > 1:
+                    cls._run_adaround_model_sequentially(stages, model, quant_sim.model, module_act_func_pair,
+                                                         opt_params, forward_fn, cached_dataset, tmp_dir)
+                else:
+                    modules = utils.get_ordered_list_of_modules(model, dummy_input)
+                    cls._run_adaround_model(modules, model, quant_sim.model, module_act_func_pair, opt_params,
+                                            params.forward_fn, cached_dataset)
 
     @classmethod
     def _run_adaround_model(cls, modules: List, model: torch.nn.Module, quant_sim_model: torch.nn.Module,
@@ -365,6 +383,59 @@ class AdaroundBase(ABC):
                         weight.copy_(adarounded_weight)
                         del adarounded_weight
 
+    @classmethod
+    def _run_adaround_model_sequentially(cls, stages: List[str], model: torch.nn.Module,
+                                         quant_sim_model: torch.nn.Module, module_act_func_pair: Dict,
+                                         opt_params: AdaroundHyperParameters, forward_fn: Callable,
+                                         cached_dataset: utils.CachedDataset, working_dir: str):
+        """
+        Apply Adaround optimization to the modules stage by stage. Inputs to the first stage are sampled from
+        the model inputs, and inputs to every following stage are the outputs of the preceding stage.
+
+        :param stages: Names of the stages in order of execution
+        :param model: Original fp32 model
+        :param quant_sim_model: QuantSim model
+        :param module_act_func_pair: Activation function pairs
+        :param opt_params: Optimization parameters
+        :param forward_fn: Adapter function that performs forward pass given a model and inputs
+         yielded from the data loader
+        :param cached_dataset: Cached dataset for the fp32 model
+        :param working_dir: Working directory to save stage inputs data to disk
+        """
+        # pylint: disable=too-many-arguments, too-many-locals
+        device = utils.get_device(model)
+        fp_cache_path = os.path.join(working_dir, 'fp32_stage_inputs')
+        quant_cache_path = os.path.join(working_dir, 'quant_stage_inputs')
+
+        def model_forward_fn(_model, inputs):
+            return forward_fn(_model, utils.change_tensor_device_placement(inputs, device))
+
+        def stage_forward_fn(stage: torch.nn.ModuleList, inputs):
+            return stage[0](*utils.change_tensor_device_placement(inputs, device))
+
+        # Cache inputs to the first stage from both FP32 and quant models
+        utils.cache_intermediate_datasets(cached_dataset, False, model, stages[0], model_forward_fn, fp_cache_path)
+        utils.cache_intermediate_datasets(cached_dataset, False, quant_sim_model, stages[0], model_forward_fn,
+                                          quant_cache_path)
+        cached_fp_dataset = utils.CachedDataset(None, len(cached_dataset), fp_cache_path)
+        cached_quant_dataset = utils.CachedDataset(None, len(cached_dataset), quant_cache_path)
+
+        for i, stage_name in enumerate(stages):
+            # Stages are wrapped with ModuleList so that any module in the stage,
+            # including the stage itself, can be temporarily replaced by name
+            fp_stage = torch.nn.ModuleList([utils.get_named_module(model, stage_name)])
+            quant_stage = torch.nn.ModuleList([utils.get_named_module(quant_sim_model, stage_name)])
+
+            if any(isinstance(module, AdaroundSupportedModules) for module in fp_stage.modules()):
+                modules = utils.get_ordered_list_of_modules(fp_stage, cached_fp_dataset[0], stage_forward_fn)
+                cls._run_adaround_model(modules, fp_stage, quant_stage, module_act_func_pair, opt_params,
+                                        stage_forward_fn, cached_fp_dataset, cached_quant_dataset)
+
+            # Outputs of the current stage are the inputs to the next stage
+            if i < len(stages) - 1:
+                propagate_stage_inputs(fp_stage, quant_stage, cached_fp_dataset, cached_quant_dataset,
+                                       stage_forward_fn, fp_cache_path, quant_cache_path)
+
     @staticmethod
     @abstractmethod
     def _compute_param_encodings(quant_sim: _QuantizationSimModelInterface):
@@ -35,9 +35,6 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 """ Evaluator class for mixed precision """
-import os
-from collections import defaultdict, OrderedDict
-import pickle
 import functools
 from typing import Any, Callable, Union, Tuple, List, Dict
 import numpy as np
@@ -48,9 +45,7 @@ from aimet_common.defs import CallbackFunc
 from aimet_common.amp.mixed_precision_algo import GreedyMixedPrecisionAlgo as MixedPrecisionAlgo
 from aimet_common.amp.quantizer_groups import reformat_supported_kernels
 from aimet_common.amp.utils import (
-    sort_accuracy_list,
     CANDIDATE_WITH_DTYPE,
-    ACCURACY_LIST,
     disable_quantizers,
     enable_quantizers,
 )
@@ -278,142 +273,31 @@ class GreedyMixedPrecisionAlgo(MixedPrecisionAlgo):
             use_all_amp_candidates)
 
 
-    def _create_and_save_accuracy_list_optimized(self, baseline_candidate) -> ACCURACY_LIST:
+    def _compute_encodings_for_candidate(self, quantizer_groups: List[QuantizerGroup]):
         """
-        Create a list of tuples of (quantizer_group, bitwidth, accuracy score)
+        Computes encodings of the sim, in which the given quantizer groups are enabled and set to the same candidate.
+        The activation encodings are computed without parameter quantization.
 
-        :param baseline_candidate: Candidate [bitwidth, dtype] which yields max accuracy
-        :return: Sorted accuracy list containing tuples of (quantizer, candidate, accuracy score, bit ops reduction)
+        :param quantizer_groups: Enabled quantizer groups
         """
-        # pylint: disable=too-many-locals, too-many-branches, too-many-statements
-        index_of_quantizer_group = {}
-        for index, quantizer_group in enumerate(self.quantizer_groups):
-            index_of_quantizer_group[quantizer_group] = index
+        # list to store all the param quantizers
+        param_quantizers = []
 
-        accuracy_list: ACCURACY_LIST = []
+        for _, wrapper in self._sim.quant_wrappers():
+            for _, param_quantizer in wrapper.param_quantizers.items():
+                if param_quantizer.enabled:
+                    param_quantizers.append(param_quantizer)
 
-        file = os.path.join(self._results_dir, '.cache', 'accuracy_list.pkl')
-        combinations_already_computed = set()
-
-        if os.path.isfile(file):
-            if self._clean_start:
-                os.remove(file)
-                logger.info("Removed old cached files and restarting computation")
-            else:
-                with open(file, 'rb') as f:
-                    accuracy_list = pickle.load(f)
-
-                combinations_already_computed.update(
-                    (quantizer_group, candidate)
-                    for quantizer_group, candidate, _, _ in accuracy_list
-                )
-
-        disabled_quantizers = OrderedDict()
+        # disable the parameter quantization
+        disable_quantizers(param_quantizers)
 
         try:
-            # Disable all quantizers
-            for quantizer_group in self.quantizer_groups:
-                quantizers = quantizer_group.get_active_quantizers(self._module_name_dict)
-                disable_quantizers(quantizers)
-                disabled_quantizers[quantizer_group] = quantizers
-
-            # quantizer_groups_per_candidate = {"candidate1":[quantizer_group1,quantizer_group2,...]}
-            # quantizer_groups_per_candidate is the dictionary with keys as candidates and values as quantizer groups that supports the corresponding candidate
-            # quantizer_groups_per_candidate is like reverse mapping to self._supported_candidates_per_quantizer_group
-            quantizer_groups_per_candidate = defaultdict(list)
-            for quantizer_group, candidates in self._supported_candidates_per_quantizer_group.items():
-                for candidate in candidates:
-                    quantizer_groups_per_candidate[candidate].append(quantizer_group)
-
-            # Loop through all possible bitwidths(candidates). Set all the quantizer groups to the corresponding bitwidth(candidate)
-            # Compute encodings by disabling the parameters and  reuse the encodings
-            for candidate, quantizer_groups in quantizer_groups_per_candidate.items():
-                if candidate == baseline_candidate:
-                    continue
-
-                 # configure the sim model with the candidate by enabling the quantizers and set quantizers to corresponding candidate
-                for quantizer_group in quantizer_groups:
-                    quantizers = disabled_quantizers[quantizer_group]
-                    try:
-                        enable_quantizers(quantizers)
-                        # Set quantizer bitwidth to candidate (bitwidth)
-                        quantizer_group.set_quantizers_to_candidate(self._module_name_dict, candidate)
-                    except RuntimeError as e:
-                        logger.info("Exception occured while setting Quantizers to Candidate: %s", e)
-
-                # list to store all the param quantizers
-                param_quantizers = []
-
-                for _, wrapper in self._sim.quant_wrappers():
-                    for _, param_quantizer in wrapper.param_quantizers.items():
-                        if param_quantizer.enabled:
-                            param_quantizers.append(param_quantizer)
-
-                # disable the parameter quantization
-                disable_quantizers(param_quantizers)
-
-
-                # compute encodings with out parameter quantization
-                self._sim.compute_encodings(self.algo_params.forward_pass_callback,
-                                            self.algo_params.forward_pass_callback_args)
-
-                # enable the parameter quantization
-                enable_quantizers(param_quantizers)
-
-
-                # Disable all the quantizers
-                for quantizer_group in quantizer_groups:
-                    quantizers = quantizer_group.get_active_quantizers(self._module_name_dict)
-                    disable_quantizers(quantizers)
-                    disabled_quantizers[quantizer_group] = quantizers
-
-                # Loop over all the quantizer groups and enable one at a time and calculate resulting model accuracy and disable the enabled quantizer
-                # Accuracy list will contain tuples of the quantizer, bitwidth, and accuracy score
-                for quantizer_group in quantizer_groups:
-                    quantizers = disabled_quantizers[quantizer_group]
-                    try:
-                        enable_quantizers(quantizers)
-
-                        # If starting the computation from an already existing state, then check if that combination
-                        # has already been executed
-                        if (quantizer_group, candidate) in combinations_already_computed:
-                            continue
-                        # Compute accuracy of model with new candidate (bitwidth)
-                        eval_score = self.evaluate_model(self.algo_params.eval_callback_for_phase1)
-
-                        bit_ops_reduction = self._find_bit_ops_reduction_for_acc_list(quantizer_group,
-                                                                                      baseline_candidate,
-                                                                                      candidate)
-                        accuracy_list.append((quantizer_group, candidate, eval_score, bit_ops_reduction))
-                        # Sort accuracy list, first by descending accuracy score, then by descending order of addition of bitwidths if accuracy
-                        # scores are identical, if that is also identical we sort by relative bit ops change in descending order
-                        # If bit ops reduction is also the same, then we sort in ascending order based on occurence of
-                        # quantizer group in the model
-                        accuracy_list = sort_accuracy_list(accuracy_list, index_of_quantizer_group)
-                        self._export_accuracy_list(accuracy_list, self._results_dir)
-                        logger.info('\n Quantizer: %s candidate: %s eval_score: %f \n', quantizer_group,
-                                    candidate, eval_score)
-                    finally:
-                        # Disable the quantizer
-                        disable_quantizers(quantizers)
+            # compute encodings with out parameter quantization
+            self._sim.compute_encodings(self.algo_params.forward_pass_callback,
+                                        self.algo_params.forward_pass_callback_args)
         finally:
-
-            # set all quantizers to baseline candidate
-            for quantizer_group in self.quantizer_groups:
-                quantizers = disabled_quantizers[quantizer_group]
-                try:
-                    # Enable the disabled quantizers
-                    enable_quantizers(quantizers)
-                    quantizer_group.set_quantizers_to_candidate(self._module_name_dict, baseline_candidate)
-                except RuntimeError as e:
-                    logger.info("Exception occured while setting Quantizers to Candidate: %s", e)
-
-        logger.info('Completed Accuracy list computation')
-        # Recompute encodings after quantizer's bitwidth is set back to self._max_bitwidth
-        self._sim.compute_encodings(self.algo_params.forward_pass_callback, self.algo_params.forward_pass_callback_args)
-        return accuracy_list
-
-
+            # enable the parameter quantization
+            enable_quantizers(param_quantizers)
 
     def _evaluate_model(self, eval_callback) -> float:
         """
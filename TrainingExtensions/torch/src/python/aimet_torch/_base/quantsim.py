@@ -698,7 +698,7 @@ class _QuantizationSimModelBase(_QuantizationSimModelInterface):
     def export(self, path: str, filename_prefix: str, dummy_input: Union[torch.Tensor, Tuple], # pylint: disable=arguments-differ
                onnx_export_args: Optional[Union[OnnxExportApiArgs, Dict]] = None, propagate_encodings: bool = False,
                export_to_torchscript: bool = False, use_embedded_encodings: bool = False, export_model: bool = True,
-               filename_prefix_encodings: str = None):
+               filename_prefix_encodings: str = None, streaming: bool = False):
         """
         This method exports out the quant-sim model so it is ready to be run on-target.
 
@@ -728,6 +728,12 @@ class _QuantizationSimModelBase(_QuantizationSimModelInterface):
                             specified
         :param filename_prefix_encodings: File name prefix to be used when saving encodings.
                                           If None, then user defaults to filename_prefix value
+        :param streaming: If True, exports the ONNX model without making copies of the model or its weights,
+                          which is meant for models too large to fit in memory more than once.
+                          The weights are quantize-dequantized one at a time and written to external data files
+                          next to the ONNX model, and the PyTorch model pth is not saved.
+                          The dummy input should be placed on the same device as the model.
+                          Not supported with export_to_torchscript, use_embedded_encodings, or conditional models
         """
         if quantsim.encoding_version == '0.6.1':
             msg = _red("Encoding version 0.6.1 will be deprecated in a future release, with version 1.0.0 becoming "
@@ -745,14 +751,23 @@ class _QuantizationSimModelBase(_QuantizationSimModelInterface):
         if quantsim.encoding_version not in VALID_ENCODING_VERSIONS:
             raise NotImplementedError(f'Encoding version {quantsim.encoding_version} not in set of valid encoding '
                                       f'versions {VALID_ENCODING_VERSIONS}.')
+        if streaming and (export_to_torchscript or use_embedded_encodings):
+            raise NotImplementedError('Streaming export is not supported with export_to_torchscript or '
+                                      'use_embedded_encodings.')
+
         # save the quantized model and encodings
         model_filename = filename_prefix + '.pth'
         model_path = os.path.join(path, model_filename)
 
-        # Create a version of the model without any quantization ops
-        model_to_export = self.get_original_model(self.model, qdq_weights=True)
+        if streaming:
+            # Create a view of the model without any quantization ops that shares its weights with the sim model
+            model_to_export = self._get_original_model_view(self.model)
+            logger.info('Skipped saving %s in streaming export', model_path)
+        else:
+            # Create a version of the model without any quantization ops
+            model_to_export = self.get_original_model(self.model, qdq_weights=True)
 
-        torch.save(model_to_export, model_path)
+            torch.save(model_to_export, model_path)
 
         if onnx_export_args is None:
             onnx_export_args = {'opset_version': None,
@@ -779,7 +794,8 @@ class _QuantizationSimModelBase(_QuantizationSimModelInterface):
                                                      self._module_marker_map, self._is_conditional,
                                                      self._excluded_layer_names, quantizer_args=self.quant_args,
                                                      export_model=export_model,
-                                                     filename_prefix_encodings=filename_prefix_encodings)
+                                                     filename_prefix_encodings=filename_prefix_encodings,
+                                                     streaming=streaming)
 
     # pylint: disable=missing-function-docstring
     @classmethod
@@ -829,7 +845,7 @@ class _QuantizationSimModelBase(_QuantizationSimModelInterface):
                                         module_marker_map: Dict[torch.nn.Module, torch.Tensor] = None,
                                         is_conditional: bool = False, excluded_layer_names: List = None,
                                         quantizer_args: Dict = None, export_model: bool = True,
-                                        filename_prefix_encodings: str = None):
+                                        filename_prefix_encodings: str = None, streaming: bool = False):
         """
         This method exports a onnx model and the corresponding encodings
 
@@ -850,6 +866,8 @@ class _QuantizationSimModelBase(_QuantizationSimModelInterface):
                             specified
         :param filename_prefix_encodings: File name prefix to be used when saving encodings.
                                           If None, then user defaults to filename_prefix value
+        :param streaming: If True, original_model shares its weights with sim_model and is exported in streaming mode,
+                          quantize-dequantizing the weights one at a time as they are written
         :return: None
 
         """
@@ -858,12 +876,15 @@ class _QuantizationSimModelBase(_QuantizationSimModelInterface):
             filename_prefix_encodings = filename_prefix
         onnx_path = os.path.join(path, filename_prefix + '.onnx')
         if export_model:
+            param_transform = cls._get_param_quantize_dequantize_fn(sim_model) if streaming else None
             OnnxSaver.create_onnx_model_with_pytorch_layer_names(onnx_path, original_model, dummy_input, is_conditional,
-                                                                 module_marker_map, onnx_export_args)
+                                                                 module_marker_map, onnx_export_args,
+                                                                 streaming=streaming, param_transform=param_transform)
 
         assert os.path.exists(onnx_path), 'The onnx model does not exist in the location specified. Please re-run export' \
                                           'with export_model flag as True or check path/file_name'
-        onnx_model = onnx.load(onnx_path)
+        # Only tensor names are needed to export encodings
+        onnx_model = onnx.load(onnx_path, load_external_data=False)
         onnx_node_to_io_tensor_map, valid_param_set = OnnxSaver.get_onnx_node_to_io_tensor_names_map(onnx_model)
 
         # Export encodings
@@ -956,6 +977,44 @@ class _QuantizationSimModelBase(_QuantizationSimModelInterface):
         cls._remove_quantization_wrappers(original_model, all_modules_in_original_model)
         return original_model
 
+    @classmethod
+    def _get_original_model_view(cls, model: torch.nn.Module) -> torch.nn.Module:
+        """
+        This function returns the model with all quantization wrappers removed
+        without copying the parameters and buffers of the model.
+
+        :param model: The input model with quantization wrappers.
+        :return: Model without quantization wrappers that shares its parameters and buffers with the input model.
+        """
+        memo = {}
+
+        def shallow_copy(module: torch.nn.Module) -> torch.nn.Module:
+            # pylint: disable=protected-access
+            if module in memo:
+                return memo[module]
+            module_copy = copy.copy(module)
+            module_copy._parameters = module._parameters.copy()
+            module_copy._buffers = module._buffers.copy()
+            module_copy._modules = module._modules.copy()
+            memo[module] = module_copy
+            for name, child in module.named_children():
+                module_copy._modules[name] = shallow_copy(child)
+            return module_copy
+
+        original_model = shallow_copy(model)
+        cls._remove_quantization_wrappers(original_model, list(original_model.modules()))
+        return original_model
+
+    @classmethod
+    def _get_param_quantize_dequantize_fn(cls, sim_model: torch.nn.Module) -> Callable[[torch.Tensor], torch.Tensor]:
+        """
+        Returns a function that quantize-dequantizes a parameter of the sim model
+        with its parameter quantizer, and returns any other tensor as is.
+
+        :param sim_model: model with the quantsim wrappers
+        """
+        raise NotImplementedError(f'Streaming export is not supported for {cls.__module__}.{cls.__qualname__}.')
+
     @classmethod
     @abstractmethod
     def _remove_quantization_wrappers(cls, starting_module, list_of_modules_to_exclude):
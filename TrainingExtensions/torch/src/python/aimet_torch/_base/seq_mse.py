@@ -52,9 +52,9 @@ from torch.utils.data import DataLoader
 from aimet_common.utils import AimetLogger
 
 from aimet_torch.utils import CachedDataset, get_ordered_list_of_modules, in_eval_mode, StopForwardException,\
-    change_tensor_device_placement, get_device
+    change_tensor_device_placement, get_device, cache_intermediate_datasets, get_named_module
 from aimet_torch._base.adaround.activation_sampler import create_modulelist_for_group_modules,\
-    get_block_inputs, get_block_outputs
+    get_block_inputs, get_block_outputs, get_sequential_stages, propagate_cached_inputs
 
 # The following modules with weights are supported
 SUPPORTED_MODULES = (torch.nn.Linear, torch.nn.Conv2d, )
@@ -87,12 +87,21 @@ class SeqMseParams:
     :param loss_fn: Loss function. Available options are 'mse', 'l1' and 'sqnr'. Default 'mse'.
     :param forward_fn: Optional adapter function that performs forward pass given a model and inputs
      yielded from the data loader. The function expects model as first argument and inputs to model as second argument.
+    :param sequential_sampling: If True, split the model into stages that are executed back-to-back and
+     compute the inputs to each stage once per batch from the outputs of the preceding stage, instead of running
+     the model up to every single module. Parts of the model that can't be split are sampled as a whole.
+     Default False
+    :param memory_budget: Optional upper bound in bytes on the outputs held at once while evaluating candidates.
+     If set, all the candidates are evaluated together on chunks of the inputs and the losses are accumulated
+     chunk by chunk, so that peak memory no longer grows with num_batches or sequence length. Default None
     """
     num_batches: int
     num_candidates: int = 20
     inp_symmetry: str = 'symqt'
     loss_fn: str = 'mse'
     forward_fn: Callable = default_forward_fn
+    sequential_sampling: bool = False
+    memory_budget: Optional[int] = None
 
 
 class SequentialMseBase(ABC):
@@ -150,14 +159,26 @@ class SequentialMseBase(ABC):
                                                      tempdir)
             else:
                 dummy_input = change_tensor_device_placement(next(iter(data_loader)), get_device(model))
-                fp32_modules = get_ordered_list_of_modules(model, dummy_input, fwd_func=params.forward_fn)
-                fp32_modules = [(name, module) for name, module in fp32_modules if isinstance(module, SUPPORTED_MODULES)]
-                if modules_to_exclude:
-                    fp32_modules = [(name, module) for name, module in fp32_modules if not module in modules_to_exclude]
 
-                # Find and freeze optimal param encodings candidate
-                cls.run_seq_mse(fp32_modules, model, sim.model, params, params.forward_fn,
-                                cached_dataset, cached_quant_dataset=None)
+                stages = ['']
+                if params.sequential_sampling:
+                    stages = get_sequential_stages(model, dummy_input, params.forward_fn)
+                    _logger.info("Split model into %d sequential stage(s)", len(stages))
+
+                if len(stages) > 1:
+                    cls.run_seq_mse_sequentially(stages, model, sim.model, modules_to_exclude, cached_dataset,
+                                                 params, tempdir)
+                else:
+                    fp32_modules = get_ordered_list_of_modules(model, dummy_input, fwd_func=params.forward_fn)
+                    fp32_modules = [(name, module) for name, module in fp32_modules
+                                    if isinstance(module, SUPPORTED_MODULES)]
+                    if modules_to_exclude:
+                        fp32_modules = [(name, module) for name, module in fp32_modules
+                                        if not module in modules_to_exclude]
+
+                    # Find and freeze optimal param encodings candidate
+                    cls.run_seq_mse(fp32_modules, model, sim.model, params, params.forward_fn,
+                                    cached_dataset, cached_quant_dataset=None)
 
     @classmethod
     def apply_seq_mse_using_opt_sampling(cls,
@@ -233,6 +254,79 @@ class SequentialMseBase(ABC):
         model.to(device)
         sim.model.to(device)
 
+    @classmethod
+    def run_seq_mse_sequentially(cls,
+                                 stages: List[str],
+                                 model: torch.nn.Module,
+                                 quant_model: torch.nn.Module,
+                                 modules_to_exclude: Optional[List[torch.nn.Module]],
+                                 cached_dataset: CachedDataset,
+                                 params: SeqMseParams,
+                                 tempdir: str):
+        """
+        Run Sequential MSE stage by stage. Inputs to the first stage are sampled from the model inputs,
+        and inputs to every following stage are the outputs of the preceding stage. Only the inputs to
+        the current stage are kept, on disk, so the memory footprint is bounded by the activations of a single stage.
+
+        :param stages: Names of the stages in order of execution
+        :param model: FP32 model
+        :param quant_model: QuantizationSimModel object
+        :param modules_to_exclude: List of supported type module(s) to exclude when applying Sequential MSE
+        :param cached_dataset: Cached dataset
+        :param params: Sequential MSE parameters
+        :param tempdir: temporary working directory
+        """
+        # pylint: disable=too-many-arguments, too-many-locals
+        device = get_device(model)
+        fp_cache_path = os.path.join(tempdir, 'fp32_stage_inputs')
+        quant_cache_path = os.path.join(tempdir, 'quant_stage_inputs')
+
+        def model_forward_fn(_model, inputs):
+            return params.forward_fn(_model, change_tensor_device_placement(inputs, device))
+
+        def stage_forward_fn(stage: torch.nn.ModuleList, inputs):
+            return stage[0](*change_tensor_device_placement(inputs, device))
+
+        # Only the inputs required by inp_symmetry are sampled and propagated,
+        # e.g. 'symqt' doesn't need to run the FP32 model at all
+        sample_fp = params.inp_symmetry != 'symqt'
+        sample_quant = params.inp_symmetry != 'symfp'
+
+        cached_fp_dataset = cached_quant_dataset = None
+        if sample_fp:
+            cache_intermediate_datasets(cached_dataset, False, model, stages[0], model_forward_fn, fp_cache_path)
+            cached_fp_dataset = CachedDataset(None, len(cached_dataset), fp_cache_path)
+        if sample_quant:
+            cache_intermediate_datasets(cached_dataset, False, quant_model, stages[0], model_forward_fn,
+                                        quant_cache_path)
+            cached_quant_dataset = CachedDataset(None, len(cached_dataset), quant_cache_path)
+
+        for i, stage_name in enumerate(stages):
+            # Stages are wrapped with ModuleList so that the modules in the stage,
+            # including the stage itself, have the same names in FP32 and quant stages
+            fp_stage = torch.nn.ModuleList([get_named_module(model, stage_name)])
+            quant_stage = torch.nn.ModuleList([get_named_module(quant_model, stage_name)])
+
+            if any(isinstance(module, SUPPORTED_MODULES) for module in fp_stage.modules()):
+                stage_inputs = cached_fp_dataset[0] if sample_fp else cached_quant_dataset[0]
+                fp32_modules = get_ordered_list_of_modules(fp_stage, stage_inputs, fwd_func=stage_forward_fn)
+                fp32_modules = [(name, module) for name, module in fp32_modules
+                                if isinstance(module, SUPPORTED_MODULES)]
+                if modules_to_exclude:
+                    fp32_modules = [(name, module) for name, module in fp32_modules
+                                    if not module in modules_to_exclude]
+
+                cls.run_seq_mse(fp32_modules, fp_stage, quant_stage, params, stage_forward_fn,
+                                cached_fp_dataset if sample_fp else cached_quant_dataset,
+                                cached_quant_dataset=cached_quant_dataset)
+
+            # Outputs of the current stage are the inputs to the next stage
+            if i < len(stages) - 1:
+                if sample_fp:
+                    propagate_cached_inputs(fp_stage, cached_fp_dataset, stage_forward_fn, fp_cache_path)
+                if sample_quant:
+                    propagate_cached_inputs(quant_stage, cached_quant_dataset, stage_forward_fn, quant_cache_path)
+
     @classmethod
     def run_seq_mse(cls,
                     fp32_modules: List[Tuple[str, torch.nn.Module]],
@@ -477,6 +571,131 @@ class SequentialMseBase(ABC):
             raise ValueError('Unsupported module: ', module)
         return xqwq, xw
 
+    @classmethod
+    def compute_batched_outputs(cls,
+                                quant_module,
+                                x: torch.Tensor,
+                                xq: torch.Tensor,
+                                w: torch.Tensor,
+                                wq: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Compute X^W^ and XW output activations for a batch of candidate weights at once.
+
+        :param quant_module: Wrapper module to be optimized
+        :param x: Inputs from FP32 model
+        :param xq: Inputs from QuantSim model
+        :param w: FP32 weights
+        :param wq: Quantized-dequantized weights of all candidates stacked along a new leading dimension
+        :return: xqwq of shape [candidates, -1, channels] and xw of shape [-1, channels]
+        """
+        module = cls._get_original_module(quant_module)
+        num_candidates = wq.shape[0]
+
+        if isinstance(module, torch.nn.Linear):
+            xqwq = torch.matmul(xq.reshape(-1, xq.shape[-1]), wq.transpose(1, 2))
+            xw = functional.linear(x, w)
+        elif isinstance(module, torch.nn.Conv2d):
+            # Stack candidates along the output channels of each group so that
+            # all the candidates are evaluated with a single convolution
+            groups = module.groups
+            out_channels = wq.shape[1]
+            wq = wq.reshape(num_candidates, groups, out_channels // groups, *wq.shape[2:])
+            wq = wq.transpose(0, 1).reshape(-1, *wq.shape[3:])
+            xqwq = functional.conv2d(xq, wq, stride=module.stride, dilation=module.dilation,
+                                     padding=module.padding, groups=groups)
+            xw = functional.conv2d(x, w, stride=module.stride, dilation=module.dilation,
+                                   padding=module.padding, groups=groups)
+
+            # [N, G * K * C/G, H, W] --> [K, N, H, W, C], so that loss can be computed across channel dimension.
+            xqwq = xqwq.reshape(xqwq.shape[0], groups, num_candidates, out_channels // groups, *xqwq.shape[2:])
+            xqwq = xqwq.permute(2, 0, 4, 5, 1, 3)
+            xw = xw.permute(0, 2, 3, 1)
+        else:
+            raise ValueError('Unsupported module: ', module)
+
+        return xqwq.reshape(num_candidates, -1, xw.shape[-1]), xw.reshape(-1, xw.shape[-1])
+
+    @classmethod
+    def compute_recon_loss_in_chunks(cls,
+                                     quant_module,
+                                     x: torch.Tensor,
+                                     xq: torch.Tensor,
+                                     w: torch.Tensor,
+                                     wq: torch.Tensor,
+                                     block_size: int,
+                                     params: SeqMseParams) -> torch.Tensor:
+        """
+        Compute reconstruction loss of all candidates at once. Each batch is split into chunks of samples
+        (or tokens, for Linear) whose outputs for all the candidates fit in params.memory_budget, and
+        per-channel losses are accumulated chunk by chunk.
+
+        :param quant_module: Wrapper module to be optimized
+        :param x: Inputs to module from FP32 model, stacked over batches
+        :param xq: Inputs to module from QuantSim model, stacked over batches
+        :param w: FP32 weights
+        :param wq: Quantized-dequantized weights of all candidates stacked along a new leading dimension
+        :param block_size: Size of the input channel blocks. Losses are computed separately for each block
+        :param params: Sequential MSE parameters
+        :return: Loss of shape [candidates, channels, blocks]
+        """
+        # pylint: disable=too-many-arguments, too-many-locals
+        if params.loss_fn not in ("mse", "l1", "sqnr"):
+            raise ValueError(f"Invalid loss function: {params.loss_fn}")
+
+        module = cls._get_original_module(quant_module)
+        num_candidates = wq.shape[0]
+        w_blocks = torch.split(w, block_size, dim=1)
+        wq_blocks = torch.split(wq, block_size, dim=2)
+
+        loss = 0
+        for batch_idx in range(params.num_batches):
+            x_batch, xq_batch = x[batch_idx], xq[batch_idx]
+            if isinstance(module, torch.nn.Linear):
+                # Every token is an independent row
+                x_batch = x_batch.reshape(-1, x_batch.shape[-1])
+                xq_batch = xq_batch.reshape(-1, xq_batch.shape[-1])
+                x_block_dim, x_block_size = -1, block_size
+            else:
+                x_block_dim, x_block_size = -3, block_size * module.groups
+
+            # Bytes of the outputs of a single row for all the candidates and FP32 weight
+            row_numel = functional.conv2d(x_batch[:1].to('meta'), w.to('meta'), stride=module.stride,
+                                          dilation=module.dilation, padding=module.padding,
+                                          groups=module.groups).numel() \
+                if isinstance(module, torch.nn.Conv2d) else w.shape[0]
+            row_bytes = (num_candidates + 1) * row_numel * w.element_size()
+            chunk_size = max(1, params.memory_budget // row_bytes)
+
+            noise, signal, num_elements = 0, 0, 0
+            for x_chunk, xq_chunk in zip(torch.split(x_batch, chunk_size), torch.split(xq_batch, chunk_size)):
+                x_blocks = torch.split(x_chunk, x_block_size, dim=x_block_dim)
+                xq_blocks = torch.split(xq_chunk, x_block_size, dim=x_block_dim)
+
+                block_noise, block_signal = [], []
+                for x_block, xq_block, w_block, wq_block in zip(x_blocks, xq_blocks, w_blocks, wq_blocks):
+                    xqwq, xw = cls.compute_batched_outputs(quant_module, x_block, xq_block, w_block, wq_block)
+                    error = xqwq.sub_(xw)
+                    error = error.abs_() if params.loss_fn == "l1" else error.square_()
+                    block_noise.append(error.sum(1))
+                    if params.loss_fn == "sqnr":
+                        block_signal.append(xw.square().sum(0))
+
+                # Stack losses in the input channel dimension
+                noise = noise + torch.stack(block_noise, dim=-1)
+                if params.loss_fn == "sqnr":
+                    signal = signal + torch.stack(block_signal, dim=-1)
+                    num_elements += xw.shape[0]
+
+            if params.loss_fn == "sqnr":
+                # Same as neg_sqnr over the whole batch
+                exp_noise = noise / num_elements + 1e-10
+                exp_signal = signal / num_elements
+                loss = loss - 10 * torch.log10(exp_signal / exp_noise)
+            else:
+                loss = loss + noise
+
+        return loss
+
     @classmethod
     @abstractmethod
     def temporarily_disable_quantizers(
@@ -152,6 +152,49 @@ def get_output_data(layer: torch.nn.Module, model: torch.nn.Module, images_in_on
     return output_data
 
 
+def get_per_channel_output_mean(model: torch.nn.Module, name_to_channel_dim: Dict[str, int],
+                                data_loader, num_batches: int) -> Dict[str, np.ndarray]:
+    """
+    Function to get per-channel mean of the outputs of several layers at once.
+    The model is run once per batch, and only per-channel running sums and counts are kept.
+
+    :param model: model
+    :param name_to_channel_dim: Dict of layer name to channel dimension of its output
+    :param data_loader: data loader for the model
+    :param num_batches: number of batches to run
+    :return: Dict of layer name to per-channel mean of the outputs
+    """
+    sums = {}
+    counts = dict.fromkeys(name_to_channel_dim, 0)
+
+    def _get_hook_to_accumulate_output_data(name: str, channel_dim: int):
+        def _hook_to_accumulate_output_data(_, __, out_data):
+            """
+            hook to accumulate per-channel sum of output data
+            """
+            out_data = out_data.detach()
+            dims = [dim for dim in range(out_data.dim()) if dim != channel_dim % out_data.dim()]
+            channel_sum = out_data.sum(dim=dims, dtype=torch.float64)
+            sums[name] = sums[name] + channel_sum if name in sums else channel_sum
+            counts[name] += out_data.numel() // out_data.shape[channel_dim]
+        return _hook_to_accumulate_output_data
+
+    hook_handles = []
+    for name, channel_dim in name_to_channel_dim.items():
+        layer = utils.get_named_module(model, name)
+        hook_handles.append(register_fwd_hook_for_layer(layer,
+                                                        _get_hook_to_accumulate_output_data(name, channel_dim)))
+
+    try:
+        for images_in_one_batch, *_ in itertools.islice(data_loader, num_batches):
+            forward_pass(model, images_in_one_batch)
+    finally:
+        for hook_handle in hook_handles:
+            hook_handle.remove()
+
+    return {name: (channel_sum / counts[name]).cpu().numpy() for name, channel_sum in sums.items()}
+
+
 def call_empirical_correct_bias(layer: torch.nn.Module,
                                 reference_outputs: np.ndarray,
                                 quantized_outputs: np.ndarray):
@@ -221,7 +264,8 @@ def correct_bias(model: torch.nn.Module, quant_params: QuantParams,
                  num_quant_samples: int, data_loader, num_bias_correct_samples: int,
                  conv_bn_dict: Union[Dict[torch.nn.Module, ConvBnInfoType], None] = None,
                  perform_only_empirical_bias_corr: bool = True,
-                 layers_to_ignore: List[torch.nn.Module] = None):
+                 layers_to_ignore: List[torch.nn.Module] = None,
+                 single_pass: bool = False):
     """
     Corrects bias for each Conv layer of model (unless ignored). A combination of Analytical and Empirical Bias
     Correction is used i.e. all the layers which can be corrected using Analytical Bias Correction are corrected
@@ -238,6 +282,10 @@ def correct_bias(model: torch.nn.Module, quant_params: QuantParams,
     :param perform_only_empirical_bias_corr: Default True. If true will perform only empirical Bias Corr for all layers
            irrespective of the fact that layer is eligible for Analytical Bias Corr.
     :param layers_to_ignore: list of layer names for which we need to skip bias correction.
+    :param single_pass: Default False. If true, outputs of all the layers to be corrected empirically are collected
+           at once by running the reference and quantized models once per batch, keeping only per-channel means.
+           Layers are then corrected all together, so the statistics of a layer don't reflect the corrections of
+           the preceding layers. Otherwise, the models are run for every layer and layers are corrected one by one.
     """
     # pylint: disable=too-many-locals, too-many-branches, too-many-statements, too-many-nested-blocks, no-else-continue
     if layers_to_ignore is None:
@@ -319,6 +367,7 @@ def correct_bias(model: torch.nn.Module, quant_params: QuantParams,
             logger.info('Corrected bias for the layer')
             ordered_conv_linear_nodes.pop(0)
 
+    empirical_layers = []
     for module_name, module in ordered_conv_linear_nodes:
         # Ignore all layers which are skipped by user
         if module in layers_to_ignore:
@@ -331,6 +380,11 @@ def correct_bias(model: torch.nn.Module, quant_params: QuantParams,
             if module in conv_bn_dict.keys():
                 bn_layer_info = conv_bn_dict[module]
                 if perform_only_empirical_bias_corr or bn_layer_info is None or bn_layer_info.input_bn is None:
+                    if single_pass:
+                        # Corrected at once after all the other layers
+                        empirical_layers.append((module_name, module))
+                        continue
+
                     # Get output from quantized model and reference model
                     reference_outputs = []
                     quantized_outputs = []
@@ -358,6 +412,22 @@ def correct_bias(model: torch.nn.Module, quant_params: QuantParams,
                                                  bn_layer_info.in_activation_type)
                 logger.info('Corrected bias for the layer')
 
+    if empirical_layers:
+        name_to_channel_dim = {
+            name: -1 if isinstance(module, torch.nn.Linear) else 1 for name, module in empirical_layers
+        }
+        reference_means = get_per_channel_output_mean(model_copy, name_to_channel_dim, data_loader,
+                                                      n_batches_bias_correction)
+        quantized_means = get_per_channel_output_mean(model, name_to_channel_dim, data_loader,
+                                                      n_batches_bias_correction)
+        for module_name, module in empirical_layers:
+            # Per-channel means in [1, C, 1, 1] layout give the same result as the full outputs
+            reference_mean = reference_means[module_name].reshape(1, -1, 1, 1)
+            quantized_mean = quantized_means[module_name].reshape(1, -1, 1, 1)
+            logger.info('Correcting layer %s using Empirical Bias Correction', module_name)
+            call_empirical_correct_bias(module, reference_mean, quantized_mean)
+            logger.info('Corrected bias for the layer')
+
     SaveUtils.remove_quantization_wrappers(model)
 
     logger.info('Completed bias correction')
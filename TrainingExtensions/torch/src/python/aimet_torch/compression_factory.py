@@ -52,6 +52,7 @@ from aimet_torch.defs import SpatialSvdParameters, WeightSvdParameters, ChannelP
 from aimet_torch.layer_selector import ConvFcLayerSelector, ConvNoDepthwiseLayerSelector, ManualLayerSelector
 from aimet_torch.layer_database import LayerDatabase
 from aimet_torch.svd.svd_pruner import SpatialSvdPruner, PyWeightSvdPruner
+from aimet_torch.svd.svd_splitter import SvdFactorizationCache
 from aimet_torch.channel_pruning.channel_pruner import InputChannelPruner, ChannelPruningCostCalculator
 
 class CompressionFactory:
@@ -85,7 +86,7 @@ class CompressionFactory:
         use_cuda = next(model.parameters()).is_cuda
 
         # Create a pruner
-        pruner = SpatialSvdPruner()
+        pruner = SpatialSvdPruner(svd_cache=SvdFactorizationCache())
         cost_calculator = SpatialSvdCostCalculator()
         comp_ratio_rounding_algo = RankRounder(params.multiplicity, cost_calculator)
 
@@ -99,7 +100,9 @@ class CompressionFactory:
                                                                greedy_params.use_monotonic_fit,
                                                                greedy_params.saved_eval_scores_dict,
                                                                comp_ratio_rounding_algo, use_cuda,
-                                                               bokeh_session=bokeh_session)
+                                                               bokeh_session=bokeh_session,
+                                                               patch_layers_in_place=greedy_params.patch_layers_in_place,
+                                                               num_workers=greedy_params.num_workers)
             layer_selector = ConvNoDepthwiseLayerSelector()
             modules_to_ignore = params.mode_params.modules_to_ignore
         else:
@@ -164,7 +167,9 @@ class CompressionFactory:
                                                                greedy_params.use_monotonic_fit,
                                                                greedy_params.saved_eval_scores_dict,
                                                                comp_ratio_rounding_algo, use_cuda,
-                                                               bokeh_session=bokeh_session)
+                                                               bokeh_session=bokeh_session,
+                                                               patch_layers_in_place=greedy_params.patch_layers_in_place,
+                                                               num_workers=greedy_params.num_workers)
             layer_selector = ConvNoDepthwiseLayerSelector()
             modules_to_ignore = params.mode_params.modules_to_ignore
 
@@ -213,7 +218,7 @@ class CompressionFactory:
         use_cuda = next(model.parameters()).is_cuda
 
         # Create a pruner
-        pruner = PyWeightSvdPruner()
+        pruner = PyWeightSvdPruner(svd_cache=SvdFactorizationCache())
         cost_calculator = WeightSvdCostCalculator()
         comp_ratio_rounding_algo = RankRounder(params.multiplicity, cost_calculator)
 
@@ -234,7 +239,9 @@ class CompressionFactory:
                                                                    saved_eval_scores_dict=greedy_params.saved_eval_scores_dict,
                                                                    comp_ratio_rounding_algo=comp_ratio_rounding_algo,
                                                                    use_cuda=use_cuda,
-                                                                   bokeh_session=bokeh_session)
+                                                                   bokeh_session=bokeh_session,
+                                                                   patch_layers_in_place=greedy_params.patch_layers_in_place,
+                                                                   num_workers=greedy_params.num_workers)
             else:
                 raise ValueError("Unknown Rank selection scheme: {}".format(params.AutoModeParams.rank_select_scheme))
 
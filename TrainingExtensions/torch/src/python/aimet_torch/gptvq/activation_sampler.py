@@ -35,19 +35,21 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 """ Sample input to a passed module (for our case, it is the quantized wrapper module)"""
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import torch
 
 # Import AIMET specific modules
 from aimet_common.utils import AimetLogger
 from aimet_torch.utils import (
+    CachedDataset,
     StopForwardException,
     change_tensor_device_placement,
     get_device,
     get_named_module,
     in_eval_mode,
     get_module_to_name_dict,
+    save_to_cache,
 )
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
@@ -147,3 +149,75 @@ class ActivationSampler:
         inp_dict = self._module_collector.collect_module_to_input_tensor(model_inputs)
 
         return inp_dict
+
+
+def cache_block_inputs(model: torch.nn.Module,
+                       block: torch.nn.Module,
+                       data_loader: Iterable,
+                       forward_fn: Callable[[torch.nn.Module, Any], Any],
+                       path: str) -> int:
+    """
+    Run the model up to the block for every batch and save the positional and keyword inputs to the block on disk
+
+    :param model: Model containing the block
+    :param block: Block to sample inputs of
+    :param data_loader: Data loader
+    :param forward_fn: Adapter function that performs forward pass given a model and inputs
+     yielded from the data loader.
+    :param path: Directory to save the block inputs
+    :return: Number of cached batches
+    """
+    cpu = torch.device('cpu')
+    num_batches = 0
+
+    def _hook_to_cache_inputs(_, args, kwargs):
+        save_to_cache(change_tensor_device_placement((args, kwargs), cpu), path, num_batches)
+        raise StopForwardException
+
+    handle = block.register_forward_pre_hook(_hook_to_cache_inputs, with_kwargs=True)
+    device = get_device(model)
+    try:
+        for model_input in data_loader:
+            try:
+                with in_eval_mode(model), torch.no_grad():
+                    _ = forward_fn(model, change_tensor_device_placement(model_input, device))
+            except StopForwardException:
+                pass
+            num_batches += 1
+    finally:
+        handle.remove()
+
+    return num_batches
+
+
+def block_forward_fn(block: torch.nn.Module, inputs: Tuple[Tuple, Dict]) -> Any:
+    """
+    Forward function for the blocks whose inputs are cached with cache_block_inputs
+
+    :param block: Block
+    :param inputs: Positional and keyword inputs to the block
+    :return: Outputs of the block
+    """
+    args, kwargs = inputs
+    return block(*args, **kwargs)
+
+
+def propagate_block_inputs(block: torch.nn.Module, cached_inputs: CachedDataset, path: str):
+    """
+    Replace the cached inputs to the block with the inputs to the next block.
+    The first output of the block replaces the first positional input, and the remaining inputs are reused as-is.
+
+    :param block: Block
+    :param cached_inputs: Cached inputs to the block
+    :param path: Directory where cached_inputs are stored
+    """
+    cpu = torch.device('cpu')
+    device = get_device(block)
+    for idx, (args, kwargs) in enumerate(cached_inputs):
+        with in_eval_mode(block), torch.no_grad():
+            outputs = block_forward_fn(block, change_tensor_device_placement((args, kwargs), device))
+        outputs = outputs[0] if isinstance(outputs, (tuple, list)) else outputs
+
+        # Overwriting the inputs of idx-th batch is safe since they are never read again
+        args = (change_tensor_device_placement(outputs, cpu), *args[1:])
+        save_to_cache((args, kwargs), path, idx)
@@ -40,8 +40,9 @@ import contextlib
 import itertools
 import json
 import os
+import tempfile
 import time
-from typing import Union, Tuple, Optional, Dict, List, Set, Iterable
+from typing import Union, Tuple, Optional, Dict, List, Set, Iterable, Callable
 
 import torch
 from torch import nn
@@ -49,6 +50,7 @@ from torch import nn
 from aimet_common.defs import QuantScheme
 from aimet_common.utils import Spinner, AimetLogger
 from aimet_torch import utils
+from aimet_torch.gptvq.activation_sampler import cache_block_inputs, block_forward_fn, propagate_block_inputs
 from aimet_torch.gptvq.defs import GPTVQSupportedModules, GPTVQParameters
 from aimet_torch.gptvq.gptvq_optimizer import GPTVQOptimizer
 from aimet_torch.gptvq.utils import get_module_name_to_hessian_tensor
@@ -80,6 +82,7 @@ class GPTVQ:
         block_level_module_names: Optional[List[List[str]]] = None,
         file_name_prefix: str = "gptvq",
         config_file_path: Optional[str] = None,
+        cached_block_names: Optional[List[str]] = None,
     ) -> nn.Module:
         """
         Returns model with optimized weight rounding of GPTVQ supportable modules
@@ -95,6 +98,12 @@ class GPTVQ:
         :param block_level_module_names: List of module name lists to optimize block level GPTVQ optimization instead of leaf module level
         :param file_name_prefix: Prefix to use for filename of the encodings file
         :param config_file_path: Configuration file path for model quantizers
+        :param cached_block_names: Names of blocks (e.g. decoder layers) executed back-to-back in the given order,
+                                   where the first output of each block is the first positional input of the next block
+                                   and the remaining inputs are shared. If provided, inputs to the first block are cached
+                                   once, and Hessians of the modules in each block are sampled by running only that block
+                                   on its cached inputs. The outputs of each block are then cached as the inputs of the next
+                                   block, so that peak memory is bounded by a single block
         :return: QuantizationSimModel with GPTVQ applied weights and saves corresponding parameter encodings JSON file at provided path
         """
         _logger.info(gptvq_params)
@@ -105,13 +114,17 @@ class GPTVQ:
         if block_level_module_names is not None:
             cls._validate_module_names(model, itertools.chain.from_iterable(block_level_module_names), "block_level_module_names")
 
+        if cached_block_names is not None:
+            cls._validate_block_names(model, cached_block_names)
+
         module_name_set = cls._get_candidate_module_name_set(model, module_names_to_exclude)
         sim = cls._get_quantsim(model, dummy_input, gptvq_params, config_file_path, module_name_set)
         if module_names_to_exclude is None:
             module_names_to_exclude = []
 
         with cls._disable_quantizers_for_gptvq_optimization(sim, module_name_set):
-            cls._apply_gptvq(model, sim, dummy_input, gptvq_params, set(module_names_to_exclude), block_level_module_names)
+            cls._apply_gptvq(model, sim, dummy_input, gptvq_params, set(module_names_to_exclude), block_level_module_names,
+                             cached_block_names)
 
         cls._export_encodings_to_json(param_encoding_path, file_name_prefix, sim, gptvq_params.rows_per_block)
         # Restore all nn.Parameters holding DequantizedTensors to hold plain torch.Tensor
@@ -146,6 +159,23 @@ class GPTVQ:
                    f"that don't exist in model or aren't GPTVQ supportable")
             raise ValueError(msg)
 
+    @staticmethod
+    def _validate_block_names(model: nn.Module, block_names: List[str]):
+        """
+        Validate user provided cached block names. Each block should exist in the model and blocks shouldn't be nested
+
+        :param model: torch Model
+        :param block_names: Block names
+        :raise ValueError: If block names are not valid
+        """
+        name_to_module = dict(model.named_modules())
+        invalid_block_names = [name for name in block_names if name not in name_to_module or
+                               any(name.startswith(f"{other}.") for other in block_names)]
+        if invalid_block_names or len(set(block_names)) != len(block_names):
+            msg = (f"Parameter `cached_block_names` contains invalid block names ({', '.join(invalid_block_names)}) "
+                   f"that don't exist in model, are nested in other blocks or are duplicated")
+            raise ValueError(msg)
+
     @staticmethod
     def _get_candidate_module_name_set(model: nn.Module,
                                        module_names_to_exclude: Optional[List[str]]) -> Set[str]:
@@ -290,6 +320,7 @@ class GPTVQ:
             gptvq_params: GPTVQParameters,
             module_names_to_exclude: Set[str],
             block_level_module_names: Optional[List[List[str]]],
+            cached_block_names: Optional[List[str]] = None,
     ):
         """
         Apply GPTVQ algorithm to optimize weights
@@ -300,43 +331,162 @@ class GPTVQ:
         :param gptvq_params: Dataclass holding GPTVQ parameters
         :param module_names_to_exclude: Module names which are excluded during GPTVQ optimization
         :param block_level_module_names: List of module name lists to optimize block level GPTVQ optimization instead of leaf module level
+        :param cached_block_names: Names of blocks executed back-to-back whose inputs are cached
         """
         block_level_module_names = cls._get_block_level_module_names(
             original_model, dummy_input, block_level_module_names, module_names_to_exclude
         )
+        schedule = cls._get_cached_block_schedule(block_level_module_names, cached_block_names or [])
 
         total_sampling_time = 0
         total_optimization_time = 0
-        for module_names in block_level_module_names:
-            name_to_quant_module = cls._get_applicable_name_to_module_dict(
-                module_names, sim, module_names_to_exclude
-            )
-
-            start_sampling_time = time.perf_counter()
-            with Spinner(f"Sampling Hessian tensor of {', '.join(module_names)}"):
-                name_to_hessian = get_module_name_to_hessian_tensor(gptvq_params, sim, module_names)
-            sampling_time = time.perf_counter() - start_sampling_time
-            _logger.info('Took %.4f seconds for Hessian sampling of %s', sampling_time, ', '.join(module_names))
-            total_sampling_time += sampling_time
-
-            for name, quant_module in name_to_quant_module.items():
-                assert isinstance(quant_module, BaseQuantizationMixin), "%s is not BaseQuantizationMixin" % quant_module
-                assert quant_module.param_quantizers["weight"], "%s does not have weight quantizer" % quant_module
-
-                start_optimization_time = time.perf_counter()
-                with Spinner(f"Started GPTVQ optimization of {name}"), torch.no_grad():
-                    GPTVQOptimizer.weight_update(
-                        module=quant_module,
-                        gptvq_params=gptvq_params,
-                        hessian=name_to_hessian[name],
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = os.path.join(tmp_dir, "block_inputs")
+            num_batches = None
+            for i, (block_name, module_groups) in enumerate(schedule):
+                if block_name is None:
+                    # Sample Hessians by running the whole model
+                    model, data, forward_fn = sim.model, gptvq_params.data_loader, gptvq_params.forward_fn
+                else:
+                    model = get_named_module(sim.model, block_name)
+                    if num_batches is None:
+                        with Spinner(f"Caching inputs to {block_name}"):
+                            num_batches = cache_block_inputs(sim.model, model, gptvq_params.data_loader,
+                                                             gptvq_params.forward_fn, cache_path)
+                    data, forward_fn = utils.CachedDataset(None, num_batches, cache_path), block_forward_fn
+
+                for module_names in module_groups:
+                    sampling_time, optimization_time = cls._optimize_module_group(
+                        module_names, sim, gptvq_params, module_names_to_exclude, model, data, forward_fn, block_name
                     )
-                optimization_time = time.perf_counter() - start_optimization_time
-                _logger.info('Took %.4f seconds for GPTVQ optimization of %s', optimization_time, name)
-                total_optimization_time += optimization_time
+                    total_sampling_time += sampling_time
+                    total_optimization_time += optimization_time
+
+                # Outputs of the current block are the inputs to the next block
+                if block_name is not None and i + 1 < len(schedule) and schedule[i + 1][0] is not None:
+                    with Spinner(f"Propagating inputs through {block_name}"):
+                        propagate_block_inputs(model, data, cache_path)
 
         _logger.info('Total %.4f seconds for total Hessian sampling', total_sampling_time)
         _logger.info('Total %.4f seconds for total GPTVQ optimization', total_optimization_time)
 
+    @classmethod
+    def _optimize_module_group(
+            cls,
+            module_names: List[str],
+            sim: QuantizationSimModel,
+            gptvq_params: GPTVQParameters,
+            module_names_to_exclude: Set[str],
+            model: nn.Module,
+            data: Iterable,
+            forward_fn: Callable,
+            block_name: Optional[str],
+    ) -> Tuple[float, float]:
+        """
+        Sample Hessians of a group of modules at once and apply GPTVQ optimization to each module in the group
+
+        :param module_names: Module names in the group
+        :param sim: QuantizationSimModel object to optimize weight
+        :param gptvq_params: Dataclass holding GPTVQ parameters
+        :param module_names_to_exclude: Module names which are excluded during GPTVQ optimization
+        :param model: Model or block to run forward pass for Hessian sampling
+        :param data: Inputs to model
+        :param forward_fn: Adapter function that performs forward pass given model and inputs yielded from data
+        :param block_name: Name of the block if model is a block, otherwise None
+        :return: Hessian sampling time and GPTVQ optimization time
+        """
+        # pylint: disable=too-many-locals
+        name_to_quant_module = cls._get_applicable_name_to_module_dict(
+            module_names, sim, module_names_to_exclude
+        )
+
+        prefix = f"{block_name}." if block_name is not None else ""
+        start_sampling_time = time.perf_counter()
+        with Spinner(f"Sampling Hessian tensor of {', '.join(module_names)}"):
+            name_to_hessian = get_module_name_to_hessian_tensor(
+                gptvq_params, sim, [name[len(prefix):] for name in module_names], model, data, forward_fn
+            )
+            name_to_hessian = {f"{prefix}{name}": hessian for name, hessian in name_to_hessian.items()}
+        sampling_time = time.perf_counter() - start_sampling_time
+        _logger.info('Took %.4f seconds for Hessian sampling of %s', sampling_time, ', '.join(module_names))
+
+        total_optimization_time = 0
+        remaining_names = list(name_to_quant_module)
+        for name, quant_module in name_to_quant_module.items():
+            assert isinstance(quant_module, BaseQuantizationMixin), "%s is not BaseQuantizationMixin" % quant_module
+            assert quant_module.param_quantizers["weight"], "%s does not have weight quantizer" % quant_module
+
+            # Weight update modifies Hessian in place, so copy it if it's shared with the following modules
+            remaining_names.remove(name)
+            hessian = name_to_hessian[name]
+            if any(name_to_hessian[other] is hessian for other in remaining_names):
+                hessian = hessian.clone()
+
+            start_optimization_time = time.perf_counter()
+            with Spinner(f"Started GPTVQ optimization of {name}"), torch.no_grad():
+                GPTVQOptimizer.weight_update(
+                    module=quant_module,
+                    gptvq_params=gptvq_params,
+                    hessian=hessian,
+                )
+            optimization_time = time.perf_counter() - start_optimization_time
+            _logger.info('Took %.4f seconds for GPTVQ optimization of %s', optimization_time, name)
+            total_optimization_time += optimization_time
+
+        return sampling_time, total_optimization_time
+
+    @staticmethod
+    def _get_cached_block_schedule(
+        block_level_module_names: List[List[str]],
+        cached_block_names: List[str],
+    ) -> List[Tuple[Optional[str], List[List[str]]]]:
+        """
+        Group the module name lists by the cached block they belong to
+
+        :param block_level_module_names: Ordered module name lists
+        :param cached_block_names: Names of blocks executed back-to-back
+        :return: List of (block name or None, module name lists) in order of execution.
+         Module name lists that don't belong to any block are paired with None
+        :raise ValueError: If a module name list spans several blocks or isn't in order of the blocks
+        """
+        def _get_block_index(name: str) -> Optional[int]:
+            for idx, block_name in enumerate(cached_block_names):
+                if name == block_name or name.startswith(f"{block_name}."):
+                    return idx
+            return None
+
+        before_blocks, after_blocks = [], []
+        block_to_module_groups = [[] for _ in cached_block_names]
+        last_block_idx = -1
+        for module_names in block_level_module_names:
+            block_indices = {_get_block_index(name) for name in module_names}
+            if len(block_indices) != 1:
+                raise ValueError(f"Modules {module_names} should belong to the same cached block")
+
+            block_idx = block_indices.pop()
+            if block_idx is None:
+                (before_blocks if last_block_idx < 0 else after_blocks).append(module_names)
+                continue
+
+            if block_idx < last_block_idx or after_blocks:
+                raise ValueError(f"Modules {module_names} are executed after the following blocks or modules. "
+                                 f"Parameter `cached_block_names` should be given in order of execution")
+            last_block_idx = block_idx
+            block_to_module_groups[block_idx].append(module_names)
+
+        # Blocks without any modules to optimize are needed only to propagate inputs to the following blocks
+        blocks = list(zip(cached_block_names, block_to_module_groups))
+        while blocks and not blocks[-1][1]:
+            blocks.pop()
+        while blocks and not blocks[0][1]:
+            blocks.pop(0)
+
+        schedule = [(None, before_blocks)] if before_blocks else []
+        schedule.extend(blocks)
+        if after_blocks:
+            schedule.append((None, after_blocks))
+        return schedule
+
     @staticmethod
     def _get_applicable_name_to_module_dict(
         module_names: List[str],
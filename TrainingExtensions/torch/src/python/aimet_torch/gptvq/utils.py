@@ -37,7 +37,7 @@
 # pylint: disable=redefined-outer-name
 """Utility methods for working with GPTVQ"""
 import math
-from typing import Optional, List, Tuple, Dict
+from typing import Optional, List, Tuple, Dict, Iterable, Callable, Any
 
 import torch
 from torch import nn
@@ -375,39 +375,98 @@ def quantize_dequantize_codebook(codebook: torch.Tensor,
 
 def get_module_name_to_hessian_tensor(gptvq_params: GPTVQParameters,
                                       sim: QuantizationSimModel,
-                                      module_names: List[str]) -> Dict[str, torch.Tensor]:
+                                      module_names: List[str],
+                                      model: Optional[nn.Module] = None,
+                                      data: Optional[Iterable] = None,
+                                      forward_fn: Optional[Callable[[nn.Module, Any], Any]] = None) \
+        -> Dict[str, torch.Tensor]:
     """
     Get module name to Hessian tensor dictionary
 
+    Modules that take the same input tensor (e.g. query/key/value projections) share a single Hessian tensor,
+    which is accumulated only once.
+
     :param gptvq_params: Data carrier holding GPTVQ parameters
     :param sim: QuantizationSimModel object
-    :param module_names: Topologically ordered module names
+    :param module_names: Topologically ordered module names, relative to model
+    :param model: Model to run forward pass. Defaults to sim.model
+    :param data: Iterable of inputs to model. Defaults to gptvq_params.data_loader
+    :param forward_fn: Adapter function that performs forward pass given model and inputs yielded from data.
+     Defaults to gptvq_params.forward_fn
     :return: Module name to Hessian tensor dictionary
     """
-    name_to_hessian = {}
-    for module_name in module_names:
-        quant_module = get_named_module(sim.model, module_name)
-        _, num_cols = get_2d_tensor_shape(quant_module)
-        device = quant_module.weight.device
-        name_to_hessian[module_name] = torch.zeros((num_cols, num_cols), device=device)
+    # pylint: disable=too-many-arguments, too-many-locals
+    model = sim.model if model is None else model
+    data = gptvq_params.data_loader if data is None else data
+    forward_fn = gptvq_params.forward_fn if forward_fn is None else forward_fn
 
-    act_sampler = ActivationSampler(sim.model, gptvq_params.forward_fn, module_names)
+    name_to_hessian = {}
+    name_to_shared_name = {}
+    act_sampler = ActivationSampler(model, forward_fn, module_names)
     n_samples = 0
-    for current_data in gptvq_params.data_loader:
+    for current_data in data:
         module_name_to_input_tensor = act_sampler.sample_activation_tensors(current_data)
 
+        if not name_to_shared_name:
+            name_to_shared_name = _get_module_name_to_shared_hessian_name(model, module_names,
+                                                                          module_name_to_input_tensor)
+            for name in module_names:
+                if name_to_shared_name[name] != name:
+                    continue
+                quant_module = get_named_module(model, name)
+                _, num_cols = get_2d_tensor_shape(quant_module)
+                device = quant_module.weight.device
+                name_to_hessian[name] = torch.zeros((num_cols, num_cols), device=device)
+
         curr_batch_size = 0
         for name, inp_data in module_name_to_input_tensor.items():
+            if name not in name_to_hessian:
+                continue
             if len(inp_data.shape) == 2:
                 inp_data = inp_data.unsqueeze(0)
             curr_batch_size = inp_data.shape[0]
 
-            quant_module = get_named_module(sim.model, name)
+            quant_module = get_named_module(model, name)
             update_hessian(quant_module, inp_data, n_samples, curr_batch_size, name_to_hessian[name])
 
         n_samples += curr_batch_size
 
-    return name_to_hessian
+    return {name: name_to_hessian[shared_name] for name, shared_name in name_to_shared_name.items()}
+
+
+def _get_module_name_to_shared_hessian_name(model: nn.Module,
+                                            module_names: List[str],
+                                            module_name_to_input_tensor: Dict[str, torch.Tensor]) -> Dict[str, str]:
+    """
+    Map each module name to the name of the first module whose Hessian tensor is identical,
+    i.e. the module that takes the same input tensor and unfolds it in the same way
+
+    :param model: Model containing the modules
+    :param module_names: Topologically ordered module names
+    :param module_name_to_input_tensor: Module name to input tensor dictionary
+    :return: Module name to shared module name dictionary
+    """
+    def _get_hessian_key(name: str):
+        inp_data = module_name_to_input_tensor.get(name)
+        if inp_data is None:
+            return None
+        module = get_named_module(model, name)
+        # Input tensors are detached in the sampler, so compare the memory they refer to instead of identity
+        key = (inp_data.data_ptr(), inp_data.shape, inp_data.stride(), type(module))
+        if isinstance(module, nn.Conv2d):
+            key += (module.kernel_size, module.dilation, module.padding, module.stride)
+        return key
+
+    name_to_shared_name = {}
+    key_to_name = {}
+    for name in module_names:
+        key = _get_hessian_key(name)
+        if key is None:
+            name_to_shared_name[name] = name
+        else:
+            name_to_shared_name[name] = key_to_name.setdefault(key, name)
+
+    return name_to_shared_name
 
 
 def get_2d_tensor_shape(quant_module: BaseQuantizationMixin) -> torch.Size:
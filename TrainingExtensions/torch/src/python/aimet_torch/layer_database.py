@@ -36,6 +36,7 @@
 # =============================================================================
 
 """Stores and updates Layer Attributes"""
+import contextlib
 import copy
 from typing import Tuple, Union, List
 import torch
@@ -219,6 +220,23 @@ class LayerDatabase(aimet_common.layer_database.LayerDatabase):
         # Add the updated layer to the database
         self._compressible_layers[id(new_layer.module)] = new_layer
 
+    @contextlib.contextmanager
+    def restore_layers_on_exit(self):
+        """
+        Context manager that restores the model and the database to their current layers on exit, undoing any
+        layer replacements (e.g. replace_layer_with_sequential_of_two_layers) made within the context.
+        Modules that are modified in place are not restored.
+        """
+        saved_modules = [(layer.parent_module, layer.var_name_of_module_in_parent, layer.module)
+                         for layer in self._compressible_layers.values()]
+        with super().restore_layers_on_exit():
+            try:
+                yield self
+            finally:
+                for parent_module, var_name, module in saved_modules:
+                    if parent_module is not None and getattr(parent_module, var_name) is not module:
+                        setattr(parent_module, var_name, module)
+
     def _custom_hook_to_collect_layer_attributes(self, module, input_tensor, output_tensor):
         """
         Custom hook function which will be applied to all the layers in the model and store following
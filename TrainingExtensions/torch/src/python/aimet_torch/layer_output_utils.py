@@ -38,7 +38,7 @@
 """ This module contains utilities to capture and save intermediate layer-outputs of a model. """
 
 import os
-from typing import Union, Dict, List, Tuple
+from typing import Union, Dict, List, Tuple, Iterable, Optional
 from enum import Enum
 import shutil
 import re
@@ -48,7 +48,8 @@ import onnx
 import torch
 
 from aimet_common.utils import AimetLogger
-from aimet_common.layer_output_utils import SaveInputOutput, save_layer_output_names
+from aimet_common.layer_output_utils import SaveInputOutput, save_layer_output_names, LayerOutputErrorStats, \
+    save_layer_output_comparison_report
 
 from aimet_torch._base.quantsim import _QuantizedModuleProtocol
 from aimet_torch import utils
@@ -81,7 +82,8 @@ class LayerOutputUtil:
     """ Implementation to capture and save outputs of intermediate layers of a model (fp32/quantsim). """
 
     def __init__(self, model: torch.nn.Module, dir_path: str, naming_scheme: NamingScheme = NamingScheme.PYTORCH,
-                 dummy_input: Union[torch.Tensor, Tuple, List] = None, onnx_export_args: Union[OnnxExportApiArgs, Dict] = None):
+                 dummy_input: Union[torch.Tensor, Tuple, List] = None, onnx_export_args: Union[OnnxExportApiArgs, Dict] = None,
+                 num_writers: int = 0, packed: bool = False):
         """
         Constructor for LayerOutputUtil.
 
@@ -93,6 +95,11 @@ class LayerOutputUtil:
         :param onnx_export_args: Should be same as that passed to quantsim export API to have consistency between
             layer-output names present in exported onnx model and generated layer-outputs. Required if naming_scheme is
             'NamingScheme.ONNX'.
+        :param num_writers: Number of background threads writing layer-outputs to disk. If 0, layer-outputs are written
+            synchronously. Otherwise, close() must be called once all layer-outputs are generated.
+        :param packed: If True, layer-outputs are saved in the packed format, with a single memory-mappable file per
+            layer-output (see aimet_common.layer_output_utils.PackedLayerOutputReader). close() must be called once all
+            layer-outputs are generated.
         """
 
         # Utility to capture layer-outputs
@@ -100,7 +107,8 @@ class LayerOutputUtil:
                                         onnx_export_args=onnx_export_args)
 
         # Utility to save model inputs and their corresponding layer-outputs
-        self.save_input_output = SaveInputOutput(dir_path=dir_path, axis_layout='NCHW')
+        self.save_input_output = SaveInputOutput(dir_path=dir_path, axis_layout='NCHW', num_writers=num_writers,
+                                                 packed=packed)
 
     def generate_layer_outputs(self, input_instance: Union[torch.Tensor, List[torch.Tensor], Tuple[torch.Tensor]]):
         """
@@ -124,6 +132,12 @@ class LayerOutputUtil:
 
         logger.info('Successfully generated layer-outputs for input instance %d', self.save_input_output.input_cntr)
 
+    def close(self):
+        """
+        Waits until all generated layer-outputs are written to disk and stops the background writers, if any.
+        """
+        self.save_input_output.close()
+
     @staticmethod
     def _get_input_in_numpy(input_instance: Union[torch.Tensor, List[torch.Tensor], Tuple[torch.Tensor]]) -> \
             Union[np.ndarray, List[np.ndarray], Tuple[np.ndarray]]:
@@ -152,6 +166,101 @@ class LayerOutputUtil:
         return layer_output_numpy_dict
 
 
+class LayerOutputComparator:
+    """
+    Compares outputs of intermediate layers of a FP32 model and its quantized (quantsim) model, by running both models
+    side by side and accumulating per-layer error metrics (SQNR, MSE, max absolute error and cosine similarity).
+    Layer-outputs are not saved, so memory usage does not grow with the number of input instances.
+    """
+
+    def __init__(self, fp32_model: torch.nn.Module, quantized_model: torch.nn.Module, dir_path: str,
+                 naming_scheme: NamingScheme = NamingScheme.PYTORCH, dummy_input: Union[torch.Tensor, Tuple, List] = None,
+                 onnx_export_args: Union[OnnxExportApiArgs, Dict] = None):
+        """
+        Constructor for LayerOutputComparator.
+
+        :param fp32_model: FP32 model
+        :param quantized_model: Quantized model, e.g. QuantizationSimModel.model
+        :param dir_path: Directory wherein the comparison report will be saved.
+        :param naming_scheme: Naming scheme to be followed to name layer-outputs. Refer the NamingScheme enum definition.
+        :param dummy_input: Dummy input to model. Required if naming_scheme is 'NamingScheme.ONNX' or 'NamingScheme.TORCHSCRIPT'.
+        :param onnx_export_args: Should be same as that passed to quantsim export API. Required if naming_scheme is
+            'NamingScheme.ONNX'.
+        """
+        self.dir_path = dir_path
+        self.fp32_layer_output = LayerOutput(model=fp32_model, dir_path=dir_path, naming_scheme=naming_scheme,
+                                             dummy_input=dummy_input, onnx_export_args=onnx_export_args)
+        self.quantized_layer_output = LayerOutput(model=quantized_model, dir_path=dir_path, naming_scheme=naming_scheme,
+                                                  dummy_input=dummy_input, onnx_export_args=onnx_export_args)
+        self.layer_output_error_stats: Dict[str, LayerOutputErrorStats] = {}
+
+    def compare_layer_outputs(self, input_instance: Union[torch.Tensor, List[torch.Tensor], Tuple[torch.Tensor]]):
+        """
+        This method captures the output of every layer of both models for the given input and accumulates the errors
+        of the quantized layer-outputs. Layer-outputs that only one of the models produces are skipped.
+
+        :param input_instance: Input (batch) passed to both models.
+        :return: None
+        """
+        fp32_layer_output_dict = self.fp32_layer_output.get_outputs(input_instance)
+        quantized_layer_output_dict = self.quantized_layer_output.get_outputs(input_instance)
+
+        names = []
+        reductions = []
+        for name, reference in fp32_layer_output_dict.items():
+            quantized = quantized_layer_output_dict.get(name)
+            if quantized is None or quantized.shape != reference.shape or reference.numel() == 0:
+                continue
+
+            reference = reference.detach().as_subclass(torch.Tensor).float()
+            quantized = quantized.detach().as_subclass(torch.Tensor).float().to(reference.device)
+            error = quantized - reference
+            names.append(name)
+            reductions.append(torch.stack([error.square().sum(), reference.square().sum(), quantized.square().sum(),
+                                           (reference * quantized).sum(), error.abs().max()]))
+
+        if not reductions:
+            return
+
+        # Fetch the reductions of all layer-outputs with a single device to host copy
+        device = reductions[0].device
+        reductions = torch.stack([reduction.to(device) for reduction in reductions]).double().cpu().tolist()
+
+        for name, (sum_squared_error, sum_squared_reference, sum_squared_quantized, sum_product, max_abs_error) \
+                in zip(names, reductions):
+            if name not in self.layer_output_error_stats:
+                self.layer_output_error_stats[name] = LayerOutputErrorStats()
+            self.layer_output_error_stats[name].update(fp32_layer_output_dict[name].numel(), sum_squared_error,
+                                                       sum_squared_reference, sum_squared_quantized, sum_product,
+                                                       max_abs_error)
+
+    def compare_over_data_loader(self, data_loader: Iterable, num_batches: Optional[int] = None) \
+            -> Dict[str, Dict[str, float]]:
+        """
+        Compares the layer-outputs of both models over a data loader and saves the comparison report
+        (layer_output_comparison.json) to dir_path.
+
+        :param data_loader: Data loader. Every batch is passed as is to compare_layer_outputs()
+        :param num_batches: Number of batches to compare. If None, all batches are compared
+        :return: Dictionary of layer-output name to metrics
+        """
+        for batch_index, batch in enumerate(data_loader):
+            if num_batches is not None and batch_index >= num_batches:
+                break
+            logger.info("Comparing layer-outputs for batch %d", batch_index + 1)
+            self.compare_layer_outputs(batch)
+
+        return self.save_report()
+
+    def save_report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Saves the metrics accumulated so far to layer_output_comparison.json in dir_path.
+
+        :return: Dictionary of layer-output name to metrics
+        """
+        return save_layer_output_comparison_report(self.layer_output_error_stats, self.dir_path)
+
+
 class LayerOutput:
     """
     This class creates a layer-output name to layer-output dictionary. The layer-output names are as per the AIMET exported
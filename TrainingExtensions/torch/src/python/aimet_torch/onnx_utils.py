@@ -39,10 +39,12 @@
 
 """ Utilities to load and save onnx models """
 from dataclasses import dataclass
-from typing import Union, List, Tuple, Dict, Set, Optional, Any
+from typing import Union, List, Tuple, Dict, Set, Optional, Any, Callable
 import os
 import copy
+import contextlib
 from collections import defaultdict, deque
+from itertools import chain
 from enum import IntEnum
 import torch
 from torch import nn
@@ -51,6 +53,7 @@ import torchvision
 import onnx
 import yaml
 from onnx import GraphProto
+from onnx.external_data_helper import uses_external_data
 from packaging import version
 
 from aimet_common.utils import AimetLogger
@@ -74,6 +77,9 @@ update_all_onnx_nodes_name = True
 # Flag to adjust ONNX node output to have unique name
 MAKE_NODE_OUTPUT_NAME_UNIQUE = True
 
+# Maximum size in bytes of each external data file written by streaming export
+STREAMING_EXPORT_SHARD_SIZE = 1 << 30
+
 
 recurrent_onnx_optypes = ['LSTM', 'GRU', 'RNN']
 
@@ -322,15 +328,27 @@ class CustomMarker(torch.nn.Module):
         """
         Forward method for this CustomMarker layer
         """
+        marked_inputs, kwargs = self._mark_inputs(inputs, kwargs)
+        x = self.marked_module(*marked_inputs, **kwargs)
+        return self._mark_outputs(x)
+
+    def _mark_inputs(self, inputs: Tuple, kwargs: Dict) -> Tuple[List, Dict]:
+        """
+        Applies start markers to the positional and keyword inputs of the marked module
+        """
         marked_tensor_map = {}
         marked_inputs = self._apply_markers_to_tuple(inputs, 'True', marked_tensor_map)
 
         if kwargs:
             kwargs = self._apply_marker_to_dict(kwargs, 'True', marked_tensor_map)
 
-        x = self.marked_module(*marked_inputs, **kwargs)
+        return marked_inputs, kwargs
 
-        marked_tensor_map.clear() # TODO should input/output be decoupled?
+    def _mark_outputs(self, x):
+        """
+        Applies end markers to the output of the marked module
+        """
+        marked_tensor_map = {} # TODO should input/output be decoupled?
         if isinstance(x, dict):
             output = self._apply_marker_to_dict(x, 'False', marked_tensor_map)
         else:
@@ -420,20 +438,32 @@ class OnnxSaver:
     @classmethod
     def create_onnx_model_with_pytorch_layer_names(cls, onnx_model_path: str, pytorch_model: torch.nn.Module,
                                                    dummy_input: Union[torch.Tensor, Tuple, List], is_conditional=False,
-                                                   module_marker_map=None, onnx_export_args: Optional[Union[OnnxExportApiArgs, dict]] = None):
+                                                   module_marker_map=None, onnx_export_args: Optional[Union[OnnxExportApiArgs, dict]] = None,
+                                                   streaming: bool = False,
+                                                   param_transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None):
         """
         This utility does some pre-processing on the pytorch model and then uses it to obtain an equivalent onnx model
         with node names same as that in pytorch model. Whatever pre-processing/post-processing steps to be done on
         the resultant onnx model must be done here.
 
+        In streaming mode, the model is exported without making copies of it or its parameters.
+        The marker layers are inserted with forward hooks that are removed after export,
+        the graph is exported without parameters, and the parameters are written one at a time
+        to external data files of at most STREAMING_EXPORT_SHARD_SIZE bytes next to the ONNX model file.
+
         :param onnx_model_path: Path to the ONNX model file
         :param pytorch_model: Equivalent PyTorch model instance
         :param dummy_input: Dummy input to the model. Used to parse model graph.
         :param is_conditional: True if model is a conditional model, False otherwise
         :param module_marker_map: Maps module names to traced custom markers (only used for conditional models)
         :param onnx_export_args:  override options for torch.onnx.export call
+        :param streaming: If True, export in streaming mode. Not supported for conditional models
+        :param param_transform: Function applied to each parameter and buffer before it is written in streaming mode
         :return:
         """
+        if streaming and is_conditional:
+            raise NotImplementedError('Streaming export is not supported for conditional models.')
+
         # Pre-processing pytorch model
         for dropout_type in aimet_torch.utils.DROPOUT_TYPES:
             aimet_torch.utils.replace_modules(pytorch_model,
@@ -441,21 +471,21 @@ class OnnxSaver:
                                               lambda _: torch.nn.Identity())
 
         if EXPORT_TO_ONNX_DIRECT:
-            cls._export_model_to_onnx(pytorch_model, dummy_input, onnx_model_path, is_conditional, onnx_export_args)
-            onnx_model = cls.load_simply_onnx_model(onnx_model_path)
+            onnx_model = cls._export_and_load_onnx_model(pytorch_model, dummy_input, onnx_model_path, is_conditional,
+                                                         onnx_export_args, streaming)
 
             cls._fix_initializer_names_for_export_to_onnx_direct(onnx_model, pytorch_model)
-            save_as_external_data = onnx_model.ByteSize() >= onnx.checker.MAXIMUM_PROTOBUF
-            onnx.save(onnx_model, onnx_model_path, save_as_external_data=save_as_external_data)
+            cls._save_onnx_model(onnx_model, onnx_model_path, pytorch_model, streaming, param_transform)
         else:
             # Obtaining equivalent onnx model
             cls.set_node_names(onnx_model_path, pytorch_model, dummy_input, is_conditional, module_marker_map,
-                               onnx_export_args)
+                               onnx_export_args, streaming, param_transform)
 
     @classmethod
     def set_node_names(cls, onnx_model_path: str, pytorch_model: torch.nn.Module,
                        dummy_input: Union[torch.Tensor, Tuple], is_conditional=False, module_marker_map=None,
-                       onnx_export_args: Optional[Union[OnnxExportApiArgs, dict]] = None):
+                       onnx_export_args: Optional[Union[OnnxExportApiArgs, dict]] = None, streaming: bool = False,
+                       param_transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None):
         """
         This utility loads a given onnx model file and set the names of all the nodes (ops) to equivalent
         pytorch module names given the corresponding pytorch model.
@@ -465,6 +495,8 @@ class OnnxSaver:
         :param is_conditional: True if model is a conditional model, False otherwise
         :param module_marker_map: Maps module names to traced custom markers (only used for conditional models)
         :param onnx_export_args:  override options for torch.onnx.export call
+        :param streaming: If True, export in streaming mode
+        :param param_transform: Function applied to each parameter and buffer before it is written in streaming mode
         :return:
         """
         if module_marker_map is None:
@@ -474,13 +506,83 @@ class OnnxSaver:
 
         onnx_model = cls._map_onnx_nodes_to_pytorch_modules(pytorch_model, dummy_input,
                                                             onnx_model_path, onnx_export_args, is_conditional,
-                                                            module_marker_map)
+                                                            module_marker_map, streaming)
 
         cls.check_onnx_node_names(onnx_model, pytorch_model)
 
-        save_as_external_data = onnx_model.ByteSize() >= onnx.checker.MAXIMUM_PROTOBUF
+        cls._save_onnx_model(onnx_model, onnx_model_path, pytorch_model, streaming, param_transform)
+
+    @classmethod
+    def _save_onnx_model(cls, onnx_model: onnx.ModelProto, onnx_model_path: str, pytorch_model: torch.nn.Module,
+                         streaming: bool, param_transform: Optional[Callable[[torch.Tensor], torch.Tensor]]):
+        """
+        Saves the onnx model, writing the parameters of the pytorch model as sharded external data in streaming mode
+        :param onnx_model: ONNX model object
+        :param onnx_model_path: Path to the ONNX model file
+        :param pytorch_model: Equivalent PyTorch model instance
+        :param streaming: If True, the onnx model was exported in streaming mode
+        :param param_transform: Function applied to each parameter and buffer before it is written in streaming mode
+        """
+        if streaming:
+            cls._write_sharded_external_data(onnx_model, onnx_model_path, pytorch_model, param_transform)
+            onnx.save(onnx_model, onnx_model_path)
+        else:
+            save_as_external_data = onnx_model.ByteSize() >= onnx.checker.MAXIMUM_PROTOBUF
+            onnx.save(onnx_model, onnx_model_path, save_as_external_data=save_as_external_data)
+
+    @classmethod
+    def _write_sharded_external_data(cls, onnx_model: onnx.ModelProto, onnx_model_path: str,
+                                     pytorch_model: torch.nn.Module,
+                                     param_transform: Optional[Callable[[torch.Tensor], torch.Tensor]]):
+        """
+        Writes the tensors referred to by the initializer placeholders of a streaming export one at a time
+        to external data files, and points the initializers to the written data.
+        :param onnx_model: ONNX model object with initializer placeholders
+        :param onnx_model_path: Path to the ONNX model file
+        :param pytorch_model: Equivalent PyTorch model instance
+        :param param_transform: Function applied to each parameter and buffer before it is written
+        """
+        state_dict = pytorch_model.state_dict(keep_vars=True)
+        base_dir = os.path.dirname(onnx_model_path)
+        filename = os.path.basename(onnx_model_path)
 
-        onnx.save(onnx_model, onnx_model_path, save_as_external_data=save_as_external_data)
+        # Maps the source tensor and permutation of the placeholders to the location of the written data
+        written = {}
+        shard, shard_index, location, offset = None, 0, None, 0
+        try:
+            for initializer in cls._get_all_initializers(onnx_model.graph):
+                if not uses_external_data(initializer):
+                    continue
+
+                external_data = {entry.key: entry.value for entry in initializer.external_data}
+                source = (external_data['location'], external_data.get('perm'))
+
+                if source not in written:
+                    tensor = state_dict[external_data['location']]
+                    if param_transform is not None:
+                        tensor = param_transform(tensor)
+                    if 'perm' in external_data:
+                        tensor = tensor.permute(*(int(axis) for axis in external_data['perm'].split(',')))
+                    data = tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy()
+
+                    if shard is None or (offset > 0 and offset + data.nbytes > STREAMING_EXPORT_SHARD_SIZE):
+                        if shard is not None:
+                            shard.close()
+                            shard_index += 1
+                        location = f'{filename}.{shard_index}.data'
+                        shard = open(os.path.join(base_dir, location), 'wb') # pylint: disable=consider-using-with
+                        offset = 0
+
+                    shard.write(data.data)
+                    written[source] = (location, offset, data.nbytes)
+                    offset += data.nbytes
+                    del tensor, data
+
+                data_location, data_offset, data_length = written[source]
+                _set_external_data(initializer, location=data_location, offset=data_offset, length=data_length)
+        finally:
+            if shard is not None:
+                shard.close()
 
     @classmethod
     def check_onnx_node_names(cls, onnx_model: onnx.ModelProto, pytorch_model: torch.nn.Module):
@@ -581,7 +683,7 @@ class OnnxSaver:
 
     @classmethod
     def _map_onnx_nodes_to_pytorch_modules(cls, pt_model, dummy_input, onnx_model_path, onnx_export_args,
-                                           is_conditional, module_marker_map):
+                                           is_conditional, module_marker_map, streaming=False):
         """
         Exports an onnx model, maps the nodes in the onnx model to corresponding pytorch modules and names
         them accordingly
@@ -591,13 +693,14 @@ class OnnxSaver:
         :param onnx_export_args:  override options for torch.onnx.export call
         :param is_conditional: True if model is a conditional model, False otherwise
         :param module_marker_map: Maps module names to traced custom markers (only used for conditional models)
+        :param streaming: If True, export in streaming mode
         """
         # pylint: disable=too-many-locals
         working_dir = os.path.dirname(onnx_model_path)
 
         onnx_model, onnx_model_all_marker = cls._create_onnx_model(dummy_input, is_conditional, module_marker_map,
                                                                    onnx_export_args, pt_model, working_dir,
-                                                                   update_all_onnx_nodes_name)
+                                                                   update_all_onnx_nodes_name, streaming)
 
         graphs_list, output_names_list = OnnxSaver._get_graph_and_output_names_lists(onnx_model)
 
@@ -614,7 +717,7 @@ class OnnxSaver:
         if update_all_onnx_nodes_name:
             cls._update_non_leaf_pytorch_modules_onnx_nodes_names(
                 pt_model, dummy_input, working_dir, onnx_export_args, is_conditional, module_marker_map,
-                onnx_model_all_marker, onnx_model)
+                onnx_model_all_marker, onnx_model, streaming)
 
         cls._remove_redundant_end_suffix(onnx_model)
 
@@ -638,7 +741,8 @@ class OnnxSaver:
     @classmethod
     def _create_onnx_model(cls, dummy_input, is_conditional: bool, module_marker_map,
                            onnx_export_args: Union[OnnxExportApiArgs, dict], pt_model: torch.nn.Module,
-                           working_dir: str, add_all_markers: bool) -> Tuple[onnx.NodeProto, Optional[onnx.NodeProto]]:
+                           working_dir: str, add_all_markers: bool,
+                           streaming: bool = False) -> Tuple[onnx.NodeProto, Optional[onnx.NodeProto]]:
         """
         creates an onnx model with markers at all module-levels if not successful falls back to marker at leaf only.
         :param dummy_input: Dummy input to run a fwd pass on @pt_model
@@ -647,17 +751,19 @@ class OnnxSaver:
         :param onnx_export_args:  override options for torch.onnx.export call
         :param pt_model: PyTorch model
         :param working_dir: working directory to save intermediate files
+        :param streaming: If True, export in streaming mode
         :return onnx model w/ leaf level markers and when feasible at non-leaf level as well.
         """
         try:
             onnx_model = cls._create_onnx_model_with_markers(dummy_input, pt_model, working_dir, onnx_export_args,
-                                                             is_conditional, module_marker_map, add_all_markers)
+                                                             is_conditional, module_marker_map, add_all_markers,
+                                                             streaming)
             if add_all_markers:
                 return onnx_model, copy.deepcopy(onnx_model)
 
         except (IndexError, AttributeError, TypeError):
             onnx_model = cls._create_onnx_model_with_markers(dummy_input, pt_model, working_dir, onnx_export_args,
-                                                             is_conditional, module_marker_map, False)
+                                                             is_conditional, module_marker_map, False, streaming)
         return onnx_model, None
 
     @classmethod
@@ -668,7 +774,8 @@ class OnnxSaver:
                                                           is_conditional: bool,
                                                           module_marker_map,
                                                           onnx_model_all_marker: Optional[onnx.ModelProto],
-                                                          onnx_model: Optional[onnx.ModelProto]):
+                                                          onnx_model: Optional[onnx.ModelProto],
+                                                          streaming: bool = False):
         # pylint: disable=too-many-arguments
         """
         updates the names of onnx ops belonging to non-leaf pytorch module with parent pytorch module context.
@@ -680,17 +787,22 @@ class OnnxSaver:
         :param module_marker_map: Maps module names to traced custom markers (only used for conditional models)
         :param onnx_model_all_marker: onnx_model with marker attached at every module level before import, optionally provided.
         :param onnx_model: onnx_model with updated names for onnx ops belonging to leaf pytorch module
+        :param streaming: If True, export in streaming mode
         """
         try:
+            # Marker hooks don't add a 'marked_module' scope to the names of the nodes in non-leaf modules
+            has_scoped_names = streaming and onnx_model_all_marker is not None
 
             if onnx_model_all_marker is None:
                 onnx_model_all_marker = cls._create_onnx_model_with_markers(
-                    dummy_input, pt_model, working_dir, onnx_export_args, is_conditional, module_marker_map, True)
+                    dummy_input, pt_model, working_dir, onnx_export_args, is_conditional, module_marker_map, True,
+                    streaming)
 
             cls._update_non_leaf_onnx_nodes_names(
                 node_list_from_leaf_markers=cls._get_topological_sorted_nodes_list(onnx_model),
                 node_list_from_all_markers=cls._get_topological_sorted_nodes_list(onnx_model_all_marker),
-                working_dir=working_dir
+                working_dir=working_dir,
+                has_scoped_names=has_scoped_names
             )
 
         except (KeyError, AttributeError, TypeError):
@@ -701,13 +813,15 @@ class OnnxSaver:
     def _update_non_leaf_onnx_nodes_names(cls,
                                           node_list_from_leaf_markers: List[Tuple[onnx.NodeProto, str]],
                                           node_list_from_all_markers: List[Tuple[onnx.NodeProto, str]],
-                                          working_dir: str):
+                                          working_dir: str, has_scoped_names: bool = False):
         """
         update the names of onnx ops list belonging to onnx model with markers at leaf-level with names from
          node list generated with markers at all level.
         :param node_list_from_leaf_markers: onnx nodes list obtained with makers for leaf modules only
         :param node_list_from_all_markers: onnx nodes lisr obtained with marker for all pytorch modules
         :param working_dir: Path to the saved ONNX model
+        :param has_scoped_names: True if the nodes in non-leaf modules of node_list_from_leaf_markers are already
+            named with the scope of the modules, which is the case for models marked at all levels with marker hooks
         """
         i = 0
         for (node, pt_module_name), (leaf_only_node, _) in zip(node_list_from_all_markers, node_list_from_leaf_markers):
@@ -719,7 +833,7 @@ class OnnxSaver:
             if pt_module_name is not None and '#' not in leaf_only_node.name and leaf_only_node.name != pt_module_name:
                 if 'marked_module' in leaf_only_node.name:
                     leaf_only_node.name = cls._get_updated_name(leaf_only_node.name)
-                else:
+                elif not (has_scoped_names and leaf_only_node.name.replace('/', '.').startswith(f'.{pt_module_name}.')):
                     leaf_only_node.name = f'{pt_module_name}.{leaf_only_node.name}'
 
             i += 1
@@ -1226,7 +1340,7 @@ class OnnxSaver:
     @classmethod
     # pylint: disable=too-many-locals
     def _create_onnx_model_with_markers(cls, dummy_input, pt_model, working_dir, onnx_export_args, is_conditional,
-                                        module_marker_map, add_all_markers) -> \
+                                        module_marker_map, add_all_markers, streaming=False) -> \
             onnx.ModelProto:
         """
         Exports an onnx model with marker nodes inserted
@@ -1236,20 +1350,190 @@ class OnnxSaver:
         :param onnx_export_args:  override options for torch.onnx.export call
         :param is_conditional: True if model is a conditional model, False otherwise
         :param module_marker_map: Maps module names to traced custom markers (only used for conditional models)
+        :param streaming: If True, marks the given model with forward hooks instead of marking a copy of it
         :return: Onnx model with marker layers
         """
-        model = copy.deepcopy(pt_model).cpu()
+        model = pt_model if streaming else copy.deepcopy(pt_model).cpu()
         module_name_map = {}
         for module_name, module_ref in model.named_modules():
             if add_all_markers or aimet_torch.utils.is_leaf_module(module_ref):
                 module_name_map[module_ref] = module_name
-        cls._add_markers(model, module_name_map, module_marker_map, is_conditional, add_all_markers)
         temp_file = os.path.join(working_dir,
                                  'temp_onnx_model_with_markers.onnx' if not add_all_markers else
                                  'temp_onnx_model_with_all_markers.onnx')
 
-        cls._export_model_to_onnx(model, dummy_input, temp_file, is_conditional, onnx_export_args)
-        return cls.load_simply_onnx_model(temp_file)
+        if streaming:
+            with cls._marker_hooks(model, module_name_map, add_all_markers):
+                return cls._export_and_load_onnx_model(model, dummy_input, temp_file, is_conditional,
+                                                       onnx_export_args, streaming)
+
+        cls._add_markers(model, module_name_map, module_marker_map, is_conditional, add_all_markers)
+        return cls._export_and_load_onnx_model(model, dummy_input, temp_file, is_conditional, onnx_export_args)
+
+    @classmethod
+    @contextlib.contextmanager
+    def _marker_hooks(cls, model: torch.nn.Module, module_name_map: Dict[torch.nn.Module, str], add_all_markers: bool):
+        """
+        Marks the modules of the model with forward hooks equivalent to CustomMarker layers
+        and removes the hooks on exit
+        :param model: PyTorch model
+        :param module_name_map: Maps modules to mark to their names
+        :param add_all_markers: if True add marker for non-leaf modules along with leaf module.
+        """
+        handles = []
+        try:
+            cls._add_marker_hooks(model, module_name_map, add_all_markers, handles, set())
+            yield
+        finally:
+            for handle in handles:
+                handle.remove()
+
+    @classmethod
+    def _add_marker_hooks(cls, starting_module, module_name_map, add_all_markers: bool, handles: List, visited: Set):
+        """
+        Recursively add marker hooks, visiting the modules in the same manner as _add_markers
+        """
+        for module_ref in starting_module.children():
+            if module_ref in visited:
+                continue
+            visited.add(module_ref)
+
+            if aimet_torch.utils.is_leaf_module(module_ref):
+                handles.extend(cls._register_marker_hooks(module_ref, module_name_map[module_ref], 'True'))
+            else:
+                # nn.ModuleList: does not have forward() method so should be ignored
+                if add_all_markers and not isinstance(module_ref, torch.nn.ModuleList):
+                    handles.extend(cls._register_marker_hooks(module_ref, module_name_map[module_ref], 'False'))
+                cls._add_marker_hooks(module_ref, module_name_map, add_all_markers, handles, visited)
+
+    @staticmethod
+    def _register_marker_hooks(module: torch.nn.Module, identifier: str, is_leaf: str) -> List:
+        """
+        Registers forward hooks that apply the markers of CustomMarker to the inputs and outputs of the module
+        :param module: Module to mark
+        :param identifier: Name of the module
+        :param is_leaf: 'True' if the module is a leaf module, 'False' otherwise
+        :return: Handles of the registered hooks
+        """
+        # pylint: disable=protected-access
+        marker = CustomMarker(module, identifier, is_leaf)
+
+        def mark_inputs(_, args, kwargs):
+            marked_args, marked_kwargs = marker._mark_inputs(args, kwargs)
+            return tuple(marked_args), marked_kwargs
+
+        def mark_outputs(_, __, output):
+            return marker._mark_outputs(output)
+
+        return [module.register_forward_pre_hook(mark_inputs, prepend=True, with_kwargs=True),
+                module.register_forward_hook(mark_outputs)]
+
+    @classmethod
+    def _export_and_load_onnx_model(cls, model: torch.nn.Module, dummy_input, onnx_model_path: str,
+                                    is_conditional: bool, onnx_export_args: Union[OnnxExportApiArgs, dict],
+                                    streaming: bool = False) -> onnx.ModelProto:
+        """
+        Exports the model to onnx and loads it back.
+        In streaming mode, the model is exported without parameters, and the parameters and buffers are added
+        back as initializer placeholders that refer to their names in the model state dict.
+        :param model: PyTorch model
+        :param dummy_input: Dummy input
+        :param onnx_model_path: Path to save the exported onnx model
+        :param is_conditional: True if model is a conditional model, False otherwise
+        :param onnx_export_args:  override options for torch.onnx.export call
+        :param streaming: If True, export in streaming mode
+        :return: Onnx model
+        """
+        if not streaming:
+            cls._export_model_to_onnx(model, dummy_input, onnx_model_path, is_conditional, onnx_export_args)
+            return cls.load_simply_onnx_model(onnx_model_path)
+
+        if isinstance(onnx_export_args, OnnxExportApiArgs):
+            onnx_export_args = onnx_export_args.kwargs
+        # Constant folding is disabled so that every parameter is exported as a graph input
+        onnx_export_args = {**onnx_export_args, 'export_params': False, 'do_constant_folding': False}
+        cls._export_model_to_onnx(model, dummy_input, onnx_model_path, is_conditional, onnx_export_args)
+
+        onnx_model = onnx.load(onnx_model_path)
+        state_dict = model.state_dict(keep_vars=True)
+        placeholders = {}
+        for graph_input in list(onnx_model.graph.input):
+            if graph_input.name not in state_dict:
+                continue
+            tensor_type = graph_input.type.tensor_type
+            initializer = onnx.TensorProto(name=graph_input.name, data_type=tensor_type.elem_type,
+                                           dims=[dim.dim_value for dim in tensor_type.shape.dim])
+            _set_external_data(initializer, location=graph_input.name)
+            onnx_model.graph.initializer.append(initializer)
+            onnx_model.graph.input.remove(graph_input)
+            placeholders[initializer.name] = initializer
+
+        # Parameters with the same values are deduplicated into Identity nodes of one another by torch.onnx.export.
+        # Restore them as separate placeholders since they may not have the same values once written
+        for node in list(onnx_model.graph.node):
+            if node.op_type == 'Identity' and node.input[0] in placeholders and node.output[0] in state_dict:
+                source = placeholders[node.input[0]]
+                initializer = onnx.TensorProto(name=node.output[0], data_type=source.data_type, dims=source.dims)
+                _set_external_data(initializer, location=node.output[0])
+                onnx_model.graph.initializer.append(initializer)
+                onnx_model.graph.node.remove(node)
+
+        cls._fold_transposed_initializer_placeholders(onnx_model.graph)
+        return restore_onnx_graph_initializers(onnx_model, inplace=True)
+
+    @staticmethod
+    def _fold_transposed_initializer_placeholders(onnx_graph: onnx.GraphProto):
+        """
+        Folds Transpose nodes of initializer placeholders into placeholders of the transposed tensors
+        as constant folding would do, recording the permutation to apply when the tensors are written.
+        :param onnx_graph: Onnx graph with initializer placeholders
+        """
+        placeholders = {initializer.name: initializer for initializer in onnx_graph.initializer
+                        if uses_external_data(initializer)}
+        folded_placeholders = set()
+        tensor_names = {name for node in onnx_graph.node for name in chain(node.input, node.output)}
+        tensor_names.update(placeholders)
+
+        for node in list(onnx_graph.node):
+            if node.op_type != 'Transpose' or node.input[0] not in placeholders:
+                continue
+            source = placeholders[node.input[0]]
+            external_data = {entry.key: entry.value for entry in source.external_data}
+
+            perm = [list(attr.ints) for attr in node.attribute if attr.name == 'perm']
+            perm = perm[0] if perm else list(reversed(range(len(source.dims))))
+            if 'perm' in external_data:
+                source_perm = [int(axis) for axis in external_data['perm'].split(',')]
+                perm = [source_perm[axis] for axis in perm]
+
+            name = f'onnx::Transpose_{len(tensor_names)}'
+            while name in tensor_names:
+                name += '_'
+            tensor_names.add(name)
+
+            initializer = onnx.TensorProto(name=name, data_type=source.data_type,
+                                           dims=[source.dims[axis] for axis in perm])
+            _set_external_data(initializer, location=external_data['location'],
+                               perm=','.join(str(axis) for axis in perm))
+            onnx_graph.initializer.append(initializer)
+            placeholders[name] = initializer
+            folded_placeholders.add(node.input[0])
+
+            onnx_graph.node.remove(node)
+            for consumer in onnx_graph.node:
+                for index, input_name in enumerate(consumer.input):
+                    if input_name == node.output[0]:
+                        consumer.input[index] = name
+
+        used_names = {name for node in onnx_graph.node for name in node.input}
+        used_names.update(output.name for output in onnx_graph.output)
+        for node in onnx_graph.node:
+            for attribute in node.attribute:
+                if getattr(attribute, 'g').name != '':
+                    used_names.update(name for subnode in attribute.g.node for name in subnode.input)
+
+        for name in folded_placeholders - used_names:
+            onnx_graph.initializer.remove(placeholders[name])
 
     @classmethod
     def load_simply_onnx_model(cls, filepath) -> onnx.ModelProto:
@@ -1639,6 +1923,22 @@ class OnnxSaver:
             except torch.onnx.CheckerError:
                 _logger.warning("ONNX Checker has failed but ONNX graph is still generated.")
 
+def _set_external_data(tensor: onnx.TensorProto, **external_data):
+    """
+    Points the tensor to external data.
+    Unlike onnx.external_data_helper.set_external_data, the tensor doesn't need to hold raw data.
+
+    :param tensor: ONNX tensor
+    :param external_data: External data entries such as location, offset and length
+    """
+    tensor.data_location = onnx.TensorProto.EXTERNAL
+    del tensor.external_data[:]
+    for key, value in external_data.items():
+        entry = tensor.external_data.add()
+        entry.key = key
+        entry.value = str(value)
+
+
 def save_initializer_restored_onnx_graph(original_model_path: str,
                                          restored_model_path: str):
     """
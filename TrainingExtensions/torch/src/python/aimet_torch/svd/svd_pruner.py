@@ -38,6 +38,7 @@
 """ Prunes layers using SpatialSvdModuleSplitter SVD scheme """
 
 import copy
+from typing import List, Optional
 
 import aimet_common.libpymo as pymo
 from aimet_common.utils import AimetLogger
@@ -47,6 +48,7 @@ import aimet_common.svd_pruner
 
 from aimet_torch import pymo_utils
 from aimet_torch.svd.svd_splitter import (
+    SvdFactorizationCache,
     SpatialSvdModuleSplitter,
     MoWeightSvdModuleSplitter,
     PyWeightSvdModuleSplitter
@@ -60,6 +62,19 @@ class SpatialSvdPruner(aimet_common.svd_pruner.SpatialSvdPruner):
     """
     Pruner for Spatial-SVD method
     """
+    supports_in_place_pruning = True
+
+    def __init__(self, svd_cache: Optional[SvdFactorizationCache] = None):
+        """
+        :param svd_cache: Cache of layer weight factorizations shared by all calls to prune a layer. If None, the SVD
+                          of a layer weight is recomputed every time the layer is split
+        """
+        self._svd_cache = svd_cache
+
+    def prepare_to_prune(self, layer_db: LayerDatabase, layers: List[Layer]):
+        if self._svd_cache is not None:
+            self._svd_cache.precompute(layers, SvdFactorizationCache.spatial)
+
     def _perform_svd_and_split_layer(self, layer: Layer, rank: int, comp_layer_db: LayerDatabase):
         """
         Performs spatial svd and splits given layer into two layers
@@ -69,7 +84,8 @@ class SpatialSvdPruner(aimet_common.svd_pruner.SpatialSvdPruner):
         :return: None
         """
         # Split module using Spatial SVD
-        module_a, module_b = SpatialSvdModuleSplitter.split_module(layer.module, rank)
+        module_a, module_b = SpatialSvdModuleSplitter.split_module(layer.module, rank, svd_cache=self._svd_cache,
+                                                                   name=layer.name)
 
         first_layer_shape = copy.copy(layer.output_shape)
 
@@ -89,6 +105,8 @@ class WeightSvdPruner(aimet_common.svd_pruner.WeightSvdPruner):
     """
     Pruner for Weight-SVD method
     """
+    supports_in_place_pruning = True
+
     # pylint: disable=no-self-use
     def _perform_svd_and_split_layer(self, layer: Layer, rank: int, cost_metric: CostMetric,
                                      comp_layer_db: LayerDatabase):
@@ -121,6 +139,19 @@ class PyWeightSvdPruner(aimet_common.svd_pruner.WeightSvdPruner):
     """
     Pruner for Weight-SVD method using numpy.
     """
+    supports_in_place_pruning = True
+
+    def __init__(self, svd_cache: Optional[SvdFactorizationCache] = None):
+        """
+        :param svd_cache: Cache of layer weight factorizations shared by all calls to prune a layer. If None, the SVD
+                          of a layer weight is recomputed every time the layer is split
+        """
+        self._svd_cache = svd_cache
+
+    def prepare_to_prune(self, layer_db: LayerDatabase, layers: List[Layer]):
+        if self._svd_cache is not None:
+            self._svd_cache.precompute(layers, SvdFactorizationCache.weight)
+
     # pylint: disable=no-self-use
     def _perform_svd_and_split_layer(self, layer: Layer, rank: int, cost_metric: CostMetric,
                                      comp_layer_db: LayerDatabase):
@@ -136,7 +167,8 @@ class PyWeightSvdPruner(aimet_common.svd_pruner.WeightSvdPruner):
                                                                                              cost_metric)
         # Split module using Weight SVD
         logger.info("Splitting module: %s with rank: %r", layer.name, rank)
-        module_a, module_b = PyWeightSvdModuleSplitter.split_module(layer.module, rank)
+        module_a, module_b = PyWeightSvdModuleSplitter.split_module(layer.module, rank, svd_cache=self._svd_cache,
+                                                                    name=layer.name)
 
         layer_a = Layer(module_a, layer.name + '.0', layer.output_shape)
         layer_b = Layer(module_b, layer.name + '.1', layer.output_shape)
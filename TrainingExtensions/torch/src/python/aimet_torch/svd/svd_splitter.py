@@ -39,6 +39,9 @@
 
 import abc
 import math
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Tuple
 import numpy as np
 import torch
 
@@ -48,42 +51,170 @@ from aimet_common.svd_pruner import SpatialSvdPruner, WeightSvdPruner
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Svd)
 
 
+class SvdFactorizationCache:
+    """
+    Caches the SVD factorization of layer weights so that split weights for any rank can be derived by slicing,
+    instead of recomputing the SVD of a layer for every rank that is tried.
+    Factorizations are computed in torch on the device of the layer weight and are keyed by layer name, so they
+    can be shared between copies of a model. A cached factorization is recomputed if the layer weight changed.
+    Lookups with the same weight tensor are validated by its version counter; only weights of other copies of the
+    model are compared by value, on the device of the weight.
+    """
+    spatial = 'spatial'
+    weight = 'weight'
+
+    def __init__(self):
+        self._factorizations = {}
+
+    def get_factorization(self, name: str, module: torch.nn.Module,
+                          scheme: str) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Returns the SVD factorization of the weight matrix of a given module, computing it if not cached
+
+        :param name: Name of the layer
+        :param module: Conv2d or Linear module of the layer
+        :param scheme: Either SvdFactorizationCache.spatial or SvdFactorizationCache.weight
+        :return: Tuple of (u, s, vh) such that the weight matrix is u @ diag(s) @ vh
+        """
+        # pylint: disable=protected-access
+        param = module.weight
+        weight = param.detach()
+        cached = self._factorizations.get((name, scheme))
+
+        if cached is not None:
+            param_ref, version, cached_weight, factorization = cached
+            if param_ref() is param and version == param._version:
+                return factorization
+
+            if cached_weight.shape == weight.shape and torch.equal(cached_weight.to(weight.device), weight):
+                self._factorizations[(name, scheme)] = (weakref.ref(param), param._version, cached_weight,
+                                                        factorization)
+                return factorization
+
+        matrix = self._get_weight_matrix(weight, scheme)
+        if matrix.dtype not in (torch.float32, torch.float64):
+            matrix = matrix.float()
+
+        factorization = torch.linalg.svd(matrix, full_matrices=False)  # pylint: disable=not-callable
+        self._factorizations[(name, scheme)] = (weakref.ref(param), param._version, weight.to('cpu', copy=True),
+                                                tuple(factorization))
+
+        return tuple(factorization)
+
+    def precompute(self, layers: Iterable, scheme: str, num_workers: Optional[int] = None):
+        """
+        Computes the factorizations of the given layers in parallel
+
+        :param layers: Layers to factorize
+        :param scheme: Either SvdFactorizationCache.spatial or SvdFactorizationCache.weight
+        :param num_workers: Maximum number of worker threads. Defaults to the ThreadPoolExecutor default
+        """
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            list(executor.map(lambda layer: self.get_factorization(layer.name, layer.module, scheme), layers))
+
+    def clear(self):
+        """
+        Removes all cached factorizations
+        """
+        self._factorizations.clear()
+
+    @staticmethod
+    def _get_weight_matrix(weight: torch.Tensor, scheme: str) -> torch.Tensor:
+        """
+        Reshapes a weight tensor into the 2D matrix that is decomposed by the given SVD scheme
+
+        :param weight: Conv2d or Linear weight
+        :param scheme: Either SvdFactorizationCache.spatial or SvdFactorizationCache.weight
+        :return: Weight matrix
+        """
+        if scheme == SvdFactorizationCache.spatial:
+            out_channels, in_channels, height, width = weight.shape
+            # in_channels height out_channels width
+            return weight.permute(1, 2, 0, 3).reshape(in_channels * height, out_channels * width)
+
+        if scheme == SvdFactorizationCache.weight:
+            if weight.dim() == 4:
+                # in_channels x (out_channels * kernel_h * kernel_w)
+                return weight.permute(1, 0, 2, 3).reshape(weight.shape[1], -1)
+            return weight.transpose(1, 0)
+
+        raise ValueError(f"Unknown SVD scheme: {scheme}")
+
+
 class SpatialSvdModuleSplitter:
     """
     Spatial SVD module splitter
     """
     @staticmethod
-    def split_module(module: torch.nn.Module, rank: int):
+    def split_module(module: torch.nn.Module, rank: int, svd_cache: Optional[SvdFactorizationCache] = None,
+                     name: Optional[str] = None):
         """
         :param module: Module to be split
         :param rank: rank for splitting
+        :param svd_cache: If given, split weights are sliced from the cached factorization of the module weight
+        :param name: Name of the module. Required if svd_cache is given
         :return: Two split modules
         """
         assert isinstance(module, torch.nn.Conv2d)
         assert module.dilation == (1, 1)
 
-        weight_tensor = module.weight.detach().cpu().numpy()  # n c h w
-        out_channels, in_channels, height, width = weight_tensor.shape
+        out_channels, in_channels, height, width = module.weight.shape
 
-        h, v = SpatialSvdPruner.lingalg_spatial_svd(weight_tensor, rank, in_channels, out_channels,
-                                                    height, width)
+        if svd_cache is not None:
+            factorization = svd_cache.get_factorization(name, module, SvdFactorizationCache.spatial)
+            h, v = SpatialSvdModuleSplitter._slice_spatial_svd(factorization, rank, in_channels, out_channels,
+                                                               height, width)
+        else:
+            weight_tensor = module.weight.detach().cpu().numpy()  # n c h w
+            h, v = SpatialSvdPruner.lingalg_spatial_svd(weight_tensor, rank, in_channels, out_channels,
+                                                        height, width)
+            h, v = torch.FloatTensor(h), torch.FloatTensor(v)
 
         first_module = torch.nn.Conv2d(in_channels=module.in_channels,
                                        out_channels=rank, kernel_size=(height, 1),
                                        stride=(module.stride[0], 1),
                                        padding=(module.padding[0], 0), dilation=1, bias=False)
-        first_module.weight.data = torch.FloatTensor(v).to(device=module.weight.device)
+        first_module.weight.data = v.to(device=module.weight.device, dtype=torch.float32).contiguous()
 
         second_module = torch.nn.Conv2d(in_channels=rank,
                                         out_channels=module.out_channels, kernel_size=(1, width),
                                         stride=(1, module.stride[1]),
                                         padding=(0, module.padding[1]), dilation=1, bias=module.bias is not None)
-        second_module.weight.data = torch.FloatTensor(h).to(device=module.weight.device)
+        second_module.weight.data = h.to(device=module.weight.device, dtype=torch.float32).contiguous()
         if module.bias is not None:
             second_module.bias.data = module.bias.data
 
         return first_module, second_module
 
+    @staticmethod
+    def _slice_spatial_svd(factorization: Tuple[torch.Tensor, torch.Tensor, torch.Tensor], rank: int,
+                           in_channels: int, out_channels: int, height: int,
+                           width: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Torch equivalent of SpatialSvdPruner.lingalg_spatial_svd() given a precomputed factorization
+
+        :param factorization: Tuple of (u, s, vh) of the spatial SVD weight matrix
+        :param rank: Rank to use for svd split
+        :param in_channels: Number of in-channels
+        :param out_channels: Number of out-channels
+        :param height: Kernel height
+        :param width: Kernel width
+        :return: Tuple of split tensors (shape: out_chan, in_chan, height, width)
+        """
+        assert rank <= in_channels * height
+
+        u, s, vh = factorization
+        sqrt_s = torch.sqrt(s[:rank])
+        v = u[:, :rank] * sqrt_s
+        h = sqrt_s.reshape(rank, 1) * vh[:rank, :]
+
+        # rank out_channels width 1 -> out_channels rank 1 width
+        h = h.reshape(rank, out_channels, width, 1).permute(1, 0, 3, 2)
+        # in_channels 1 height rank -> rank in_channels height 1
+        v = v.reshape(in_channels, 1, height, rank).permute(3, 0, 2, 1)
+
+        return h, v
+
 
 class WeightSvdModuleSplitter(abc.ABC):
     """
@@ -319,26 +450,35 @@ class PyWeightSvdModuleSplitter(WeightSvdModuleSplitter):
     """
     # pylint:disable=arguments-differ
     @classmethod
-    def split_conv_module(cls, module: torch.nn.Module, rank: int) -> (torch.nn.Module, torch.nn.Module):
+    def split_conv_module(cls, module: torch.nn.Module, rank: int, svd_cache: Optional[SvdFactorizationCache] = None,
+                          name: Optional[str] = None) -> (torch.nn.Module, torch.nn.Module):
         """
         Split a given module using weight svd.
         :param module: Module to be split
         :param rank: rank for splitting
+        :param svd_cache: If given, split weights are sliced from the cached factorization of the module weight
+        :param name: Name of the module. Required if svd_cache is given
         :return:
         """
-        weight = module.weight.detach().cpu()
-        weight = weight.permute(1, 0, 2, 3).numpy()
-        nkk_shape = weight.shape[-3:]
-        nkk = math.prod(nkk_shape)
-        weight = weight.reshape(weight.shape[0], nkk)
+        nkk_shape = module.weight.permute(1, 0, 2, 3).shape[-3:]
+
+        if svd_cache is not None:
+            # Slice the cached factorization of the weight matrix.
+            factorization = svd_cache.get_factorization(name, module, SvdFactorizationCache.weight)
+            weight_1, weight_2 = cls._slice_weight_svd(factorization, rank)
+        else:
+            weight = module.weight.detach().cpu()
+            weight = weight.permute(1, 0, 2, 3).numpy()
+            nkk = math.prod(nkk_shape)
+            weight = weight.reshape(weight.shape[0], nkk)
 
-        # Split weight matrix.
-        weight_1, weight_2 = WeightSvdPruner.lingalg_weight_svd(weight, rank)
+            # Split weight matrix.
+            weight_1, weight_2 = WeightSvdPruner.lingalg_weight_svd(weight, rank)
+            weight_1, weight_2 = torch.from_numpy(weight_1), torch.from_numpy(weight_2)
 
-        weight_1 = torch.from_numpy(weight_1).unsqueeze(-1).unsqueeze(-1)
+        weight_1 = weight_1.unsqueeze(-1).unsqueeze(-1)
         weight_1 = weight_1.permute(1, 0, 2, 3)
 
-        weight_2 = torch.from_numpy(weight_2)
         weight_2 = weight_2.reshape(weight_2.shape[0], *nkk_shape)
         weight_2 = weight_2.permute(1, 0, 2, 3)
 
@@ -355,22 +495,31 @@ class PyWeightSvdModuleSplitter(WeightSvdModuleSplitter):
 
     # pylint:disable=arguments-differ
     @classmethod
-    def split_fc_module(cls, module: torch.nn.Module, rank: int) -> (torch.nn.Module, torch.nn.Module):
+    def split_fc_module(cls, module: torch.nn.Module, rank: int, svd_cache: Optional[SvdFactorizationCache] = None,
+                        name: Optional[str] = None) -> (torch.nn.Module, torch.nn.Module):
         """
         Split a given module using weight svd.
 
         :param module: Module to be split
         :param rank: rank for splitting
+        :param svd_cache: If given, split weights are sliced from the cached factorization of the module weight
+        :param name: Name of the module. Required if svd_cache is given
         :return:
         """
-        weight = module.weight.detach().cpu().numpy()
-        weight = weight.transpose(1, 0)
+        if svd_cache is not None:
+            # Slice the cached factorization of the weight matrix.
+            factorization = svd_cache.get_factorization(name, module, SvdFactorizationCache.weight)
+            weight_1, weight_2 = cls._slice_weight_svd(factorization, rank)
+        else:
+            weight = module.weight.detach().cpu().numpy()
+            weight = weight.transpose(1, 0)
 
-        # Split weight matrix.
-        weight_1, weight_2 = WeightSvdPruner.lingalg_weight_svd(weight, rank)
+            # Split weight matrix.
+            weight_1, weight_2 = WeightSvdPruner.lingalg_weight_svd(weight, rank)
+            weight_1, weight_2 = torch.from_numpy(weight_1), torch.from_numpy(weight_2)
 
-        weight_1 = torch.from_numpy(weight_1).transpose(1, 0)
-        weight_2 = torch.from_numpy(weight_2).transpose(1, 0)
+        weight_1 = weight_1.transpose(1, 0)
+        weight_2 = weight_2.transpose(1, 0)
 
         # Split the FC into two modules.
         fc_a, fc_b = cls.create_fc_modules(module, rank)
@@ -383,6 +532,22 @@ class PyWeightSvdModuleSplitter(WeightSvdModuleSplitter):
 
         return fc_a, fc_b
 
+    @staticmethod
+    def _slice_weight_svd(factorization: Tuple[torch.Tensor, torch.Tensor, torch.Tensor],
+                          rank: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Torch equivalent of WeightSvdPruner.lingalg_weight_svd() given a precomputed factorization
+
+        :param factorization: Tuple of (u, s, vh) of the weight matrix
+        :param rank: rank for splitting
+        :return: Tuple of split weight matrices
+        """
+        u, s, vh = factorization
+        if rank > min(u.shape[0], vh.shape[1]):
+            raise ValueError(f"Specified rank: {rank} is invalid.")
+
+        return u[:, :rank], s[:rank].reshape(rank, 1) * vh[:rank, :]
+
     @staticmethod
     def _update_bias(module: torch.nn.Module, module_1: torch.nn.Module, module_2: torch.nn.Module):
         """
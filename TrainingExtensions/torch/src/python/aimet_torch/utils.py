@@ -38,8 +38,10 @@
 
 import importlib
 import inspect
+import io
 import itertools
 import json
+import math
 from typing import List, Tuple, Union, Dict, Callable, Any, Iterable, Optional, TextIO, Literal
 import contextlib
 import os
@@ -49,6 +51,7 @@ import functools
 import logging
 import warnings
 
+import numpy as np
 from safetensors.numpy import load as load_safetensor
 import torch.nn
 import torch
@@ -221,11 +224,7 @@ class CachedDataset(Dataset):
 
     def __getitem__(self, index: int):
         path = os.path.join(self._path, 'model_inputs_' + str(index))
-
-        with open(path, 'rb') as file:
-            batch = pickle.load(file)
-
-        return batch
+        return load_from_cache(path)
 
     def __iter__(self):
         for i in range(self.__len__()):
@@ -235,13 +234,8 @@ class CachedDataset(Dataset):
         """
         Function to cache number of batches individually in separate file at provided path location
         """
-        if not os.path.exists(self._path):
-            os.makedirs(self._path)
-
         for i, batch in enumerate(data_loader):
-            path = os.path.join(self._path, f'model_inputs_{i}')
-            with open(path, 'wb') as file:
-                pickle.dump(batch, file)
+            save_to_cache(batch, self._path, i)
 
         logger.info('Caching %d batches from data loader at path location: %s', self._num_batches, self._path)
 
@@ -842,18 +836,126 @@ def disable_all_quantizers(model: torch.nn.Module):
         raise
 
 
+_TENSOR_STORE_MAGIC = b'AIMETTS\x01'
+_TENSOR_STORE_ALIGNMENT = 64
+
+
+def _align(nbytes: int) -> int:
+    return -(-nbytes // _TENSOR_STORE_ALIGNMENT) * _TENSOR_STORE_ALIGNMENT
+
+
+class _TensorStorePickler(pickle.Pickler):
+    """
+    Pickler that leaves out the data of torch.Tensors from the pickle stream.
+    Tensor data is instead laid out back-to-back so that it can be written to file as-is.
+    """
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.tensors = []
+        self.nbytes = 0
+        self._persistent_ids = {}
+
+    def persistent_id(self, obj):
+        # Tensor subclasses and tensors without plain strided storage are pickled as usual
+        # pylint: disable=unidiomatic-typecheck
+        if type(obj) is not torch.Tensor or obj.layout != torch.strided or obj.is_quantized:
+            return None
+
+        if id(obj) not in self._persistent_ids:
+            tensor = obj.detach().cpu().contiguous()
+            self._persistent_ids[id(obj)] = (self.nbytes, obj.dtype, tuple(obj.shape),
+                                             obj.requires_grad, str(obj.device))
+            self.tensors.append((obj, tensor))
+            self.nbytes += _align(tensor.numel() * tensor.element_size())
+
+        return self._persistent_ids[id(obj)]
+
+
+class _TensorStoreUnpickler(pickle.Unpickler):
+    """
+    Unpickler that restores torch.Tensors as zero-copy views of the memory-mapped tensor data
+    """
+    def __init__(self, file, buffer: Optional[torch.Tensor]):
+        super().__init__(file)
+        self._buffer = buffer
+
+    def persistent_load(self, pid):
+        offset, dtype, shape, requires_grad, device = pid
+        numel = math.prod(shape)
+
+        if numel == 0:
+            tensor = torch.empty(shape, dtype=dtype)
+        else:
+            nbytes = numel * torch.empty((), dtype=dtype).element_size()
+            tensor = self._buffer[offset:offset + nbytes].view(dtype).view(shape)
+
+        if device != 'cpu':
+            tensor = tensor.to(device)
+
+        return tensor.requires_grad_(requires_grad)
+
+
 def save_to_cache(tensor, dir_path, idx):
     """
-    Save tensor data into provided path with index
-    :param tensor: Tensor
+    Save tensor data into provided path with index.
+
+    Data of torch.Tensors are packed back-to-back in a single file after a small pickled header
+    so that they can be memory-mapped when loaded again. All the other objects are pickled in the header.
+
+    :param tensor: Tensor, or any picklable nested structure of tensors
     :param dir_path: Provided path to save data
     :param idx: Index of the file
     """
-    if not os.path.exists(dir_path):
-        os.makedirs(dir_path)
+    os.makedirs(dir_path, exist_ok=True)
     path = os.path.join(dir_path, f'model_inputs_{idx}')
-    with open(path, 'wb') as cache:
-        pickle.dump(tensor, cache)
+
+    header = io.BytesIO()
+    pickler = _TensorStorePickler(header)
+    pickler.dump(tensor)
+    header = header.getvalue()
+
+    data_offset = _align(len(_TENSOR_STORE_MAGIC) + 8 + len(header))
+
+    # Write to a temporary file first so that previously loaded views of the cache file,
+    # which are backed by the file on disk, stay valid after the cache file is replaced
+    tmp_path = os.path.join(dir_path, f'.model_inputs_{idx}.tmp')
+    with open(tmp_path, 'wb') as cache:
+        cache.write(_TENSOR_STORE_MAGIC)
+        cache.write(len(header).to_bytes(8, 'little'))
+        cache.write(header)
+        for _, data in pickler.tensors:
+            cache.seek(data_offset)
+            if data.numel() > 0:
+                cache.write(data.reshape(-1).view(torch.uint8).numpy())
+            data_offset += _align(data.numel() * data.element_size())
+        cache.truncate(data_offset)
+
+    os.replace(tmp_path, path)
+
+
+def load_from_cache(path: str):
+    """
+    Load data saved with save_to_cache.
+    Tensors are returned as copy-on-write views of the memory-mapped file; reading them doesn't copy the data.
+    Files written as plain pickle are loaded as-is.
+
+    :param path: Path to the cache file
+    :return: Cached data
+    """
+    with open(path, 'rb') as cache:
+        if cache.read(len(_TENSOR_STORE_MAGIC)) != _TENSOR_STORE_MAGIC:
+            cache.seek(0)
+            return pickle.load(cache)
+
+        header_size = int.from_bytes(cache.read(8), 'little')
+        header = cache.read(header_size)
+
+    data_offset = _align(len(_TENSOR_STORE_MAGIC) + 8 + header_size)
+    buffer = None
+    if os.path.getsize(path) > data_offset:
+        buffer = torch.from_numpy(np.memmap(path, dtype=np.uint8, mode='c', offset=data_offset))
+
+    return _TensorStoreUnpickler(io.BytesIO(header), buffer).load()
 
 
 def get_named_module(model, name):
@@ -141,19 +141,31 @@ class SequentialMse(SequentialMseBase):
         per_channel_min, per_channel_max = cls.get_per_channel_min_and_max(quant_module)
         candidates = cls.get_candidates(params.num_candidates, per_channel_max, per_channel_min)
 
-        total_loss = []
-        for cand_max, cand_min in candidates:
-            cls.compute_param_encodings(quant_module.param_quantizers['weight'], cand_min, cand_max)
+        if params.memory_budget is not None:
+            # Evaluate all the candidates at once on chunks of the inputs
             w = quant_module.weight
-            wq = cls._get_quantized_weight(quant_module)
-            loss = torch.zeros(len(cand_max), device=w.device)
             with torch.no_grad():
-                for batch_idx in range(params.num_batches):
-                    xqwq, xw = cls.compute_outputs(quant_module, x[batch_idx], xq[batch_idx], w, wq)
-                    loss += cls.compute_recon_loss(xqwq, xw, params)
-                total_loss.append(loss)
-
-        best_indices = torch.stack(total_loss).min(0, keepdim=True)[1]
+                wq = []
+                for cand_max, cand_min in candidates:
+                    cls.compute_param_encodings(quant_module.param_quantizers['weight'], cand_min, cand_max)
+                    wq.append(cls._get_quantized_weight(quant_module))
+                total_loss = cls.compute_recon_loss_in_chunks(quant_module, x, xq, w, torch.stack(wq),
+                                                              w.shape[1], params).squeeze(-1)
+        else:
+            total_loss = []
+            for cand_max, cand_min in candidates:
+                cls.compute_param_encodings(quant_module.param_quantizers['weight'], cand_min, cand_max)
+                w = quant_module.weight
+                wq = cls._get_quantized_weight(quant_module)
+                loss = torch.zeros(len(cand_max), device=w.device)
+                with torch.no_grad():
+                    for batch_idx in range(params.num_batches):
+                        xqwq, xw = cls.compute_outputs(quant_module, x[batch_idx], xq[batch_idx], w, wq)
+                        loss += cls.compute_recon_loss(xqwq, xw, params)
+                    total_loss.append(loss)
+            total_loss = torch.stack(total_loss)
+
+        best_indices = total_loss.min(0, keepdim=True)[1]
         _logger.debug("Indices of optimal candidate: %s", best_indices.squeeze(0)[:params.num_candidates].tolist())
         best_max = torch.stack([cand_max for cand_max, _ in candidates]).gather(0, best_indices)[0]
         best_min = torch.stack([cand_min for _, cand_min in candidates]).gather(0, best_indices)[0]
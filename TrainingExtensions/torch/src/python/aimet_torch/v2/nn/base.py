@@ -40,6 +40,7 @@ import abc
 import contextlib
 import inspect
 import itertools
+import weakref
 from typing import Type, List, Dict, Union, Iterable, Mapping, Optional
 
 import torch
@@ -61,6 +62,31 @@ def _no_op(in_tensor):
     return in_tensor
 
 
+# Quantized parameters cached for inference.
+# quantized module -> {param_name: (param, param_quantizer, cache key, quantized param)}
+_quantized_param_cache = weakref.WeakKeyDictionary()
+
+
+def _is_compiling() -> bool:
+    # pylint: disable=protected-access
+    return torch.jit.is_tracing() or torch.jit.is_scripting() or torch._dynamo.is_compiling()
+
+
+def _get_quantized_param_cache_key(param: torch.Tensor, param_quantizer: QuantizerBase) -> tuple:
+    """
+    Returns the state that determines the output of param_quantizer(param).
+    Any in-place update of the parameter or the quantization parameters bumps their version counters,
+    and any change of the quantizer configuration (bitwidth, symmetry, ...) changes its attributes.
+    """
+    # pylint: disable=protected-access
+    tensors = itertools.chain((param,), param_quantizer.parameters(), param_quantizer.buffers())
+    return (
+        tuple((id(tensor), tensor._version, tensor.data_ptr(), tensor.dtype, tensor.device) for tensor in tensors),
+        tuple((key, value) for key, value in vars(param_quantizer).items()
+              if isinstance(value, (bool, int, float, str, tuple, type(None)))),
+    )
+
+
 class UnknownModuleError(RuntimeError):
     """
     Exception thrown when an unknown module is encountered
@@ -206,6 +232,14 @@ class BaseQuantizationMixin(abc.ABC):
     cls_to_qcls: dict
     qcls_to_cls: dict
 
+    # If True, quantized parameters are cached while gradient computation is disabled,
+    # so that repeated evaluations quantize the parameters only once.
+    # Cached parameters are invalidated once the parameters or the param quantizers change.
+    # Disabled by default since the cache holds a quantized copy of every parameter.
+    # Can be enabled per module by setting this attribute of the module instance,
+    # or for a whole model with QuantizationSimModel(..., cache_quantized_params=True)
+    CACHE_QUANTIZED_PARAMS_IN_INFERENCE = False
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.__quant_init__()
@@ -242,16 +276,42 @@ class BaseQuantizationMixin(abc.ABC):
         return super().forward(*args, **kwargs)
 
     def _patch_quantized_parameters(self):
+        use_cache = self.CACHE_QUANTIZED_PARAMS_IN_INFERENCE and not torch.is_grad_enabled() and not _is_compiling()
+        if not use_cache:
+            _quantized_param_cache.pop(self, None)
+
         stack = contextlib.ExitStack()
         for param_name, param_quantizer in self.param_quantizers.items():
             if param_quantizer and param_quantizer.is_initialized():
                 orig_param = getattr(self, param_name)
-                quantized_param = param_quantizer(orig_param)
+                if use_cache:
+                    quantized_param = self._get_cached_quantized_param(param_name, orig_param, param_quantizer)
+                else:
+                    quantized_param = param_quantizer(orig_param)
                 ctx = patch_attr(self, param_name, quantized_param)
                 stack.enter_context(ctx)
 
         return stack
 
+    def _get_cached_quantized_param(self, param_name: str, param: torch.Tensor, param_quantizer: QuantizerBase):
+        """
+        Returns param_quantizer(param), reusing the output of the previous call
+        if neither the parameter nor the param quantizer has changed since then.
+        """
+        if param is None or 'forward' in vars(param_quantizer):
+            # Parameter quantizer is patched (e.g. during compute_encodings)
+            return param_quantizer(param)
+
+        cache = _quantized_param_cache.setdefault(self, {})
+        key = _get_quantized_param_cache_key(param, param_quantizer)
+        cached_param, cached_quantizer, cached_key, quantized_param = cache.get(param_name, (None, None, None, None))
+
+        if cached_param is not param or cached_quantizer is not param_quantizer or cached_key != key:
+            quantized_param = param_quantizer(param)
+            cache[param_name] = (param, param_quantizer, key, quantized_param)
+
+        return quantized_param
+
     def _compute_param_encodings(self, overwrite: bool):
         """
         :param bool overwrite: If True, the quantizers that are already initialized will also recompute encodings.
@@ -0,0 +1,481 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+# pylint: disable=redefined-builtin
+""" Integer kernels for true-quant modules """
+
+import functools
+from typing import Optional, Tuple, Union
+
+import torch
+import torch.nn.functional as F
+from torch import Tensor
+from torch.nn.modules.utils import _pair
+
+from aimet_torch.v2.quantization.base import EncodingBase
+from aimet_torch.v2.quantization.affine import AffineEncoding
+from aimet_torch.v2.quantization.tensor import QuantizedTensorBase, QuantizedTensor
+from aimet_torch.v2.utils import _ContextManager
+from .true_quant import QuantizedLinear, QuantizedConv2d
+from .modules.custom import QuantizedMatMul, QuantizedAdd
+
+
+__all__ = ['int_linear', 'int_conv2d', 'int_matmul', 'int_add', 'set_int_kernels']
+
+
+# Largest integer magnitudes that float32/float64 GEMMs can accumulate without rounding error
+_FLOAT32_EXACT_BOUND = 2 ** 24
+_FLOAT64_EXACT_BOUND = 2 ** 53
+
+
+@functools.lru_cache(maxsize=None)
+def _is_int_mm_available(device: torch.device) -> bool:
+    """
+    Returns True if torch._int_mm (int8 x int8 -> int32 GEMM) is supported on the given device.
+    In older versions of pytorch, torch._int_mm is only supported on CUDA.
+    """
+    if not hasattr(torch, '_int_mm'):
+        return False
+
+    try:
+        a = torch.zeros(32, 32, dtype=torch.int8, device=device)
+        torch._int_mm(a, a) # pylint: disable=protected-access
+    except RuntimeError:
+        return False
+
+    return True
+
+
+def _int_mm_supports_shape(m: int, k: int, n: int, device: torch.device) -> bool:
+    """
+    Returns True if torch._int_mm supports multiplying (M, K) and (K, N) matrices on the given device.
+    On CUDA, torch._int_mm requires M > 16 and K, N to be multiples of 8.
+    """
+    if device.type == 'cuda':
+        return m > 16 and k % 8 == 0 and n % 8 == 0
+    return True
+
+
+def _is_supported_encoding(encoding: Optional[EncodingBase]) -> bool:
+    if not isinstance(encoding, AffineEncoding) or encoding.block_size is not None:
+        return False
+    offset = encoding.offset
+    return bool(torch.equal(offset, offset.round()))
+
+
+def _is_per_tensor(qtensor: Tensor) -> bool:
+    return isinstance(qtensor, QuantizedTensor) and \
+           _is_supported_encoding(qtensor.encoding) and \
+           qtensor.encoding.scale.numel() == 1
+
+
+def _is_per_channel(qtensor: Tensor, axis: int) -> bool:
+    """
+    Returns True if the encoding of qtensor is per-tensor or per-channel along the given axis
+    """
+    if not isinstance(qtensor, QuantizedTensor) or not _is_supported_encoding(qtensor.encoding):
+        return False
+
+    scale = qtensor.encoding.scale
+    if scale.dim() > qtensor.dim():
+        return False
+
+    shape = (1,) * (qtensor.dim() - scale.dim()) + tuple(scale.shape)
+    return all(size == 1 for dim, size in enumerate(shape) if dim != axis % qtensor.dim())
+
+
+def _quantize_if_dequantized(tensor):
+    if isinstance(tensor, QuantizedTensorBase) and tensor.encoding is not None:
+        return tensor.quantize()
+    return tensor
+
+
+def _per_channel_params(qtensor: QuantizedTensor, axis: int) -> Tuple[Tensor, Tensor]:
+    """
+    Returns scale and offset of qtensor as 1D tensors along the given axis
+    """
+    encoding = qtensor.encoding
+    num_channels = qtensor.shape[axis]
+    scale = encoding.scale.as_subclass(Tensor).double()
+    offset = encoding.offset.as_subclass(Tensor).double()
+    scale = scale.reshape(-1).expand(num_channels) if scale.numel() == 1 else scale.reshape(-1)
+    offset = offset.reshape(-1).expand(num_channels) if offset.numel() == 1 else offset.reshape(-1)
+    return scale, offset
+
+
+def _magnitude(encoding: AffineEncoding) -> int:
+    """
+    Returns the largest possible magnitude of (q + offset) where q is quantized with the given encoding
+    """
+    offset = encoding.offset.as_subclass(Tensor)
+    return int(torch.maximum((encoding.qmin + offset).abs(), (encoding.qmax + offset).abs()).max())
+
+
+def _int8_shift(qmin: int, qmax: int) -> Optional[int]:
+    """
+    Returns the shift that maps the range [qmin, qmax] into [-128, 127], or None if it doesn't fit.
+    """
+    shift = -128 - qmin
+    if qmax + shift > 127:
+        return None
+    return shift
+
+
+def _affine_matmul(a: Tensor, offset_a: Tensor, qrange_a: Tuple[int, int],
+                   b: Tensor, offset_b: Tensor, qrange_b: Tuple[int, int],
+                   bound: int) -> Tensor:
+    """
+    Computes (a + offset_a) @ (b + offset_b) exactly with integer accumulation.
+
+    :param a: Quantized values of shape (..., M, K)
+    :param offset_a: Integer offset of a that broadcasts to a
+    :param qrange_a: (qmin, qmax) of a
+    :param b: Quantized values of shape (..., K, N)
+    :param offset_b: Integer offset of b that broadcasts to b
+    :param qrange_b: (qmin, qmax) of b
+    :param bound: Upper bound of the magnitude of every partial sum
+    :return: Integer accumulator in int64
+    """
+    shift_a = _int8_shift(*qrange_a)
+    shift_b = _int8_shift(*qrange_b)
+
+    if a.dim() == 2 and b.dim() == 2 and shift_a is not None and shift_b is not None and \
+            offset_a.numel() == 1 and a.shape[1] * 128 * 128 < 2 ** 31 and \
+            _is_int_mm_available(a.device) and _int_mm_supports_shape(*a.shape, b.shape[1], a.device):
+        # Expand (a' + c_a) @ (b' + c_b) into the int8 GEMM a' @ b' plus zero-point correction terms
+        # where a' and b' are shifted into int8 range
+        a_int8 = (a + shift_a).to(torch.int8)
+        b_int8 = (b + shift_b).to(torch.int8)
+        try:
+            acc = torch._int_mm(a_int8, b_int8).to(torch.int64) # pylint: disable=protected-access
+        except RuntimeError:
+            # Shape, layout or dtype not supported by the int8 GEMM of the backend.
+            # Fall back to the floating-point GEMM below
+            acc = None
+
+        if acc is not None:
+            c_a = (offset_a.reshape(()) - shift_a).to(torch.int64)
+            c_b = (offset_b.reshape(1, -1) - shift_b).to(torch.int64)
+            acc += c_b * a_int8.sum(dim=1, keepdim=True, dtype=torch.int64)
+            acc += c_a * b_int8.sum(dim=0, keepdim=True, dtype=torch.int64)
+            acc += a.shape[1] * c_a * c_b
+            return acc
+
+    if bound < _FLOAT32_EXACT_BOUND:
+        dtype = torch.float32
+    elif bound < _FLOAT64_EXACT_BOUND:
+        dtype = torch.float64
+    else:
+        dtype = torch.int64
+
+    a = a.to(dtype) + offset_a.to(dtype)
+    b = b.to(dtype) + offset_b.to(dtype)
+    return torch.matmul(a, b).to(torch.int64)
+
+
+def _quantize_bias(bias: Optional[Tensor], scale: Tensor) -> Optional[Tensor]:
+    """
+    Quantizes bias into int32 with scale = input_scale * weight_scale
+    """
+    if bias is None:
+        return None
+    if isinstance(bias, QuantizedTensorBase):
+        bias = bias.dequantize()
+    bias = bias.as_subclass(Tensor).double()
+    int32 = torch.iinfo(torch.int32)
+    return torch.round(bias / scale).clamp(int32.min, int32.max).to(torch.int64)
+
+
+def _requantize(acc: Tensor, scale: Tensor, output_encodings: Optional[EncodingBase], dtype: torch.dtype):
+    """
+    Requantizes the int64 accumulator with the output encodings
+    """
+    output = acc.double() * scale
+    return _quantize_output(output, output_encodings, dtype)
+
+
+def _quantize_output(output: Tensor, output_encodings: Optional[EncodingBase], dtype: torch.dtype):
+    if output_encodings is None:
+        return output.to(dtype)
+
+    output = output_encodings.quantize(output).to(dtype)
+    output = output.as_subclass(QuantizedTensor)
+    output.encoding = output_encodings
+    return output
+
+
+def _fallback(fn, *args, output_encodings: Optional[EncodingBase] = None, **kwargs):
+    """
+    Runs the floating-point kernel with dequantized inputs for the inputs not supported by the integer kernels
+    """
+    args = tuple(x.dequantize().as_subclass(Tensor) if isinstance(x, QuantizedTensorBase) else x for x in args)
+    kwargs = {
+        key: x.dequantize().as_subclass(Tensor) if isinstance(x, QuantizedTensorBase) else x
+        for key, x in kwargs.items()
+    }
+    output = fn(*args, **kwargs)
+    return _quantize_output(output, output_encodings, output.dtype)
+
+
+def _qrange(qtensor: QuantizedTensor) -> Tuple[int, int]:
+    return qtensor.encoding.qmin, qtensor.encoding.qmax
+
+
+def int_linear(input: Tensor, weight: Tensor, bias: Optional[Tensor] = None, *,
+               output_encodings: Optional[EncodingBase] = None):
+    """
+    Integer kernel for :class:`QuantizedLinear`.
+
+    Multiplies the quantized input and weight with int32 accumulation, adds the bias quantized to int32,
+    and requantizes the accumulator with ``output_encodings``.
+    Input should be quantized per-tensor and weight per-tensor or per-output-channel.
+    Otherwise, falls back to the floating-point kernel with dequantized inputs.
+
+    :param input: Quantized input
+    :param weight: Quantized weight
+    :param bias: Bias in floating point
+    :param output_encodings: Output encodings. If None, returns the output in floating point
+    :return: Output quantized with ``output_encodings``
+    """
+    input = _quantize_if_dequantized(input)
+    weight = _quantize_if_dequantized(weight)
+
+    if not _is_per_tensor(input) or not _is_per_channel(weight, axis=0) or weight.dim() != 2:
+        return _fallback(F.linear, input, weight, bias, output_encodings=output_encodings)
+
+    in_features = input.shape[-1]
+    x = input.as_subclass(Tensor).reshape(-1, in_features)
+    w = weight.as_subclass(Tensor)
+    scale_w, offset_w = _per_channel_params(weight, axis=0)
+    bound = in_features * _magnitude(input.encoding) * _magnitude(weight.encoding)
+
+    acc = _affine_matmul(x, input.encoding.offset.as_subclass(Tensor), _qrange(input),
+                         w.t(), offset_w, _qrange(weight),
+                         bound)
+    scale = input.encoding.scale.as_subclass(Tensor).double().reshape(()) * scale_w
+
+    if bias is not None:
+        acc += _quantize_bias(bias, scale)
+
+    acc = acc.reshape(*input.shape[:-1], weight.shape[0])
+    return _requantize(acc, scale, output_encodings, input.dtype)
+
+
+def int_conv2d(input: Tensor, weight: Tensor, bias: Optional[Tensor] = None,
+               stride: Union[int, Tuple[int, int]] = 1,
+               padding: Union[int, Tuple[int, int]] = 0,
+               dilation: Union[int, Tuple[int, int]] = 1,
+               groups: int = 1, *,
+               output_encodings: Optional[EncodingBase] = None):
+    """
+    Integer kernel for :class:`QuantizedConv2d`.
+
+    Lowers convolution to integer matrix multiplication over the unfolded input (im2col)
+    with int32 accumulation, and requantizes the accumulator with ``output_encodings``.
+    Input should be quantized per-tensor and weight per-tensor or per-output-channel.
+    Otherwise, falls back to the floating-point kernel with dequantized inputs.
+
+    :param input: Quantized input
+    :param weight: Quantized weight
+    :param bias: Bias in floating point
+    :param stride: Stride of the convolution
+    :param padding: Implicit zero padding on both sides of the input
+    :param dilation: Spacing between kernel elements
+    :param groups: Number of blocked connections from input channels to output channels
+    :param output_encodings: Output encodings. If None, returns the output in floating point
+    :return: Output quantized with ``output_encodings``
+    """
+    input = _quantize_if_dequantized(input)
+    weight = _quantize_if_dequantized(weight)
+
+    if not _is_per_tensor(input) or not _is_per_channel(weight, axis=0) or \
+            isinstance(padding, str) or input.dim() not in (3, 4):
+        return _fallback(F.conv2d, input, weight, bias, stride, padding, dilation, groups,
+                         output_encodings=output_encodings)
+
+    unbatched = input.dim() == 3
+    x = input.as_subclass(Tensor)
+    if unbatched:
+        x = x.unsqueeze(0)
+
+    offset_in = input.encoding.offset.as_subclass(Tensor).reshape(())
+    qmin, qmax = _qrange(input)
+    pad_h, pad_w = _pair(padding)
+    if pad_h or pad_w:
+        # Zero in real domain is represented as -offset in quantized domain
+        x = F.pad(x, (pad_w, pad_w, pad_h, pad_h), value=float(-offset_in))
+        qmin, qmax = min(qmin, int(-offset_in)), max(qmax, int(-offset_in))
+
+    batch_size, _, height, width = x.shape
+    out_channels, in_channels_per_group, kernel_h, kernel_w = weight.shape
+    dilation_h, dilation_w = _pair(dilation)
+    stride_h, stride_w = _pair(stride)
+    out_h = (height - dilation_h * (kernel_h - 1) - 1) // stride_h + 1
+    out_w = (width - dilation_w * (kernel_w - 1) - 1) // stride_w + 1
+
+    # cols: (groups, N * L, C/groups * kh * kw)
+    cols = F.unfold(x, (kernel_h, kernel_w), dilation=dilation, stride=stride)
+    patch_size = in_channels_per_group * kernel_h * kernel_w
+    cols = cols.reshape(batch_size, groups, patch_size, -1).permute(1, 0, 3, 2).reshape(groups, -1, patch_size)
+
+    # w: (groups, C/groups * kh * kw, O/groups)
+    w = weight.as_subclass(Tensor).reshape(groups, out_channels // groups, patch_size).transpose(1, 2)
+    scale_w, offset_w = _per_channel_params(weight, axis=0)
+    bound = patch_size * _magnitude(input.encoding) * _magnitude(weight.encoding)
+
+    if groups == 1:
+        acc = _affine_matmul(cols[0], offset_in, (qmin, qmax),
+                             w[0], offset_w, _qrange(weight), bound)
+        acc = acc.unsqueeze(0)
+    else:
+        acc = _affine_matmul(cols, offset_in, (qmin, qmax),
+                             w, offset_w.reshape(groups, 1, -1), _qrange(weight), bound)
+
+    # acc: (N, O, H_out, W_out)
+    acc = acc.reshape(groups, batch_size, out_h * out_w, -1).permute(1, 0, 3, 2)
+    acc = acc.reshape(batch_size, out_channels, out_h, out_w)
+    scale = input.encoding.scale.as_subclass(Tensor).double().reshape(()) * scale_w
+
+    if bias is not None:
+        acc += _quantize_bias(bias, scale).reshape(-1, 1, 1)
+
+    if unbatched:
+        acc = acc.squeeze(0)
+    return _requantize(acc, scale.reshape(-1, 1, 1), output_encodings, input.dtype)
+
+
+def int_matmul(input: Tensor, other: Tensor, *, out: Optional[Tensor] = None,
+               output_encodings: Optional[EncodingBase] = None):
+    """
+    Integer kernel for :class:`QuantizedMatMul`.
+
+    Multiplies the quantized operands with int32 accumulation and requantizes the accumulator with
+    ``output_encodings``. Both operands should be quantized per-tensor and have at least two dimensions.
+    Otherwise, falls back to the floating-point kernel with dequantized inputs.
+
+    :param input: Quantized first operand
+    :param other: Quantized second operand
+    :param out: Not supported
+    :param output_encodings: Output encodings. If None, returns the output in floating point
+    :return: Output quantized with ``output_encodings``
+    """
+    if out is not None:
+        raise RuntimeError("int_matmul doesn't support 'out' argument")
+
+    input = _quantize_if_dequantized(input)
+    other = _quantize_if_dequantized(other)
+
+    if not _is_per_tensor(input) or not _is_per_tensor(other) or input.dim() < 2 or other.dim() < 2:
+        return _fallback(torch.matmul, input, other, output_encodings=output_encodings)
+
+    bound = input.shape[-1] * _magnitude(input.encoding) * _magnitude(other.encoding)
+    acc = _affine_matmul(input.as_subclass(Tensor), input.encoding.offset.as_subclass(Tensor), _qrange(input),
+                         other.as_subclass(Tensor), other.encoding.offset.as_subclass(Tensor), _qrange(other),
+                         bound)
+    scale = input.encoding.scale.as_subclass(Tensor).double() * other.encoding.scale.as_subclass(Tensor).double()
+    return _requantize(acc, scale.reshape(()), output_encodings, input.dtype)
+
+
+def int_add(input: Tensor, other: Tensor, *, alpha=1, out: Optional[Tensor] = None,
+            output_encodings: Optional[EncodingBase] = None):
+    """
+    Integer kernel for :class:`QuantizedAdd`.
+
+    Rescales both quantized operands to the output scale, adds them up, and rounds the sum to the output grid.
+    Both operands should be quantized tensors with affine encodings.
+    Otherwise, falls back to the floating-point kernel with dequantized inputs.
+
+    :param input: Quantized first operand
+    :param other: Quantized second operand
+    :param alpha: Multiplier for ``other``
+    :param out: Not supported
+    :param output_encodings: Output encodings. If None, returns the output in floating point
+    :return: Output quantized with ``output_encodings``
+    """
+    if out is not None:
+        raise RuntimeError("int_add doesn't support 'out' argument")
+
+    input = _quantize_if_dequantized(input)
+    other = _quantize_if_dequantized(other)
+
+    if not all(isinstance(x, QuantizedTensor) and _is_supported_encoding(x.encoding) for x in (input, other)):
+        return _fallback(torch.add, input, other, alpha=alpha, output_encodings=output_encodings)
+
+    def _rescale(qtensor: QuantizedTensor):
+        scale = qtensor.encoding.scale.as_subclass(Tensor).double()
+        offset = qtensor.encoding.offset.as_subclass(Tensor).double()
+        return (qtensor.as_subclass(Tensor).double() + offset) * scale
+
+    output = _rescale(input) + alpha * _rescale(other)
+    return _quantize_output(output, output_encodings, input.dtype)
+
+
+_INT_KERNELS = (
+    (QuantizedLinear, int_linear),
+    (QuantizedConv2d, int_conv2d),
+    (QuantizedMatMul, int_matmul),
+    (QuantizedAdd, int_add),
+)
+
+
+def set_int_kernels() -> _ContextManager:
+    """
+    Sets the integer kernels as the default kernels of
+    :class:`QuantizedLinear`, :class:`QuantizedConv2d`, :class:`QuantizedMatMul`, and :class:`QuantizedAdd`.
+
+    Once set, these modules run integer arithmetic with int32 accumulation outside of the
+    :meth:`compute_encodings` context. If used as a context manager, the previous default kernels
+    are restored upon exit.
+
+    Example:
+
+        >>> qlinear = QuantizedLinear(10, 10)
+        >>> with set_int_kernels():
+        ...     qlinear.get_kernel()
+        <function int_linear at ...>
+        >>> qlinear.get_kernel() is None
+        True
+    """
+    orig_kernels = [(cls, cls.get_default_kernel()) for cls, _ in _INT_KERNELS]
+
+    def restore_kernels():
+        for cls, kernel in orig_kernels:
+            cls.set_default_kernel(kernel)
+
+    for cls, kernel in _INT_KERNELS:
+        cls.set_default_kernel(kernel)
+
+    return _ContextManager(action=lambda: None, cleanup=restore_kernels)
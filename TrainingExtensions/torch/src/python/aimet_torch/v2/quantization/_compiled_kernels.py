@@ -0,0 +1,191 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+""" Switch between the eager and the torch.compile'd quantization kernels """
+import contextlib
+import functools
+import warnings
+from typing import Optional
+import torch
+from packaging import version
+from aimet_torch.v2.utils import _ContextManager
+
+
+__all__ = ['use_compiled_impl']
+
+
+# Quantizers see inputs of many different ranks, shapes and quantization grids across a model.
+# The kernels are compiled with dynamic shapes, and the recompilation limit of torch.compile is raised
+# while running them. Otherwise the limit (8 by default) is exhausted within a single forward pass
+# of a typical model, after which the kernels silently run in eager mode
+_RECOMPILE_LIMIT = 64
+
+if version.parse(torch.__version__) >= version.parse("2.0.0"):
+    import torch._dynamo.config # pylint: disable=wrong-import-position
+    import torch._dynamo.exc # pylint: disable=wrong-import-position
+    import torch._inductor.exc # pylint: disable=wrong-import-position
+    _compile = functools.partial(torch.compile, dynamic=True)
+    _recompile_limit_config = 'recompile_limit' if hasattr(torch._dynamo.config, 'recompile_limit') \
+                              else 'cache_size_limit'
+    _raise_recompile_limit = lambda: torch._dynamo.config.patch(**{_recompile_limit_config: _RECOMPILE_LIMIT})
+    # Errors raised by torch.compile itself, e.g. unsupported ops or missing compiler toolchain.
+    # Inductor wraps most of its errors in BackendCompilerFailed, which is a TorchDynamoException
+    _COMPILATION_ERRORS = (torch._dynamo.exc.TorchDynamoException, torch._inductor.exc.CppCompileError)
+else:
+    _compile = lambda fn: fn
+    _raise_recompile_limit = contextlib.nullcontext
+    _COMPILATION_ERRORS = ()
+
+
+_USE_COMPILED_IMPL = False
+
+# Eager implementations whose compiled counterparts failed to run.
+# Cleared whenever the compiled kernels are enabled again
+_FAILED_KERNELS = set()
+
+
+def _is_compiled_impl_enabled() -> bool:
+    """ Returns True if the compiled kernels are enabled """
+    return _USE_COMPILED_IMPL
+
+
+def _run_impl(compiled_impl, impl, *args, compiled: Optional[bool] = None):
+    """
+    Run the torch.compile'd implementation if enabled, falling back to the eager implementation
+    if compilation of this kernel is not supported in the current environment.
+
+    :param compiled: Whether to run the compiled implementation.
+        If None, follows the current setting of :func:`use_compiled_impl`.
+    """
+    if compiled is None:
+        compiled = _USE_COMPILED_IMPL
+
+    if not compiled or impl in _FAILED_KERNELS:
+        return impl(*args)
+
+    try:
+        with _raise_recompile_limit():
+            return compiled_impl(*args)
+    except _COMPILATION_ERRORS as e:
+        # Re-run in eager mode. If the eager implementation also fails,
+        # the error isn't related to torch.compile and should be raised as-is
+        output = impl(*args)
+        _FAILED_KERNELS.add(impl)
+        warnings.warn(f"Failed to run torch.compile'd quantization kernels ({type(e).__name__}: {e}). "
+                      "Falling back to eager implementation.")
+        return output
+
+
+def use_compiled_impl(flag: bool = True):
+    """
+    Run the forward and backward passes of quantize, dequantize and quantize-dequantize,
+    and the statistics collection of min-max and histogram observers with kernels
+    compiled by :func:`torch.compile`.
+
+    Can be used either as a context manager or as a decorator.
+    To enable the compiled kernels only for the forward passes of a QuantizationSimModel,
+    use ``QuantizationSimModel(..., use_compiled_kernels=True)`` instead.
+    If compilation of a kernel fails (e.g. due to missing compiler toolchain),
+    AIMET falls back to the eager implementation of that kernel with a warning.
+    Compilation of such kernels is retried the next time the compiled kernels are enabled.
+
+    Example:
+
+        >>> sim = QuantizationSimModel(...)
+        >>> with use_compiled_impl():
+        ...     sim.compute_encodings(run_forward_pass)
+        ...     train(sim.model)
+
+    :param flag: Whether to use the compiled kernels
+    """
+    return _set_compiled_impl(flag, retry_failed_kernels=True)
+
+
+def _set_compiled_impl(flag: bool, retry_failed_kernels: bool):
+    """
+    Returns a context manager that enables or disables the compiled kernels
+
+    :param flag: Whether to use the compiled kernels
+    :param retry_failed_kernels: If True, compilation of the kernels that failed before is retried
+    """
+    orig = _USE_COMPILED_IMPL
+
+    def action():
+        global _USE_COMPILED_IMPL # pylint: disable=global-statement
+        _USE_COMPILED_IMPL = flag
+        if flag and retry_failed_kernels:
+            _FAILED_KERNELS.clear()
+
+    def cleanup():
+        global _USE_COMPILED_IMPL # pylint: disable=global-statement
+        _USE_COMPILED_IMPL = orig
+
+    return _ContextManager(action, cleanup)
+
+
+# Stack of the contexts entered by the forward pre-hooks of the models
+# created with QuantizationSimModel(..., use_compiled_kernels=True)
+_hook_contexts = []
+
+
+def _enter_compiled_impl(*_):
+    """ Forward pre-hook that enables the compiled kernels during the forward pass of the module """
+    # Don't retry the failed kernels in every forward pass
+    ctx = _set_compiled_impl(True, retry_failed_kernels=False)
+    ctx.__enter__()
+    _hook_contexts.append(ctx)
+
+
+def _exit_compiled_impl(*_):
+    """ Forward hook that restores the previous setting after the forward pass of the module """
+    if _hook_contexts:
+        _hook_contexts.pop().__exit__(None, None, None)
+
+
+def _register_compiled_impl_hooks(module: torch.nn.Module):
+    """
+    Enable the compiled kernels during every forward pass of the module.
+    Backward passes follow the setting of the forward pass that created the graph.
+
+    :param module: Module to register the hooks to
+    """
+    _FAILED_KERNELS.clear()
+    module.register_forward_pre_hook(_enter_compiled_impl)
+    if version.parse(torch.__version__) >= version.parse("2.1.0"):
+        # Restore the setting even if the forward pass raises an error
+        module.register_forward_hook(_exit_compiled_impl, always_call=True)
+    else:
+        module.register_forward_hook(_exit_compiled_impl)
@@ -38,15 +38,11 @@
 import functools
 from typing import Optional, List
 import torch
-from aimet_torch.v2.utils import _is_expandable, _ContextManager
+from aimet_torch.v2.utils import _is_expandable
 import aimet_torch.v2.experimental.onnx._export as _onnx
-from packaging import version
-
-
-if version.parse(torch.__version__) >= version.parse("2.0.0"):
-    _compile = torch.compile
-else:
-    _compile = lambda fn: fn
+# pylint: disable=unused-import
+from aimet_torch.v2.quantization._compiled_kernels import _compile, _run_impl, _is_compiled_impl_enabled, \
+    use_compiled_impl
 
 
 def _is_value_representable(dtype: torch.dtype, value: int):
@@ -210,47 +206,117 @@ def dequantize(tensor: torch.Tensor, scale: torch.Tensor, offset: torch.Tensor,
                                 offset.to(internal_dtype)).to(output_dtype).view(orig_tensor_shape)
 
 
+def _quantize_forward(tensor: torch.Tensor, scale: torch.Tensor, offset: torch.Tensor,
+                      qmin: int, qmax: int, mask_dtype: Optional[torch.dtype]):
+    x_round = (tensor.to(scale.dtype) / scale).round_().sub_(offset)
+    mask = ((x_round >= qmin) * (x_round <= qmax)).to(mask_dtype) if mask_dtype is not None else None
+    return x_round.clamp_(qmin, qmax), mask
+
+
+def _quantize_backward(grad: torch.Tensor, tensor: Optional[torch.Tensor], scale: Optional[torch.Tensor],
+                       mask: Optional[torch.Tensor], tensor_requires_grad: bool, scale_requires_grad: bool,
+                       offset_requires_grad: bool):
+    if tensor_requires_grad or scale_requires_grad or offset_requires_grad:
+        masked_grad = grad * mask
+    tensor_grad = masked_grad / scale if tensor_requires_grad else None
+    scale_grad = -(masked_grad / scale) * (tensor / scale) if scale_requires_grad else None
+    offset_grad = -masked_grad if offset_requires_grad else None
+    return tensor_grad, scale_grad, offset_grad
+
+
+def _dequantize_forward(tensor: torch.Tensor, scale: torch.Tensor, offset: torch.Tensor):
+    return (tensor + offset).mul_(scale)
+
+
+def _dequantize_backward(grad: torch.Tensor, tensor: Optional[torch.Tensor], scale: Optional[torch.Tensor],
+                         offset: Optional[torch.Tensor], tensor_requires_grad: bool, scale_requires_grad: bool,
+                         offset_requires_grad: bool):
+    if tensor_requires_grad or offset_requires_grad:
+        tensor_and_offset_grad = grad * scale
+    tensor_grad = tensor_and_offset_grad if tensor_requires_grad else None
+    scale_grad = grad * (tensor + offset) if scale_requires_grad else None
+    offset_grad = tensor_and_offset_grad if offset_requires_grad else None
+    return tensor_grad, scale_grad, offset_grad
+
+
+def _quantize_dequantize_forward(tensor: torch.Tensor, scale: torch.Tensor, offset: torch.Tensor,
+                                 qmin: int, qmax: int, mask_dtype: Optional[torch.dtype]):
+    x_round = (tensor.to(scale.dtype) / scale).round_().sub_(offset)
+    mask = ((qmin <= x_round) & (x_round <= qmax)).to(mask_dtype) if mask_dtype is not None else None
+    x_quant = x_round.clamp_(qmin, qmax)
+    return x_quant.add_(offset).mul_(scale), mask
+
+
+def _quantize_dequantize_backward(grad: torch.Tensor, tensor: Optional[torch.Tensor], scale: Optional[torch.Tensor],
+                                  offset: Optional[torch.Tensor], mask: Optional[torch.Tensor], qmin: int, qmax: int,
+                                  tensor_requires_grad: bool, scale_requires_grad: bool, offset_requires_grad: bool):
+    if scale_requires_grad:
+        tensor = tensor.to(scale.dtype) / scale
+        if mask is None:
+            # Mask wasn't saved in forward pass. Recompute it from the saved input
+            x_round = torch.round(tensor).sub(offset)
+            mask = (qmin <= x_round) & (x_round <= qmax)
+        scale_grad = grad * (torch.round(tensor).clamp(offset + qmin, offset + qmax) - (tensor * mask))
+    else:
+        scale_grad = None
+
+    tensor_grad = grad * mask if tensor_requires_grad else None
+    offset_grad = grad * (~mask * scale) if offset_requires_grad else None
+    return tensor_grad, scale_grad, offset_grad
+
+
+# NOTE: The compiled kernels take and return plain tensors that don't require grad.
+#       Accessing autograd context inside the compiled region causes graph breaks,
+#       and inputs that require grad make torch.compile trace the backward graph as well.
+#       Writing out a boolean tensor is several times slower than the rest of the compiled
+#       forward kernels on CPU, so the compiled kernels emit the mask in floating point
+#       and the mask is converted to boolean outside the compiled region.
+
+
+def _get_mask_dtype(compute_mask: bool, compiled: bool, scale: torch.Tensor) -> Optional[torch.dtype]:
+    """ Returns the dtype of the mask to be emitted by the forward kernels, or None if mask isn't needed """
+    if not compute_mask:
+        return None
+    return scale.dtype if compiled else torch.bool
+
+_compiled_quantize_forward = _compile(_quantize_forward)
+_compiled_quantize_backward = _compile(_quantize_backward)
+_compiled_dequantize_forward = _compile(_dequantize_forward)
+_compiled_dequantize_backward = _compile(_dequantize_backward)
+_compiled_quantize_dequantize_forward = _compile(_quantize_dequantize_forward)
+_compiled_quantize_dequantize_backward = _compile(_quantize_dequantize_backward)
+
+
 # pylint: disable=abstract-method
 class QuantizeFunc(torch.autograd.Function):
     """
     Custom gradient function for quantization
     """
-    # pylint: disable=arguments-differ, protected-access
+    # pylint: disable=arguments-differ
     @staticmethod
     def forward(ctx, tensor: torch.Tensor, scale: torch.Tensor, offset: torch.Tensor, qmin: int, qmax: int):
-        if _USE_COMPILED_IMPL:
-            impl = __class__._compiled_forward_impl
-        else:
-            impl = __class__._forward_impl
-        return impl(ctx, tensor, scale, offset, qmin, qmax)
-
-    @staticmethod
-    def _forward_impl(ctx, tensor: torch.Tensor, scale: torch.Tensor, offset: torch.Tensor, qmin: int, qmax: int):
-        x_round = (tensor.to(scale.dtype) / scale).round_().sub_(offset)
-        if tensor.requires_grad or scale.requires_grad or offset.requires_grad:
-            mask = (x_round >= qmin) * (x_round <= qmax)
-        else:
-            mask = None
+        compute_mask = tensor.requires_grad or scale.requires_grad or offset.requires_grad
+        ctx.compiled = _is_compiled_impl_enabled()
+        x_quant, mask = _run_impl(_compiled_quantize_forward, _quantize_forward,
+                                  tensor.detach(), scale.detach(), offset.detach(), qmin, qmax,
+                                  _get_mask_dtype(compute_mask, ctx.compiled, scale))
+        mask = mask.bool() if mask is not None else None
         ctx.tensor_requires_grad = tensor.requires_grad
         ctx.scale_requires_grad = scale.requires_grad
         ctx.offset_requires_grad = offset.requires_grad
         ctx.save_for_backward(tensor if scale.requires_grad else None,
                               scale if tensor.requires_grad or scale.requires_grad else None,
                               mask)
-        return x_round.clamp_(qmin, qmax)
-
-    _compiled_forward_impl = staticmethod(_compile(_forward_impl.__func__))
+        return x_quant
 
     # pylint: disable=arguments-differ
     @staticmethod
     def backward(ctx, grad):
         tensor, scale, mask = ctx.saved_tensors
-        if ctx.tensor_requires_grad or ctx.scale_requires_grad or ctx.offset_requires_grad:
-            masked_grad = grad * mask
-        tensor_grad = masked_grad / scale if ctx.tensor_requires_grad else None
-        scale_grad = -(masked_grad / scale) * (tensor / scale) if ctx.scale_requires_grad else None
-        offset_grad = -masked_grad if ctx.offset_requires_grad else None
-        return tensor_grad, scale_grad, offset_grad, None, None
+        return *_run_impl(_compiled_quantize_backward, _quantize_backward,
+                          grad, tensor, scale, mask,
+                          ctx.tensor_requires_grad, ctx.scale_requires_grad, ctx.offset_requires_grad,
+                          compiled=ctx.compiled), None, None
 
 
 # pylint: disable=abstract-method
@@ -258,18 +324,12 @@ class DequantizeFunc(torch.autograd.Function):
     """
     Custom gradient function for dequantization
     """
-    # pylint: disable=arguments-differ, protected-access
+    # pylint: disable=arguments-differ
     @staticmethod
     def forward(ctx, tensor: torch.Tensor, scale: torch.Tensor, offset: torch.Tensor):
-        if _USE_COMPILED_IMPL:
-            impl = __class__._compiled_forward_impl
-        else:
-            impl = __class__._forward_impl
-        return impl(ctx, tensor, scale, offset)
-
-    @staticmethod
-    def _forward_impl(ctx, tensor: torch.Tensor, scale: torch.Tensor, offset: torch.Tensor):
-        x_dequant = (tensor + offset).mul_(scale)
+        ctx.compiled = _is_compiled_impl_enabled()
+        x_dequant = _run_impl(_compiled_dequantize_forward, _dequantize_forward,
+                              tensor.detach(), scale.detach(), offset.detach())
         ctx.tensor_requires_grad = tensor.requires_grad
         ctx.scale_requires_grad = scale.requires_grad
         ctx.offset_requires_grad = offset.requires_grad
@@ -278,18 +338,14 @@ class DequantizeFunc(torch.autograd.Function):
                               offset if scale.requires_grad else None)
         return x_dequant
 
-    _compiled_forward_impl = staticmethod(_compile(_forward_impl.__func__))
-
     # pylint: disable=arguments-differ
     @staticmethod
     def backward(ctx, grad):
         tensor, scale, offset = ctx.saved_tensors
-        if ctx.tensor_requires_grad or ctx.offset_requires_grad:
-            tensor_and_offset_grad = grad * scale
-        tensor_grad = tensor_and_offset_grad if ctx.tensor_requires_grad else None
-        scale_grad = grad * (tensor + offset) if ctx.scale_requires_grad else None
-        offset_grad = tensor_and_offset_grad if ctx.offset_requires_grad else None
-        return tensor_grad, scale_grad, offset_grad
+        return _run_impl(_compiled_dequantize_backward, _dequantize_backward,
+                         grad, tensor, scale, offset,
+                         ctx.tensor_requires_grad, ctx.scale_requires_grad, ctx.offset_requires_grad,
+                         compiled=ctx.compiled)
 
 
 # pylint: disable=abstract-method
@@ -297,27 +353,18 @@ class QuantDequantFunc(torch.autograd.Function):
     """
     Custom gradient function for quant-dequant
     """
-    # pylint: disable=arguments-differ, protected-access
+    # pylint: disable=arguments-differ
     @staticmethod
     def forward(ctx, tensor: torch.Tensor, scale: torch.Tensor, offset: torch.Tensor, qmin: int, qmax: int):
-        if _USE_COMPILED_IMPL:
-            impl = __class__._compiled_forward_impl
-        else:
-            impl = __class__._forward_impl
-        return impl(ctx, tensor, scale, offset, qmin, qmax)
-
-    @staticmethod
-    def _forward_impl(ctx, tensor: torch.Tensor, scale: torch.Tensor, offset: torch.Tensor, qmin: int, qmax: int):
-        x_round = (tensor.to(scale.dtype) / scale).round_().sub_(offset)
-
-        if tensor.requires_grad or scale.requires_grad or offset.requires_grad:
-            mask = (qmin <= x_round) & (x_round <= qmax)
-        else:
-            mask = None
-
-        x_quant = x_round.clamp_(qmin, qmax)
-        x_dequant = x_quant.add_(offset).mul_(scale)
-
+        ctx.compiled = _is_compiled_impl_enabled()
+        # If the input is saved for backward anyway (scale.requires_grad == True),
+        # the compiled kernels recompute the mask in backward pass instead of writing it out
+        compute_mask = (tensor.requires_grad or scale.requires_grad or offset.requires_grad) and \
+                not (ctx.compiled and scale.requires_grad)
+        x_dequant, mask = _run_impl(_compiled_quantize_dequantize_forward, _quantize_dequantize_forward,
+                                    tensor.detach(), scale.detach(), offset.detach(), qmin, qmax,
+                                    _get_mask_dtype(compute_mask, ctx.compiled, scale))
+        mask = mask.bool() if mask is not None else None
         ctx.tensor_requires_grad = tensor.requires_grad
         ctx.scale_requires_grad = scale.requires_grad
         ctx.offset_requires_grad = offset.requires_grad
@@ -329,25 +376,14 @@ class QuantDequantFunc(torch.autograd.Function):
                               mask)
         return x_dequant
 
-    _compiled_forward_impl = staticmethod(_compile(_forward_impl.__func__))
-
     # pylint: disable=arguments-differ
     @staticmethod
     def backward(ctx, grad):
-        qmax, qmin = ctx.qmax, ctx.qmin
         tensor, scale, offset, mask = ctx.saved_tensors
-
-        if ctx.scale_requires_grad:
-            tensor = tensor.to(scale.dtype) / scale
-            scale_grad = grad * (torch.round(tensor).clamp(offset + qmin, offset + qmax) - (tensor * mask))
-        else:
-            scale_grad = None
-
-        del tensor, offset
-
-        tensor_grad = grad * mask if ctx.tensor_requires_grad else None
-        offset_grad = grad * (~mask * scale) if ctx.offset_requires_grad else None
-        return tensor_grad, scale_grad, offset_grad, None, None
+        return *_run_impl(_compiled_quantize_dequantize_backward, _quantize_dequantize_backward,
+                          grad, tensor, scale, offset, mask, ctx.qmin, ctx.qmax,
+                          ctx.tensor_requires_grad, ctx.scale_requires_grad, ctx.offset_requires_grad,
+                          compiled=ctx.compiled), None, None
 
 
 def get_encoding_shape_with_blocks(original_encoding_shape: torch.Size, block_size: List[int]):
@@ -409,17 +445,4 @@ def reshape_tensor_for_blocks(tensor: torch.Tensor, encoding_shape: torch.Tensor
     return tensor.view(input_reshape)
 
 
-_USE_COMPILED_IMPL = False
-
-def _use_compiled_impl(flag: bool = True):
-    orig = _USE_COMPILED_IMPL
-
-    def action():
-        global _USE_COMPILED_IMPL # pylint: disable=global-statement
-        _USE_COMPILED_IMPL = flag
-
-    def cleanup():
-        global _USE_COMPILED_IMPL # pylint: disable=global-statement
-        _USE_COMPILED_IMPL = orig
-
-    return _ContextManager(action, cleanup)
+_use_compiled_impl = use_compiled_impl
@@ -40,13 +40,17 @@
 """ Computes statistics and encodings """
 
 from abc import ABC, abstractmethod
+import contextlib
+import functools
 import math
 import warnings
 from dataclasses import dataclass
-from typing import TypeVar, Generic, Tuple, Optional, List
+from typing import TypeVar, Generic, Tuple, Optional, List, Union
 import itertools
 import torch
+import torch.distributed as dist
 from aimet_torch.v2.utils import reduce, StatisticsNotFoundError, _is_expandable
+from aimet_torch.v2.quantization._compiled_kernels import _compile, _run_impl
 
 
 @dataclass
@@ -88,6 +92,99 @@ class _Observer(Generic[_Statistics], ABC):
     def get_stats(self) -> _Statistics:
         pass
 
+    def all_reduce_stats(self, process_group: Optional[dist.ProcessGroup] = None):
+        """
+        Merges the statistics of all processes in the process group, so that
+        every process ends up with the statistics of the union of the observed inputs.
+        """
+        raise NotImplementedError(f"{type(self).__name__} doesn't support all-reducing statistics")
+
+
+# Process group across which the observer statistics are all-reduced before computing encodings.
+# Statistics are not all-reduced if None.
+_all_reduce_config: Optional[Tuple[Optional[dist.ProcessGroup]]] = None
+
+
+@contextlib.contextmanager
+def _all_reduce_stats_before_compute(enabled: bool, process_group: Optional[dist.ProcessGroup] = None):
+    """
+    Within this context, :meth:`EncodingAnalyzer.compute_encodings` all-reduces the observer statistics
+    across the process group before computing encodings.
+    """
+    global _all_reduce_config # pylint: disable=global-statement
+    orig_config = _all_reduce_config
+    try:
+        _all_reduce_config = (process_group,) if enabled else None
+        yield
+    finally:
+        _all_reduce_config = orig_config
+
+
+def is_all_reduce_enabled() -> bool:
+    """
+    Returns True if the observer statistics are all-reduced before computing encodings
+    """
+    return _all_reduce_config is not None
+
+
+def get_all_reduce_process_group() -> Optional[dist.ProcessGroup]:
+    """
+    Returns the process group across which the observer statistics are all-reduced before computing encodings.
+    None stands for the default process group.
+    """
+    if _all_reduce_config is None:
+        raise RuntimeError("Statistics are not all-reduced outside of enable_distributed_calibration context")
+    process_group, = _all_reduce_config
+    return process_group
+
+
+def _get_communication_device(process_group: Optional[dist.ProcessGroup]) -> torch.device:
+    if dist.get_backend(process_group) == dist.Backend.NCCL:
+        return torch.device('cuda', torch.cuda.current_device())
+    return torch.device('cpu')
+
+
+def _all_reduce_min_max(min: Optional[torch.Tensor], max: Optional[torch.Tensor], shape: tuple,
+                        process_group: Optional[dist.ProcessGroup]) -> Tuple[Optional[torch.Tensor],
+                                                                             Optional[torch.Tensor]]:
+    """
+    All-reduces min and max with a single collective.
+    Processes that haven't observed any input may pass None as min and max.
+
+    :return: Global min and max, or (None, None) if none of the processes observed any input
+    """
+    device = _get_communication_device(process_group)
+    if min is None:
+        min = torch.full(shape, float('inf'), dtype=torch.float64, device=device)
+        max = torch.full(shape, -float('inf'), dtype=torch.float64, device=device)
+        has_stats = torch.zeros(1, dtype=torch.float64, device=device)
+    else:
+        has_stats = torch.ones(1, dtype=torch.float64, device=device)
+
+    # Reduce -max and -has_stats with MIN so that all three are reduced at once
+    buffer = torch.cat([min.to(device, torch.float64).flatten(),
+                        max.to(device, torch.float64).flatten().neg(),
+                        has_stats.neg()])
+    dist.all_reduce(buffer, op=dist.ReduceOp.MIN, group=process_group)
+
+    if buffer[-1] == 0:
+        return None, None
+
+    numel = (buffer.numel() - 1) // 2
+    return buffer[:numel].view(shape), buffer[numel:-1].neg().view(shape)
+
+
+def _min_max(input_tensor: torch.Tensor, shape: tuple) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Computes min and max of the input reduced into the given shape in a single pass
+    """
+    return tuple(reduce(input_tensor, shape=shape, reduce_op=torch.aminmax))
+
+
+@functools.lru_cache(None)
+def _get_compiled_min_max():
+    return _compile(_min_max)
+
 
 class _MinMaxObserver(_Observer[_MinMaxRange]):
     """
@@ -99,8 +196,7 @@ class _MinMaxObserver(_Observer[_MinMaxRange]):
 
     @torch.no_grad()
     def collect_stats(self, input_tensor: torch.Tensor) -> _MinMaxRange:
-        new_min = reduce(input_tensor, shape=self.shape, reduce_op=torch.min).values
-        new_max = reduce(input_tensor, shape=self.shape, reduce_op=torch.max).values
+        new_min, new_max = _run_impl(_get_compiled_min_max(), _min_max, input_tensor, tuple(self.shape))
         return _MinMaxRange(new_min, new_max)
 
     @torch.no_grad()
@@ -127,6 +223,34 @@ class _MinMaxObserver(_Observer[_MinMaxRange]):
     def get_stats(self) -> _MinMaxRange:
         return self.stats
 
+    @torch.no_grad()
+    def all_reduce_stats(self, process_group: Optional[dist.ProcessGroup] = None):
+        min, max = _all_reduce_min_max(self.stats.min, self.stats.max, self.shape, process_group)
+        if min is None:
+            return
+
+        if self.stats.min is not None:
+            min = min.to(self.stats.min)
+            max = max.to(self.stats.max)
+        self.stats = _MinMaxRange(min, max)
+
+
+def _histogram(observer: '_HistogramObserver', hist_inputs: torch.Tensor,
+               hist_min: torch.Tensor, hist_max: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Computes the histograms and the bin edges of all rows of hist_inputs
+    """
+    # pylint: disable=protected-access
+    bin_edges = observer._create_bin_edges(min_val=hist_min, max_val=hist_max, device=hist_inputs.device)
+    # inf values and any fp errors are clipped to the first and last bin
+    histogram = observer._batched_histc(hist_inputs, bin_edges[:, 0], bin_edges[:, -1])
+    return histogram, bin_edges
+
+
+@functools.lru_cache(None)
+def _get_compiled_histogram():
+    return _compile(_histogram)
+
 
 class _HistogramObserver(_Observer[_Histogram]):
     """
@@ -141,124 +265,170 @@ class _HistogramObserver(_Observer[_Histogram]):
             self.stats.append(_Histogram())
 
 
-    # pylint: disable=too-many-locals
     @torch.no_grad()
     def collect_stats(self, input_tensor: torch.Tensor) -> List[_Histogram]:
         if not _is_expandable(self.shape, input_tensor.shape):
             raise RuntimeError(f"Shape {self.shape} is incompatible with input of shape {input_tensor.shape}")
 
-        hist_stats = []
-        input_shape = tuple(input_tensor.shape)
-        histogram_shape = self.shape
-
-        padded_histogram_shape = (
-            *itertools.repeat(1, len(input_shape) - len(histogram_shape)),
-            *histogram_shape
-        )
-
-        for hist_num in range(self.num_histograms):
-            hist_input = input_tensor
-
-            for axis, dim in enumerate(padded_histogram_shape):
-                if dim == 1:
-                    continue
-                # elements in current axis, ex: could be W*C, C, or 1 for input_shape [H, W, C]
-                numel = torch.prod(torch.Tensor(padded_histogram_shape[axis+1:]), dtype=int)
-                # index where hist_input at current dimension will be sliced at
-                index = (hist_num // numel) % dim
-                hist_input = torch.unsqueeze(torch.select(hist_input, axis, index), axis)
-
-            hist_min, hist_max = self._handle_inputs(hist_input)
+        # hist_inputs.shape = (num_histograms, -1)
+        hist_inputs = self._get_hist_inputs(input_tensor)
+        hist_min, hist_max = self._handle_inputs(hist_inputs)
 
-            bin_edges = self._create_bin_edges(min_val=hist_min, max_val=hist_max, device=input_tensor.device)
-            histogram = torch.histc(hist_input.to(torch.float), bins=self.num_bins, min=bin_edges[0], max=bin_edges[-1])
+        histogram, bin_edges = _run_impl(_get_compiled_histogram(), _histogram,
+                                         self, hist_inputs, hist_min, hist_max)
 
-            # clip inf values to hist_min and hist_max and adjust for any fp errors
-            histogram[0] += torch.sum(hist_input < bin_edges[0])
-            histogram[-1] += torch.sum(hist_input > bin_edges[-1])
+        return [
+            _Histogram(*stats) for stats in zip(histogram, bin_edges, hist_min, hist_max)
+        ]
 
-            hist_stats.append(_Histogram(histogram, bin_edges, hist_min, hist_max))
-
-        return hist_stats
+    def _get_hist_inputs(self, input_tensor: torch.Tensor) -> torch.Tensor:
+        """
+        Reshapes input tensor to (num_histograms, -1) such that
+        the i-th row holds all the input elements that belong to the i-th histogram
+        """
+        input_shape = tuple(input_tensor.shape)
+        padded_histogram_shape = (
+            *itertools.repeat(1, len(input_shape) - len(self.shape)),
+            *self.shape
+        )
+        reduce_dims = tuple(axis for axis, dim in enumerate(padded_histogram_shape) if dim == 1)
+        other_dims = tuple(axis for axis, dim in enumerate(padded_histogram_shape) if dim > 1)
 
-    def _handle_inputs(self, hist_input):
-        if not torch.any(hist_input.isfinite()):
-            raise ValueError('Input tensor cannot contain only infinite or only NaN values')
+        hist_inputs = input_tensor.permute(reduce_dims + other_dims)
+        return hist_inputs.reshape(-1, self.num_histograms).transpose(0, 1)
 
-        min = hist_input[hist_input.isfinite()].min()
-        max = hist_input[hist_input.isfinite()].max()
+    @staticmethod
+    def _handle_inputs(hist_inputs):
+        is_finite = hist_inputs.isfinite()
+
+        if not torch.all(is_finite):
+            if not torch.all(torch.any(is_finite, dim=1)):
+                raise ValueError('Input tensor cannot contain only infinite or only NaN values')
+            min = hist_inputs.masked_fill(~is_finite, float('inf')).amin(dim=1)
+            max = hist_inputs.masked_fill(~is_finite, -float('inf')).amax(dim=1)
+        else:
+            min = hist_inputs.amin(dim=1)
+            max = hist_inputs.amax(dim=1)
 
         return min, max
 
-    def _create_bin_edges(self, min_val, max_val, device):
+    @staticmethod
+    def _get_bin_range(min_val, max_val):
         # Adjust min/max values to be in line with PyTorch's torch.histc implementation
-        if max_val == min_val:
-            min_val = min_val - 0.5
-            max_val = max_val + 0.5
+        is_empty_range = min_val == max_val
+        min_val = torch.where(is_empty_range, min_val - 0.5, min_val)
+        max_val = torch.where(is_empty_range, max_val + 0.5, max_val)
+        return min_val.float(), max_val.float()
 
-        min_val, max_val = min_val.float(), max_val.float()
+    def _create_bin_edges(self, min_val, max_val, device):
+        min_val, max_val = self._get_bin_range(min_val, max_val)
         step = (max_val - min_val) / self.num_bins
 
-        return torch.arange(0, self.num_bins + 1, device=device) * step + min_val
+        return torch.arange(0, self.num_bins + 1, device=device) * step[:, None] + min_val[:, None]
+
+    def _batched_histc(self, hist_inputs: torch.Tensor, min_val: torch.Tensor, max_val: torch.Tensor):
+        """
+        Computes the histograms of all rows of hist_inputs at once.
+        Equivalent to calling torch.histc row by row, except that out-of-range values
+        are counted in the first or the last bin instead of being ignored.
+
+        :param hist_inputs: Input tensor of shape (num_histograms, -1)
+        :param min_val: Lower end of the histogram ranges of shape (num_histograms,)
+        :param max_val: Upper end of the histogram ranges of shape (num_histograms,)
+        :return: Histograms of shape (num_histograms, num_bins)
+        """
+        num_histograms = hist_inputs.shape[0]
+        hist_inputs = hist_inputs.to(torch.float)
+        is_nan = hist_inputs.isnan()
+
+        # Same arithmetic as torch.histc to land on the same bins
+        bin_index = (hist_inputs - min_val[:, None]) * self.num_bins / (max_val - min_val)[:, None]
+        bin_index = bin_index.clamp_(0, self.num_bins - 1).masked_fill_(is_nan, 0).to(torch.int64)
+        # Offset bin indices by histogram number to scatter all histograms into one flat buffer
+        bin_index += torch.arange(0, num_histograms * self.num_bins, self.num_bins,
+                                  device=bin_index.device)[:, None]
+
+        histogram = torch.zeros(num_histograms * self.num_bins, device=hist_inputs.device)
+        histogram.scatter_add_(0, bin_index.flatten(), (~is_nan).to(histogram.dtype).flatten())
+        return histogram.view(num_histograms, self.num_bins)
 
     def _get_bin_num(self, bin_width: int, curr_min, data):
         bin_tensor = torch.full(data.shape, self.num_bins - 1, device=data.device)
         index_tensor = (data - curr_min) / bin_width
         return torch.minimum(index_tensor.to(torch.int32), bin_tensor)
 
-    # pylint: disable=arguments-differ
     # pylint: disable=too-many-locals
-    @torch.no_grad()
-    def merge_stats(self, new_stats_list: List[_Histogram], input_tensor: torch.Tensor):
-        if self.stats[0].histogram is None:
-            self.stats = new_stats_list
-            return
-
-        hist_inputs = torch.reshape(input_tensor, (len(new_stats_list), -1))
-        for index, new_stats in enumerate(new_stats_list):
-            curr_stats = self.stats[index]
-            curr_input = hist_inputs[index]
-
-            updated_min = min(new_stats.min, curr_stats.min)
-            updated_max = max(new_stats.max, curr_stats.max)
-
-            # if the current histogram can capture new_stats within in its range
-            if updated_min == curr_stats.min and updated_max == curr_stats.max:
-                histogram_updates = curr_stats.histogram
-            else:
-                dest_bin_width = (updated_max - updated_min) / self.num_bins
-                src_bin_width = (curr_stats.max - curr_stats.min) / self.num_bins
-                histogram_updates = torch.zeros(self.num_bins).to(input_tensor.device)
+    def _resize_histograms(self, histogram, curr_min, curr_max, updated_min, updated_max):
+        """
+        Redistributes the counts of histograms with range [curr_min, curr_max]
+        into histograms with range [updated_min, updated_max]
+
+        :param histogram: Histograms of shape (num_histograms, num_bins)
+        :param curr_min: Current lower end of the histogram ranges of shape (num_histograms,)
+        :param curr_max: Current upper end of the histogram ranges of shape (num_histograms,)
+        :param updated_min: New lower end of the histogram ranges of shape (num_histograms,)
+        :param updated_max: New upper end of the histogram ranges of shape (num_histograms,)
+        :return: Resized histograms of shape (num_histograms, num_bins)
+        """
+        curr_min, curr_max = self._get_bin_range(curr_min, curr_max)
+        curr_min, curr_max = curr_min[:, None], curr_max[:, None]
+        updated_min, updated_max = updated_min.float()[:, None], updated_max.float()[:, None]
 
-                src_bin_start = curr_stats.min + (src_bin_width * torch.arange(0, self.num_bins, device=input_tensor.device))
-                dest_bin_index = self._get_bin_num(dest_bin_width, updated_min, src_bin_start)
-                dest_bin_end = updated_min + dest_bin_width * (dest_bin_index + 1)
+        dest_bin_width = (updated_max - updated_min) / self.num_bins
+        src_bin_width = (curr_max - curr_min) / self.num_bins
 
-                # split curr_hist if values in source bin cannot neatly fold into dest bin
-                split_hist_value = torch.round(((dest_bin_end - src_bin_start) / src_bin_width) * curr_stats.histogram)
-                dest_bin_updates = torch.minimum(split_hist_value, curr_stats.histogram)
+        src_bin_start = curr_min + (src_bin_width * torch.arange(0, self.num_bins, device=histogram.device))
+        dest_bin_index = self._get_bin_num(dest_bin_width, updated_min, src_bin_start)
+        dest_bin_end = updated_min + dest_bin_width * (dest_bin_index + 1)
 
-                # update appropriate bin with either the full or split curr_hist value
-                for i, dest_bin in enumerate(dest_bin_index):
-                    histogram_updates[dest_bin] += dest_bin_updates[i]
+        # split histogram if values in source bin cannot neatly fold into dest bin
+        split_hist_value = torch.round(((dest_bin_end - src_bin_start) / src_bin_width) * histogram)
+        dest_bin_updates = torch.minimum(split_hist_value, histogram)
 
-                # if curr_hist is split, update other bin that the remaining values fall into
-                other_bins = torch.nonzero(torch.where(dest_bin_updates < curr_stats.histogram, 1, 0))
-                other_bin_index = self._get_bin_num(dest_bin_width, updated_min, src_bin_start + dest_bin_width)
-                other_bin_updates = curr_stats.histogram - dest_bin_updates
-                for bin_num in other_bins:
-                    histogram_updates[other_bin_index[bin_num]] += other_bin_updates[bin_num]
+        # if histogram is split, the remaining values fall into the next dest bin
+        other_bin_index = self._get_bin_num(dest_bin_width, updated_min, src_bin_start + dest_bin_width)
+        other_bin_updates = histogram - dest_bin_updates
 
-            # create histogram given input tensor and full range
-            expanded_histogram = torch.histc(curr_input.to(torch.float), bins=self.num_bins, min=updated_min, max=updated_max)
-            expanded_histogram += histogram_updates.to(expanded_histogram.device)
+        resized_histogram = torch.zeros_like(histogram)
+        resized_histogram.scatter_add_(1, dest_bin_index.to(torch.int64), dest_bin_updates)
+        resized_histogram.scatter_add_(1, other_bin_index.to(torch.int64), other_bin_updates)
+        return resized_histogram
 
-            # clip inf values to hist_min and hist_max
-            expanded_histogram[0] += torch.sum(curr_input == -float('inf'))
-            expanded_histogram[-1] += torch.sum(curr_input == float('inf'))
+    # pylint: disable=arguments-differ
+    # pylint: disable=too-many-locals
+    @torch.no_grad()
+    def merge_stats(self, new_stats_list: List[_Histogram], input_tensor: torch.Tensor):
+        if self.stats[0].histogram is None:
+            self.stats = new_stats_list
+            return
 
-            expanded_bin_edges = self._create_bin_edges(min_val=updated_min, max_val=updated_max, device=expanded_histogram.device)
-            self.stats[index] = _Histogram(expanded_histogram, expanded_bin_edges, updated_min, updated_max)
+        curr_histogram = torch.stack([stats.histogram for stats in self.stats])
+        curr_min = torch.stack([stats.min for stats in self.stats])
+        curr_max = torch.stack([stats.max for stats in self.stats])
+
+        updated_min = torch.minimum(torch.stack([stats.min for stats in new_stats_list]), curr_min)
+        updated_max = torch.maximum(torch.stack([stats.max for stats in new_stats_list]), curr_max)
+
+        # resize only the histograms that can't capture new_stats within their current range
+        histogram_updates = curr_histogram.to(input_tensor.device)
+        needs_resize = torch.logical_or(updated_min != curr_min, updated_max != curr_max)
+        if torch.any(needs_resize):
+            index = needs_resize.nonzero().flatten()
+            histogram_updates = histogram_updates.clone()
+            histogram_updates[index] = self._resize_histograms(histogram_updates[index],
+                                                               curr_min[index], curr_max[index],
+                                                               updated_min[index], updated_max[index])
+
+        # create histogram given input tensor and full range
+        hist_inputs = self._get_hist_inputs(input_tensor)
+        expanded_histogram = self._batched_histc(hist_inputs, *self._get_bin_range(updated_min, updated_max))
+        expanded_histogram += histogram_updates.to(expanded_histogram.device)
+
+        expanded_bin_edges = self._create_bin_edges(min_val=updated_min, max_val=updated_max,
+                                                    device=expanded_histogram.device)
+        self.stats = [
+            _Histogram(*stats) for stats in zip(expanded_histogram, expanded_bin_edges, updated_min, updated_max)
+        ]
 
     def reset_stats(self):
         self.stats = []
@@ -268,6 +438,50 @@ class _HistogramObserver(_Observer[_Histogram]):
     def get_stats(self) -> List[_Histogram]:
         return self.stats
 
+    @torch.no_grad()
+    def all_reduce_stats(self, process_group: Optional[dist.ProcessGroup] = None):
+        """
+        Resizes the local histograms to the global range of all processes and sums them up.
+        """
+        has_stats = self.stats[0].histogram is not None
+        curr_min = curr_max = None
+        if has_stats:
+            curr_min = torch.stack([stats.min for stats in self.stats])
+            curr_max = torch.stack([stats.max for stats in self.stats])
+
+        updated_min, updated_max = _all_reduce_min_max(curr_min, curr_max, (self.num_histograms,), process_group)
+        if updated_min is None:
+            return
+
+        device = updated_min.device
+        if has_stats:
+            stats_device = self.stats[0].histogram.device
+            updated_min = updated_min.to(curr_min.dtype)
+            updated_max = updated_max.to(curr_max.dtype)
+            curr_min, curr_max = curr_min.to(device), curr_max.to(device)
+            histogram = torch.stack([stats.histogram for stats in self.stats]).to(device)
+
+            # resize only the histograms whose range doesn't match the global range
+            needs_resize = torch.logical_or(updated_min != curr_min, updated_max != curr_max)
+            if torch.any(needs_resize):
+                index = needs_resize.nonzero().flatten()
+                histogram[index] = self._resize_histograms(histogram[index],
+                                                           curr_min[index], curr_max[index],
+                                                           updated_min[index], updated_max[index])
+        else:
+            stats_device = device
+            updated_min, updated_max = updated_min.float(), updated_max.float()
+            histogram = torch.zeros(self.num_histograms, self.num_bins, device=device)
+
+        dist.all_reduce(histogram, op=dist.ReduceOp.SUM, group=process_group)
+
+        histogram = histogram.to(stats_device)
+        updated_min, updated_max = updated_min.to(stats_device), updated_max.to(stats_device)
+        bin_edges = self._create_bin_edges(min_val=updated_min, max_val=updated_max, device=stats_device)
+        self.stats = [
+            _Histogram(*stats) for stats in zip(histogram, bin_edges, updated_min, updated_max)
+        ]
+
 class EncodingAnalyzer(Generic[_Statistics], ABC):
     '''
     Base class that gathers statistics of input data and computes encodings
@@ -293,6 +507,16 @@ class EncodingAnalyzer(Generic[_Statistics], ABC):
         """
         self.observer.reset_stats()
 
+    def all_reduce_stats(self, process_group: Optional[dist.ProcessGroup] = None):
+        """
+        Merges the internal stats of all processes in the process group.
+
+        Args:
+            process_group (ProcessGroup, optional): Process group to all-reduce the stats across.
+                Default process group if None.
+        """
+        self.observer.all_reduce_stats(process_group)
+
     def compute_encodings(self, num_steps: int, is_symmetric: bool):
         r"""
         Computes encodings based on the input data & calibration scheme and returns the encoding minimum and maximum value
@@ -305,6 +529,9 @@ class EncodingAnalyzer(Generic[_Statistics], ABC):
             Encoding min and max as a tuple
 
         """
+        if _all_reduce_config is not None:
+            process_group, = _all_reduce_config
+            self.all_reduce_stats(process_group)
         return self.compute_encodings_from_stats(self.observer.get_stats(), num_steps, is_symmetric)
 
     def compute_dynamic_encodings(self, input_tensor: torch.Tensor, num_steps: int,
@@ -436,7 +663,7 @@ def adjust_min_max(curr_min, curr_max, num_steps, is_symmetric):
     if is_symmetric:
         num_pos_steps = math.floor(num_steps / 2)
         num_neg_steps = math.ceil(num_steps / 2)
-        delta = max(curr_max / num_pos_steps, -curr_min / num_neg_steps)
+        delta = torch.maximum(curr_max / num_pos_steps, -curr_min / num_neg_steps)
         offset = -1 * num_neg_steps
 
         curr_min = offset * delta
@@ -511,31 +738,26 @@ class PercentileEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
         if stats[0].histogram is None:
             raise StatisticsNotFoundError('No statistics present to compute encodings.')
 
-        encoding_min_list = []
-        encoding_max_list = []
+        histogram = torch.stack([stat.histogram for stat in stats])
+        bin_edges = torch.stack([stat.bin_edges for stat in stats])
 
-        for list_elem in stats:
-            cum_sum = torch.cumsum(list_elem.histogram, dim=0)
+        if self.percentile == 100:
+            curr_min = bin_edges[:, 0]
+            curr_max = bin_edges[:, -1]
+        else:
+            cum_sum = torch.cumsum(histogram, dim=1)
+            total = cum_sum[:, -1:]
             # trim percentile value from min and max
-            max_index = torch.searchsorted(cum_sum, cum_sum[-1] * self.percentile/100)
-            min_index = torch.searchsorted(cum_sum, cum_sum[-1] * (1 - self.percentile/100))
+            max_index = torch.searchsorted(cum_sum, total * self.percentile/100)
+            min_index = torch.searchsorted(cum_sum, total * (1 - self.percentile/100))
+            curr_min = torch.gather(bin_edges, 1, min_index).squeeze(1)
+            curr_max = torch.gather(bin_edges, 1, max_index).squeeze(1)
 
-            if self.percentile == 100:
-                min_index = 0
-                max_index = -1
+        # adjust min/max
+        encoding_min, encoding_max = adjust_min_max(curr_min, curr_max, num_steps, is_symmetric)
 
-            curr_min = list_elem.bin_edges[min_index]
-            curr_max = list_elem.bin_edges[max_index]
-            # adjust min/max
-            updated_min, updated_max = adjust_min_max(curr_min, curr_max, num_steps, is_symmetric)
-            encoding_min_list.append(updated_min)
-            encoding_max_list.append(updated_max)
-
-        encoding_min = torch.tensor(encoding_min_list, device=stats[0].histogram.device, dtype = stats[0].min.dtype)
-        encoding_min = torch.reshape(encoding_min, self.observer.shape)
-
-        encoding_max = torch.tensor(encoding_max_list, device=stats[0].histogram.device, dtype = stats[0].max.dtype)
-        encoding_max = torch.reshape(encoding_max, self.observer.shape)
+        encoding_min = encoding_min.to(stats[0].min.dtype).reshape(self.observer.shape)
+        encoding_max = encoding_max.to(stats[0].max.dtype).reshape(self.observer.shape)
 
         return encoding_min, encoding_max
 
@@ -551,6 +773,8 @@ class SqnrEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
         symmetric_delta_candidates (int): Number of delta values to search over in symmetric mode
         offset_candidates (int): Number of offset values to search over in asymmetric mode
         max_parallelism (int): Maximum number of encodings to process in parallel (higher number results in higher memory usage but faster computation)
+        memory_budget (int, optional): Maximum number of bytes to use for evaluating the candidates at once.
+            If specified, the number of encodings to process in parallel is derived from the memory budget instead of max_parallelism
         gamma (float): Weighting factor on clipping noise (higher value results in less clipping noise)
         percentile (float): Percentile value which is used to clip values
 
@@ -574,9 +798,12 @@ class SqnrEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
                  symmetric_delta_candidates=101,
                  offset_candidates=21,
                  max_parallelism=64,
-                 gamma=3.0):
+                 gamma=3.0,
+                 memory_budget: Optional[int] = None):
         if num_bins <= 0:
             raise ValueError('Number of bins cannot be less than or equal to 0.')
+        if memory_budget is not None and memory_budget <= 0:
+            raise ValueError('Memory budget cannot be less than or equal to 0.')
         observer = _HistogramObserver(shape=shape, num_bins=num_bins)
         super().__init__(observer)
         self.asym_delta_candidates = asymmetric_delta_candidates
@@ -584,6 +811,7 @@ class SqnrEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
         self.num_offset_candidates = offset_candidates
         self.gamma = gamma
         self.max_parallelism = max_parallelism
+        self.memory_budget = memory_budget
 
     @torch.no_grad()
     def update_stats(self, input_tensor: torch.Tensor) -> _Statistics:
@@ -602,9 +830,16 @@ class SqnrEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
             raise StatisticsNotFoundError('No statistics present to compute encodings.')
         if num_steps <= 0:
             raise ValueError('The number of quantization bins cannot be less than or equal to 0.')
-        chunked_stats = [stats[i:min(i+self.max_parallelism, len(stats))] for i in range(0, len(stats), self.max_parallelism)]
+        stacked_stats = _stack_histograms(stats)
+        num_histograms, num_bins = stacked_stats.histogram.shape
+        chunk_size = self._get_chunk_size(num_bins, num_steps, is_symmetric)
         best_deltas, best_offsets = [], []
-        for stats_ in chunked_stats:
+        for start in range(0, num_histograms, chunk_size):
+            end = min(start + chunk_size, num_histograms)
+            stats_ = _Histogram(stacked_stats.histogram[start:end],
+                                stacked_stats.bin_edges[start:end],
+                                stacked_stats.min[start:end],
+                                stacked_stats.max[start:end])
             test_deltas, test_offsets = self._pick_test_candidates(stats_, num_steps, is_symmetric)
             best_delta, best_offset = self._select_best_candidates(test_deltas, test_offsets, stats_, num_steps)
             best_deltas.append(best_delta)
@@ -620,13 +855,30 @@ class SqnrEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
         return min_enc.view(self.observer.shape), \
                max_enc.view(self.observer.shape)
 
+    def _get_chunk_size(self, num_bins: int, num_steps: int, symmetric: bool) -> int:
+        """
+        Returns the number of encodings whose candidates can be evaluated at once
+        """
+        if self.memory_budget is None:
+            return self.max_parallelism
+
+        if symmetric:
+            num_candidates = self.sym_delta_candidates
+        else:
+            num_candidates = self.asym_delta_candidates * (min(num_steps + 2, self.num_offset_candidates) + 1)
+
+        # Each (candidate, bin) pair takes a float32 for the quantization error, plus a float32 and
+        # two booleans for the clipping mask if gamma != 1
+        bytes_per_element = 4 if self.gamma == 1.0 else 10
+        bytes_per_histogram = num_candidates * num_bins * bytes_per_element
+        return max(1, self.memory_budget // bytes_per_histogram)
+
     def _pick_test_candidates(self, stats, num_steps, symmetric):
         minimum_scale = _get_minimum_scale(num_steps)
+        stats = _stack_histograms(stats)
         # min/max.shape = (num_histograms, )
-        min_vals = torch.stack([stat.min for stat in stats])
-        max_vals = torch.stack([stat.max for stat in stats])
-        min_vals = torch.min(min_vals, torch.zeros_like(min_vals))
-        max_vals = torch.max(max_vals, torch.zeros_like(max_vals))
+        min_vals = torch.min(stats.min, torch.zeros_like(stats.min))
+        max_vals = torch.max(stats.max, torch.zeros_like(stats.max))
         max_vals = torch.max(max_vals, min_vals + minimum_scale * num_steps)
         if symmetric:
             return self._pick_test_candidates_symmetric(min_vals, max_vals, num_steps)
@@ -710,7 +962,7 @@ class SqnrEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
 
     # pylint: disable=too-many-locals
     @staticmethod
-    def _estimate_clip_and_quant_noise(stats: List[_Histogram],
+    def _estimate_clip_and_quant_noise(stats: Union[List[_Histogram], _Histogram],
                                        test_deltas: torch.Tensor,
                                        test_offsets: torch.Tensor,
                                        num_steps: int,
@@ -721,29 +973,50 @@ class SqnrEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
         midpoint of that bin.
 
         Args:
-            stats (List): A list of _Histogram objects with length equal to the number of encodings to compute
+            stats (List | _Histogram): A list of _Histogram objects with length equal to the number of encodings to compute,
+                or a single _Histogram object holding the stacked histograms of shape (num_hists, num_bins)
             test_deltas (torch.Tensor): Tensor holding the values of all deltas to search with shape (num_hists, num_deltas, num_offsets)
             test_offsets (torch.Tensor):Tensor holding values of all offsets to search with shape (num_hists, num_deltas, num_offsets)
             num_steps (int): Number of quantization steps, i.e., (2 ** bitwidth) - 1
             gamma (float): Fudge factor to trade off between saturation cost and quantization cost. When gamma=1.0, this approximates the MSE of the quantization function
         """
         tensor_kwargs = {"device": test_deltas.device, "dtype": test_deltas.dtype}
-        hists = torch.stack([stat.histogram for stat in stats])
-        bin_edges = torch.stack([stat.bin_edges for stat in stats])
+        stats = _stack_histograms(stats)
+        hists = stats.histogram.to(**tensor_kwargs)
+        bin_edges = stats.bin_edges
+        num_hists, num_bins = hists.shape
         hist_delta = bin_edges[:, 1] - bin_edges[:, 0]
         # hist_midpoints is shape (hists, num_bins)
-        hist_offsets = hist_delta[:, None] * torch.arange(0, bin_edges.shape[1] - 1, **tensor_kwargs)[None, :]
+        hist_offsets = hist_delta[:, None] * torch.arange(0, num_bins, **tensor_kwargs)[None, :]
         hist_midpoints = (bin_edges[:, 0] + hist_delta/2)[:, None] + hist_offsets
         # hists_midpoints_qdq is shape (hists, num_deltas, num_offsets, num_bins)
         test_offsets_bcast = test_offsets[:, :, :, None]
         test_deltas_bcast = test_deltas[:, :, :, None]
-        hist_midpoints_qdq = hist_midpoints[:, None, None, :].div(test_deltas_bcast).sub(test_offsets_bcast).round()
+        hist_midpoints_qdq = hist_midpoints[:, None, None, :].div(test_deltas_bcast).sub_(test_offsets_bcast).round_()
         if gamma != 1.0:
             clipped = torch.logical_or(hist_midpoints_qdq < 0,
-                                       hist_midpoints_qdq > num_steps)
-        hist_midpoints_qdq = hist_midpoints_qdq.clamp_(0, num_steps).add_(test_offsets_bcast).mul_(test_deltas_bcast)
-        square_error = hist_midpoints_qdq.sub_(hist_midpoints[:, None, None, :]).pow_(2).mul_(hists[:, None, None, :])
+                                       hist_midpoints_qdq > num_steps).to(hist_midpoints_qdq.dtype)
+        square_error = hist_midpoints_qdq.clamp_(0, num_steps).add_(test_offsets_bcast).mul_(test_deltas_bcast)\
+                                         .sub_(hist_midpoints[:, None, None, :]).square_()
         if gamma != 1.0:
             # Apply the gamma "fudge factor" to the clipped errors
-            square_error = torch.where(clipped, square_error * gamma, square_error)
-        return torch.sum(square_error, dim=-1)
+            square_error.addcmul_(square_error, clipped, value=gamma - 1)
+            del clipped
+        # Weighted sum of the square errors over all bins, computed as batched matrix-vector product
+        # (hists, num_deltas * num_offsets, num_bins) x (hists, num_bins, 1)
+        noise_shape = square_error.shape[:-1]
+        noise = torch.bmm(square_error.view(num_hists, -1, num_bins), hists[:, :, None])
+        return noise.view(noise_shape)
+
+
+def _stack_histograms(stats: Union[List[_Histogram], _Histogram]) -> _Histogram:
+    """
+    Stacks a list of histograms into a single _Histogram object whose fields hold the statistics
+    of all histograms along the first dimension, e.g. histogram.shape == (num_histograms, num_bins)
+    """
+    if isinstance(stats, _Histogram):
+        return stats
+    return _Histogram(torch.stack([stat.histogram for stat in stats]),
+                      torch.stack([stat.bin_edges for stat in stats]),
+                      torch.stack([stat.min for stat in stats]),
+                      torch.stack([stat.max for stat in stats]))
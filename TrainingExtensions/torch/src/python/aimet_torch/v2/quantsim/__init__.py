@@ -38,3 +38,6 @@
 # pylint: disable=all
 
 from .quantsim import *
+from .stats_cache import *
+from .distributed import *
+from .inference import *
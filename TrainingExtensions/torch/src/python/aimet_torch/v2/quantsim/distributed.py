@@ -0,0 +1,81 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+""" Data-parallel calibration across multiple processes """
+
+import contextlib
+from typing import Optional
+
+import torch.distributed as dist
+
+from aimet_torch.v2.quantization.encoding_analyzer import _all_reduce_stats_before_compute
+
+
+__all__ = ['enable_distributed_calibration']
+
+
+@contextlib.contextmanager
+def enable_distributed_calibration(process_group: Optional[dist.ProcessGroup] = None):
+    """
+    Enables data-parallel calibration over :mod:`torch.distributed`.
+
+    Within this context, each quantizer all-reduces the statistics observed by its encoding analyzer
+    across all processes in ``process_group`` before computing its encodings. Each process can therefore
+    run :meth:`QuantizationSimModel.compute_encodings` (or :meth:`BaseQuantizationMixin.compute_encodings`)
+    with a different shard of the calibration data, and all processes end up with the encodings computed
+    from the union of the shards.
+
+    Min-max statistics are merged exactly. Histograms are resized to the global range and summed up,
+    the same way histograms of consecutive batches are merged within a single process.
+
+    .. note::
+        All processes should hold the same model and compute encodings of the same set of quantizers,
+        since statistics are all-reduced quantizer by quantizer. Processes that receive no calibration
+        data should still call ``compute_encodings``.
+
+    Example:
+
+        >>> dist.init_process_group(backend='gloo')
+        >>> with enable_distributed_calibration():
+        ...     sim.compute_encodings(run_forward_pass, calibration_shards[dist.get_rank()])
+
+    :param process_group: Process group to all-reduce the statistics across. Default process group if None.
+    """
+    if not dist.is_initialized():
+        raise RuntimeError("Default process group is not initialized. "
+                           "Call torch.distributed.init_process_group() first.")
+
+    with _all_reduce_stats_before_compute(True, process_group):
+        yield
@@ -0,0 +1,256 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+# pylint: disable=redefined-builtin
+""" Low-overhead inference path for calibrated quantized models """
+
+import copy
+from typing import Any, Dict, Optional, Tuple, Union
+
+import torch
+from torch import nn, Tensor
+from torch.utils._pytree import tree_map
+
+from aimet_torch.v2.nn import BaseQuantizationMixin
+from aimet_torch.v2.nn.true_quant import _DispatchMixin, _dequantize_if_applicable
+from aimet_torch.v2.quantization.base import QuantizerBase
+from aimet_torch.v2.quantization.affine import QuantizeDequantize
+from aimet_torch.v2.quantization.affine.backends import quantize_dequantize
+
+
+__all__ = ['lower_for_inference']
+
+
+def _to_plain_tensor(output: Any):
+    """
+    Strips off QuantizedTensorBase subclass from the (nested) outputs
+    """
+    return tree_map(lambda t: _dequantize_if_applicable(t).as_subclass(Tensor) if isinstance(t, Tensor) else t,
+                    output)
+
+
+class _FusedQuantizeDequantize(nn.Module):
+    """
+    Quantize-dequantize with frozen encodings that takes and returns plain torch.Tensor
+    """
+    def __init__(self, quantizer: QuantizeDequantize):
+        super().__init__()
+        encoding = quantizer.get_encodings()
+        self.register_buffer('scale', encoding.scale.detach().clone())
+        self.register_buffer('offset', encoding.offset.detach().clone())
+        self.qmin = encoding.qmin
+        self.qmax = encoding.qmax
+        self.block_size = encoding.block_size
+
+    def forward(self, input: Tensor) -> Tensor: # pylint: disable=missing-function-docstring
+        return quantize_dequantize(input, self.scale, self.offset,
+                                   qmin=self.qmin, qmax=self.qmax, block_size=self.block_size)
+
+
+class _PlainTensorQuantizer(nn.Module):
+    """
+    Wraps a quantizer whose encodings can't be frozen into a fused kernel (e.g. float quantizers)
+    so that it returns dequantized plain torch.Tensor
+    """
+    def __init__(self, quantizer: QuantizerBase):
+        super().__init__()
+        self.quantizer = quantizer
+
+    def forward(self, input: Tensor) -> Tensor: # pylint: disable=missing-function-docstring
+        return _to_plain_tensor(self.quantizer(input))
+
+
+class _PlainTensorModule(nn.Module):
+    """
+    Wraps a quantized module that can't be lowered so that it returns plain torch.Tensor
+    """
+    def __init__(self, module: nn.Module):
+        super().__init__()
+        self.module = module
+
+    def forward(self, *args, **kwargs): # pylint: disable=missing-function-docstring
+        return _to_plain_tensor(self.module(*args, **kwargs))
+
+
+class _LoweredQuantizedModule(nn.Module):
+    """
+    Lowered form of a dispatch-based quantized module.
+
+    Runs the floating point module with quantize-dequantized parameters,
+    quantize-dequantizing the floating point inputs and output without QuantizedTensor subclass dispatch.
+    """
+    def __init__(self, module: nn.Module, input_quantizers, output_quantizer: Optional[nn.Module]):
+        super().__init__()
+        self.module = module
+        self.input_quantizers = nn.ModuleList(input_quantizers)
+        self.output_quantizer = output_quantizer
+
+    def forward(self, *args, **kwargs): # pylint: disable=missing-function-docstring
+        args = tuple(
+            qtzr(x) if qtzr is not None and isinstance(x, Tensor) and x.is_floating_point() else x
+            for x, qtzr in zip(args, self.input_quantizers)
+        ) + args[len(self.input_quantizers):]
+
+        output = self.module(*args, **kwargs)
+
+        if self.output_quantizer is not None and isinstance(output, Tensor) and output.is_floating_point():
+            output = self.output_quantizer(output)
+
+        return output
+
+
+def _lower_quantizer(quantizer: Optional[QuantizerBase]) -> Optional[nn.Module]:
+    if quantizer is None:
+        return None
+
+    if not quantizer.is_initialized():
+        raise RuntimeError(f"Failed to lower {type(quantizer).__name__} since quantization parameters "
+                           "are not initialized. Please initialize the quantization parameters using "
+                           "`compute_encodings()`.")
+
+    if type(quantizer) is QuantizeDequantize: # pylint: disable=unidiomatic-typecheck
+        return _FusedQuantizeDequantize(quantizer)
+
+    return _PlainTensorQuantizer(quantizer)
+
+
+def _is_lowerable(qmodule: BaseQuantizationMixin) -> bool:
+    """
+    Returns True if the quantized module quantizes the positional inputs of its forward method
+    and the output of the underlying torch function with the default (non-integer) kernel
+    """
+    # pylint: disable=protected-access
+    return isinstance(qmodule, _DispatchMixin) and \
+           qmodule.get_kernel() is None and \
+           type(qmodule)._builtin_torch_fn_helper is _DispatchMixin._builtin_torch_fn_helper and \
+           len(qmodule.output_quantizers) == 1
+
+
+@torch.no_grad()
+def _lower_quantized_module(qmodule: BaseQuantizationMixin) -> nn.Module:
+    if not _is_lowerable(qmodule):
+        return _PlainTensorModule(qmodule)
+
+    qmodule._compute_param_encodings(overwrite=False) # pylint: disable=protected-access
+
+    module = qmodule.get_original_module()
+    for param_name, param_quantizer in qmodule.param_quantizers.items():
+        param = getattr(qmodule, param_name)
+        if param_quantizer is None or param is None:
+            continue
+        if not param_quantizer.is_initialized():
+            raise RuntimeError(f"Failed to lower {type(qmodule).__name__} since the encodings of "
+                               f"'{param_name}' are not initialized.")
+        param = _to_plain_tensor(param_quantizer(param)).detach()
+        module._parameters[param_name] = nn.Parameter(param, requires_grad=False) # pylint: disable=protected-access
+
+    input_quantizers = [_lower_quantizer(qtzr) for qtzr in qmodule.input_quantizers]
+    output_quantizer = _lower_quantizer(qmodule.output_quantizers[0])
+    return _LoweredQuantizedModule(module, input_quantizers, output_quantizer)
+
+
+def _lower(module: nn.Module, memo: Dict[nn.Module, nn.Module]) -> nn.Module:
+    if module in memo:
+        return memo[module]
+
+    if isinstance(module, BaseQuantizationMixin):
+        lowered = _lower_quantized_module(module)
+    else:
+        # Shallow-copy the module so the original model is left intact.
+        # Parameters and buffers are shared with the original model
+        lowered = copy.copy(module)
+        lowered._parameters = module._parameters.copy() # pylint: disable=protected-access
+        lowered._buffers = module._buffers.copy() # pylint: disable=protected-access
+        lowered._modules = module._modules.copy() # pylint: disable=protected-access
+        for name, child in module.named_children():
+            lowered._modules[name] = _lower(child, memo) # pylint: disable=protected-access
+
+    memo[module] = lowered
+    return lowered
+
+
+def lower_for_inference(model: nn.Module,
+                        example_inputs: Optional[Union[Tensor, Tuple[Any, ...]]] = None,
+                        compile: bool = False) -> nn.Module:
+    """
+    Lowers a calibrated quantized model into an inference-only model that runs on plain :class:`torch.Tensor`.
+
+    Quantized modules evaluate their inputs, parameters, and outputs as :class:`QuantizedTensorBase` objects
+    with Python-level dispatch (:meth:`QuantizedTensorBase.__torch_function__` and a torch function mode
+    per forward pass), which becomes the dominant CPU cost in graphs with many small operations.
+    The lowered model instead
+
+        1) quantize-dequantizes the parameters once, ahead of time,
+        2) replaces :class:`QuantizeDequantize` quantizers with fused quantize-dequantize calls
+           with frozen encodings, and
+        3) runs the floating point modules directly on plain :class:`torch.Tensor`.
+
+    The lowered model produces the same outputs as the original model.
+    Quantized modules that can't be lowered (e.g. modules with custom kernels or recurrent modules)
+    are kept as they are, with their outputs converted to plain :class:`torch.Tensor`.
+
+    .. note::
+        The lowered model is a snapshot of the encodings and parameters at the time of lowering.
+        It doesn't reflect any changes made to the original model afterwards.
+        The original model is left unchanged, and shares the unquantized parameters and buffers
+        with the lowered model.
+
+    Example:
+
+        >>> sim = QuantizationSimModel(model, dummy_input)
+        >>> sim.compute_encodings(...)
+        >>> sim.model.eval()
+        >>> lowered = lower_for_inference(sim.model, dummy_input)
+        >>> lowered(dummy_input)
+
+    :param model: Calibrated model containing quantized modules
+    :param example_inputs: Example inputs to trace the lowered model with :func:`torch.jit.trace`.
+        If None, the lowered model is returned without tracing
+    :param compile: If True, compiles the lowered model with :func:`torch.compile` instead of tracing
+    :return: Lowered model
+    """
+    lowered = _lower(model, {})
+
+    if compile:
+        return torch.compile(lowered)
+
+    if example_inputs is not None:
+        if not isinstance(example_inputs, tuple):
+            example_inputs = (example_inputs,)
+        with torch.no_grad():
+            return torch.jit.trace(lowered, example_inputs)
+
+    return lowered
@@ -64,15 +64,18 @@ from aimet_torch._base.quantsim import (
 from aimet_torch.v2 import nn as aimet_nn
 from aimet_torch.v2.nn import BaseQuantizationMixin, QuantizationMixin, UnknownModuleError
 from aimet_torch.v2.nn.fake_quant import _legacy_impl
+from aimet_torch.v2.nn.true_quant import _dequantize_if_applicable
 from aimet_torch.v2._builder import _V2LazyQuantizeWrapper
 from aimet_torch.v2.quantization.base import QuantizerBase
 from aimet_torch.v2.quantization.affine import AffineQuantizerBase
 from aimet_torch.v2.quantization.encoding_analyzer import PercentileEncodingAnalyzer
+from aimet_torch.v2.quantization._compiled_kernels import _register_compiled_impl_hooks
 from aimet_torch.v2.utils import patch_attr
 from aimet_torch import utils
 from aimet_torch.utils import deprecated, _red
 from aimet_torch.v2.deepspeed_utils import _register_zero3_forward_hooks
 from aimet_torch.v2.experimental.onnx._export import remove_quantization_nodes_from_onnx_graph, export
+from .stats_cache import _compute_encodings
 
 __all__ = [
     'QuantizationSimModel',
@@ -207,7 +210,9 @@ class QuantizationSimModel(_QuantizationSimModelBase):
                  default_param_bw: int = 8,
                  in_place: bool = False,
                  config_file: Optional[str] = None,
-                 default_data_type: QuantizationDataType = QuantizationDataType.int):
+                 default_data_type: QuantizationDataType = QuantizationDataType.int,
+                 use_compiled_kernels: bool = False,
+                 cache_quantized_params: bool = False):
         """
         .. warning::
            `rounding_mode` parameter is deprecated.
@@ -237,6 +242,13 @@ class QuantizationSimModel(_QuantizationSimModelBase):
                 Possible options are QuantizationDataType.int and QuantizationDataType.float.
                 Note that the mode default_data_type=QuantizationDataType.float is only supported with
                 default_output_bw=16 or 32 and default_param_bw=16 or 32. (Default: `QuantizationDataType.int`)
+            use_compiled_kernels (bool, optional): If True, the forward passes of the quantized model run
+                quantization kernels and observers compiled by :func:`torch.compile`, as well as
+                the backward passes of the graphs they create. Falls back to the eager kernels with a
+                warning if compilation isn't supported in the current environment. (Default: `False`)
+            cache_quantized_params (bool, optional): If True, quantized parameters are cached while gradient
+                computation is disabled, so that repeated evaluations quantize the parameters only once.
+                Note that the cache holds a quantized copy of every parameter of the model. (Default: `False`)
         """
         if not quant_scheme:
             old_default = QuantScheme.post_training_tf_enhanced
@@ -335,6 +347,14 @@ class QuantizationSimModel(_QuantizationSimModelBase):
             # Set quantization parameters to the device of the original module
             module.to(device=device)
 
+        if use_compiled_kernels:
+            _register_compiled_impl_hooks(self.model)
+
+        if cache_quantized_params:
+            for module in self.model.modules():
+                if isinstance(module, BaseQuantizationMixin):
+                    module.CACHE_QUANTIZED_PARAMS_IN_INFERENCE = True
+
         # Class instantiation for supporting sim.onnx.export()
         self.onnx = _QuantizationSimOnnxExport(self)
 
@@ -401,8 +421,7 @@ class QuantizationSimModel(_QuantizationSimModelBase):
 
         # Run forward iterations so we can collect statistics to compute the appropriate encodings
         with utils.in_eval_mode(self.model), torch.no_grad():
-            with aimet_nn.compute_encodings(self.model):
-                _ = forward_pass_callback(*args)
+            _compute_encodings(self.model, forward_pass_callback, args)
 
     def export(self, path: str, filename_prefix: str, dummy_input: Union[torch.Tensor, Tuple],
                *args, **kwargs):
@@ -523,6 +542,31 @@ class QuantizationSimModel(_QuantizationSimModelBase):
                 stack.enter_context(cls._update_parameters_by_attr(module))
         return stack
 
+    @classmethod
+    def _get_param_quantize_dequantize_fn(cls, sim_model: torch.nn.Module):
+        """
+        Returns a function that quantize-dequantizes a parameter of the sim model
+        with its parameter quantizer, and returns any other tensor as is.
+
+        :param sim_model: model with the quantsim wrappers
+        """
+        param_quantizers = {}
+        for module in sim_model.modules():
+            if isinstance(module, BaseQuantizationMixin):
+                for param_name, param_quantizer in module.param_quantizers.items():
+                    param = module._parameters.get(param_name) # pylint: disable=protected-access
+                    if param_quantizer and param is not None:
+                        param_quantizers[id(param)] = param_quantizer
+
+        @torch.no_grad()
+        def quantize_dequantize(tensor: torch.Tensor) -> torch.Tensor:
+            param_quantizer = param_quantizers.get(id(tensor))
+            if param_quantizer is None or not param_quantizer.is_initialized():
+                return tensor
+            return _dequantize_if_applicable(param_quantizer(tensor)).as_subclass(torch.Tensor)
+
+        return quantize_dequantize
+
     def named_qmodules(self):
         """Generator that yields all quantized modules in the model and their names
         """
@@ -0,0 +1,303 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+""" Persistent cache of the calibration statistics collected by compute_encodings """
+
+import contextlib
+import copy
+import hashlib
+import itertools
+import os
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import torch
+import torch.distributed as dist
+
+from aimet_common.cache import Cache
+from aimet_torch import utils
+from aimet_torch.v2 import nn as aimet_nn
+from aimet_torch.v2.nn import BaseQuantizationMixin
+from aimet_torch.v2.quantization.base import QuantizerBase
+from aimet_torch.v2.quantization.encoding_analyzer import _all_reduce_stats_before_compute, _get_communication_device, \
+    is_all_reduce_enabled, get_all_reduce_process_group
+from aimet_torch.v2.utils import flatten_nn_module_list
+
+
+__all__ = ['enable_encoding_stats_cache']
+
+
+_stats_cache = Cache()
+_data_key: Optional[str] = None
+
+
+@contextlib.contextmanager
+def enable_encoding_stats_cache(cache_dir: str, data_key: str):
+    """
+    Enables caching of the raw input statistics collected by
+    :meth:`QuantizationSimModel.compute_encodings`.
+
+    Within this context, the statistics observed by each input/output quantizer are saved to
+    ``cache_dir``, keyed by a fingerprint of the model graph, the model weights, the parameter
+    quantizer configurations and ``data_key``.
+    Subsequent calls to ``compute_encodings`` with the same key will skip the calibration
+    forward passes and derive the encodings directly from the cached statistics.
+    Since input/output quantizers run in pass-through mode during calibration, the cached
+    statistics stay valid after changing the bitwidth or symmetry of the input/output quantizers.
+
+    .. note::
+        Hashing the whole calibration data would require running ``forward_pass_callback`` in full,
+        which is what the cache is meant to avoid. ``data_key`` should therefore uniquely identify
+        the calibration data produced by ``forward_pass_callback``, and be changed whenever the
+        calibration data changes. As a safeguard, the first batch of calibration data is also
+        fingerprinted by running ``forward_pass_callback`` until the first forward pass of the model.
+
+    Example:
+
+        >>> with enable_encoding_stats_cache("./stats_cache", data_key="calib_set_v1"):
+        ...     sim.compute_encodings(run_forward_pass)
+        ...     sim.model.conv1.output_quantizers[0].bitwidth = 4
+        ...     sim.compute_encodings(run_forward_pass) # No forward pass
+
+    :param cache_dir: Directory to save the cached statistics
+    :param data_key: Key that identifies the calibration data used by the forward pass callback
+    """
+    if not isinstance(data_key, str) or not data_key:
+        raise ValueError(f"data_key should be a non-empty string identifying the calibration data; got {data_key}")
+
+    global _data_key # pylint: disable=global-statement
+    prev_data_key = _data_key
+    _data_key = data_key
+    try:
+        with _stats_cache.enable(cache_dir):
+            yield
+    finally:
+        _data_key = prev_data_key
+
+
+def _get_activation_quantizers(model: torch.nn.Module) -> Dict[str, QuantizerBase]:
+    """
+    Returns input/output quantizers whose statistics are collected during compute_encodings
+    """
+    module_to_name = {module: name for name, module in model.named_modules()}
+    quantizers = {}
+
+    for module in model.modules():
+        if not isinstance(module, BaseQuantizationMixin):
+            continue
+        for qtzr in flatten_nn_module_list(module.input_quantizers) +\
+                flatten_nn_module_list(module.output_quantizers):
+            if not isinstance(qtzr, QuantizerBase) or not qtzr._allow_overwrite: # pylint: disable=protected-access
+                continue
+            if getattr(qtzr, 'encoding_analyzer', None) is None:
+                continue
+            quantizers[module_to_name[qtzr]] = qtzr
+
+    return quantizers
+
+
+def _get_observer_descriptor(qtzr: QuantizerBase) -> Tuple:
+    """
+    Returns the attributes of the quantizer that determine the layout of its observer statistics
+    """
+    analyzer = qtzr.encoding_analyzer
+    return (type(analyzer).__name__,
+            type(analyzer.observer).__name__,
+            tuple(analyzer.observer.shape),
+            getattr(analyzer.observer, 'num_bins', None),
+            getattr(qtzr, 'block_size', None))
+
+
+def _update_hash_with_tensor(hasher, tensor: torch.Tensor):
+    """ Update hash with the dtype, shape and raw bytes of the tensor """
+    tensor = tensor.detach().cpu().contiguous()
+    hasher.update(f'{tensor.dtype}{tuple(tensor.shape)}'.encode())
+    hasher.update(tensor.flatten().view(torch.uint8).numpy().tobytes())
+
+
+def _update_hash_with_data(hasher, data: Any):
+    """ Update hash with a (possibly nested) structure of tensors """
+    if isinstance(data, torch.Tensor):
+        _update_hash_with_tensor(hasher, data)
+    elif isinstance(data, (list, tuple)):
+        hasher.update(f'{type(data).__name__}{len(data)}'.encode())
+        for item in data:
+            _update_hash_with_data(hasher, item)
+    elif isinstance(data, dict):
+        hasher.update(f'dict{len(data)}'.encode())
+        for key, value in data.items():
+            hasher.update(repr(key).encode())
+            _update_hash_with_data(hasher, value)
+    else:
+        hasher.update(repr(data).encode())
+
+
+def _fingerprint_model(model: torch.nn.Module, activation_quantizers: Dict[str, QuantizerBase], hasher):
+    """
+    Hash the graph, weights and the quantization parameters of the model.
+
+    Input/output quantizers whose statistics are cached are excluded since they run in
+    pass-through mode during calibration and don't affect the statistics.
+    """
+    for name, module in model.named_modules():
+        hasher.update(f'{name}:{type(module).__qualname__}'.encode())
+
+        if name in activation_quantizers:
+            continue
+
+        if isinstance(module, QuantizerBase):
+            # Configuration (bitwidth, symmetry, ...) of the parameter quantizers affects
+            # the statistics observed by the downstream input/output quantizers
+            hasher.update(repr(module).encode())
+            hasher.update(str(module._allow_overwrite).encode()) # pylint: disable=protected-access
+            if module._allow_overwrite: # pylint: disable=protected-access
+                # Encodings will be overwritten by compute_encodings
+                continue
+
+        for tensor_name, tensor in itertools.chain(module.named_parameters(recurse=False),
+                                                   module.named_buffers(recurse=False)):
+            if tensor is None:
+                continue
+            hasher.update(tensor_name.encode())
+            _update_hash_with_tensor(hasher, tensor)
+
+
+def _fingerprint_calibration_data(model: torch.nn.Module,
+                                  forward_pass_callback: Callable,
+                                  args: Tuple,
+                                  hasher):
+    """
+    Hash the inputs of the first forward pass invoked by forward_pass_callback
+    """
+    def hash_inputs_and_stop(_, inputs, kwargs):
+        _update_hash_with_data(hasher, inputs)
+        _update_hash_with_data(hasher, kwargs)
+        raise utils.StopForwardException
+
+    handle = model.register_forward_pre_hook(hash_inputs_and_stop, with_kwargs=True)
+    try:
+        forward_pass_callback(*args)
+    except utils.StopForwardException:
+        pass
+    finally:
+        handle.remove()
+
+
+def _compute_encodings(model: torch.nn.Module, forward_pass_callback: Callable, args: Tuple):
+    """
+    Compute encodings of all quantizers in the model, reusing the cached statistics if available.
+
+    :param model: Model to compute encodings
+    :param forward_pass_callback: Callback that runs calibration forward passes
+    :param args: Arguments to forward_pass_callback
+    """
+    if not _stats_cache.is_enabled():
+        with aimet_nn.compute_encodings(model):
+            _ = forward_pass_callback(*args)
+        return
+
+    quantizers = _get_activation_quantizers(model)
+    hasher = hashlib.sha256()
+    hasher.update(f'data_key:{_data_key}'.encode())
+    _fingerprint_model(model, quantizers, hasher)
+    _fingerprint_calibration_data(model, forward_pass_callback, args, hasher)
+    for name, qtzr in quantizers.items():
+        hasher.update(f'{name}:{_get_observer_descriptor(qtzr)}'.encode())
+
+    if is_all_reduce_enabled():
+        # Statistics are cached after being all-reduced, so they are valid only for the same process group.
+        # Rank is included so that the processes don't write the same cache file
+        process_group = get_all_reduce_process_group()
+        hasher.update(f'all_reduce:{dist.get_rank(process_group)}/{dist.get_world_size(process_group)}'.encode())
+
+    calibrated = []
+    cache_key = f'encoding_stats_{hasher.hexdigest()}'
+
+    def calibrate() -> Dict[str, Any]:
+        with aimet_nn.compute_encodings(model):
+            _ = forward_pass_callback(*args)
+        calibrated.append(True)
+        return {
+            name: copy.deepcopy(qtzr.encoding_analyzer.observer.get_stats())
+            for name, qtzr in quantizers.items()
+        }
+
+    collect_stats = _stats_cache.mark(cache_key)(calibrate)
+
+    if is_all_reduce_enabled():
+        # Processes that miss the cache all-reduce the statistics while calibrating.
+        # Unless all processes hit the cache, all processes should calibrate to join the all-reduce
+        is_cache_hit = os.path.exists(_stats_cache.get_cache_file(cache_key))
+        if not _is_cache_hit_in_all_processes(is_cache_hit, get_all_reduce_process_group()):
+            if is_cache_hit:
+                calibrate()
+            else:
+                collect_stats()
+            return
+
+    stats = collect_stats()
+    if calibrated:
+        return
+
+    # Cache hit. Compute encodings from the cached statistics without running forward passes.
+    # Cached statistics were saved after being all-reduced, so they shouldn't be all-reduced again
+    with _all_reduce_stats_before_compute(False), aimet_nn.compute_encodings(model):
+        for name, qtzr in quantizers.items():
+            qtzr.encoding_analyzer.observer.stats = _to_device(stats[name], qtzr)
+
+
+def _is_cache_hit_in_all_processes(is_cache_hit: bool, process_group: Optional[dist.ProcessGroup]) -> bool:
+    """
+    Returns True if all processes in the process group hit the cache
+    """
+    device = _get_communication_device(process_group)
+    is_cache_hit = torch.tensor([float(is_cache_hit)], device=device)
+    dist.all_reduce(is_cache_hit, op=dist.ReduceOp.MIN, group=process_group)
+    return bool(is_cache_hit.item())
+
+
+def _to_device(stats: Any, qtzr: QuantizerBase) -> Any:
+    """
+    Move the loaded statistics to the device of the quantizer
+    """
+    device = next(iter(qtzr.parameters()), torch.empty(0)).device
+
+    if isinstance(stats, list):
+        return [_to_device(s, qtzr) for s in stats]
+
+    stats = copy.copy(stats)
+    for field, value in vars(stats).items():
+        if isinstance(value, torch.Tensor):
+            setattr(stats, field, value.to(device))
+    return stats
@@ -335,6 +335,59 @@ class SequentialMse(SequentialMseBase):
         block_losses = torch.stack(block_losses, dim=-1)
         return block_losses
 
+    @classmethod
+    def _compute_candidate_losses(cls,
+                                  quant_module: BaseQuantizationMixin,
+                                  x: torch.Tensor,
+                                  xq: torch.Tensor,
+                                  min_tensor: torch.Tensor,
+                                  max_tensor: torch.Tensor,
+                                  params: SeqMseParams) -> torch.Tensor:
+        """
+        Compute reconstruction loss of each candidate, one candidate at a time.
+
+        :return: Loss of shape [candidates, channels, blocks]
+        """
+        total_loss = []
+        for i in range(params.num_candidates):
+            cand_min, cand_max = cls._get_candidate(i, params.num_candidates, min_tensor, max_tensor)
+            cls.compute_param_encodings(quant_module.param_quantizers['weight'], cand_min, cand_max)
+            w = quant_module.weight
+            wq = cls._get_quantized_weight(quant_module)
+            with torch.no_grad():
+                for batch_idx in range(params.num_batches):
+                    if batch_idx == 0:
+                        loss = cls._compute_loss(quant_module, x[batch_idx], xq[batch_idx], w, wq, params)
+                    else:
+                        loss += cls._compute_loss(quant_module, x[batch_idx], xq[batch_idx], w, wq, params)
+                total_loss.append(loss)
+        return torch.stack(total_loss)
+
+    @classmethod
+    def _compute_candidate_losses_in_chunks(cls,
+                                            quant_module: BaseQuantizationMixin,
+                                            x: torch.Tensor,
+                                            xq: torch.Tensor,
+                                            min_tensor: torch.Tensor,
+                                            max_tensor: torch.Tensor,
+                                            params: SeqMseParams) -> torch.Tensor:
+        """
+        Compute reconstruction loss of all candidates at once, accumulating the loss over chunks of the inputs
+        that fit in params.memory_budget.
+
+        :return: Loss of shape [candidates, channels, blocks]
+        """
+        with torch.no_grad():
+            wq = []
+            for i in range(params.num_candidates):
+                cand_min, cand_max = cls._get_candidate(i, params.num_candidates, min_tensor, max_tensor)
+                cls.compute_param_encodings(quant_module.param_quantizers['weight'], cand_min, cand_max)
+                wq.append(cls._get_quantized_weight(quant_module).as_subclass(torch.Tensor))
+            wq = torch.stack(wq)
+
+            block_size = cls._get_input_channel_block_size(quant_module)
+            return cls.compute_recon_loss_in_chunks(quant_module, x, xq, quant_module.weight, wq, block_size, params)
+
     @classmethod
     def optimize_module(cls,
                         quant_module: BaseQuantizationMixin,
@@ -353,21 +406,13 @@ class SequentialMse(SequentialMseBase):
         with SafeGatheredParameters(quant_module.parameters(recurse=False)):
             min_tensor, max_tensor = cls.get_min_and_max_for_candidate_selection(quant_module)
 
-            total_loss = []
-            for i in range(params.num_candidates):
-                cand_min, cand_max = cls._get_candidate(i, params.num_candidates, min_tensor, max_tensor)
-                cls.compute_param_encodings(quant_module.param_quantizers['weight'], cand_min, cand_max)
-                w = quant_module.weight
-                wq = cls._get_quantized_weight(quant_module)
-                with torch.no_grad():
-                    for batch_idx in range(params.num_batches):
-                        if batch_idx == 0:
-                            loss = cls._compute_loss(quant_module, x[batch_idx], xq[batch_idx], w, wq, params)
-                        else:
-                            loss += cls._compute_loss(quant_module, x[batch_idx], xq[batch_idx], w, wq, params)
-                    total_loss.append(loss)
-
-            best_indices = torch.stack(total_loss).min(0)[1]
+            if params.memory_budget is None:
+                total_loss = cls._compute_candidate_losses(quant_module, x, xq, min_tensor, max_tensor, params)
+            else:
+                total_loss = cls._compute_candidate_losses_in_chunks(quant_module, x, xq, min_tensor, max_tensor,
+                                                                     params)
+
+            best_indices = total_loss.min(0)[1]
             block_size = cls._get_input_channel_block_size(quant_module)
             # In the input_channels dimension, best_indices is of size num_blocks. We use repeat_interleave to expand
             # each blockwise index into block_size number of indices. This makes best_indices input_channels dimension
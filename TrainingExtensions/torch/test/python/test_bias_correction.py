@@ -184,6 +184,42 @@ class TestTrainingExtensionBnFold:
         assert model.conv2.bias.detach().cpu().numpy() is not None
         assert model.fc1.bias.detach().cpu().numpy() is not None
 
+    def test_bias_correction_empirical_single_pass(self):
+        torch.manual_seed(10)
+        model = mnist_model.Net().eval()
+        model_single_pass = copy.deepcopy(model)
+        data_loader = create_fake_data_loader(dataset_size=2, batch_size=1, image_size=(1, 28, 28))
+        params = qsim.QuantParams(weight_bw=4, act_bw=4, round_mode="nearest",
+                                  quant_scheme=QuantScheme.post_training_tf, config_file=None)
+
+        with unittest.mock.patch('aimet_torch.bias_correction.forward_pass',
+                                 wraps=bias_correction.forward_pass) as forward_pass_mock:
+            bias_correction.correct_bias(model, params, 2, data_loader, 2)
+            num_forward_passes = forward_pass_mock.call_count
+            forward_pass_mock.reset_mock()
+
+            bias_correction.correct_bias(model_single_pass, params, 2, data_loader, 2, single_pass=True)
+            num_forward_passes_single_pass = forward_pass_mock.call_count
+
+        # 2 batches for compute_encodings, then 2 batches for each of reference and quantized models
+        assert num_forward_passes_single_pass == 2 + 2 * 2
+        assert num_forward_passes_single_pass < num_forward_passes
+
+        # Nothing precedes conv1, so its statistics are the same in both cases
+        assert torch.allclose(model.conv1.bias, model_single_pass.conv1.bias, atol=1e-6)
+
+    def test_per_channel_output_mean(self):
+        torch.manual_seed(10)
+        model = mnist_model.Net().eval()
+        data_loader = create_fake_data_loader(dataset_size=4, batch_size=2, image_size=(1, 28, 28))
+
+        means = bias_correction.get_per_channel_output_mean(model, {'conv2': 1, 'fc1': -1}, data_loader, 2)
+
+        reference_outputs = np.concatenate([bias_correction.get_output_data(model.conv2, model, images)
+                                            for images, _ in data_loader])
+        assert np.allclose(means['conv2'], reference_outputs.mean(axis=(0, 2, 3)), atol=1e-6)
+        assert means['fc1'].shape == (model.fc1.out_features,)
+
     def test_layer_selection_bn_based_bc_no_residual(self):
         model = MockMobileNetV1()
         model = model.eval()
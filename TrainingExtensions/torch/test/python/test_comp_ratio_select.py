@@ -41,8 +41,11 @@ from unittest.mock import create_autospec
 from decimal import Decimal
 import math
 import os
+import pickle
 import signal
+import tempfile
 
+import torch
 from torch import nn
 import torch.nn.functional as functional
 import aimet_common.libpymo as pymo
@@ -166,7 +169,10 @@ class TestTrainingExtensionsCompRatioSelect(unittest.TestCase):
         greedy_algo = comp_ratio_select.GreedyCompRatioSelectAlgo(layer_db, pruner, SpatialSvdCostCalculator(),
                                                                   eval_func, 20, CostMetric.mac, 0.5, 10, True, None,
                                                                   None, True, bokeh_session=None)
-        eval_dict = greedy_algo._compute_eval_scores_for_all_comp_ratio_candidates()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with unittest.mock.patch.object(comp_ratio_select.GreedyCompRatioSelectAlgo, 'PICKLE_FILE_EVAL_DICT',
+                                            os.path.join(tmp_dir, 'eval_scores_dict.pkl')):
+                eval_dict = greedy_algo._compute_eval_scores_for_all_comp_ratio_candidates()
 
         print()
         print(eval_dict)
@@ -175,6 +181,179 @@ class TestTrainingExtensionsCompRatioSelect(unittest.TestCase):
         self.assertEqual(51, eval_dict['conv2'][Decimal('0.5')])
         self.assertEqual(21, eval_dict['conv2'][Decimal('0.8')])
 
+    def test_eval_scores_with_spatial_svd_pruner_in_place(self):
+        """
+        Given: A layer database and a spatial SVD pruner
+        When: Eval scores are computed by patching each pruned layer into the original model
+        Then: 1) The eval scores match the ones computed on pruned copies of the model
+              2) The original model and layer database are restored after each evaluation
+        """
+        torch.manual_seed(0)
+        model = mnist_torch_model.Net().eval()
+        input_shape = (1, 1, 28, 28)
+        dummy_input = create_rand_tensors_given_shapes(input_shape, get_device(model))
+        layer_db = LayerDatabase(model, dummy_input)
+
+        layer1 = layer_db.find_layer_by_name('conv1')
+        layer2 = layer_db.find_layer_by_name('conv2')
+        layer_db.mark_picked_layers([layer1, layer2])
+
+        orig_modules = list(model.modules())
+        orig_layers = list(layer_db)
+        eval_models = []
+
+        def eval_func(model, _iterations, use_cuda):
+            eval_models.append(model)
+            with torch.no_grad():
+                return model.eval()(*dummy_input).sum().item()
+
+        eval_dicts = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with unittest.mock.patch.object(comp_ratio_select.GreedyCompRatioSelectAlgo, 'PICKLE_FILE_EVAL_DICT',
+                                            os.path.join(tmp_dir, 'eval_scores_dict.pkl')):
+                for patch_layers_in_place in (False, True):
+                    greedy_algo = comp_ratio_select.GreedyCompRatioSelectAlgo(layer_db, SpatialSvdPruner(),
+                                                                              SpatialSvdCostCalculator(), eval_func, 20,
+                                                                              CostMetric.mac, 0.5, 10, True, None, None,
+                                                                              False, bokeh_session=None,
+                                                                              patch_layers_in_place=patch_layers_in_place)
+                    eval_dicts.append(greedy_algo._compute_eval_scores_for_all_comp_ratio_candidates())
+
+        for layer_name in ('conv1', 'conv2'):
+            for comp_ratio, eval_score in eval_dicts[0][layer_name].items():
+                self.assertAlmostEqual(eval_score, eval_dicts[1][layer_name][comp_ratio], places=3)
+
+        # Copies of the model are only evaluated without patching layers in place
+        num_evals = len(eval_models) // 2
+        self.assertTrue(all(eval_model is not model for eval_model in eval_models[:num_evals]))
+        self.assertTrue(all(eval_model is model for eval_model in eval_models[num_evals:]))
+
+        self.assertEqual(orig_modules, list(model.modules()))
+        self.assertEqual(orig_layers, list(layer_db))
+        self.assertIs(model.conv1, layer_db.find_layer_by_name('conv1').module)
+
+    def test_eval_scores_in_parallel_and_resume(self):
+        """
+        Given: A layer database and a spatial SVD pruner
+        When: 1) Eval scores are computed with 2 worker processes
+              2) Eval scores are computed from a partially computed eval scores dictionary
+        Then: 1) The eval scores match the ones computed in the current process
+              2) Only the missing candidates are evaluated and the completed dictionary is saved
+        """
+        torch.manual_seed(0)
+        model = mnist_torch_model.Net().eval()
+        input_shape = (1, 1, 28, 28)
+        dummy_input = create_rand_tensors_given_shapes(input_shape, get_device(model))
+        layer_db = LayerDatabase(model, dummy_input)
+        layer_db.mark_picked_layers([layer_db.find_layer_by_name('conv1'), layer_db.find_layer_by_name('conv2')])
+
+        eval_func = unittest.mock.MagicMock()
+
+        def _eval(model, _iterations, use_cuda):
+            with torch.no_grad():
+                return model.eval()(*dummy_input).sum().item()
+
+        eval_func.side_effect = _eval
+
+        def create_greedy_algo(saved_eval_scores_dict=None, num_workers=None):
+            return comp_ratio_select.GreedyCompRatioSelectAlgo(layer_db, SpatialSvdPruner(), SpatialSvdCostCalculator(),
+                                                               eval_func, 20, CostMetric.mac, 0.5, 5, True,
+                                                               saved_eval_scores_dict, None, False, bokeh_session=None,
+                                                               num_workers=num_workers)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pickle_file = os.path.join(tmp_dir, 'eval_scores_dict.pkl')
+            with unittest.mock.patch.object(comp_ratio_select.GreedyCompRatioSelectAlgo, 'PICKLE_FILE_EVAL_DICT',
+                                            pickle_file):
+                eval_dict = create_greedy_algo()._compute_eval_scores_for_all_comp_ratio_candidates()
+                self.assertEqual(8, eval_func.call_count)
+
+                parallel_eval_dict = create_greedy_algo(num_workers=2)._compute_eval_scores_for_all_comp_ratio_candidates()
+
+                self.assertEqual(list(eval_dict), list(parallel_eval_dict))
+                for layer_name, layer_eval_dict in eval_dict.items():
+                    self.assertEqual(list(layer_eval_dict), list(parallel_eval_dict[layer_name]))
+                    for comp_ratio, eval_score in layer_eval_dict.items():
+                        self.assertAlmostEqual(eval_score, parallel_eval_dict[layer_name][comp_ratio], places=3)
+
+                # Save a partially computed dictionary, as if the run was interrupted
+                partial_eval_dict = {'conv1': dict(eval_dict['conv1']),
+                                     'conv2': {Decimal('0.2'): eval_dict['conv2'][Decimal('0.2')]}}
+                saved_eval_dict_path = os.path.join(tmp_dir, 'partial_eval_scores_dict.pkl')
+                with open(saved_eval_dict_path, 'wb') as f:
+                    pickle.dump(partial_eval_dict, f)
+
+                eval_func.reset_mock()
+                resumed_eval_dict = create_greedy_algo(saved_eval_dict_path)._construct_eval_dict()
+                self.assertEqual(3, eval_func.call_count)
+
+                with open(pickle_file, 'rb') as f:
+                    saved_eval_dict = pickle.load(f)['eval_scores']
+
+        for eval_dict_to_check in (resumed_eval_dict, saved_eval_dict):
+            self.assertEqual(list(eval_dict), list(eval_dict_to_check))
+            for layer_name, layer_eval_dict in eval_dict.items():
+                for comp_ratio, eval_score in layer_eval_dict.items():
+                    self.assertAlmostEqual(eval_score, eval_dict_to_check[layer_name][comp_ratio], places=3)
+
+    def test_resume_interrupted_eval_scores(self):
+        """
+        Given: Eval scores dictionary saved by a run interrupted while evaluating the first layer
+        When: Resume from the saved dictionary
+        Then: 1) All the comp-ratio candidates of the interrupted run should be evaluated,
+                 not only the ones found in the saved dictionary
+              2) The eval scores should match the ones computed without interruption
+        """
+        torch.manual_seed(0)
+        model = mnist_torch_model.Net().eval()
+        input_shape = (1, 1, 28, 28)
+        dummy_input = create_rand_tensors_given_shapes(input_shape, get_device(model))
+        layer_db = LayerDatabase(model, dummy_input)
+        layer_db.mark_picked_layers([layer_db.find_layer_by_name('conv1'), layer_db.find_layer_by_name('conv2')])
+
+        def eval_func(model, _iterations, use_cuda):
+            with torch.no_grad():
+                return model.eval()(*dummy_input).sum().item()
+
+        def create_greedy_algo(eval_func, saved_eval_scores_dict=None):
+            return comp_ratio_select.GreedyCompRatioSelectAlgo(layer_db, SpatialSvdPruner(), SpatialSvdCostCalculator(),
+                                                               eval_func, 20, CostMetric.mac, 0.5, 5, True,
+                                                               saved_eval_scores_dict, None, False, bokeh_session=None)
+
+        num_interrupted_evals = 0
+
+        def interrupting_eval_func(model, iterations, use_cuda):
+            nonlocal num_interrupted_evals
+            if num_interrupted_evals == 1:
+                raise KeyboardInterrupt
+            num_interrupted_evals += 1
+            return eval_func(model, iterations, use_cuda)
+
+        resuming_eval_func = unittest.mock.MagicMock(side_effect=eval_func)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pickle_file = os.path.join(tmp_dir, 'eval_scores_dict.pkl')
+            with unittest.mock.patch.object(comp_ratio_select.GreedyCompRatioSelectAlgo, 'PICKLE_FILE_EVAL_DICT',
+                                            pickle_file):
+                eval_dict = create_greedy_algo(eval_func)._compute_eval_scores_for_all_comp_ratio_candidates()
+
+                with self.assertRaises(KeyboardInterrupt):
+                    create_greedy_algo(interrupting_eval_func)._construct_eval_dict()
+
+                with open(pickle_file, 'rb') as f:
+                    saved = pickle.load(f)
+                self.assertEqual({'conv1': 1}, {name: len(scores) for name, scores in saved['eval_scores'].items()})
+                self.assertEqual(eval_dict['conv1'][Decimal('0.2')], saved['eval_scores']['conv1'][Decimal('0.2')])
+
+                resumed_eval_dict = create_greedy_algo(resuming_eval_func, pickle_file)._construct_eval_dict()
+
+        self.assertEqual(7, resuming_eval_func.call_count)
+        self.assertEqual(list(eval_dict), list(resumed_eval_dict))
+        for layer_name, layer_eval_dict in eval_dict.items():
+            self.assertEqual(list(layer_eval_dict), list(resumed_eval_dict[layer_name]))
+            for comp_ratio, eval_score in layer_eval_dict.items():
+                self.assertEqual(eval_score, resumed_eval_dict[layer_name][comp_ratio])
+
     def test_find_min_max_eval_scores(self):
 
         eval_scores_dict = {'layer1': {Decimal('0.1'): 90, Decimal('0.5'): 50, Decimal('0.7'): 30, Decimal('0.8'): 20},
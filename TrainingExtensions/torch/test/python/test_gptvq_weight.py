@@ -35,6 +35,7 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 """Test GPTVQ weight"""
+import copy
 import itertools
 import json
 import os
@@ -49,6 +50,7 @@ from torch.utils.data import DataLoader, Dataset
 from aimet_common import quantsim
 from aimet_torch.gptvq.defs import GPTVQSupportedModules
 from aimet_torch.gptvq.gptvq_weight import GPTVQ, GPTVQParameters
+from aimet_torch.gptvq.utils import get_module_name_to_hessian_tensor
 from aimet_torch.utils import is_vector_encoding
 from aimet_torch.v2.nn import BaseQuantizationMixin
 from aimet_torch.v2.quantization.affine import VectorEncoding
@@ -113,6 +115,33 @@ class RandomDataset(Dataset):
         return x, y
 
 
+class AttentionLikeBlock(torch.nn.Module):
+    def __init__(self, dim: int):
+        super().__init__()
+        self.q_proj = torch.nn.Linear(dim, dim)
+        self.k_proj = torch.nn.Linear(dim, dim)
+        self.v_proj = torch.nn.Linear(dim, dim)
+        self.o_proj = torch.nn.Linear(dim, dim)
+
+    def forward(self, hidden_states, scale=1.0):
+        q, k, v = self.q_proj(hidden_states), self.k_proj(hidden_states), self.v_proj(hidden_states)
+        return self.o_proj(q * k * scale + v),
+
+
+class ModelWithAttentionLikeBlocks(torch.nn.Module):
+    def __init__(self, dim: int = 256, num_blocks: int = 3):
+        super().__init__()
+        self.embed = torch.nn.Linear(dim, dim)
+        self.layers = torch.nn.ModuleList([AttentionLikeBlock(dim) for _ in range(num_blocks)])
+        self.head = torch.nn.Linear(dim, dim)
+
+    def forward(self, x):
+        x = self.embed(x)
+        for layer in self.layers:
+            x = layer(x, scale=0.5)[0]
+        return self.head(x)
+
+
 class TestGPTVQWeight:
     @pytest.mark.parametrize("vector_bw", [4, 8, 16])
     @pytest.mark.parametrize("rows_per_block", [32, 64])
@@ -240,6 +269,71 @@ class TestGPTVQWeight:
         # After first module optimization, Hessian of next module is affected by previous module if leaf level optimization
         assert not torch.allclose(leaf_level_rounded_model.linear2.weight, block_level_rounded_model.linear2.weight)
 
+    def test_gptvq_with_cached_blocks(self):
+        """
+        Given: Model with blocks executed back-to-back, whose query/key/value projections share input
+        When: Apply GPTVQ with and without cached block names
+        Then: 1) Projections sharing input should share a single Hessian
+              2) Modules before the blocks shouldn't be re-run once the inputs to the blocks are cached
+              3) Weights should be the same in both cases
+        """
+        torch.manual_seed(0)
+        model = ModelWithAttentionLikeBlocks().eval()
+        data_loader = DataLoader(RandomDataset(data_size=2, input_dim=256), batch_size=1, shuffle=False)
+        gptvq_parameters = GPTVQParameters(data_loader, forward_fn=lambda m, d: m(d[0]), num_of_kmeans_iterations=1)
+        dummy_input = torch.randn(1, 256)
+
+        def get_block_level_module_names():
+            return [[f"layers.{i}.q_proj", f"layers.{i}.k_proj", f"layers.{i}.v_proj"] for i in range(3)] + \
+                   [[f"layers.{i}.o_proj"] for i in range(3)]
+
+        sim = QuantizationSimModel(model, dummy_input)
+        with GPTVQ._disable_quantizers_for_gptvq_optimization(sim, set()):
+            name_to_hessian = get_module_name_to_hessian_tensor(
+                gptvq_parameters, sim, ["layers.0.q_proj", "layers.0.k_proj", "layers.0.v_proj", "layers.0.o_proj"]
+            )
+        assert name_to_hessian["layers.0.q_proj"] is name_to_hessian["layers.0.k_proj"]
+        assert name_to_hessian["layers.0.q_proj"] is name_to_hessian["layers.0.v_proj"]
+        assert name_to_hessian["layers.0.q_proj"] is not name_to_hessian["layers.0.o_proj"]
+
+        num_calls = []
+        handle = model.embed.register_forward_hook(lambda *_: num_calls.append(None))
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                rounded_model = GPTVQ.apply_gptvq(
+                    copy.deepcopy(model),
+                    dummy_input,
+                    gptvq_parameters,
+                    param_encoding_path=temp_dir,
+                    block_level_module_names=get_block_level_module_names(),
+                )
+                num_calls_default = len(num_calls)
+                num_calls.clear()
+
+                cached_rounded_model = GPTVQ.apply_gptvq(
+                    copy.deepcopy(model),
+                    dummy_input,
+                    gptvq_parameters,
+                    param_encoding_path=temp_dir,
+                    block_level_module_names=get_block_level_module_names(),
+                    cached_block_names=["layers.0", "layers.1", "layers.2"],
+                )
+                num_calls_cached = len(num_calls)
+        finally:
+            handle.remove()
+
+        assert num_calls_cached < num_calls_default
+        for name, param in rounded_model.named_parameters():
+            assert torch.allclose(param, cached_rounded_model.get_parameter(name), atol=1e-6)
+
+        with pytest.raises(ValueError):
+            GPTVQ._validate_block_names(model, ["layers.0", "layers.0.q_proj"])
+        with pytest.raises(ValueError):
+            GPTVQ._get_cached_block_schedule([["layers.1.q_proj"], ["layers.0.q_proj"]], ["layers.0", "layers.1"])
+        assert GPTVQ._get_cached_block_schedule([["embed"], ["layers.1.q_proj"], ["head"]],
+                                                ["layers.0", "layers.1", "layers.2"]) == \
+            [(None, [["embed"]]), ("layers.1", [["layers.1.q_proj"]]), (None, [["head"]])]
+
     def test_gptvq_module_name_validation(self):
         model = test_models.ModelWithThreeLinears()
         with pytest.raises(ValueError):
@@ -35,6 +35,8 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 import pytest
+import copy
+import json
 import os
 import re
 import shutil
@@ -48,7 +50,9 @@ from aimet_torch.model_preparer import prepare_model
 from aimet_torch.model_validator.model_validator import ModelValidator
 from aimet_torch.v1.quantsim import QuantizationSimModel as QuantizationSimModelV1
 from aimet_torch.v2.quantsim import QuantizationSimModel as QuantizationSimModelV2
-from aimet_torch.layer_output_utils import NamingScheme, LayerOutputUtil, LayerOutput
+from aimet_common.layer_output_utils import SaveInputOutput, PackedLayerOutputReader, LayerOutputErrorStats, \
+    save_layer_output_comparison_report
+from aimet_torch.layer_output_utils import NamingScheme, LayerOutputUtil, LayerOutput, LayerOutputComparator
 from aimet_torch.utils import is_leaf_module
 from aimet_torch.onnx_utils import OnnxExportApiArgs
 from .models import test_models
@@ -288,3 +292,127 @@ class TestLayerOutputUtil:
                 saved_output = torch.from_numpy(saved_output)
 
                 assert torch.equal(layer_output_from_dict, saved_output)
+
+    @pytest.mark.parametrize('num_writers, packed', [(2, False), (0, True), (2, True)])
+    def test_generate_layer_outputs_async_and_packed(self, num_writers, packed):
+        """
+        Given: A model and LayerOutputUtil saving layer-outputs with background writers and/or in the packed format
+        When: Layer-outputs are generated for several input instances, in a directory holding packed files of a
+              previous run
+        Then: Saved inputs and layer-outputs match the ones saved synchronously as individual raw files
+        """
+        model = test_models.ModelWithOneSplit().eval()
+        dummy_input = torch.randn(4, 1, 10, 10)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            raw_dir = os.path.join(tmpdir, 'raw')
+            dir_path = os.path.join(tmpdir, 'layer_outputs')
+
+            previous_layer_output_util = LayerOutputUtil(model=model, dir_path=dir_path, packed=True)
+            previous_layer_output_util.generate_layer_outputs(torch.randn(1, 1, 10, 10))
+            previous_layer_output_util.close()
+
+            raw_layer_output_util = LayerOutputUtil(model=model, dir_path=raw_dir)
+            layer_output_util = LayerOutputUtil(model=model, dir_path=dir_path, num_writers=num_writers, packed=packed)
+            for single_input in dummy_input:
+                raw_layer_output_util.generate_layer_outputs(single_input.unsqueeze(0))
+                layer_output_util.generate_layer_outputs(single_input.unsqueeze(0))
+            layer_output_util.close()
+
+            layer_output_names = sorted(name[:-len('.raw')]
+                                        for name in os.listdir(os.path.join(raw_dir, 'outputs', 'layer_outputs_0')))
+            assert layer_output_names
+
+            if packed:
+                reader = PackedLayerOutputReader(dir_path)
+                assert sorted(reader.get_names()) == layer_output_names
+                assert reader.get_input_indices('input', kind='inputs') == list(range(len(dummy_input)))
+
+            for i in range(len(dummy_input)):
+                file_name = f'input_{i}.raw'
+                raw_input = np.fromfile(os.path.join(raw_dir, 'inputs', file_name), dtype=np.float32)
+                if packed:
+                    saved_input = reader.read('input', i, kind='inputs').ravel()
+                else:
+                    saved_input = np.fromfile(os.path.join(dir_path, 'inputs', file_name), dtype=np.float32)
+                assert np.array_equal(raw_input, saved_input)
+
+                for name in layer_output_names:
+                    file_path = os.path.join('outputs', f'layer_outputs_{i}', name + '.raw')
+                    raw_output = np.fromfile(os.path.join(raw_dir, file_path), dtype=np.float32)
+                    if packed:
+                        saved_output = reader.read(name, i)
+                        assert saved_output.ctypes.data % SaveInputOutput.PACKED_ALIGNMENT == 0
+                        saved_output = saved_output.ravel()
+                    else:
+                        saved_output = np.fromfile(os.path.join(dir_path, file_path), dtype=np.float32)
+                    assert np.array_equal(raw_output, saved_output)
+
+
+class TestLayerOutputComparator:
+    def test_compare_over_data_loader(self):
+        """
+        Given: A FP32 model and its quantsim model
+        When: Layer-outputs of both models are compared over a data loader
+        Then: 1) Accumulated metrics match the ones computed over all layer-outputs at once
+              2) The comparison report is saved
+        """
+        torch.manual_seed(0)
+        model = test_models.ModelWithOneSplit().eval()
+        dummy_input = torch.randn(1, 1, 10, 10)
+        quantsim, layer_names, _ = get_quantsim_artifacts(QuantizationSimModelV2,
+                                                          model_and_input=(copy.deepcopy(model), dummy_input))
+        data_loader = [torch.randn(2, 1, 10, 10) for _ in range(3)]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            comparator = LayerOutputComparator(model, quantsim.model, dir_path=tmpdir)
+            report = comparator.compare_over_data_loader(data_loader)
+
+            with open(os.path.join(tmpdir, 'layer_output_comparison.json')) as f:
+                saved_report = json.load(f)['layer_outputs']
+
+            fp32_layer_output = LayerOutput(model, dir_path=tmpdir)
+            quantized_layer_output = LayerOutput(quantsim.model, dir_path=tmpdir)
+            fp32_outputs = [fp32_layer_output.get_outputs(batch) for batch in data_loader]
+            quantized_outputs = [quantized_layer_output.get_outputs(batch) for batch in data_loader]
+
+        assert sorted(report) == sorted(re.sub(r'\W+', "_", name) for name in layer_names)
+        assert list(saved_report) == list(report)
+
+        for name, metrics in report.items():
+            reference = torch.cat([outputs[name].flatten() for outputs in fp32_outputs]).double()
+            quantized = torch.cat([outputs[name].flatten() for outputs in quantized_outputs]).double()
+            error = quantized - reference
+
+            assert metrics['mse'] == pytest.approx(error.square().mean().item(), rel=1e-4)
+            assert metrics['max_abs_error'] == pytest.approx(error.abs().max().item(), rel=1e-4)
+            assert metrics['sqnr'] == pytest.approx(
+                10 * torch.log10(reference.square().sum() / error.square().sum()).item(), rel=1e-4)
+            assert metrics['cosine_similarity'] == pytest.approx(
+                torch.nn.functional.cosine_similarity(reference, quantized, dim=0).item(), rel=1e-4)
+            assert 0 < metrics['mse'] and saved_report[name]['mse'] == pytest.approx(metrics['mse'])
+
+    def test_save_report_with_non_finite_sqnr(self):
+        """
+        Given: One layer-output without any error and one with an all-zero reference
+        When: The comparison report is saved
+        Then: The saved report is strict JSON and non-finite SQNRs are stored as strings
+        """
+        exact_stats, zero_reference_stats = LayerOutputErrorStats(), LayerOutputErrorStats()
+        exact_stats.update_from_numpy(np.ones(4), np.ones(4))
+        zero_reference_stats.update_from_numpy(np.zeros(4), np.ones(4))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            report = save_layer_output_comparison_report({'exact': exact_stats, 'zero_reference': zero_reference_stats},
+                                                         tmpdir)
+            with open(os.path.join(tmpdir, 'layer_output_comparison.json')) as f:
+                def reject_constant(constant):
+                    raise ValueError(f'Non-standard JSON constant {constant}')
+                saved_report = json.load(f, parse_constant=reject_constant)['layer_outputs']
+
+        assert report['exact']['sqnr'] == float('inf')
+        assert report['zero_reference']['sqnr'] == float('-inf')
+        assert saved_report['exact']['sqnr'] == 'inf'
+        assert saved_report['zero_reference']['sqnr'] == '-inf'
+        assert float(saved_report['exact']['sqnr']) == report['exact']['sqnr']
+        assert saved_report['exact']['mse'] == 0.0
@@ -37,6 +37,7 @@
 
 import numpy as np
 import unittest
+import unittest.mock
 import copy
 from decimal import Decimal
 
@@ -46,7 +47,7 @@ from torchvision import datasets, transforms
 
 from aimet_torch.utils import create_rand_tensors_given_shapes, get_device
 from .models import mnist_torch_model
-from aimet_torch.svd.svd_splitter import SpatialSvdModuleSplitter
+from aimet_torch.svd.svd_splitter import SpatialSvdModuleSplitter, SvdFactorizationCache
 from aimet_torch.svd.svd_pruner import SpatialSvdPruner
 from aimet_torch.layer_database import LayerDatabase
 from aimet_common.defs import CostMetric, LayerCompRatioPair
@@ -162,6 +163,39 @@ class TestSpatialSvdLayerSplit(unittest.TestCase):
 
         assert np.allclose(new_output.detach(), output_data, atol=1e-5)
 
+    def test_split_layer_with_svd_cache(self):
+        """
+        Given: A conv layer and an SVD factorization cache
+        When: The layer is split at several ranks using the cache
+        Then: 1) The split layers match the ones computed without the cache
+              2) The SVD of the layer weight is computed only once, unless the weight changes
+        """
+        torch.manual_seed(0)
+        layer = _TestNet().conv2
+        input_data = torch.randn(10, layer.in_channels, 8, 8)
+        svd_cache = SvdFactorizationCache()
+
+        with unittest.mock.patch('torch.linalg.svd', wraps=torch.linalg.svd) as svd:
+            for rank in (10, 50, 100):
+                first_layer, second_layer = SpatialSvdModuleSplitter.split_module(layer, rank)
+                expected_output = second_layer(first_layer(input_data))
+
+                first_layer, second_layer = SpatialSvdModuleSplitter.split_module(layer, rank, svd_cache=svd_cache,
+                                                                                  name='conv2')
+                self.assertEqual((rank, layer.in_channels, *layer.kernel_size[:1], 1), first_layer.weight.shape)
+                self.assertTrue(torch.allclose(second_layer(first_layer(input_data)), expected_output, atol=1e-4))
+
+            self.assertEqual(1, svd.call_count)
+
+            with torch.no_grad():
+                layer.weight.mul_(2)
+            SpatialSvdModuleSplitter.split_module(layer, 10, svd_cache=svd_cache, name='conv2')
+            self.assertEqual(2, svd.call_count)
+
+            # Copies of the layer with the same weight share the cached factorization
+            SpatialSvdModuleSplitter.split_module(copy.deepcopy(layer), 10, svd_cache=svd_cache, name='conv2')
+            self.assertEqual(2, svd.call_count)
+
 
 class TestSpatialSvdPruning(unittest.TestCase):
 
@@ -36,6 +36,7 @@
 # =============================================================================
 import json
 import os
+import pickle
 import pytest
 import unittest.mock
 import numpy as np
@@ -446,6 +447,45 @@ class TestTrainingExtensionsUtils(unittest.TestCase):
             with pytest.raises(ValueError):
                 utils.CachedDataset(data_loader, possible_batches + 1, path)
 
+    def test_save_and_load_from_cache(self):
+        """ Test tensor data is saved to and loaded from the cache file """
+        batch = (
+            torch.randn(2, 3, 4).transpose(0, 2),
+            {'mask': torch.rand(5) > 0.5, 'ids': torch.arange(3), 'name': 'batch'},
+            [torch.randn(3, dtype=torch.bfloat16), torch.tensor(1.5), torch.empty(0, 4), 7, None],
+        )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            utils.save_to_cache(batch, tmp_dir, 0)
+            loaded = utils.CachedDataset(None, 1, tmp_dir)[0]
+
+            self.assertEqual(len(loaded), 3)
+            self.assertTrue(torch.equal(loaded[0], batch[0]))
+            self.assertEqual(loaded[1].keys(), batch[1].keys())
+            for key in ('mask', 'ids'):
+                self.assertEqual(loaded[1][key].dtype, batch[1][key].dtype)
+                self.assertTrue(torch.equal(loaded[1][key], batch[1][key]))
+            self.assertEqual(loaded[1]['name'], 'batch')
+            for tensor, expected in zip(loaded[2][:3], batch[2][:3]):
+                self.assertEqual(tensor.dtype, expected.dtype)
+                self.assertEqual(tensor.shape, expected.shape)
+                self.assertTrue(torch.equal(tensor, expected))
+            self.assertEqual(loaded[2][3:], [7, None])
+
+            # Loaded tensors are copy-on-write; in-place updates shouldn't be written back to the cache
+            loaded[0].zero_()
+            self.assertTrue(torch.equal(utils.load_from_cache(os.path.join(tmp_dir, 'model_inputs_0'))[0], batch[0]))
+
+            # Overwriting the cache shouldn't affect the previously loaded tensors
+            utils.save_to_cache([torch.ones(10)], tmp_dir, 0)
+            self.assertTrue(torch.equal(loaded[1]['ids'], batch[1]['ids']))
+            self.assertTrue(torch.equal(utils.CachedDataset(None, 1, tmp_dir)[0][0], torch.ones(10)))
+
+            # Plain pickle files are loaded as-is
+            with open(os.path.join(tmp_dir, 'model_inputs_0'), 'wb') as file:
+                pickle.dump(batch, file)
+            self.assertTrue(torch.equal(utils.CachedDataset(None, 1, tmp_dir)[0][0], batch[0]))
+
     def test_find_num_inout_map(self):
         """
         Test functionality to find cardinality of the inputs, outputs for each leaf module
@@ -41,6 +41,7 @@ import torch.nn as nn
 import torch.nn.functional as functional
 import pytest
 import copy
+import unittest.mock
 from contextlib import contextmanager
 
 import aimet_common.defs
@@ -51,6 +52,7 @@ import aimet_torch.compression_factory as cf_svd
 from aimet_torch.utils import create_rand_tensors_given_shapes, get_device
 from aimet_torch.layer_database import LayerDatabase, Layer
 from aimet_torch.svd.svd_pruner import WeightSvdPruner, PyWeightSvdPruner
+from aimet_torch.svd.svd_splitter import SvdFactorizationCache
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Test)
 
@@ -276,6 +278,36 @@ class TestWeightSvdPruning:
 
         print(comp_layer_db.model)
 
+    def test_prune_model_with_svd_cache(self):
+        """
+        Given: A model and a PyWeightSvdPruner with an SVD factorization cache
+        When: The factorizations are precomputed and the model is pruned at several compression ratios
+        Then: 1) Pruned models match the ones from a pruner without the cache
+              2) No factorization is computed while pruning
+        """
+        torch.manual_seed(0)
+        model = mnist_model.Net().eval()
+        input_shape = (1, 1, 28, 28)
+        dummy_input = create_rand_tensors_given_shapes(input_shape, get_device(model))
+        layer_db = LayerDatabase(model, dummy_input)
+        layers = [layer_db.find_layer_by_name('conv2'), layer_db.find_layer_by_name('fc1')]
+
+        pruner = PyWeightSvdPruner()
+        cached_pruner = PyWeightSvdPruner(svd_cache=SvdFactorizationCache())
+        cached_pruner.prepare_to_prune(layer_db, layers)
+
+        for comp_ratio in (Decimal('0.25'), Decimal('0.5'), Decimal('0.75')):
+            layer_comp_ratio_list = [LayerCompRatioPair(layer, comp_ratio) for layer in layers]
+            py_layer_db = pruner.prune_model(layer_db, layer_comp_ratio_list, aimet_common.defs.CostMetric.mac,
+                                             trainer=None)
+            with unittest.mock.patch('torch.linalg.svd') as svd:
+                cached_layer_db = cached_pruner.prune_model(layer_db, layer_comp_ratio_list,
+                                                            aimet_common.defs.CostMetric.mac, trainer=None)
+            assert svd.call_count == 0
+
+            with torch.no_grad():
+                assert torch.allclose(py_layer_db.model(*dummy_input), cached_layer_db.model(*dummy_input), atol=1e-4)
+
     @pytest.mark.cuda
     @pytest.mark.parametrize("device", ['cpu', 'cuda'])
     @pytest.mark.parametrize("channels", [(16, 32), (32, 16)])
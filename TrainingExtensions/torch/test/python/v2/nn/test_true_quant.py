@@ -70,6 +70,8 @@ from aimet_torch.v2.nn import (
 )
 from aimet_torch.v2.nn.fake_quant import _legacy_impl
 from aimet_torch.v2.nn.true_quant import _dispatch, _dispatch_table
+from aimet_torch.v2.nn.int_kernels import set_int_kernels
+import aimet_torch.v2.nn.int_kernels as int_kernels
 from aimet_torch.v2.quantization.affine import AffineEncoding
 from aimet_torch.v2.quantization.tensor import QuantizedTensor, DequantizedTensor
 from aimet_torch.v2.utils import enable_recompute
@@ -639,6 +641,72 @@ class TestQuantizedLayers:
         qlinear._remove_output_quantizers(0)
         assert qlinear.output_quantizers[0] is None
 
+    def test_quantized_param_cache(self, input):
+        qlinear = QuantizedLinear(10, 10)
+        qlinear.param_quantizers["weight"] = weight_qtzr = QuantizeDequantize(shape=(10, 1), bitwidth=4, symmetric=True)
+        with qlinear.compute_encodings():
+            qlinear(input)
+
+        num_weight_qdq = 0
+
+        def count_weight_qdq(*_):
+            nonlocal num_weight_qdq
+            num_weight_qdq += 1
+
+        weight_qtzr.register_forward_hook(count_weight_qdq)
+
+        def expected_out():
+            return F.linear(input, weight_qtzr(qlinear.weight).dequantize(), qlinear.bias)
+
+        """
+        When: Run forward multiple times with gradient computation disabled and the cache not enabled
+        Then: Weight should be quantized in every forward pass
+        """
+        with torch.no_grad():
+            for _ in range(3):
+                qlinear(input)
+        assert num_weight_qdq == 3
+
+        """
+        When: Run forward multiple times with gradient computation disabled and the cache enabled
+        Then: Weight should be quantized only once
+        """
+        qlinear.CACHE_QUANTIZED_PARAMS_IN_INFERENCE = True
+        num_weight_qdq = 0
+        with torch.no_grad():
+            out = qlinear(input)
+            for _ in range(3):
+                assert torch.equal(qlinear(input), out)
+        assert num_weight_qdq == 1
+        assert torch.equal(out, expected_out())
+
+        """
+        When: Update weight, encodings, or quantizer configuration between forward passes
+        Then: Weight should be quantized again
+        """
+        with torch.no_grad():
+            qlinear.weight.mul_(2)
+            assert torch.equal(qlinear(input), expected_out())
+
+            weight_qtzr.set_range(weight_qtzr.min * 2, weight_qtzr.max * 2)
+            assert torch.equal(qlinear(input), expected_out())
+
+            weight_qtzr.bitwidth = 8
+            assert torch.equal(qlinear(input), expected_out())
+
+            qlinear.weight = nn.Parameter(torch.randn_like(qlinear.weight))
+            assert torch.equal(qlinear(input), expected_out())
+
+        """
+        When: Run forward with gradient computation enabled
+        Then: Weight should be quantized in every forward pass
+        """
+        num_weight_qdq = 0
+        for _ in range(3):
+            qlinear(input).sum().backward()
+        assert num_weight_qdq == 3
+        assert qlinear.weight.grad is not None
+
 
 def test_dispatch_sanity():
     """
@@ -1100,3 +1168,128 @@ def test_subclassing():
     my_qlinear.bias.copy_(qlinear.bias)
 
     assert torch.equal(qlinear(x), my_qlinear(x))
+
+
+def _int_linear_factory(symmetric):
+    qlinear = QuantizedLinear(64, 32)
+    qlinear.input_quantizers[0] = QuantizeDequantize((), 8, symmetric=symmetric)
+    qlinear.param_quantizers['weight'] = QuantizeDequantize((32, 1), 8, symmetric=True)
+    return qlinear
+
+
+def _int_conv2d_factory(symmetric, groups=1):
+    qconv = QuantizedConv2d(8, 16, 3, padding=1, stride=2, groups=groups)
+    qconv.input_quantizers[0] = QuantizeDequantize((), 8, symmetric=symmetric)
+    qconv.param_quantizers['weight'] = QuantizeDequantize((16, 1, 1, 1), 8, symmetric=True)
+    return qconv
+
+
+def _int_binary_factory(cls, symmetric):
+    qmodule = cls()
+    qmodule.input_quantizers[0] = QuantizeDequantize((), 8, symmetric=symmetric)
+    qmodule.input_quantizers[1] = QuantizeDequantize((), 8, symmetric=False)
+    return qmodule
+
+
+@torch.no_grad()
+@pytest.mark.parametrize('symmetric', [True, False])
+@pytest.mark.parametrize('module_factory,                                   input_factory', [
+    (_int_linear_factory,                                                   lambda: (randn(4, 7, 64),)),
+    (_int_conv2d_factory,                                                   lambda: (randn(2, 8, 15, 15),)),
+    (functools.partial(_int_conv2d_factory, groups=4),                      lambda: (randn(2, 8, 15, 15),)),
+    (functools.partial(_int_binary_factory, custom.QuantizedMatMul),        lambda: (randn(3, 5, 16), randn(3, 16, 6))),
+    (functools.partial(_int_binary_factory, custom.QuantizedMatMul),        lambda: (randn(5, 16), randn(16, 6))),
+    (functools.partial(_int_binary_factory, custom.QuantizedAdd),           lambda: (randn(3, 5, 16), randn(3, 5, 16))),
+])
+def test_int_kernels(module_factory, input_factory, symmetric):
+    """
+    Given: Quantized module with input, output, and weight quantizers
+    """
+    qmodule = module_factory(symmetric)
+    qmodule.output_quantizers[0] = QuantizeDequantize((), 8, symmetric=False)
+    inputs = input_factory()
+
+    with qmodule.compute_encodings():
+        _ = qmodule(*inputs)
+
+    """
+    When: Run forward pass with integer kernels
+    Then: 1) Output should be quantized with the output encodings
+          2) Output should be within one quantization step from the fake-quantized output
+             (The difference comes from quantizing the bias to int32)
+    """
+    fout = qmodule(*inputs)
+
+    with set_int_kernels():
+        out = qmodule(*inputs)
+
+    assert isinstance(out, DequantizedTensor)
+    assert torch.equal(out, out.quantize().dequantize())
+    scale = qmodule.output_quantizers[0].get_scale()
+    assert torch.all((out - fout).abs() <= scale * 1.001)
+
+    """
+    When: Exit set_int_kernels context
+    Then: Default kernel should be restored
+    """
+    assert qmodule.get_kernel() is None
+
+
+def test_int_mm_fallback(monkeypatch):
+    """
+    When: Check whether torch._int_mm supports the shapes of the operands on CUDA
+    Then: Only M > 16 and K, N multiples of 8 should be supported
+    """
+    cuda = torch.device('cuda')
+    assert int_kernels._int_mm_supports_shape(32, 64, 16, cuda)
+    assert not int_kernels._int_mm_supports_shape(16, 64, 16, cuda)
+    assert not int_kernels._int_mm_supports_shape(32, 60, 16, cuda)
+    assert not int_kernels._int_mm_supports_shape(32, 64, 12, cuda)
+
+    """
+    Given: torch._int_mm that raises error for the given operands
+    When: Multiply quantized operands
+    Then: Should fall back to floating-point GEMM and compute the exact accumulator
+    """
+    def _int_mm(*_):
+        raise RuntimeError
+
+    monkeypatch.setattr(torch, '_int_mm', _int_mm, raising=False)
+    monkeypatch.setattr(int_kernels, '_is_int_mm_available', lambda _: True)
+
+    a = randint(0, 256, (20, 64))
+    b = randint(-128, 128, (64, 16))
+    offset_a = tensor(-128)
+    offset_b = randint(-5, 5, (16,))
+    acc = int_kernels._affine_matmul(a, offset_a, (0, 255), b, offset_b, (-128, 127), bound=64 * 128 * 133)
+    assert torch.equal(acc, (a + offset_a) @ (b + offset_b))
+
+
+@torch.no_grad()
+@pytest.mark.parametrize('bitwidth', [8, 16])
+def test_int_linear_exactness(bitwidth):
+    """
+    Given: Quantized linear without bias
+    When: Run forward pass with integer kernels
+    Then: Output should be equal to requantizing the accumulator computed in integer arithmetic
+    """
+    qlinear = QuantizedLinear(64, 32, bias=False)
+    qlinear.input_quantizers[0] = Quantize((), bitwidth, symmetric=False)
+    qlinear.param_quantizers['weight'] = Quantize((32, 1), 8, symmetric=True)
+    qlinear.output_quantizers[0] = Quantize((), bitwidth, symmetric=False)
+    x = randn(10, 64)
+
+    with qlinear.compute_encodings():
+        _ = qlinear(x)
+
+    with set_int_kernels():
+        out = qlinear(x)
+
+    x_q = qlinear.input_quantizers[0](x)
+    w_q = qlinear.param_quantizers['weight'](qlinear.weight)
+    acc = (x_q.quantized_repr().long() + x_q.encoding.offset.long()) @ \
+          (w_q.quantized_repr().long() + w_q.encoding.offset.long()).t()
+    expected = qlinear.output_quantizers[0].get_encodings().quantize(
+        acc.double() * x_q.encoding.scale.double() * w_q.encoding.scale.double().t()
+    )
+    assert torch.equal(out.quantize().as_subclass(torch.Tensor), expected.float())
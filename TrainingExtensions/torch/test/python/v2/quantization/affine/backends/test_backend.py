@@ -40,6 +40,7 @@ import pytest
 from collections import namedtuple
 from aimet_torch.v2.quantization import affine
 from aimet_torch.v2.quantization.affine.backends import torch_builtins
+from aimet_torch.v2.quantization import _compiled_kernels
 from aimet_torch.v2.utils import ste_round
 
 VectorSetForTest = namedtuple("VectorSetForTest", ["tensor", "tensor_q", "tensor_qdq", "mask", "delta", "offset", "qmin", "qmax"])
@@ -737,3 +738,72 @@ class TestQuantizationBackends:
                                                block_size=[1, 3])
         backend_module._validate_arguments(torch.randn(1, 4), torch.randn(1, 2), torch.randn(1, 2),
                                            block_size=[1, 2])
+
+
+def test_compiled_impl_fallback(monkeypatch):
+    """
+    Given: torch.compile'd quantization kernel that fails to compile
+    """
+    num_compiled_calls = 0
+
+    def compiled_forward_impl(*_):
+        nonlocal num_compiled_calls
+        num_compiled_calls += 1
+        raise torch._dynamo.exc.TorchDynamoException("Failed to compile")
+
+    monkeypatch.setattr(torch_builtins, '_compiled_quantize_dequantize_forward', compiled_forward_impl)
+    monkeypatch.setattr(_compiled_kernels, '_FAILED_KERNELS', set())
+
+    tensor = torch.randn(10, 10)
+    scale = torch.tensor(0.1)
+    offset = torch.tensor(-128.)
+    expected = torch_builtins.quantize_dequantize(tensor, scale, offset, 0, 255)
+
+    """
+    When: Run quantize_dequantize with compiled implementation enabled
+    Then: 1) Should fall back to eager implementation with a warning
+          2) Output should be equal to the eager implementation
+          3) Only the failed kernel should fall back
+    """
+    with torch_builtins.use_compiled_impl():
+        with pytest.warns(UserWarning):
+            out = torch_builtins.quantize_dequantize(tensor, scale, offset, 0, 255)
+        assert torch.equal(out, expected)
+        assert _compiled_kernels._FAILED_KERNELS == {torch_builtins._quantize_dequantize_forward}
+        assert num_compiled_calls == 1
+
+        """
+        When: Run quantize_dequantize again
+        Then: Should run eager implementation without retrying compilation
+        """
+        out = torch_builtins.quantize_dequantize(tensor, scale, offset, 0, 255)
+        assert torch.equal(out, expected)
+        assert num_compiled_calls == 1
+
+    """
+    When: Enable the compiled implementation again
+    Then: Should retry compilation
+    """
+    with torch_builtins.use_compiled_impl():
+        with pytest.warns(UserWarning):
+            out = torch_builtins.quantize_dequantize(tensor, scale, offset, 0, 255)
+        assert torch.equal(out, expected)
+        assert num_compiled_calls == 2
+
+
+def test_compiled_impl_error_not_related_to_compilation(monkeypatch):
+    """
+    Given: torch.compile'd quantization kernel that raises an error not related to torch.compile
+    When: Run quantize_dequantize with compiled implementation enabled
+    Then: The error should be raised as-is without falling back to eager implementation
+    """
+    def compiled_forward_impl(*_):
+        raise ValueError("Invalid input")
+
+    monkeypatch.setattr(torch_builtins, '_compiled_quantize_dequantize_forward', compiled_forward_impl)
+    monkeypatch.setattr(_compiled_kernels, '_FAILED_KERNELS', set())
+
+    with torch_builtins.use_compiled_impl():
+        with pytest.raises(ValueError):
+            torch_builtins.quantize_dequantize(torch.randn(10, 10), torch.tensor(0.1), torch.tensor(-128.), 0, 255)
+    assert not _compiled_kernels._FAILED_KERNELS
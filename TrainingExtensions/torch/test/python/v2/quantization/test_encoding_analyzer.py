@@ -355,6 +355,35 @@ class TestHistogramEncodingAnalyzer:
         #
         #                                       (new_histogram)
 
+    @pytest.mark.parametrize('shape', [(4,), (8, 1), (2, 1, 4)])
+    def test_per_channel_histograms(self, shape):
+        """
+        Given: Histogram observer of per-channel shape
+        When: Collect and merge stats of inputs with different ranges per channel
+        Then: Each histogram should be equal to the histogram observed with a per-tensor observer
+              on the corresponding slice of the inputs
+        """
+        inputs = [torch.randn(2, 8, 4) * torch.arange(1, 5), torch.randn(2, 8, 4) * 5 - 1, torch.randn(2, 8, 4)]
+        inputs[1][0, 0, 0] = float('inf')
+
+        observer = _HistogramObserver(shape, num_bins=16)
+        for x in inputs:
+            observer.merge_stats(observer.collect_stats(x), x)
+
+        histogram_index = torch.arange(observer.num_histograms).view(shape).expand(inputs[0].shape)
+        for i, stats in enumerate(observer.get_stats()):
+            per_tensor_observer = _HistogramObserver((), num_bins=16)
+            for x in inputs:
+                x = x[histogram_index == i]
+                per_tensor_observer.merge_stats(per_tensor_observer.collect_stats(x), x)
+
+            expected, = per_tensor_observer.get_stats()
+            assert torch.equal(stats.min, expected.min)
+            assert torch.equal(stats.max, expected.max)
+            assert torch.equal(stats.histogram, expected.histogram)
+            assert torch.allclose(stats.bin_edges, expected.bin_edges)
+            assert stats.histogram.sum() == x.numel() * len(inputs)
+
 
 class TestPercentileEncodingAnalyzer():
     @pytest.fixture
@@ -909,3 +938,35 @@ class TestSqnrEncodingAnalyzer:
         best_delta, best_offset = encoding_analyzer._select_best_candidates(deltas, offsets, histograms, 255)
         assert torch.equal(best_delta, torch.tensor([1/255., 2/255.]).view(2, 1))
         assert torch.equal(best_offset, torch.tensor([-128, 0]).view(2, 1))
+
+    @pytest.mark.parametrize('symmetric', [True, False])
+    @pytest.mark.parametrize('gamma', [1.0, 3.0])
+    def test_memory_budget(self, symmetric, gamma):
+        """
+        Given: Two encoding analyzers, one bounded by max_parallelism and the other by memory budget
+        """
+        torch.manual_seed(0)
+        x = torch.randn(100, 256) * torch.rand(100, 1)
+        shape = (100, 1)
+        encoding_analyzer = SqnrEncodingAnalyzer(shape=shape, num_bins=128, gamma=gamma, max_parallelism=64)
+        budgeted_encoding_analyzer = SqnrEncodingAnalyzer(shape=shape, num_bins=128, gamma=gamma,
+                                                          memory_budget=1024 ** 2)
+        encoding_analyzer.update_stats(x)
+        budgeted_encoding_analyzer.update_stats(x)
+
+        """
+        When: Compute encodings
+        Then: 1) The number of encodings processed in parallel should be bounded by the memory budget
+              2) Both encoding analyzers should produce the same encodings
+        """
+        chunk_size = budgeted_encoding_analyzer._get_chunk_size(128, 255, symmetric)
+        assert 1 <= chunk_size < 100
+
+        min_1, max_1 = encoding_analyzer.compute_encodings(255, symmetric)
+        min_2, max_2 = budgeted_encoding_analyzer.compute_encodings(255, symmetric)
+        assert min_1.shape == max_1.shape == shape
+        assert torch.allclose(min_1, min_2)
+        assert torch.allclose(max_1, max_2)
+
+        with pytest.raises(ValueError):
+            SqnrEncodingAnalyzer(shape=shape, memory_budget=0)
@@ -35,19 +35,26 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 import contextlib
+import multiprocessing
 import torch
+import torch.distributed as dist
 import tempfile
 import os
+import shutil
 import json
 import pytest
 import random
 import numpy as np
+import onnx
+from onnx import numpy_helper
 from aimet_common.quantsim_config.utils import get_path_for_per_channel_config
 from aimet_common.defs import QuantizationDataType
 from aimet_torch import onnx_utils
 from aimet_torch.v1.quantsim import load_encodings_to_sim, QuantScheme
-from aimet_torch.v2.quantsim import QuantizationSimModel
+from aimet_torch.v2.quantsim import QuantizationSimModel, enable_encoding_stats_cache, enable_distributed_calibration, \
+    lower_for_inference
 from aimet_torch.v2.quantization.encoding_analyzer import PercentileEncodingAnalyzer
+from aimet_torch.v2.quantization import _compiled_kernels
 from aimet_torch.v2.quantization.base import QuantizerBase
 from aimet_torch.v2.quantization.affine import AffineQuantizerBase, GroupedBlockQuantizeDequantize, QuantizeDequantize
 from aimet_torch.v2.experimental import propagate_output_encodings
@@ -58,6 +65,7 @@ from aimet_torch.v2.nn import (
     QuantizedLinear,
     QuantizedReLU,
 )
+from aimet_torch.v2.nn.base import _quantized_param_cache
 import aimet_torch.v2.nn.modules.custom as custom
 from ..models_ import test_models
 
@@ -75,6 +83,33 @@ def set_seed():
     torch.manual_seed(0)
     np.random.seed(0)
 
+def _run_distributed_worker(fn, rank, world_size, init_file, queue):
+    torch.set_num_threads(1)
+    dist.init_process_group(backend='gloo', init_method=f'file://{init_file}', rank=rank, world_size=world_size)
+    try:
+        queue.put((rank, fn(rank, world_size)))
+    finally:
+        dist.destroy_process_group()
+
+
+def run_distributed(fn, world_size):
+    """
+    Runs fn(rank, world_size) in world_size processes with a gloo process group and returns the results of all ranks
+    """
+    ctx = multiprocessing.get_context('fork')
+    queue = ctx.Queue()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        init_file = os.path.join(tmp_dir, 'init')
+        processes = [ctx.Process(target=_run_distributed_worker, args=(fn, rank, world_size, init_file, queue))
+                     for rank in range(world_size)]
+        for process in processes:
+            process.start()
+        results = dict(queue.get(timeout=300) for _ in range(world_size))
+        for process in processes:
+            process.join()
+    return [results[rank] for rank in range(world_size)]
+
+
 @contextlib.contextmanager
 def set_export_to_onnx_direct(export_to_onnx_direct):
     entry_state = onnx_utils.EXPORT_TO_ONNX_DIRECT
@@ -83,6 +118,35 @@ def set_export_to_onnx_direct(export_to_onnx_direct):
     onnx_utils.EXPORT_TO_ONNX_DIRECT = entry_state
 
 
+class ResidualBlock(torch.nn.Module):
+
+    def __init__(self):
+        super().__init__()
+        self.linear = torch.nn.Linear(8, 8)
+        self.norm = torch.nn.LayerNorm(8)
+        self.relu = torch.nn.ReLU()
+
+    def forward(self, x):
+        return self.relu(self.norm(self.linear(x)) + x)
+
+
+class TiedWeightsModel(torch.nn.Module):
+
+    def __init__(self):
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 8, 3)
+        self.bn = torch.nn.BatchNorm2d(8)
+        self.layers = torch.nn.ModuleList([ResidualBlock(), ResidualBlock()])
+        self.head = torch.nn.Linear(8, 8, bias=False)
+        self.head.weight = self.layers[0].linear.weight
+
+    def forward(self, x):
+        x = self.bn(self.conv(x)).flatten(2).transpose(1, 2)
+        for layer in self.layers:
+            x = layer(x)
+        return self.head(x)
+
+
 class ConcatModel(torch.nn.Module):
 
     def __init__(self):
@@ -1262,6 +1326,406 @@ class TestQuantsim:
                 assert torch.equal(qtzr_a.get_min(), qtzr_b.get_min())
                 assert torch.equal(qtzr_a.get_max(), qtzr_b.get_max())
 
+    @pytest.mark.parametrize('quant_scheme', ['tf', 'percentile'])
+    def test_compute_encodings_with_stats_cache(self, quant_scheme):
+        """
+        Given: A quantsim and a calibration callback that counts forward passes
+        """
+        model = test_models.BasicConv2d(kernel_size=3)
+        dummy_input = torch.rand(1, 64, 16, 16)
+        num_forward_passes = 0
+
+        def forward_pass(model):
+            nonlocal num_forward_passes
+            num_forward_passes += 1
+            model(dummy_input)
+
+        sim = QuantizationSimModel(model, dummy_input, quant_scheme=quant_scheme)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with pytest.raises(ValueError):
+                with enable_encoding_stats_cache(cache_dir, None):
+                    pass
+
+            with enable_encoding_stats_cache(cache_dir, data_key='calib_v1'):
+                """
+                When: Run compute_encodings with stats cache enabled for the first time
+                Then: Calibration should run and the encodings should be identical to those without cache
+                """
+                sim.compute_encodings(forward_pass)
+                assert num_forward_passes == 2 # 1 fingerprinting pass + 1 calibration pass
+
+                ref_sim = QuantizationSimModel(model, dummy_input, quant_scheme=quant_scheme)
+                ref_sim.compute_encodings(lambda model: model(dummy_input))
+                for qtzr, ref_qtzr in zip(sim.model.modules(), ref_sim.model.modules()):
+                    if isinstance(qtzr, AffineQuantizerBase):
+                        assert torch.equal(qtzr.get_min(), ref_qtzr.get_min())
+                        assert torch.equal(qtzr.get_max(), ref_qtzr.get_max())
+
+                """
+                When: Change bitwidth and symmetry of the output quantizers and recompute encodings
+                Then: 1) Calibration forward pass should be skipped
+                      2) The encodings should be identical to those computed from scratch
+                """
+                for qsim in (sim, ref_sim):
+                    for module in qsim.model.modules():
+                        if isinstance(module, BaseQuantizationMixin) and module.output_quantizers[0]:
+                            module.output_quantizers[0].bitwidth = 4
+                            module.output_quantizers[0].symmetric = True
+
+                num_forward_passes = 0
+                sim.compute_encodings(forward_pass)
+                assert num_forward_passes == 1 # fingerprinting pass only
+
+            ref_sim.compute_encodings(lambda model: model(dummy_input))
+            for qtzr, ref_qtzr in zip(sim.model.modules(), ref_sim.model.modules()):
+                if isinstance(qtzr, AffineQuantizerBase):
+                    assert torch.equal(qtzr.get_min(), ref_qtzr.get_min())
+                    assert torch.equal(qtzr.get_max(), ref_qtzr.get_max())
+
+            """
+            When: Change the data key
+            Then: Cached statistics should not be reused
+            """
+            num_forward_passes = 0
+            with enable_encoding_stats_cache(cache_dir, data_key='calib_v2'):
+                sim.compute_encodings(forward_pass)
+            assert num_forward_passes == 2
+
+            """
+            When: Change the calibration data without changing the data key
+            Then: Cached statistics should not be reused
+            """
+            dummy_input = torch.rand(1, 64, 16, 16)
+            num_forward_passes = 0
+            with enable_encoding_stats_cache(cache_dir, data_key='calib_v2'):
+                sim.compute_encodings(forward_pass)
+            assert num_forward_passes == 2
+
+
+    @pytest.mark.parametrize('quant_scheme', ['tf', 'percentile'])
+    def test_compute_encodings_with_distributed_calibration(self, quant_scheme):
+        """
+        Given: Calibration data split into two shards
+        When: Compute encodings in two processes with distributed calibration enabled,
+              each process running forward pass with one of the shards
+        Then: 1) All processes should end up with the same encodings
+              2) The encodings should be equal to those computed in a single process with all the shards
+        """
+        model = test_models.BasicConv2d(kernel_size=3).eval()
+        shards = [torch.randn(2, 64, 16, 16), torch.randn(2, 64, 16, 16) * 2 + 1]
+
+        def get_encodings(sim):
+            return {
+                name: (qtzr.get_min().numpy(), qtzr.get_max().numpy())
+                for name, qtzr in sim.model.named_modules() if isinstance(qtzr, AffineQuantizerBase)
+            }
+
+        def calibrate(rank, _):
+            sim = QuantizationSimModel(model, shards[0], quant_scheme=quant_scheme)
+            with enable_distributed_calibration():
+                sim.compute_encodings(lambda model: model(shards[rank]))
+            return get_encodings(sim)
+
+        results = run_distributed(calibrate, world_size=2)
+        distributed_encodings = results[0]
+
+        ref_sim = QuantizationSimModel(model, shards[0], quant_scheme=quant_scheme)
+        ref_sim.compute_encodings(lambda model: [model(shard) for shard in shards])
+        ref_encodings = get_encodings(ref_sim)
+
+        assert results[0].keys() == results[1].keys() == ref_encodings.keys()
+        for name, (ref_min, ref_max) in ref_encodings.items():
+            for encodings in results:
+                enc_min, enc_max = encodings[name]
+                assert np.array_equal(enc_min, results[0][name][0])
+                assert np.array_equal(enc_max, results[0][name][1])
+                if quant_scheme == 'tf':
+                    assert np.array_equal(enc_min, ref_min)
+                    assert np.array_equal(enc_max, ref_max)
+                else:
+                    # Histograms of the shards are merged in a different order
+                    scale = (ref_max - ref_min) / 255
+                    assert np.allclose(enc_min, ref_min, atol=scale)
+                    assert np.allclose(enc_max, ref_max, atol=scale)
+
+        """
+        When: Compute encodings with distributed calibration while one of the processes has no data
+        Then: All processes should end up with the encodings of the data seen by the other process
+        """
+        def calibrate_one_rank(rank, _):
+            sim = QuantizationSimModel(model, shards[0], quant_scheme=quant_scheme)
+            with enable_distributed_calibration():
+                sim.compute_encodings(lambda model: model(shards[0]) if rank == 0 else None)
+            return get_encodings(sim)
+
+        results = run_distributed(calibrate_one_rank, world_size=2)
+
+        ref_sim = QuantizationSimModel(model, shards[0], quant_scheme=quant_scheme)
+        ref_sim.compute_encodings(lambda model: model(shards[0]))
+        for name, (ref_min, ref_max) in get_encodings(ref_sim).items():
+            for encodings in results:
+                assert np.allclose(encodings[name][0], ref_min)
+                assert np.allclose(encodings[name][1], ref_max)
+
+        """
+        Given: Distributed calibration with stats cache enabled, each process caching to its own directory
+        """
+        single_shard_encodings = get_encodings(ref_sim)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_dirs = [os.path.join(tmp_dir, f'rank{rank}') for rank in range(2)]
+
+            def calibrate_with_stats_cache(rank, _):
+                sim = QuantizationSimModel(model, shards[0], quant_scheme=quant_scheme)
+                num_forward_passes = 0
+
+                def forward_pass(model):
+                    nonlocal num_forward_passes
+                    num_forward_passes += 1
+                    model(shards[rank])
+
+                with enable_encoding_stats_cache(cache_dirs[rank], data_key='calib'), \
+                        enable_distributed_calibration():
+                    sim.compute_encodings(forward_pass)
+                return num_forward_passes, get_encodings(sim)
+
+            def assert_distributed_encodings(cached_results, expected_num_forward_passes):
+                for num_forward_passes, encodings in cached_results:
+                    assert num_forward_passes == expected_num_forward_passes
+                    for name, (enc_min, enc_max) in encodings.items():
+                        assert np.array_equal(enc_min, distributed_encodings[name][0])
+                        assert np.array_equal(enc_max, distributed_encodings[name][1])
+
+            """
+            When: Compute encodings for the first time, and then once again
+            Then: 1) All processes should calibrate for the first time, and skip calibration the second time
+                  2) All processes should end up with the encodings of all the shards
+            """
+            assert_distributed_encodings(run_distributed(calibrate_with_stats_cache, world_size=2),
+                                         expected_num_forward_passes=2) # 1 fingerprinting pass + 1 calibration pass
+            assert_distributed_encodings(run_distributed(calibrate_with_stats_cache, world_size=2),
+                                         expected_num_forward_passes=1) # fingerprinting pass only
+
+            """
+            When: Compute encodings while only one of the processes has the statistics cached
+            Then: All processes should calibrate instead of waiting for each other
+            """
+            shutil.rmtree(cache_dirs[1])
+            assert_distributed_encodings(run_distributed(calibrate_with_stats_cache, world_size=2),
+                                         expected_num_forward_passes=2)
+
+            """
+            When: Compute encodings in a single process with the shard and the cache directory of one of the processes
+            Then: Statistics all-reduced across the processes should not be reused
+            """
+            num_forward_passes = 0
+
+            def forward_pass(model):
+                nonlocal num_forward_passes
+                num_forward_passes += 1
+                model(shards[0])
+
+            sim = QuantizationSimModel(model, shards[0], quant_scheme=quant_scheme)
+            with enable_encoding_stats_cache(cache_dirs[0], data_key='calib'):
+                sim.compute_encodings(forward_pass)
+
+        assert num_forward_passes == 2
+        for name, (enc_min, enc_max) in get_encodings(sim).items():
+            assert np.allclose(enc_min, single_shard_encodings[name][0])
+            assert np.allclose(enc_max, single_shard_encodings[name][1])
+
+    def test_use_compiled_kernels(self):
+        """
+        Given: Two quantsims of the same model, one of which is created with use_compiled_kernels=True
+        """
+        model = test_models.BasicConv2d(kernel_size=3).eval()
+        dummy_input = torch.randn(2, 64, 16, 16)
+        sim = QuantizationSimModel(model, dummy_input, quant_scheme='tf')
+        compiled_sim = QuantizationSimModel(model, dummy_input, quant_scheme='tf', use_compiled_kernels=True)
+
+        compiled_impl_enabled = []
+        compiled_sim.model.conv.register_forward_hook(
+            lambda *_: compiled_impl_enabled.append(_compiled_kernels._is_compiled_impl_enabled())
+        )
+
+        """
+        When: Compute encodings and run forward and backward pass
+        Then: 1) Compiled kernels should be enabled only during the forward pass of the compiled sim
+              2) Encodings, outputs and gradients should be equal to those of the eager sim
+        """
+        sim.compute_encodings(lambda model: model(dummy_input))
+        compiled_sim.compute_encodings(lambda model: model(dummy_input))
+        assert compiled_impl_enabled and all(compiled_impl_enabled)
+        assert not _compiled_kernels._is_compiled_impl_enabled()
+
+        for qtzr, compiled_qtzr in zip(sim.model.modules(), compiled_sim.model.modules()):
+            if isinstance(qtzr, AffineQuantizerBase):
+                assert torch.equal(qtzr.get_min(), compiled_qtzr.get_min())
+                assert torch.equal(qtzr.get_max(), compiled_qtzr.get_max())
+
+        inp = dummy_input.clone().requires_grad_()
+        compiled_inp = dummy_input.clone().requires_grad_()
+        out = sim.model(inp)
+        compiled_out = compiled_sim.model(compiled_inp)
+        assert not _compiled_kernels._is_compiled_impl_enabled()
+        assert torch.allclose(out, compiled_out, atol=1e-6)
+
+        out.sum().backward()
+        compiled_out.sum().backward()
+        assert torch.allclose(inp.grad, compiled_inp.grad, atol=1e-6)
+        assert torch.allclose(sim.model.conv.weight.grad, compiled_sim.model.conv.weight.grad, atol=1e-4)
+
+    def test_cache_quantized_params(self):
+        """
+        Given: Two calibrated quantsims of the same model, one of which is created with cache_quantized_params=True
+        """
+        model = test_models.BasicConv2d(kernel_size=3).eval()
+        dummy_input = torch.randn(2, 64, 16, 16)
+        sim = QuantizationSimModel(model, dummy_input, quant_scheme='tf')
+        cached_sim = QuantizationSimModel(model, dummy_input, quant_scheme='tf', cache_quantized_params=True)
+        sim.compute_encodings(lambda model: model(dummy_input))
+        cached_sim.compute_encodings(lambda model: model(dummy_input))
+
+        """
+        When: Run forward pass with gradient computation disabled
+        Then: 1) Quantized parameters should be cached only for the sim created with cache_quantized_params=True
+              2) Outputs of both sims should be equal
+        """
+        with torch.no_grad():
+            out = sim.model(dummy_input)
+            cached_out = cached_sim.model(dummy_input)
+            assert torch.equal(cached_sim.model(dummy_input), cached_out)
+
+        assert sim.model.conv not in _quantized_param_cache
+        assert 'weight' in _quantized_param_cache[cached_sim.model.conv]
+        assert torch.equal(out, cached_out)
+
+    @pytest.mark.parametrize('trace', [False, True])
+    def test_lower_for_inference(self, trace):
+        """
+        Given: Calibrated sim with dispatch-based quantized modules (conv, linear, add, matmul, softmax)
+               and a quantized module that can't be lowered (batchnorm)
+        """
+        class Model(torch.nn.Module):
+            def __init__(self):
+                super().__init__()
+                self.conv = torch.nn.Conv2d(3, 8, 3, padding=1)
+                self.bn = torch.nn.BatchNorm2d(8)
+                self.relu = torch.nn.ReLU()
+                self.linear = torch.nn.Linear(16, 16)
+                self.add = custom.Add()
+                self.matmul = custom.MatMul()
+                self.softmax = torch.nn.Softmax(dim=-1)
+
+            def forward(self, x):
+                x = self.relu(self.bn(self.conv(x))).flatten(2)
+                x = self.add(x, self.linear(x))
+                return self.softmax(self.matmul(x, x.transpose(-1, -2)))
+
+        model = Model().eval()
+        dummy_input = torch.randn(2, 3, 4, 4)
+        sim = QuantizationSimModel(model, dummy_input, default_param_bw=4)
+        sim.compute_encodings(lambda model: model(dummy_input))
+
+        """
+        When: Lower the sim model for inference
+        Then: 1) Lowered model should produce the same output as the sim model in plain torch.Tensor
+              2) Quantized modules in the lowered model shouldn't produce QuantizedTensorBase outputs
+              3) Original sim model should be left unchanged
+        """
+        with torch.no_grad():
+            expected = sim.model(dummy_input)
+            lowered = lower_for_inference(sim.model, dummy_input if trace else None)
+            out = lowered(dummy_input)
+
+        assert type(out) is torch.Tensor
+        assert torch.equal(out, expected)
+
+        if not trace:
+            assert not any(isinstance(m, BaseQuantizationMixin) for m in lowered.modules()
+                           if not isinstance(m, torch.nn.BatchNorm2d))
+            outputs = []
+            handles = [m.register_forward_hook(lambda m, i, o: outputs.append(o)) for m in lowered.children()]
+            with torch.no_grad():
+                lowered(dummy_input)
+            for handle in handles:
+                handle.remove()
+            assert all(type(o) is torch.Tensor for o in outputs)
+
+        assert all(isinstance(sim.model.get_submodule(name), BaseQuantizationMixin)
+                   for name in ['conv', 'bn', 'linear', 'add', 'matmul', 'softmax'])
+        with torch.no_grad():
+            assert torch.equal(sim.model(dummy_input), expected)
+
+        """
+        When: Lower the sim model with uninitialized quantizers
+        Then: Throw runtime error
+        """
+        sim = QuantizationSimModel(model, dummy_input)
+        with pytest.raises(RuntimeError):
+            lower_for_inference(sim.model)
+
+    def test_export_streaming(self):
+        """
+        Given: Calibrated sim with nested modules, a batchnorm, a linear without bias, and tied weights
+        """
+        torch.manual_seed(0)
+        model = TiedWeightsModel().eval()
+        dummy_input = torch.randn(1, 3, 6, 6)
+        sim = QuantizationSimModel(model, dummy_input, default_param_bw=4)
+        sim.compute_encodings(lambda model: model(dummy_input))
+        state_dict = {name: param.clone() for name, param in sim.model.state_dict().items()
+                      if isinstance(param, torch.Tensor)}
+
+        """
+        When: Export the sim with and without streaming
+        Then: 1) Both exports should produce the same onnx graph, initializers, and encodings
+              2) Streaming export should write the initializers to sharded external data files
+                 and shouldn't save the pth
+              3) Sim should be left unchanged
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            export_args = {'input_names': ['input'], 'output_names': ['output']}
+            sim.export(tmp_dir, 'model', dummy_input, onnx_export_args=dict(export_args))
+            entry_shard_size = onnx_utils.STREAMING_EXPORT_SHARD_SIZE
+            onnx_utils.STREAMING_EXPORT_SHARD_SIZE = 1024
+            try:
+                sim.export(tmp_dir, 'streamed', dummy_input, onnx_export_args=dict(export_args), streaming=True)
+            finally:
+                onnx_utils.STREAMING_EXPORT_SHARD_SIZE = entry_shard_size
+
+            onnx_model = onnx.load(os.path.join(tmp_dir, 'model.onnx'))
+            streamed_onnx_model = onnx.load(os.path.join(tmp_dir, 'streamed.onnx'))
+
+            assert [(node.name, node.op_type) for node in onnx_model.graph.node if node.op_type != 'Constant'] == \
+                   [(node.name, node.op_type) for node in streamed_onnx_model.graph.node if node.op_type != 'Constant']
+
+            initializers = {init.name: numpy_helper.to_array(init) for init in onnx_model.graph.initializer}
+            streamed_initializers = {init.name: numpy_helper.to_array(init)
+                                     for init in streamed_onnx_model.graph.initializer}
+            assert initializers.keys() == streamed_initializers.keys()
+            for name, initializer in initializers.items():
+                assert np.array_equal(initializer, streamed_initializers[name])
+
+            with open(os.path.join(tmp_dir, 'model.encodings')) as f:
+                encodings = json.load(f)
+            with open(os.path.join(tmp_dir, 'streamed.encodings')) as f:
+                streamed_encodings = json.load(f)
+            assert encodings == streamed_encodings
+
+            assert not os.path.exists(os.path.join(tmp_dir, 'streamed.pth'))
+            assert len([f for f in os.listdir(tmp_dir) if f.startswith('streamed.onnx.')]) > 1
+            assert all(init.data_location == onnx.TensorProto.EXTERNAL
+                       for init in onnx.load(os.path.join(tmp_dir, 'streamed.onnx'),
+                                             load_external_data=False).graph.initializer)
+
+        assert all(torch.equal(param, state_dict[name]) for name, param in sim.model.state_dict().items()
+                   if isinstance(param, torch.Tensor))
+        assert all(not module._forward_hooks and not module._forward_pre_hooks for module in sim.model.modules())
+        assert all(isinstance(sim.model.get_submodule(name), BaseQuantizationMixin)
+                   for name in ['conv', 'bn', 'layers.0.linear', 'head'])
+
 
 class TestQuantsimUtilities:
 
@@ -55,6 +55,7 @@ from aimet_torch.v1.adaround.adaround_wrapper import AdaroundWrapper
 from aimet_torch.utils import create_fake_data_loader, create_rand_tensors_given_shapes, get_device
 from .models_ import test_models
 from aimet_torch._base.adaround.adaround_optimizer import AdaroundOptimizer
+from aimet_torch._base.adaround.activation_sampler import get_sequential_stages
 from aimet_torch.v1.adaround.adaround_weight import AdaroundParameters
 from aimet_torch.v2.quantsim import QuantizationSimModel
 from aimet_torch.v2.adaround import Adaround
@@ -433,6 +434,59 @@ class TestAdaround:
                 for k in list(enc.keys()):
                     assert enc[k] == enc_ckpts[k]
 
+    def test_adaround_with_sequential_sampling(self):
+        """ Test stage-by-stage activation sampling gives the same result as per-layer sampling """
+        def dummy_fwd(model, inputs):
+            return model(*inputs) if isinstance(inputs, (list, tuple)) else model(inputs)
+        torch.manual_seed(10)
+
+        data_loader = create_fake_data_loader(dataset_size=2, batch_size=1, image_size=(3, 32, 32))
+        model = MultiBlockModel().eval()
+        inp_tensor_list = create_rand_tensors_given_shapes((1, 3, 32, 32), get_device(model))
+
+        stages = get_sequential_stages(model, inp_tensor_list, dummy_fwd)
+        assert stages == ['conv1', 'block1.conv1', 'block1.relu', 'block1.conv2', 'conv2', 'relu',
+                          'block2.conv1', 'block2.relu', 'block2.conv2', 'conv3']
+
+        # TinyModel reshapes its input in forward() and therefore can't be split
+        tiny_model = test_models.TinyModel().eval()
+        assert get_sequential_stages(tiny_model, torch.randn(1, 3, 32, 32), dummy_fwd) == ['']
+
+        num_fp_calls = []
+        handle = model.conv1.register_forward_hook(lambda *_: num_fp_calls.append(None))
+        try:
+            with tempfile.TemporaryDirectory() as tempdir:
+                params = AdaroundParameters(data_loader=data_loader, num_batches=2, default_num_iterations=5,
+                                            forward_fn=dummy_fwd)
+                ada_rounded_model = Adaround.apply_adaround(model, inp_tensor_list, params, tempdir, 'dummy')
+                num_calls = len(num_fp_calls)
+                num_fp_calls.clear()
+
+                params = AdaroundParameters(data_loader=data_loader, num_batches=2, default_num_iterations=5,
+                                            forward_fn=dummy_fwd, sequential_sampling=True)
+                ada_rounded_model_seq = Adaround.apply_adaround(model, inp_tensor_list, params, tempdir,
+                                                                'dummy_sequential')
+                num_calls_seq = len(num_fp_calls)
+
+                with open(os.path.join(tempdir, 'dummy.encodings')) as json_file:
+                    encoding_data = json.load(json_file)['param_encodings']
+                with open(os.path.join(tempdir, 'dummy_sequential.encodings')) as json_file:
+                    encoding_data_seq = json.load(json_file)['param_encodings']
+        finally:
+            handle.remove()
+
+        # Earlier layers are no longer re-run to sample inputs of every later layer
+        assert num_calls_seq < num_calls
+
+        for (name, param), (name_seq, param_seq) in zip(ada_rounded_model.named_parameters(),
+                                                        ada_rounded_model_seq.named_parameters()):
+            assert name == name_seq
+            assert torch.allclose(param, param_seq)
+
+        assert encoding_data.keys() == encoding_data_seq.keys()
+        for key in encoding_data:
+            assert encoding_data[key] == encoding_data_seq[key]
+
     def test_apply_adaround_per_channel(self):
         """ test apply_adaround end to end using tiny model when using per-channel mode """
 
@@ -362,6 +362,62 @@ class TestAutoMixedPrecision:
         assert accuracy_list[3][2] >= accuracy_list[4][2]
         assert accuracy_list[4][2] >= accuracy_list[5][2]
 
+    def test_phase1_parallel(self, sim, dummy_input, candidates, forward_pass_callback, eval_callback_phase1,
+                             eval_callback_phase2, results_dir):
+        algo = GreedyMixedPrecisionAlgo(sim, dummy_input, candidates, eval_callback_phase1, eval_callback_phase2,
+                                        results_dir, True, forward_pass_callback)
+        algo.set_baseline()
+        accuracy_list = algo._create_and_save_accuracy_list(algo.baseline_candidate)
+
+        active_quantizers = {
+            quantizer_group: quantizer_group.get_active_quantizers(algo._module_name_dict)
+            for quantizer_group in algo.quantizer_groups
+        }
+
+        with unittest.mock.patch.object(GreedyMixedPrecisionAlgo, 'PHASE1_NUM_WORKERS', 2):
+            parallel_accuracy_list = algo._create_and_save_accuracy_list(algo.baseline_candidate)
+
+        assert parallel_accuracy_list == accuracy_list
+
+        # Quantizers of the current process should be left as they were
+        for quantizer_group in algo.quantizer_groups:
+            assert active_quantizers[quantizer_group] == \
+                    quantizer_group.get_active_quantizers(algo._module_name_dict)
+
+        # Finished results are saved incrementally and reused when phase 1 is resumed
+        file_path = os.path.join(results_dir, '.cache', 'accuracy_list.pkl')
+        with open(file_path, 'rb') as file:
+            assert pickle.load(file) == accuracy_list
+
+        algo._clean_start = False
+        with unittest.mock.patch.object(algo, '_evaluate_quantizer_group_candidate') as evaluate_fn:
+            assert algo._create_and_save_accuracy_list(algo.baseline_candidate) == accuracy_list
+        evaluate_fn.assert_not_called()
+
+    def test_phase1_optimize_parallel(self, sim, dummy_input, candidates, forward_pass_callback, eval_callback_phase1,
+                                      eval_callback_phase2, results_dir):
+        """
+        Given: Phase 1 with phase1_optimize enabled
+        When: Accuracy list is created serially and with worker processes
+        Then: 1) Encodings are computed once per non-baseline candidate instead of once per (quantizer group, candidate)
+              2) Serial and parallel accuracy lists should be identical
+        """
+        algo = GreedyMixedPrecisionAlgo(sim, dummy_input, candidates, eval_callback_phase1, eval_callback_phase2,
+                                        results_dir, True, forward_pass_callback, phase1_optimize=True)
+        algo.set_baseline()
+
+        with unittest.mock.patch.object(sim, 'compute_encodings', wraps=sim.compute_encodings) as compute_encodings:
+            accuracy_list = algo._create_and_save_accuracy_list(algo.baseline_candidate)
+
+        # One computation per non-baseline candidate plus the final computation with the baseline candidate
+        assert compute_encodings.call_count == len(candidates) - 1 + 1
+        assert len(accuracy_list) > len(candidates) - 1
+
+        with unittest.mock.patch.object(GreedyMixedPrecisionAlgo, 'PHASE1_NUM_WORKERS', 2):
+            parallel_accuracy_list = algo._create_and_save_accuracy_list(algo.baseline_candidate)
+
+        assert parallel_accuracy_list == accuracy_list
+
     def test_save_load_accuracy_list(
             self, sim, dummy_input, candidates, forward_pass_callback, eval_callback_phase1, eval_callback_phase2, results_dir
     ):
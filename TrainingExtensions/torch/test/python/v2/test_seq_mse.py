@@ -217,6 +217,38 @@ class TestSeqMse:
             assert not torch.allclose(before.min, after.min)
             assert not torch.allclose(before.max, after.max)
 
+    @pytest.mark.parametrize("module, quantizer_shape, block_size, inp_shape",
+                             [[torch.nn.Linear(64, 128), [128, 1], None, (4, 2, 16, 64)],
+                              [torch.nn.Linear(64, 128), [128, 8], [-1, -1], (4, 2, 16, 64)],
+                              [torch.nn.Conv2d(6, 32, 3), [32, 1, 1, 1], None, (4, 3, 6, 10, 10)],
+                              [torch.nn.Conv2d(6, 32, 3), [32, 3, 1, 1], [1, 2, -1, -1], (4, 3, 6, 10, 10)],
+                              [torch.nn.Conv2d(6, 32, 3, groups=2), [32, 1, 1, 1], None, (4, 3, 6, 10, 10)]])
+    @pytest.mark.parametrize("loss_fn", ['mse', 'l1', 'sqnr'])
+    def test_optimize_module_with_memory_budget(self, module, quantizer_shape, block_size, inp_shape, loss_fn):
+        """
+        Given: Module with per-channel or blockwise weight quantizer
+        When: Compute candidate losses with a memory budget smaller than the outputs of a single batch
+        Then: Losses accumulated chunk by chunk should be equal to the losses computed one candidate at a time
+        """
+        torch.manual_seed(0)
+        wrapper = QuantizationMixin.from_module(module)
+        wrapper.param_quantizers['weight'] = QuantizeDequantize(shape=quantizer_shape, bitwidth=4,
+                                                                symmetric=True, block_size=block_size)
+        x = torch.randn(*inp_shape)
+        xq = x + torch.randn(*inp_shape) * 0.1
+        min_tensor, max_tensor = SequentialMse.get_min_and_max_for_candidate_selection(wrapper)
+
+        params = SeqMseParams(num_batches=inp_shape[0], loss_fn=loss_fn)
+        expected = SequentialMse._compute_candidate_losses(wrapper, x, xq, min_tensor, max_tensor, params)
+
+        params = SeqMseParams(num_batches=inp_shape[0], loss_fn=loss_fn, memory_budget=64 * 1024)
+        loss = SequentialMse._compute_candidate_losses_in_chunks(wrapper, x, xq, min_tensor, max_tensor, params)
+        assert loss.shape == expected.shape
+        assert torch.allclose(loss, expected, rtol=1e-4, atol=1e-4)
+
+        optimize_module(wrapper, x, xq, params)
+        assert not wrapper.param_quantizers['weight']._allow_overwrite
+
     @pytest.mark.cuda()
     @pytest.mark.parametrize("inp_symmetry", ['asym', 'symfp', 'symqt'])
     @pytest.mark.parametrize("loss_fn", ['mse', 'l1', 'sqnr'])
@@ -291,6 +323,48 @@ class TestSeqMse:
         assert without_checkpoints_enc.scale == with_checkpoints_enc.scale
         assert without_checkpoints_enc.offset == with_checkpoints_enc.offset
 
+    @pytest.mark.parametrize("inp_symmetry", ['asym', 'symfp', 'symqt'])
+    def test_seq_mse_with_sequential_sampling(self, inp_symmetry):
+        """
+        Given: Model that runs its children back-to-back
+        When: Apply sequential MSE with and without sequential sampling
+        Then: 1) Earlier layers shouldn't be re-run to sample inputs of every later layer
+              2) Encodings should be bit-exact
+        """
+        torch.manual_seed(0)
+
+        data_loader = create_fake_data_loader(dataset_size=2, batch_size=1, image_size=(3, 32, 32))
+        model = SplittableModel().eval()
+        dummy_input = torch.randn(1, 3, 32, 32)
+        sim = QuantizationSimModel(model, dummy_input, default_param_bw=4)
+        sim_seq = QuantizationSimModel(model, dummy_input, default_param_bw=4)
+
+        num_calls = []
+        handles = [model.conv1.register_forward_hook(lambda *_: num_calls.append(None)),
+                   sim.model.conv1.register_forward_hook(lambda *_: num_calls.append(None)),
+                   sim_seq.model.conv1.register_forward_hook(lambda *_: num_calls.append(None))]
+        try:
+            params = SeqMseParams(num_batches=2, inp_symmetry=inp_symmetry)
+            apply_seq_mse(model, sim, data_loader, params, modules_to_exclude=[model.fc1])
+            num_calls_default = len(num_calls)
+            num_calls.clear()
+
+            params = SeqMseParams(num_batches=2, inp_symmetry=inp_symmetry, sequential_sampling=True)
+            apply_seq_mse(model, sim_seq, data_loader, params, modules_to_exclude=[model.fc1])
+            num_calls_seq = len(num_calls)
+        finally:
+            for handle in handles:
+                handle.remove()
+
+        assert num_calls_seq < num_calls_default
+
+        for name in ('conv1', 'conv2', 'conv3', 'conv4', 'fc2'):
+            enc = getattr(sim.model, name).param_quantizers['weight'].get_encodings()
+            enc_seq = getattr(sim_seq.model, name).param_quantizers['weight'].get_encodings()
+            assert torch.equal(enc.scale, enc_seq.scale)
+            assert torch.equal(enc.offset, enc_seq.offset)
+        assert sim_seq.model.fc1.param_quantizers['weight']._allow_overwrite
+
     @pytest.mark.parametrize("qscheme", [QuantScheme.post_training_tf, QuantScheme.training_range_learning_with_tf_init])
     def test_apply_seq_mse_with_modules_to_exclude(self, unlabeled_data_loader, qscheme):
         """ test apply_seq_mse end-to-end with exclusion list """